@@ -33,6 +33,16 @@ async def get_guilds() -> Response:
     return jsonify({"status": "success", **ipc_response.response})  # type: ignore
 
 
+@app.route("/metrics")
+@rate_limit(limit=1, period=timedelta(seconds=1))
+async def metrics() -> Response:
+    limit = request.args.get("limit", "10")
+    ipc_response = await ipc.request("metrics", limit=int(limit) if limit.isdigit() else 10)
+    if not ipc_response:
+        return jsonify({"status": "error", "message": "No metrics found"})
+    return jsonify({"status": "success", **ipc_response.response})  # type: ignore
+
+
 @app.route("/routes")
 async def routes() -> Response:
     rules = app.url_map.iter_rules()
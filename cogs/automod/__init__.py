@@ -1,14 +1,18 @@
 from __future__ import annotations
 
 import json
+import logging
 
 import discord
 from core import Cog, Context, Parrot
+from core.joins import JoinBuffer
 from discord.ext import commands
 
 from .parsers import Action, Condition, Trigger
 from .views import Automod
 
+log = logging.getLogger("cogs.automod")
+
 
 class AutomaticModeration(Cog):
     """Hihghly customizable automod system for your server!"""
@@ -53,6 +57,7 @@ class AutomaticModeration(Cog):
         # }
 
         self._auto_mod_logs = {}
+        self.joins = JoinBuffer(self.on_join_burst)
 
     async def ensure_configuration_cache(self, guild_id: int) -> None:
         data = await self.bot.automod_configurations.find_one({"guild_id": guild_id})
@@ -110,7 +115,11 @@ class AutomaticModeration(Cog):
             return
 
         self._was_ready = True
-        await self.bot.loop.create_task(self.__cache_build())
+        # `bot.guilds` is empty until READY
+        self.bot.defer_until_ready("automod.cache", self.__cache_build)
+
+    async def cog_unload(self) -> None:
+        self.joins.close()
 
     async def __cache_build(self):
         for guild in self.bot.guilds:
@@ -192,17 +201,26 @@ class AutomaticModeration(Cog):
         if member.guild is None or member.id == self.bot.user.id:
             return
 
-        data = self.auto_mod.get(member.guild.id)
+        if member.guild.id not in self.auto_mod:
+            return
+
+        self.joins.add(member)
+
+    async def on_join_burst(self, guild: discord.Guild, members: list[discord.Member]) -> None:
+        data = self.auto_mod.get(guild.id)
         if not data:
             return
 
-        for _rule_name, rule_data in data.items():
+        for rule_name, rule_data in data.items():
             trigger: Trigger = rule_data["trigger"]
             condition: Condition = rule_data["condition"]
-
-            if await trigger.check(member=member) and await condition.check(member=member):
-                action: Action = rule_data["action"]
-                await action.execute(member=member)
+            try:
+                if targets := await condition.filter_members(await trigger.filter_members(members)):
+                    action: Action = rule_data["action"]
+                    await action.execute_many(targets)
+            except Exception as e:
+                # one broken rule must not stop the others from handling the raid
+                log.error("Automod rule %r failed on %s joins in %s", rule_name, len(members), guild.id, exc_info=e)
 
     @commands.group(name="automod", invoke_without_command=True)
     @commands.has_permissions(manage_guild=True)
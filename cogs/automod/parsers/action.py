@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -10,7 +11,8 @@ if TYPE_CHECKING:
 import arrow
 from tabulate import tabulate
 
-from discord import Forbidden, Member, Message, Object, PermissionOverwrite
+from core.joins import run_bounded
+from discord import Forbidden, HTTPException, Member, Message, Object, PermissionOverwrite
 from discord.abc import GuildChannel
 from discord.utils import MISSING, maybe_coroutine, utcnow
 
@@ -18,6 +20,9 @@ reason_init = """AutoMod: {reason}
 Sent from {guild.name} ({guild.id})
 """
 
+# Maximum users per request for the bulk ban endpoint
+BULK_BAN_CHUNK = 200
+
 
 class AutomodWarnings:
     def __init__(self, *, bot: Parrot, raw_data: dict) -> None:
@@ -59,6 +64,27 @@ class AutomodWarnings:
         }
         await self.bot.automod_voilations.update_one(query, update, upsert=True)
 
+    async def warn_many(self, *, member_ids: Sequence[int], warning_name: str = "global") -> None:
+        now = utcnow().timestamp()
+        update = {
+            "$addToSet": {
+                "warnings": {
+                    "$each": [
+                        {
+                            "timestamp": now,
+                            "user_id": member_id,
+                            "warning_name": warning_name,
+                            "reason": None,
+                            "moderator_id": None,
+                            "expires_at": None,
+                        }
+                        for member_id in member_ids
+                    ],
+                },
+            },
+        }
+        await self.bot.automod_voilations.update_one({"guild_id": self.guild_id}, update, upsert=True)
+
     async def delete_warn(
         self,
         *,
@@ -170,6 +196,27 @@ class Action:
 
             await maybe_coroutine(func, **kw, **action)
 
+    async def execute_many(self, members: Sequence[Member]) -> None:
+        """|coro|.
+
+        Executes the actions for a batch of joins, one action at a time over every member.
+        Bans and voilations are written in bulk, anything else runs through a bounded executor.
+        """
+        for action in self.data:
+            batch = getattr(self, f"_batch_{action['type']}", None)
+            if batch is not None:
+                await batch(members, **action)
+                continue
+
+            func = getattr(self, action["type"], None)
+            if func is None:
+                continue
+
+            async def run(member: Member, func=func, action=action) -> None:
+                await maybe_coroutine(func, member=member, **action)
+
+            await run_bounded(members, run)
+
     async def delete_message(self, *, message: Message, **kw) -> None:
         await message.delete(delay=0)
 
@@ -258,3 +305,29 @@ class Action:
         assert message.guild is not None and isinstance(message.channel, GuildChannel)
         ch = message.guild.get_channel(channel) or message.channel
         await ch.send(msg, delete_after=delete_after)  # type: ignore
+
+    async def _batch_plus_voilation(self, members: Sequence[Member], *, name_of_voilation: str = None, **kw) -> None:
+        warnings = AutomodWarnings(bot=self.bot, raw_data={"guild_id": members[0].guild.id})
+        await warnings.warn_many(member_ids=[member.id for member in members], warning_name=name_of_voilation or "global")
+
+    async def _batch_ban_user(self, members: Sequence[Member], *, msg: str = None, **kw) -> None:
+        guild = members[0].guild
+        if not guild.me.guild_permissions.ban_members:
+            return
+
+        targets = [member for member in members if member.top_role < guild.me.top_role]
+        banned: list[Member] = []
+        for i in range(0, len(targets), BULK_BAN_CHUNK):
+            chunk = targets[i : i + BULK_BAN_CHUNK]
+            try:
+                result = await guild.bulk_ban(chunk, reason="Automod")
+            except HTTPException:
+                # bulk ban also needs Manage Server, ban them one by one
+                done, _ = await run_bounded(chunk, lambda member: guild.ban(member, reason="Automod"))
+                banned.extend(done)
+            else:
+                ids = {user.id for user in result.banned}
+                banned.extend(member for member in chunk if member.id in ids)
+
+        text = reason_init.format(reason=msg or "Banned", guild=guild)
+        await run_bounded(banned, lambda member: member.send(text))
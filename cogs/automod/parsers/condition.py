@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
+from datetime import timedelta
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -29,6 +31,26 @@ class Condition:
                 return False
         return True
 
+    async def filter_members(self, members: Sequence[Member]) -> list[Member]:
+        """|coro|.
+
+        The members, out of a batch of joins, which pass every condition.
+        Each condition only looks at the members which passed the previous ones.
+        """
+        members = list(members)
+        for condition in self.data:
+            if not members:
+                break
+
+            batch = getattr(self, f"_batch_{condition['type']}", None)
+            if batch is not None:
+                mask = batch(members, **condition)
+            else:
+                func = getattr(self, condition["type"])
+                mask = [await maybe_coroutine(func, member=member, **condition) for member in members]
+            members = [member for member, ok in zip(members, mask, strict=True) if ok]
+        return members
+
     def ignore_roles(self, *, member: Member, roles: list[int], **kw) -> bool:
         return any(role.id in roles for role in member.roles)
 
@@ -79,3 +101,31 @@ class Condition:
 
     def all_true(self, **kw) -> bool:
         return True
+
+    def _batch_account_age_below(self, members: Sequence[Member], *, age_in_min: int, **kw) -> list[bool]:
+        cutoff = utcnow() - timedelta(minutes=age_in_min)
+        return [member.created_at > cutoff for member in members]
+
+    def _batch_account_age_above(self, members: Sequence[Member], *, age_in_min: int, **kw) -> list[bool]:
+        cutoff = utcnow() - timedelta(minutes=age_in_min)
+        return [member.created_at < cutoff for member in members]
+
+    def _batch_server_member_duration_below(
+        self,
+        members: Sequence[Member],
+        *,
+        duration_in_min: int,
+        **kw,
+    ) -> list[bool]:
+        cutoff = utcnow() - timedelta(minutes=duration_in_min)
+        return [member.joined_at is not None and member.joined_at > cutoff for member in members]
+
+    def _batch_server_member_duration_above(
+        self,
+        members: Sequence[Member],
+        *,
+        duration_in_min: int,
+        **kw,
+    ) -> list[bool]:
+        cutoff = utcnow() - timedelta(minutes=duration_in_min)
+        return [member.joined_at is not None and member.joined_at < cutoff for member in members]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -59,6 +60,32 @@ class Trigger:
 
         return self.operator(ls)
 
+    async def filter_members(self, members: Sequence[Member]) -> list[Member]:
+        """|coro|.
+
+        The members, out of a batch of joins, for which the trigger fires.
+        Join triggers are evaluated over the whole batch, with each pattern compiled once.
+        """
+        if not self.data or not members:
+            return []
+
+        columns: list[list[bool]] = []
+        for tgr in self.data:
+            batch = getattr(self, f"_batch_{tgr['type']}", None)
+            if batch is not None:
+                columns.append(batch(members, **tgr))
+                continue
+
+            try:
+                func = getattr(self, tgr["type"])
+            except AttributeError:
+                continue
+            columns.append([await maybe_coroutine(func, member=member, **tgr) for member in members])
+
+        if not columns:
+            return list(members) if self.operator([]) else []
+        return [member for member, row in zip(members, zip(*columns, strict=True), strict=True) if self.operator(row)]
+
     def build_cooldowns(self) -> None:
         for tgr in self.data:
             if tgr["type"] == "x_user_messages_in_y_seconds":
@@ -267,3 +294,44 @@ class Trigger:
             return False
         has_scam_link = await cog._scam_detection(message, to_send=False)
         return bool(has_scam_link)
+
+    @staticmethod
+    def _words_pattern(words: list[str] | None) -> re.Pattern[str] | None:
+        # one scan of the name, instead of one per word
+        return re.compile("|".join(map(re.escape, words))) if words else None
+
+    def _batch_join_username_match_regex(self, members: Sequence[Member], *, regex: str, **kw) -> list[bool]:
+        search = re.compile(regex).search
+        return [bool(search(member.display_name) or search(member.name)) for member in members]
+
+    def _batch_join_username_not_match_regex(self, members: Sequence[Member], *, regex: str, **kw) -> list[bool]:
+        return [not matched for matched in self._batch_join_username_match_regex(members, regex=regex)]
+
+    def _batch_join_username_word_blacklist(self, members: Sequence[Member], *, words: list[str], **kw) -> list[bool]:
+        if (pattern := self._words_pattern(words)) is None:
+            return [False] * len(members)
+        search = pattern.search
+        return [bool(search(member.display_name) or search(member.name)) for member in members]
+
+    def _batch_join_username_word_whitelist(self, members: Sequence[Member], *, words: list[str], **kw) -> list[bool]:
+        return [not matched for matched in self._batch_join_username_word_blacklist(members, words=words)]
+
+    def _batch_join_username_invite(self, members: Sequence[Member], **kw) -> list[bool]:
+        search = INVITE_RE.search
+        return [bool(search(member.display_name) or search(member.name)) for member in members]
+
+    def _batch_nickname_match_regex(self, members: Sequence[Member], *, regex: str, **kw) -> list[bool]:
+        search = re.compile(regex).search
+        return [bool(search(member.display_name)) for member in members]
+
+    def _batch_nickname_not_match_regex(self, members: Sequence[Member], *, regex: str, **kw) -> list[bool]:
+        return [not matched for matched in self._batch_nickname_match_regex(members, regex=regex)]
+
+    def _batch_nickname_word_blacklist(self, members: Sequence[Member], *, words: list[str], **kw) -> list[bool]:
+        if (pattern := self._words_pattern(words)) is None:
+            return [False] * len(members)
+        search = pattern.search
+        return [bool(search(member.display_name)) for member in members]
+
+    def _batch_nickname_word_whitelist(self, members: Sequence[Member], *, words: list[str], **kw) -> list[bool]:
+        return [not matched for matched in self._batch_nickname_word_blacklist(members, words=words)]
@@ -53,6 +53,9 @@ class AutoResponders(Cog):
 
     async def cog_load(self):
         self.check_autoresponders.start()
+        self.bot.defer_until_ready("autoresponder.cache", self.__build_cache)
+
+    async def __build_cache(self):
         async for guild_data in self.bot.guild_configurations.find({"autoresponder": {"$exists": True}}):
             self.cache[guild_data["_id"]] = guild_data["autoresponder"]
 
@@ -1,15 +1,27 @@
 from __future__ import annotations
 
+import logging
+
 import discord
 from core import Cog, Parrot
+from core.joins import JoinBuffer, run_bounded
 
 from .settings import DEFCON_SETTINGS
 
+log = logging.getLogger("cogs.defcon.events")
+
+# a raid wave is broadcasted as one message, instead of one per member
+BROADCAST_EACH = 5
+
 
 class DefconListeners(Cog):
     def __init__(self, bot: Parrot) -> None:
         self.bot = bot
         self.settings = bot.guild_configurations_cache
+        self.joins = JoinBuffer(self.on_join_burst)
+
+    async def cog_unload(self) -> None:
+        self.joins.close()
 
     async def defcon_broadcast(self, message: str | discord.Embed, *, guild: discord.Guild, level: int) -> None:
         if self.has_defcon_in(guild) is False:
@@ -38,20 +50,36 @@ class DefconListeners(Cog):
         await self.bot.wait_until_ready()
         await channel.send(embed=embed)  # type: ignore
 
-    async def defcon_on_member_join(self, member: discord.Member, level: int) -> None:
+    async def defcon_on_members_join(self, members: list[discord.Member], level: int) -> None:
         settings = DEFCON_SETTINGS[level]["SETTINGS"]
         if settings.get("ALLOW_SERVER_JOIN", True):
             return
 
-        try:
-            await member.kick(reason=f"DEFCON is active and does not allow server joins. LEVEL {level}")
-        except discord.Forbidden:
-            pass
-        else:
+        guild = members[0].guild
+        if not guild.me.guild_permissions.kick_members:
+            return
+
+        reason = f"DEFCON is active and does not allow server joins. LEVEL {level}"
+        kicked, failures = await run_bounded(members, lambda member: member.kick(reason=reason))
+        if failures:
+            log.debug("DEFCON %s failed to kick %s members in %s: %s", level, sum(failures.values()), guild.id, failures)
+
+        if not kicked:
+            return
+
+        if len(kicked) > BROADCAST_EACH:
+            await self.defcon_broadcast(
+                f"**{len(kicked)}** members joined the server within a few seconds and were kicked for DEFCON level {level}",
+                guild=guild,
+                level=level,
+            )
+            return
+
+        for member in kicked:
             joined_at = discord.utils.format_dt(member.joined_at or discord.utils.utcnow(), style="R")
             await self.defcon_broadcast(
                 f"{member.mention} - **{member}** (`{member.id}`) has joined the server ({joined_at}) and was kicked for DEFCON level {level}",
-                guild=member.guild,
+                guild=guild,
                 level=level,
             )
 
@@ -109,11 +137,18 @@ class DefconListeners(Cog):
 
     @Cog.listener()
     async def on_member_join(self, member: discord.Member):
-        defcon = self.has_defcon_in(member.guild)
+        if self.has_defcon_in(member.guild) is False:
+            return
+
+        self.joins.add(member)
+
+    async def on_join_burst(self, guild: discord.Guild, members: list[discord.Member]) -> None:
+        # the level is read again, it may have been lowered during the window
+        defcon = self.has_defcon_in(guild)
         if defcon is False:
             return
 
-        await self.defcon_on_member_join(member, defcon)
+        await self.defcon_on_members_join(members, defcon)
 
     @Cog.listener("on_audit_log_entry_create")
     async def audit_member_update(self, entry: discord.AuditLogEntry) -> None:
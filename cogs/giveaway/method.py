@@ -102,13 +102,15 @@ async def __check_requirements(bot: Parrot, **kw: Any) -> list[int]:
     required_role: int = kw.get("required_role", 0)
     required_level: int = kw.get("required_level", 0)
 
-    for member in kw.get("winners", []):
-        member = await bot.get_or_fetch_member(current_guild, member)
+    winners: list[int] = kw.get("winners", [])
+    members = await bot.member_resolver.resolve(current_guild, winners)
+    required_members = await bot.member_resolver.resolve(required_guild, winners) if required_guild else {}
+
+    for member in winners:
+        member = members.get(member)
         assert isinstance(member, discord.Member)
-        if required_guild:
-            is_member_none = await bot.get_or_fetch_member(required_guild, member.id)
-            if is_member_none is None:
-                __item__remove(real_winners, member)
+        if required_guild and member.id not in required_members:
+            __item__remove(real_winners, member)
 
         if required_role and not member.get_role(required_role):
             __item__remove(real_winners, member)
@@ -94,6 +94,9 @@ class Highlight(Cog):
         await self.bulk_insert()
 
     async def cog_load(self):
+        self.bot.defer_until_ready("highlight.cache", self.__build_cache)
+
+    async def __build_cache(self):
         log.info("Getting all the highlight settings")
         async for data in self.bot.user_collections_ind.find({"highlight_settings": {"$exists": True}}):
             self.cached_settings[data["_id"]] = data["highlight_settings"]
@@ -55,6 +55,10 @@ class IPCRoutes(Cog):
 
         return await self.bot.mongo[db][collection].update_one(query, update, upsert=upsert)
 
+    @Server.route()
+    async def metrics(self, data: ClientPayload) -> dict[str, Any]:
+        return self.bot.metrics.to_dict(getattr(data, "limit", 10))
+
     @Server.route()
     async def sql_execute(self, data: ClientPayload) -> Any:
         args = [data.query]
@@ -263,8 +267,8 @@ class IPCRoutes(Cog):
             webhook = data["global_chat"]
             if (hook := webhook["webhook"]) and webhook["enable"]:
                 try:
-                    webhook = discord.Webhook.from_url(f"{hook}", session=self.bot.http_session)
-                    msg = await webhook.send(
+                    msg = await self.bot.webhooks.send(
+                        f"{hook}",
                         content=data.content[:1990],
                         username=f"{data.author_name}",
                         avatar_url=data.avatar_url,
@@ -274,6 +278,8 @@ class IPCRoutes(Cog):
                 except (discord.NotFound, discord.HTTPException):
                     pass
                 else:
+                    if msg is None:
+                        continue
                     MESSAGES.append(
                         {
                             "jump_url": msg.jump_url,
@@ -96,11 +96,9 @@ class Leveling(Cog):
                 return countr
 
     async def __get_entries(self, *, collection: Collection, limit: int, guild: discord.Guild):
-        ls = []
-        async for data in collection.find({}, limit=limit, sort=[("xp", -1)]):
-            if member := await self.bot.get_or_fetch_member(guild, data["_id"]):  # type: ignore
-                ls.append(f"{member} (`{member.id}`)")
-        return ls
+        ids: list[int] = [data["_id"] async for data in collection.find({}, {"_id": 1}, limit=limit, sort=[("xp", -1)])]
+        members = await self.bot.member_resolver.resolve(guild, ids)
+        return [f"{member} (`{member.id}`)" for _id in ids if (member := members.get(_id))]
 
     @commands.group(name="leveling", aliases=["ranking"], invoke_without_command=True)
     @commands.has_permissions(administrator=True)
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import Counter, deque
+from collections.abc import Awaitable, Callable, Sequence
+from time import monotonic
+from typing import TYPE_CHECKING, Literal
+
+import discord
+from core import Context, ParrotView
+
+if TYPE_CHECKING:
+    from typing import TypeAlias
+
+    Target: TypeAlias = discord.Member | discord.User | discord.Object
+    Action: TypeAlias = Callable[[Target], Awaitable[object]]
+    BulkAction: TypeAlias = Callable[[list[Target]], Awaitable[tuple[Sequence[Target], Sequence[Target]]]]
+
+__all__ = ("BulkJob", "get_job", "JOBS")
+
+log = logging.getLogger("cogs.mod.bulk")
+
+# Role and kick routes share a per guild bucket, discord.py waits on it for us.
+# More workers than this only queue up inside the HTTP client.
+CONCURRENCY = 5
+# Maximum users per request for the bulk ban endpoint
+BULK_BAN_CHUNK = 200
+PROGRESS_INTERVAL = 5
+# jobs this small are run in place: no progress message, and not held by a running job
+INLINE_TARGETS = 3
+FAILED_SAMPLE = 10
+
+# guild ID -> the latest job, finished, cancelled or still running
+JOBS: dict[int, BulkJob] = {}
+
+
+def get_job(guild_id: int) -> BulkJob | None:
+    return JOBS.get(guild_id)
+
+
+class BulkJobView(ParrotView):
+    def __init__(self, job: BulkJob, *, ctx: Context) -> None:
+        super().__init__(timeout=None, ctx=ctx)
+        self.job = job
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.red)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        self.job.cancel()
+        button.disabled = True
+        await interaction.response.edit_message(view=self)
+
+
+class BulkJob:
+    """A member operation run over many targets.
+
+    Targets are processed by a few concurrent workers (or in chunks, if a bulk
+    endpoint is available), progress is reported by editing one message and
+    failures are collected into one summary. A cancelled job keeps the targets
+    it did not process, so that it can be resumed.
+    """
+
+    def __init__(
+        self,
+        *,
+        guild: discord.Guild,
+        name: str,
+        targets: Sequence[Target],
+        action: Action,
+        bulk_action: BulkAction | None = None,
+        concurrency: int = CONCURRENCY,
+    ) -> None:
+        self.guild = guild
+        self.name = name
+        self.action = action
+        self.bulk_action = bulk_action
+        self.concurrency = concurrency
+
+        self.pending: deque[Target] = deque(targets)
+        self.total: int = len(self.pending)
+        self.succeeded: int = 0
+        self.failures: Counter[str] = Counter()
+        self.failed_targets: list[Target] = []
+
+        self.state: Literal["pending", "running", "cancelled", "finished"] = "pending"
+        self.started_at: float | None = None
+        self.message: discord.Message | None = None
+        self.task: asyncio.Task | None = None
+
+    @property
+    def processed(self) -> int:
+        return self.succeeded + sum(self.failures.values())
+
+    @property
+    def running(self) -> bool:
+        return self.state == "running"
+
+    def cancel(self) -> None:
+        if self.running:
+            self.state = "cancelled"
+
+    def _fail(self, target: Target, error: Exception | str) -> None:
+        self.failures[str(error)] += 1
+        if len(self.failed_targets) < FAILED_SAMPLE:
+            self.failed_targets.append(target)
+
+    async def _worker(self) -> None:
+        while self.pending and self.running:
+            target = self.pending.popleft()
+            try:
+                await self.action(target)
+            except discord.HTTPException as e:
+                self._fail(target, e)
+            else:
+                self.succeeded += 1
+
+    async def _bulk_worker(self) -> None:
+        assert self.bulk_action is not None
+
+        while self.pending and self.running:
+            chunk = [self.pending.popleft() for _ in range(min(BULK_BAN_CHUNK, len(self.pending)))]
+            try:
+                done, failed = await self.bulk_action(chunk)
+            except discord.HTTPException as e:
+                # bulk endpoint not usable here (missing Manage Server, ...), do them one by one
+                log.debug("Bulk action of %s failed, falling back. %s", self.name, e)
+                self.pending.extendleft(reversed(chunk))
+                self.bulk_action = None
+                return
+
+            self.succeeded += len(done)
+            for target in failed:
+                self._fail(target, "Could not be banned")
+
+    def progress(self) -> str:
+        elapsed = monotonic() - (self.started_at or monotonic())
+        failed = sum(self.failures.values())
+        return (
+            f"**{self.name}**: {self.processed}/{self.total} processed, {failed} failed "
+            f"({elapsed:.0f}s elapsed){' - cancelled' if self.state == 'cancelled' else ''}"
+        )
+
+    def summary(self) -> str:
+        lines = [self.progress()]
+        if self.state == "cancelled" and self.pending:
+            lines.append(f"{len(self.pending)} left. Use `bulkjob resume` to continue.")
+        if self.failures:
+            lines.append("**Failures:**")
+            lines.extend(f"- `{count}x` {error}" for error, count in self.failures.most_common(5))
+        if self.failed_targets:
+            lines.append(f"Failed for: {', '.join(str(t) for t in self.failed_targets)}")
+        return "\n".join(lines)[:2000]
+
+    async def _report(self) -> None:
+        while self.running:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            if self.message is not None and self.running:
+                try:
+                    await self.message.edit(content=self.progress())
+                except discord.HTTPException:
+                    return
+
+    async def _run_inline(self, ctx: Context, destination: discord.abc.Messageable) -> BulkJob:
+        targets = list(self.pending)
+        self.state = "running"
+        self.started_at = monotonic()
+        try:
+            await asyncio.gather(*(self._worker() for _ in targets))
+        finally:
+            if self.running:
+                self.state = "finished"
+
+        if self.failures:
+            await destination.send(self.summary())
+        else:
+            await destination.send(f"{ctx.author.mention} **{self.name}** done for {', '.join(f'**{t}**' for t in targets)}")
+        return self
+
+    async def run(self, ctx: Context, *, destination: discord.abc.Messageable | None = None) -> BulkJob:
+        """|coro|.
+
+        Runs (or resumes) the job until every target is processed or the job is cancelled.
+        Jobs of at most :data:`INLINE_TARGETS` targets are simply awaited, they neither
+        wait for nor block the running job of the guild.
+        """
+        if self.total <= INLINE_TARGETS and self.state == "pending":
+            return await self._run_inline(ctx, destination or ctx.channel)
+
+        current = JOBS.get(self.guild.id)
+        if current is not None and current is not self and current.running:
+            await ctx.error(f"{ctx.author.mention} a bulk job (**{current.name}**) is already running in this server.")
+            return self
+
+        JOBS[self.guild.id] = self
+        destination = destination or ctx.channel
+
+        self.state = "running"
+        self.started_at = monotonic()
+
+        view = BulkJobView(self, ctx=ctx)
+        self.message = await destination.send(self.progress(), view=view)
+        view.message = self.message
+
+        reporter = asyncio.create_task(self._report())
+        try:
+            if self.bulk_action is not None:
+                await self._bulk_worker()
+            if self.running and self.pending:
+                await asyncio.gather(*(self._worker() for _ in range(min(self.concurrency, len(self.pending)))))
+        finally:
+            reporter.cancel()
+            if self.running:
+                self.state = "finished"
+            view.stop()
+
+        log.debug("Bulk job %s in %s: %s", self.name, self.guild.id, self.state)
+        try:
+            await self.message.edit(content=self.summary(), view=None)
+        except discord.HTTPException:
+            await destination.send(self.summary())
+        return self
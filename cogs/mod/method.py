@@ -1,19 +1,23 @@
 from __future__ import annotations
 
-import asyncio
 import datetime
 import io
 from collections import Counter
 from collections.abc import Callable
 from typing import Any, Literal
 
+from bson import ObjectId
+
 import discord
 from core import Context, Parrot
 from discord.ext import commands
 from utilities.time import FutureTime, ShortTime
 
+from cogs.mod.bulk import BulkJob
+from cogs.mod.purge import MAX_SEARCH, Purge, bulk_delete_cutoff
 
-async def _add_roles_bot(
+
+async def _bulk_roles(
     *,
     guild: discord.Guild,
     command_name: str,
@@ -22,7 +26,7 @@ async def _add_roles_bot(
     operator: Literal["+", "add", "give", "-", "remove", "take"],
     role: discord.Role,
     reason: str | None,
-    **kwargs: Any,
+    bots: bool,
 ):
     if ctx.author.top_role.position < role.position:
         return await destination.send(f"{ctx.author.mention} can not assign/remove/edit the role which is above you")
@@ -32,15 +36,51 @@ async def _add_roles_bot(
 
     if is_mod and (is_mod.id == role.id):
         return await destination.send(f"{ctx.author.mention} can not assign/remove/edit mod role")
-    for member in guild.members:
-        try:
-            if member.bot:
-                if operator.lower() in ["+", "add", "give"]:
-                    await member.add_roles(role, reason=reason)
-                elif operator.lower() in ["-", "remove", "take"]:
-                    await member.remove_roles(role, reason=reason)
-        except Exception as e:
-            await destination.send(f"Can not able to {command_name} **{member}**. Error raised: **{e}**")
+
+    if operator.lower() in ["+", "add", "give"]:
+        # members which already have the role are skipped, saves a request for each
+        targets = [m for m in guild.members if m.bot is bots and role not in m.roles]
+
+        async def action(member: discord.Member) -> None:
+            await member.add_roles(role, reason=reason)
+
+    elif operator.lower() in ["-", "remove", "take"]:
+        targets = [m for m in guild.members if m.bot is bots and role in m.roles]
+
+        async def action(member: discord.Member) -> None:
+            await member.remove_roles(role, reason=reason)
+
+    else:
+        return None
+
+    if not targets:
+        return await destination.send(f"{ctx.author.mention} nothing to do, no member to {command_name}")
+
+    job = BulkJob(guild=guild, name=f"{command_name} {operator} {role.name}", targets=targets, action=action)
+    await job.run(ctx, destination=destination)
+
+
+async def _add_roles_bot(
+    *,
+    guild: discord.Guild,
+    command_name: str,
+    ctx: Context,
+    destination: discord.abc.Messageable,
+    operator: Literal["+", "add", "give", "-", "remove", "take"],
+    role: discord.Role,
+    reason: str | None,
+    **kwargs: Any,
+):
+    await _bulk_roles(
+        guild=guild,
+        command_name=command_name,
+        ctx=ctx,
+        destination=destination,
+        operator=operator,
+        role=role,
+        reason=reason,
+        bots=True,
+    )
 
 
 async def _add_roles_humans(
@@ -54,22 +94,16 @@ async def _add_roles_humans(
     reason: str | None,
     **kwargs: Any,
 ):
-    if ctx.author.top_role.position < role.position:
-        return await destination.send(f"{ctx.author.mention} can not assign/remove/edit the role which is above you")
-    if role.permissions.administrator:
-        return await destination.send(f"{ctx.author.mention} can not assign/remove/edit admin role.")
-    is_mod = await ctx.modrole()
-    if is_mod and (is_mod.id == role.id):
-        return await destination.send(f"{ctx.author.mention} can not assign/remove/edit mod role")
-    for member in guild.members:
-        try:
-            if not member.bot:
-                if operator.lower() in ["+", "add", "give"]:
-                    await member.add_roles(role, reason=reason)
-                elif operator.lower() in ["-", "remove", "take"]:
-                    await member.remove_roles(role, reason=reason)
-        except Exception as e:
-            await destination.send(f"Can not able to {command_name} **{member}**. Error raised: **{e}**")
+    await _bulk_roles(
+        guild=guild,
+        command_name=command_name,
+        ctx=ctx,
+        destination=destination,
+        operator=operator,
+        role=role,
+        reason=reason,
+        bots=False,
+    )
 
 
 async def _add_roles(
@@ -266,10 +300,7 @@ async def _sticky_ban(
         silent=silent,
         **kwargs,
     )
-    await ctx.bot.guild_collections_ind.update_one(
-        {"_id": guild.id},
-        {"$push": {"sticky_bans": member if isinstance(member, int) else member.id}},
-    )
+    ctx.bot.moderation.add_sticky_ban(guild.id, member if isinstance(member, int) else member.id)
 
 async def _unsticky_ban(
     *,
@@ -282,6 +313,8 @@ async def _unsticky_ban(
     silent: bool = False,
     **kwargs: Any,
 ) -> None:
+    # before the unban, else the unban listener bans them again
+    ctx.bot.moderation.remove_sticky_ban(guild.id, member if isinstance(member, int) else member.id)
     await _unban(
         guild=guild,
         command_name=command_name,
@@ -291,10 +324,23 @@ async def _unsticky_ban(
         reason=reason,
         **kwargs,
     )
-    await ctx.bot.guild_collections_ind.update_one(
-        {"_id": guild.id},
-        {"$pull": {"sticky_bans": member if isinstance(member, int) else member.id}},
-    )
+
+
+def _check_targets(
+    *,
+    guild: discord.Guild,
+    command_name: str,
+    ctx: Context,
+    members: list[discord.Member],
+) -> list[discord.Member]:
+    for member in members:
+        if ctx.author.top_role.position < member.top_role.position:
+            msg = f"{ctx.author.mention} can not {command_name} the {member}, as the their's role is above you"
+            raise commands.BadArgument(
+                msg,
+            )
+    return [member for member in members if member.id not in (ctx.author.id, guild.me.id)]
+
 
 async def _mass_ban(
     *,
@@ -308,25 +354,27 @@ async def _mass_ban(
     **kwargs: Any,
 ):
     members = members if isinstance(members, list) else [members]
-    for member in members:
-        if ctx.author.top_role.position < member.top_role.position:
-            msg = f"{ctx.author.mention} can not {command_name} the {member}, as the their's role is above you"
-            raise commands.BadArgument(
-                msg,
-            )
-        try:
-            if member.id in (ctx.author.id, guild.me.id):
-                await destination.send(f"{ctx.author.mention} don't do that, Bot is only trying to help")
-                return
-            await guild.ban(
-                member,
-                reason=reason,
-                delete_message_days=days,
-            )
-        except Exception as e:
-            await destination.send(f"Can not able to {command_name} **{member}**. Error raised: **{e}**")
+    targets = _check_targets(guild=guild, command_name=command_name, ctx=ctx, members=members)
+    if len(targets) != len(members):
+        await destination.send(f"{ctx.author.mention} don't do that, Bot is only trying to help")
+    if not targets:
+        return
+
+    async def action(member: discord.abc.Snowflake) -> None:
+        await guild.ban(member, reason=reason, delete_message_days=days)
 
-    await destination.send(f"{ctx.author.mention} **{', '.join([str(member) for member in members])}** are banned!")
+    async def bulk_action(chunk: list[discord.abc.Snowflake]):
+        result = await guild.bulk_ban(chunk, reason=reason, delete_message_seconds=days * 86400)
+        return result.banned, result.failed
+
+    job = BulkJob(
+        guild=guild,
+        name=command_name,
+        targets=targets,
+        action=action,
+        bulk_action=bulk_action if hasattr(guild, "bulk_ban") and len(targets) > 1 else None,
+    )
+    await job.run(ctx, destination=destination)
 
 
 async def _softban(
@@ -340,22 +388,18 @@ async def _softban(
     **kwargs: Any,
 ):
     members = members if isinstance(members, list) else [members]
-    for member in members:
-        if ctx.author.top_role.position < member.top_role.position:
-            msg = f"{ctx.author.mention} can not {command_name} the {member}, as the their's role is above you"
-            raise commands.BadArgument(
-                msg,
-            )
-        try:
-            if member.id in (ctx.author.id, guild.me.id):
-                await destination.send(f"{ctx.author.mention} don't do that, Bot is only trying to help")
-                return
-            await member.ban(reason=reason)
-            await guild.unban(member, reason=reason)
+    targets = _check_targets(guild=guild, command_name=command_name, ctx=ctx, members=members)
+    if len(targets) != len(members):
+        await destination.send(f"{ctx.author.mention} don't do that, Bot is only trying to help")
+    if not targets:
+        return
 
-            await destination.send(f"{ctx.author.mention} **{member}** is soft banned!")
-        except Exception as e:
-            await destination.send(f"Can not able to {command_name} **{member}**. Error raised: **{e}**")
+    async def action(member: discord.Member) -> None:
+        await member.ban(reason=reason)
+        await guild.unban(member, reason=reason)
+
+    job = BulkJob(guild=guild, name=command_name, targets=targets, action=action)
+    await job.run(ctx, destination=destination)
 
 
 async def _temp_ban(
@@ -373,33 +417,51 @@ async def _temp_ban(
 ):
     bot = bot or ctx.bot
     members = members if isinstance(members, list) else [members]
+    dt = duration if isinstance(duration, datetime.datetime) else duration.dt
+
+    timers: list[dict[str, Any]] = []
+    banned: list[discord.Member] = []
     for member in members:
-        try:
-            if member.id in (ctx.author.id, guild.me.id) and not silent:
+        if member.id in (ctx.author.id, guild.me.id):
+            if not silent:
                 await destination.send(f"{ctx.author.mention} don't do that, Bot is only trying to help")
-                return
+            continue
+        try:
             await guild.ban(discord.Object(id=member.id), reason=reason)
-            mod_action = {
-                "action": "UNBAN",
-                "member": member.id,
-                "reason": f"Action requested by: {ctx.author} ({ctx.author.id}) | Reason: Automatic tempban action",
-                "guild": guild.id,
-            }
-
-            await ctx.bot.create_timer(
-                _event_name="mod_action",
-                expires_at=duration.dt.timestamp(),
-                created_at=discord.utils.utcnow().timestamp(),
-                message=ctx.message.id,
-                mod_action=mod_action,
-            )
-            await destination.send(
-                f"{ctx.author.mention} **{member}** will be unbanned {discord.utils.format_dt(duration.dt, 'R')}!",
-            )
-
         except Exception as e:
             if not silent:
                 await destination.send(f"Can not able to {command_name} **{member}**. Error raised: **{e}**")
+            continue
+
+        banned.append(member)
+        timers.append(
+            {
+                # one message can tempban many members, so the message ID can not be the timer ID
+                "_id": ObjectId(),
+                "_event_name": "mod_action",
+                "expires_at": dt.timestamp(),
+                "created_at": discord.utils.utcnow().timestamp(),
+                "mod_action": {
+                    "action": "UNBAN",
+                    "member": member.id,
+                    "reason": f"Action requested by: {ctx.author} ({ctx.author.id}) | Reason: Automatic tempban action",
+                    "guild": guild.id,
+                },
+            },
+        )
+
+    if not timers:
+        return
+
+    await bot.create_timers(*timers)
+    if len(timers) == 1:
+        await destination.send(
+            f"{ctx.author.mention} **{banned[0]}** will be unbanned {discord.utils.format_dt(dt, 'R')}!",
+        )
+    else:
+        await destination.send(
+            f"{ctx.author.mention} **{len(timers)}** members will be unbanned {discord.utils.format_dt(dt, 'R')}!",
+        )
 
 
 async def _unban(
@@ -650,24 +712,17 @@ async def _mass_kick(
     **kwargs: Any,
 ):
     members = members if isinstance(members, list) else [members]
-    for member in members:
-        if ctx.author.top_role.position < member.top_role.position:
-            msg = f"{ctx.author.mention} can not {command_name} the {member}, as the their's role is above you"
-            raise commands.BadArgument(
-                msg,
-            )
-        try:
-            if member.id in (ctx.author.id, guild.me.id):
-                await destination.send(f"{ctx.author.mention} don't do that, Bot is only trying to help")
-                return
-            await member.kick(reason=reason)
-        except Exception as e:
-            await destination.send(f"Can not able to {command_name} **{member}**. Error raised: **{e}**")
+    targets = _check_targets(guild=guild, command_name=command_name, ctx=ctx, members=members)
+    if len(targets) != len(members):
+        await destination.send(f"{ctx.author.mention} don't do that, Bot is only trying to help")
+    if not targets:
+        return
 
-        await asyncio.sleep(0.25)
-    await destination.send(
-        f"{ctx.author.mention} **{', '.join([str(member) for member in members])}** are kicked from the server!",
-    )
+    async def action(member: discord.Member) -> None:
+        await member.kick(reason=reason)
+
+    job = BulkJob(guild=guild, name=command_name, targets=targets, action=action)
+    await job.run(ctx, destination=destination)
 
 
 # BLOCK
@@ -1270,20 +1325,14 @@ async def do_removal(
     before: int | None = None,
     after: int | None = None,
 ):
-    limit = max(1, min(limit or 1, 2000))
+    limit = max(1, min(limit or 1, MAX_SEARCH))
 
     passed_before = ctx.message if before is None else discord.Object(id=before)
-    two_weeks_before = ctx.message.created_at - datetime.timedelta(weeks=2)
-    two_weeks_before_snowflake = discord.utils.time_snowflake(two_weeks_before)
-
-    if after:
-        _after = max(two_weeks_before_snowflake, after)
-        passed_after = discord.Object(id=_after)
-    else:
-        passed_after = None
+    passed_after = discord.Object(id=bulk_delete_cutoff(ctx.message.created_at, after))
 
+    purge = Purge(ctx.channel, predicate, limit=limit, before=passed_before, after=passed_after)
     try:
-        deleted = await ctx.channel.purge(limit=limit, before=passed_before, after=passed_after, check=predicate)
+        deleted = await purge.run(progress_to=ctx.channel)
     except discord.HTTPException as e:
         return await ctx.send(f"Can not able to {ctx.command.qualified_name}. Error raised: **{e}** (try a smaller search?)")
 
@@ -1295,6 +1344,9 @@ async def do_removal(
         spammers = sorted(spammers.items(), key=lambda t: t[1], reverse=True)
         messages.extend(f"**{name}**: {count}" for name, count in spammers)
 
+    if purge.error is not None:
+        messages.append(f"\nStopped early. Error raised: **{purge.error}**")
+
     to_send = "\n".join(messages)
 
     if len(to_send) > 2000:
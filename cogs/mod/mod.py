@@ -6,17 +6,16 @@ import re
 import shlex
 from typing import Annotated, Literal
 
-import arrow
-
 import discord
 from cogs.mod import method as mod_method
+from cogs.mod.bulk import get_job
 from cogs.mod.embeds import MEMBER_EMBED, ROLE_EMBED, TEXT_CHANNEL_EMBED, VOICE_CHANNEL_EMBED
+from cogs.mod.purge import MAX_SEARCH, PurgeFilter
 from core import Cog, Context, Parrot
 from discord.ext import commands
 from utilities.checks import in_temp_channel, is_mod
 from utilities.converters import ActionReason, BannedMember, MemberID, UserID
 from utilities.time import FutureTime, ShortTime
-from utilities.regex import LINKS_RE
 
 class Arguments(argparse.ArgumentParser):
     def error(self, message: str):
@@ -506,6 +505,49 @@ class Moderator(Cog):
             reason=reason,
         )
 
+    @commands.group(name="bulkjob", invoke_without_command=True)
+    @commands.check_any(is_mod(), commands.has_permissions(manage_guild=True))
+    @Context.with_type
+    async def bulk_job(self, ctx: Context):
+        """To see the progress of the latest bulk action (role all, massban, masskick, ...) of the server.
+
+        **Examples:**
+        - `[p]bulkjob`
+        """
+        job = get_job(ctx.guild.id)
+        if job is None:
+            return await ctx.error(f"{ctx.author.mention} no bulk job was run in this server.")
+        await ctx.reply(job.summary())
+
+    @bulk_job.command(name="cancel")
+    @commands.check_any(is_mod(), commands.has_permissions(manage_guild=True))
+    @Context.with_type
+    async def bulk_job_cancel(self, ctx: Context):
+        """To cancel the running bulk action. It can be resumed later.
+
+        **Examples:**
+        - `[p]bulkjob cancel`
+        """
+        job = get_job(ctx.guild.id)
+        if job is None or not job.running:
+            return await ctx.error(f"{ctx.author.mention} no bulk job is running in this server.")
+        job.cancel()
+        await ctx.tick()
+
+    @bulk_job.command(name="resume")
+    @commands.check_any(is_mod(), commands.has_permissions(manage_guild=True))
+    @Context.with_type
+    async def bulk_job_resume(self, ctx: Context):
+        """To resume the cancelled bulk action, from where it was left.
+
+        **Examples:**
+        - `[p]bulkjob resume`
+        """
+        job = get_job(ctx.guild.id)
+        if job is None or job.state != "cancelled" or not job.pending:
+            return await ctx.error(f"{ctx.author.mention} no cancelled bulk job to resume in this server.")
+        await job.run(ctx)
+
     @commands.command()
     @commands.check_any(is_mod(), commands.has_permissions(kick_members=True))
     @commands.bot_has_permissions(manage_channels=True, manage_permissions=True, manage_roles=True)
@@ -739,11 +781,7 @@ class Moderator(Cog):
         - `[p]clean 10`
         """
         if ctx.invoked_subcommand is None:
-
-            def check(message: discord.Message) -> bool:
-                return message.created_at > arrow.utcnow().shift(days=-14).datetime
-
-            await mod_method.do_removal(ctx, num, check)
+            await mod_method.do_removal(ctx, num, PurgeFilter().compile())
 
     @clean.command(aliases=["embed"])
     @commands.check_any(is_mod(), commands.has_permissions(manage_messages=True))
@@ -755,7 +793,7 @@ class Moderator(Cog):
         - `[p]clean embeds`
         - `[p]clean embeds 10`
         """
-        await mod_method.do_removal(ctx, search, lambda e: len(e.embeds))
+        await mod_method.do_removal(ctx, search, PurgeFilter(embeds=True).compile())
 
     @clean.command(name="regex", aliases=["re"])
     @commands.check_any(is_mod(), commands.has_permissions(manage_messages=True))
@@ -768,10 +806,10 @@ class Moderator(Cog):
         - `[p]clean regex .*`
         - `[p]clean regex .* 10`
         """
-        pattern = pattern or r".*"
-
-        def check(m: discord.Message) -> bool:
-            return bool(re.match(rf"{pattern}", m.content)) and m.created_at > arrow.utcnow().shift(days=-14).datetime
+        try:
+            check = PurgeFilter(regex=pattern or r".*").compile()
+        except re.error as e:
+            return await ctx.error(f"{ctx.author.mention} invalid regex pattern. Error raised: **{e}**")
 
         await mod_method.do_removal(ctx, search, check)
 
@@ -785,7 +823,7 @@ class Moderator(Cog):
         - `[p]clean files`
         - `[p]clean files 10`
         """
-        await mod_method.do_removal(ctx, search, lambda e: len(e.attachments))
+        await mod_method.do_removal(ctx, search, PurgeFilter(files=True).compile())
 
     @clean.command(aliases=["image", "imgs", "img", "picture", "pictures", "pics", "pic"])
     @commands.check_any(is_mod(), commands.has_permissions(manage_messages=True))
@@ -797,7 +835,7 @@ class Moderator(Cog):
         - `[p]clean images`
         - `[p]clean images 10`
         """
-        await mod_method.do_removal(ctx, search, lambda e: len(e.embeds) or len(e.attachments))
+        await mod_method.do_removal(ctx, search, PurgeFilter(embeds=True, files=True, any_=True).compile())
 
     @clean.command(alises=["member"])
     @commands.check_any(is_mod(), commands.has_permissions(manage_messages=True))
@@ -809,7 +847,7 @@ class Moderator(Cog):
         - `[p]clean user @member`
         - `[p]clean user @member 10`
         """
-        await mod_method.do_removal(ctx, search, lambda e: e.author == member)
+        await mod_method.do_removal(ctx, search, PurgeFilter(users=[member]).compile())
 
     @clean.command(aliases=["contain", "substring", "substr"])
     @commands.check_any(is_mod(), commands.has_permissions(manage_messages=True))
@@ -824,7 +862,7 @@ class Moderator(Cog):
         if len(substr) < 3:
             await ctx.send("The substring length must be at least 3 characters.")
         else:
-            await mod_method.do_removal(ctx, 100, lambda e: substr in e.content)
+            await mod_method.do_removal(ctx, 100, PurgeFilter(contains=[substr]).compile())
 
     @clean.command(name="bot", aliases=["bots"])
     @commands.check_any(is_mod(), commands.has_permissions(manage_messages=True))
@@ -837,10 +875,8 @@ class Moderator(Cog):
         - `[p]clean bot !`
         """
 
-        def predicate(m: discord.Message):
-            return (
-                (m.webhook_id is None and m.author.bot) or (prefix and m.content.startswith(prefix))
-            ) and m.created_at > arrow.utcnow().shift(days=-14).datetime
+        def predicate(m: discord.Message) -> bool:
+            return (m.webhook_id is None and m.author.bot) or bool(prefix and m.content.startswith(prefix))
 
         await mod_method.do_removal(ctx, search, predicate)
 
@@ -854,12 +890,7 @@ class Moderator(Cog):
         - `[p]clean emoji`
         - `[p]clean emoji 10`
         """
-        custom_emoji = re.compile(r"<a?:[a-zA-Z0-9\_]+:([0-9]+)>")
-
-        def predicate(m: discord.Message) -> bool:
-            return bool(custom_emoji.search(m.content)) and m.created_at > arrow.utcnow().shift(days=-14).datetime
-
-        await mod_method.do_removal(ctx, search, predicate)
+        await mod_method.do_removal(ctx, search, PurgeFilter(emoji=True).compile())
 
     @clean.command(name="reactions")
     @commands.check_any(is_mod(), commands.has_permissions(manage_messages=True))
@@ -892,7 +923,7 @@ class Moderator(Cog):
         - `[p]clean mine`
         - `[p]clean mine 10`
         """
-        await mod_method.do_removal(ctx, search, lambda e: e.author == ctx.author)
+        await mod_method.do_removal(ctx, search, PurgeFilter(users=[ctx.author]).compile())
 
     @clean.command(name="links", aliases=["link", "url", "urls"])
     @commands.bot_has_permissions(read_message_history=True, manage_messages=True)
@@ -904,7 +935,7 @@ class Moderator(Cog):
         - `[p]clean links`
         - `[p]clean links 10`
         """
-        await mod_method.do_removal(ctx, search, lambda m: LINKS_RE.search(m.content))
+        await mod_method.do_removal(ctx, search, PurgeFilter(links=True).compile())
 
     @commands.command()
     @commands.check_any(is_mod(), commands.has_permissions(manage_channels=True))
@@ -954,7 +985,7 @@ class Moderator(Cog):
         `--contains`: A substring to search for in the message.
         `--starts`: A substring to search if the message starts with.
         `--ends`: A substring to search if the message ends with.
-        `--search`: How many messages to search. Default 100. Max 2000.
+        `--search`: How many messages to search. Default 100. Max 10000.
         `--after`: Messages must come after this message ID.
         `--before`: Messages must come before this message ID.
 
@@ -978,10 +1009,10 @@ class Moderator(Cog):
         parser.add_argument("--or", action="store_true", dest="_or")
         parser.add_argument("--not", action="store_true", dest="_not")
         parser.add_argument("--emoji", action="store_true")
-        parser.add_argument("--bot", action="store_const", const=lambda m: m.author.bot)
-        parser.add_argument("--embeds", action="store_const", const=lambda m: len(m.embeds))
-        parser.add_argument("--files", action="store_const", const=lambda m: len(m.attachments))
-        parser.add_argument("--reactions", action="store_const", const=lambda m: len(m.reactions))
+        parser.add_argument("--bot", action="store_true")
+        parser.add_argument("--embeds", action="store_true")
+        parser.add_argument("--files", action="store_true")
+        parser.add_argument("--reactions", action="store_true")
         parser.add_argument("--search", type=int)
         parser.add_argument("--after", type=int)
         parser.add_argument("--before", type=int)
@@ -992,25 +1023,8 @@ class Moderator(Cog):
             await ctx.send(str(e))
             return
 
-        predicates = []
-        if args.bot:
-            predicates.append(args.bot)
-
-        if args.embeds:
-            predicates.append(args.embeds)
-
-        if args.files:
-            predicates.append(args.files)
-
-        if args.reactions:
-            predicates.append(args.reactions)
-
-        if args.emoji:
-            custom_emoji = re.compile(r"<:(\w+):(\d+)>")
-            predicates.append(lambda m: custom_emoji.search(m.content))
-
+        users = []
         if args.user:
-            users = []
             converter = commands.MemberConverter()
             for u in args.user:
                 try:
@@ -1020,31 +1034,28 @@ class Moderator(Cog):
                     await ctx.send(str(e))
                     return
 
-            predicates.append(lambda m: m.author in users)
-
-        if args.contains:
-            predicates.append(lambda m: any(sub in m.content for sub in args.contains))
-
-        if args.starts:
-            predicates.append(lambda m: any(m.content.startswith(s) for s in args.starts))
-
-        if args.ends:
-            predicates.append(lambda m: any(m.content.endswith(s) for s in args.ends))
-
-        predicates.append(lambda m: m.created_at > arrow.utcnow().shift(days=-14).datetime)
-        op = any if args._or else all
-
-        def predicate(m: discord.Message) -> bool:
-            r = op(p(m) for p in predicates)
-            return not r if args._not else r
+        # messages older than two weeks are never searched, so the age is not a part of the filter
+        predicate = PurgeFilter(
+            users=users,
+            contains=args.contains,
+            starts=args.starts,
+            ends=args.ends,
+            bot=args.bot,
+            embeds=args.embeds,
+            files=args.files,
+            emoji=args.emoji,
+            reactions=args.reactions,
+            any_=args._or,
+            negate=args._not,
+        ).compile()
 
         if args.after and args.search is None:
-            args.search = 2000
+            args.search = MAX_SEARCH
 
         if args.search is None:
             args.search = 100
 
-        args.search = max(0, min(2000, args.search))  # clamp from 0-2000
+        args.search = max(0, min(MAX_SEARCH, args.search))
         await mod_method.do_removal(ctx, args.search, predicate, before=args.before, after=args.after)
 
     @commands.command()
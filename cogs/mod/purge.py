@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+import re
+from collections.abc import Callable, Iterable
+from time import monotonic
+from typing import TYPE_CHECKING
+
+import discord
+from utilities.regex import LINKS_RE
+
+if TYPE_CHECKING:
+    from typing import TypeAlias
+
+    Predicate: TypeAlias = Callable[[discord.Message], object]
+
+__all__ = ("Purge", "PurgeFilter", "MAX_SEARCH", "bulk_delete_cutoff")
+
+log = logging.getLogger("cogs.mod.purge")
+
+# messages fetched per request and deleted per bulk delete request
+PAGE = 100
+# pages fetched ahead, while the current page is being filtered
+PREFETCH = 2
+MAX_SEARCH = 10_000
+# searches larger than this report their progress
+PROGRESS_THRESHOLD = 500
+PROGRESS_INTERVAL = 5
+# bulk delete rejects messages older than two weeks, a minute of margin for the time the purge takes
+BULK_DELETE_AGE = datetime.timedelta(weeks=2) - datetime.timedelta(minutes=1)
+
+CUSTOM_EMOJI_RE = re.compile(r"<a?:[a-zA-Z0-9\_]+:([0-9]+)>")
+
+
+def bulk_delete_cutoff(now: datetime.datetime, after: int | None = None) -> int:
+    """The snowflake to search the history after, so that every message found can be bulk deleted."""
+    return max(discord.utils.time_snowflake(now - BULK_DELETE_AGE), after or 0)
+
+
+class PurgeFilter:
+    """The options of a purge, compiled into one predicate.
+
+    Substrings become one regex alternation, users a set of IDs, prefixes and
+    suffixes a single ``startswith``/``endswith`` call.
+    """
+
+    def __init__(
+        self,
+        *,
+        users: Iterable[discord.abc.Snowflake] | None = None,
+        contains: Iterable[str] | None = None,
+        starts: Iterable[str] | None = None,
+        ends: Iterable[str] | None = None,
+        regex: str | re.Pattern[str] | None = None,
+        bot: bool = False,
+        embeds: bool = False,
+        files: bool = False,
+        emoji: bool = False,
+        reactions: bool = False,
+        links: bool = False,
+        any_: bool = False,
+        negate: bool = False,
+    ) -> None:
+        self.users = frozenset(user.id for user in users) if users else None
+        self.contains = tuple(contains) if contains else None
+        self.starts = tuple(starts) if starts else None
+        self.ends = tuple(ends) if ends else None
+        # raises re.error early, instead of once per message
+        self.regex = re.compile(regex) if isinstance(regex, str) else regex
+
+        self.bot = bot
+        self.embeds = embeds
+        self.files = files
+        self.emoji = emoji
+        self.reactions = reactions
+        self.links = links
+
+        self.any_ = any_
+        self.negate = negate
+
+    def _checks(self) -> list[Callable[[discord.Message], bool]]:
+        checks: list[Callable[[discord.Message], bool]] = []
+        if self.users is not None:
+            users = self.users
+            checks.append(lambda m: m.author.id in users)
+        if self.bot:
+            checks.append(lambda m: m.author.bot)
+        if self.embeds:
+            checks.append(lambda m: bool(m.embeds))
+        if self.files:
+            checks.append(lambda m: bool(m.attachments))
+        if self.reactions:
+            checks.append(lambda m: bool(m.reactions))
+        if self.contains is not None:
+            search = re.compile("|".join(map(re.escape, self.contains))).search
+            checks.append(lambda m: search(m.content) is not None)
+        if self.starts is not None:
+            starts = self.starts
+            checks.append(lambda m: m.content.startswith(starts))
+        if self.ends is not None:
+            ends = self.ends
+            checks.append(lambda m: m.content.endswith(ends))
+        if self.regex is not None:
+            match = self.regex.match
+            checks.append(lambda m: match(m.content) is not None)
+        if self.emoji:
+            search = CUSTOM_EMOJI_RE.search
+            checks.append(lambda m: search(m.content) is not None)
+        if self.links:
+            search = LINKS_RE.search
+            checks.append(lambda m: search(m.content) is not None)
+        return checks
+
+    def compile(self) -> Callable[[discord.Message], bool]:
+        checks = self._checks()
+        negate = self.negate
+
+        if not checks:
+            return lambda m: not negate
+
+        if len(checks) == 1:
+            (check,) = checks
+            return (lambda m: not check(m)) if negate else check
+
+        op = any if self.any_ else all
+
+        def predicate(m: discord.Message) -> bool:
+            return op(check(m) for check in checks) is not negate
+
+        return predicate
+
+
+class Purge:
+    """Deletes the messages of a channel matching a predicate.
+
+    History is fetched a few pages ahead of the filtering, and the matches are
+    bulk deleted in chunks of 100 while the next pages are still being fetched.
+    Only messages younger than two weeks can be bulk deleted, ``after`` must
+    be bounded by the caller.
+    """
+
+    def __init__(
+        self,
+        channel: discord.abc.Messageable,
+        predicate: Predicate,
+        *,
+        limit: int,
+        before: discord.abc.Snowflake | None = None,
+        after: discord.abc.Snowflake | None = None,
+    ) -> None:
+        self.channel = channel
+        self.predicate = predicate
+        self.limit = limit
+        self.before = before
+        self.after = after
+
+        self.scanned: int = 0
+        self.deleted: list[discord.Message] = []
+        self.error: Exception | None = None
+        self.started_at: float | None = None
+
+    def progress(self) -> str:
+        elapsed = monotonic() - (self.started_at or monotonic())
+        return f"Purging: {self.scanned}/{self.limit} messages searched, {len(self.deleted)} removed ({elapsed:.0f}s elapsed)"
+
+    async def _fetch(self, pages: asyncio.Queue[list[discord.Message] | None]) -> None:
+        page: list[discord.Message] = []
+        try:
+            async for message in self.channel.history(
+                limit=self.limit,
+                before=self.before,
+                after=self.after,
+                oldest_first=False,
+            ):
+                page.append(message)
+                if len(page) == PAGE:
+                    await pages.put(page)
+                    page = []
+        except Exception as e:
+            self.error = e
+        else:
+            if page:
+                await pages.put(page)
+        await pages.put(None)
+
+    async def _delete(self, chunks: asyncio.Queue[list[discord.Message] | None]) -> None:
+        while (chunk := await chunks.get()) is not None:
+            try:
+                await self.channel.delete_messages(chunk)  # type: ignore
+            except discord.NotFound:
+                # deleted by someone else meanwhile
+                continue
+            except discord.HTTPException as e:
+                self.error = e
+                return
+            self.deleted.extend(chunk)
+
+    async def _report(self, message: discord.Message) -> None:
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            try:
+                await message.edit(content=self.progress())
+            except discord.HTTPException:
+                return
+
+    async def run(self, *, progress_to: discord.abc.Messageable | None = None) -> list[discord.Message]:
+        """|coro|.
+
+        Runs the purge, reporting its progress to ``progress_to`` if the search is large.
+        The error it stopped on is raised only if nothing was removed, it is kept in :attr:`error` otherwise.
+        """
+        self.started_at = monotonic()
+        pages: asyncio.Queue[list[discord.Message] | None] = asyncio.Queue(maxsize=PREFETCH)
+        # not bounded, the deleter is the slowest stage and the fetcher must not wait on it
+        chunks: asyncio.Queue[list[discord.Message] | None] = asyncio.Queue()
+
+        status: discord.Message | None = None
+        if progress_to is not None and self.limit > PROGRESS_THRESHOLD:
+            status = await progress_to.send(self.progress())
+
+        fetcher = asyncio.create_task(self._fetch(pages))
+        deleter = asyncio.create_task(self._delete(chunks))
+        reporter = asyncio.create_task(self._report(status)) if status is not None else None
+
+        predicate = self.predicate
+        matched: list[discord.Message] = []
+        try:
+            while (page := await pages.get()) is not None and not deleter.done():
+                self.scanned += len(page)
+                matched.extend(m for m in page if predicate(m))
+                while len(matched) >= PAGE:
+                    chunks.put_nowait(matched[:PAGE])
+                    del matched[:PAGE]
+
+            if matched:
+                chunks.put_nowait(matched)
+            chunks.put_nowait(None)
+            await deleter
+        finally:
+            fetcher.cancel()
+            deleter.cancel()
+            if reporter is not None:
+                reporter.cancel()
+            if status is not None:
+                await status.delete(delay=0)
+
+        log.debug("Purge in %s: %s searched, %s removed", getattr(self.channel, "id", None), self.scanned, len(self.deleted))
+        if self.error is not None and not self.deleted:
+            raise self.error
+        return self.deleted
@@ -4,6 +4,7 @@ import asyncio
 import hashlib
 import io
 import json
+import logging
 import os
 import random
 import re
@@ -25,6 +26,7 @@ from tabulate import tabulate
 import discord
 from core import Cog, Context, Parrot
 from discord.ext import commands
+from utilities.assets import ASSETS
 from utilities.converters import convert_bool
 from utilities.paginator import PaginationView
 from utilities.time import ShortTime
@@ -305,13 +307,16 @@ class Owner(Cog, command_attrs={"hidden": True}):
         async for data in self.bot.guild_configurations.find():
             webhook = data["global_chat"]
             if (hook := webhook["webhook"]) and webhook["enable"]:
-                if webhook := discord.Webhook.from_url(f"{hook}", session=self.bot.http_session):
-                    await webhook.send(
+                try:
+                    await self.bot.webhooks.send(
+                        f"{hook}",
                         content=announcement,
                         username="SERVER - SECTOR 17-29",
                         avatar_url=self.bot.user.display_avatar.url,
                         allowed_mentions=discord.AllowedMentions.none(),
                     )
+                except discord.HTTPException:
+                    pass
         await ctx.tick()
 
     @commands.command(aliases=["command-lookup", "cl"])
@@ -466,6 +471,62 @@ class Owner(Cog, command_attrs={"hidden": True}):
         embed.set_footer(text=f"{issues} warnings")
         await ctx.send(embed=embed)
 
+    @commands.command(hidden=True)
+    async def metrics(self, ctx: Context, event: str | None = None, limit: int = 10) -> None:
+        """Event loop lag, gateway rates and the slowest event listeners."""
+        metrics = self.bot.metrics
+        lag = metrics.loop_lag
+
+        builder = [
+            f"Loop lag: mean {lag.mean:.2f}ms | p99 {lag.percentile(99):.2f}ms | max {lag.max:.2f}ms",
+            f"Gateway: {metrics.gateway_total} payloads | {metrics.gateway_rate():.2f}/s",
+            "",
+        ]
+        table = [
+            (f"{event_name}:{name}"[:50], hist.count, f"{hist.mean:.2f}", f"{hist.percentile(95):.2f}", f"{hist.total / 1000:.2f}")
+            for (event_name, name), hist in metrics.slowest_listeners(limit, event=event)
+        ]
+        builder.append(tabulate(table, headers=["Listener", "Calls", "Mean ms", "P95 ms", "Total s"], tablefmt="psql"))
+        await ctx.paginate("\n".join(builder), module="JishakuPaginatorInterface", max_size=1000, prefix="```sql", suffix="```")
+
+    @commands.command(hidden=True)
+    async def assets(self, ctx: Context, limit: int = 25) -> None:
+        """Images and fonts held by the asset registry, largest first."""
+        usage = ASSETS.memory()
+        table = tabulate(
+            [(name[-60:], f"{size / 1024:.1f}") for name, size in sorted(usage.items(), key=lambda t: t[1], reverse=True)[:limit]],
+            headers=["Asset", "KiB"],
+            tablefmt="psql",
+        )
+        footer = f"Loaded: {len(usage)} | Total: {sum(usage.values()) / 1024 ** 2:.2f} MiB"
+        await ctx.paginate(
+            f"{table}\n{footer}",
+            module="JishakuPaginatorInterface",
+            max_size=1000,
+            prefix="```sql",
+            suffix="```",
+        )
+
+    @commands.command(name="logs", hidden=True)
+    async def _logs(self, ctx: Context, level: str = "warning", limit: int = 50) -> None:
+        """Latest logs of the given level (and above) from the log sink."""
+        sink = self.bot.log_sink
+        rows = await sink.fetch(min_level=level, limit=limit)
+
+        table = tabulate(
+            [(_id, logging.getLevelName(lvl), created_at, message[:100]) for _id, lvl, message, created_at, _ in rows],
+            headers=["ID", "Level", "Created At", "Message"],
+            tablefmt="psql",
+        )
+        footer = f"Pending: {len(sink)} | Written: {sink.written} | Dropped: {sink.dropped}"
+        await ctx.paginate(
+            f"{table}\n{footer}",
+            module="JishakuPaginatorInterface",
+            max_size=1000,
+            prefix="```sql",
+            suffix="```",
+        )
+
     @commands.command()
     async def maintenance(
         self,
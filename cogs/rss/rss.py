@@ -33,8 +33,8 @@ class RSSItem:
         return self.bot.get_channel(self.channel_id)  # type: ignore
 
     @property
-    def webhook(self) -> discord.Webhook:
-        return discord.Webhook.from_url(self.webhook_url, session=self.bot.http_session)
+    def webhook(self) -> discord.Webhook | None:
+        return self.bot.webhooks.get(self.webhook_url)
 
     async def prepare(self) -> None:
         self.feed = await self.cog.check_feed(self.link)
@@ -49,7 +49,7 @@ class RSSItem:
         if self._last_entry == self.feed.entries[0].link:
             return
 
-        await self.bot._execute_webhook(self.webhook, embed=self.embed, username="RSS Feed")
+        await self.bot._execute_webhook(self.webhook_url, embed=self.embed, username="RSS Feed")
         await self.update(guild_id, last_entry=self.feed.entries[0].link)
 
     @property
@@ -231,6 +231,8 @@ class RSS(Cog):
                 channel = self.bot.get_channel(feed["channel_id"])
                 if not channel:
                     continue
-                webhook = discord.Webhook.from_url(feed["webhook_url"], session=self.bot.http_session)
+                webhook = self.bot.webhooks.get(feed["webhook_url"])
+                if webhook is None:
+                    continue
                 item = RSSItem.from_raw_data(bot=self.bot, webhook=webhook, link=feed["link"], channel=channel)
                 await item.send(data["_id"])
@@ -16,6 +16,25 @@ class Stats(Cog):
     def __init__(self, bot: Parrot) -> None:
         self.bot = bot
 
+    async def __resolve_entries(
+        self,
+        *,
+        FILTER: dict,
+        sort_by: str,
+        order_by: int,
+        limit: int | None,
+        guild: discord.Guild | None,
+    ) -> list[tuple[dict, discord.Member | discord.User | None]]:
+        cursor = self.bot.game_collections.find(FILTER).sort(sort_by, order_by)
+        if limit:
+            cursor = cursor.limit(limit)
+        records: list[dict] = [data async for data in cursor]
+
+        # resolve all the users at once, instead of one request per row.
+        # Global boards are mostly users out of the guild, not worth a gateway query
+        users = await self.bot.member_resolver.resolve_users((data["_id"] for data in records), guild=guild)
+        return [(data, users.get(data["_id"])) for data in records]
+
     @commands.group(invoke_without_command=True)
     @commands.max_concurrency(1, per=commands.BucketType.user)
     @commands.cooldown(1, 60, commands.BucketType.user)
@@ -42,7 +61,6 @@ class Stats(Cog):
         `--limit`: To limit the search, default is 100
         """
         user = user or ctx.author
-        col = self.bot.game_collections
         sort_by = f"game_twenty48_{flag.sort_by.lower()}" if flag.sort_by else "game_twenty48_played"
         order_by = pymongo.ASCENDING if flag.order_by == "asc" else pymongo.DESCENDING
 
@@ -52,20 +70,20 @@ class Stats(Cog):
             FILTER["_id"] = user.id
         elif not flag._global:
             FILTER["_id"] = {"$in": [m.id for m in ctx.guild.members]}
-        LIMIT = flag.limit or float("inf")
         entries = []
-        i = 0
-        async for data in col.find(FILTER).sort(sort_by, order_by):
-            user = await self.bot.get_or_fetch_member(ctx.guild, data["_id"], in_guild=False)
+        for data, user in await self.__resolve_entries(
+            FILTER=FILTER,
+            sort_by=sort_by,
+            order_by=order_by,
+            limit=flag.limit,
+            guild=None if flag._global else ctx.guild,
+        ):
             entries.append(
                 f"""User: `{user or 'NA'}`
 `Games Played`: {data['game_twenty48_played']} games played
 `Total Moves `: {data['game_twenty48_moves']} moves
 """,
             )
-            if i > LIMIT:
-                break
-            i += 1
         if not entries:
             await ctx.send(f"{ctx.author.mention} No results found")
             return
@@ -119,7 +137,6 @@ class Stats(Cog):
         flag: GameCommandFlag,
     ):
         user = user or ctx.author
-        col = self.bot.game_collections
 
         sort_by = f"game_{game_type}_{flag.sort_by or 'played'}"
         order_by = pymongo.ASCENDING if flag.order_by == "asc" else pymongo.DESCENDING
@@ -134,11 +151,14 @@ class Stats(Cog):
         elif not flag._global:
             FILTER["_id"] = {"$in": [m.id for m in ctx.guild.members]}
 
-        LIMIT = flag.limit or float("inf")
         entries = []
-        i = 0
-        async for data in col.find(FILTER).sort(sort_by, order_by):
-            user = await self.bot.get_or_fetch_member(ctx.guild, data["_id"], in_guild=False)
+        for data, user in await self.__resolve_entries(
+            FILTER=FILTER,
+            sort_by=sort_by,
+            order_by=order_by,
+            limit=flag.limit,
+            guild=None if flag._global else ctx.guild,
+        ):
             entries.append(
                 f"""User: `{user or 'NA'}`
 `Games Played`: {data[f'game_{game_type}_played']} games played
@@ -146,9 +166,6 @@ class Stats(Cog):
 `Total Loss  `: {data[f'game_{game_type}_loss']} Loss
 """,
             )
-            if i > LIMIT:
-                break
-            i += 1
         if not entries:
             await ctx.send(f"{ctx.author.mention} No records found")
             return
@@ -183,9 +200,12 @@ class Stats(Cog):
             return
         entries = []
         chess_data = data["game_chess_stat"]
+        users = await self.bot.member_resolver.resolve_users(
+            [i[key] for i in chess_data for key in ("game_chess_player_1", "game_chess_player_2")],
+        )
         for i in chess_data:
-            user1 = await self.bot.getch(self.bot.get_user, self.bot.fetch_user, i["game_chess_player_1"])
-            user2 = await self.bot.getch(self.bot.get_user, self.bot.fetch_user, i["game_chess_player_2"])
+            user1 = users.get(i["game_chess_player_1"])
+            user2 = users.get(i["game_chess_player_2"])
             if not user1 and not user2:
                 continue
 
@@ -230,7 +250,6 @@ class Stats(Cog):
 
     async def __test_stats(self, game_type: str, ctx: Context, flag: GameCommandFlag):
         entries = []
-        i = 1
         sort_by = f"game_{game_type}_{flag.sort_by or 'played'}".replace(" ", "_").lower()
         FILTER: dict = {sort_by: {"$exists": True}}
         if flag.me:
@@ -238,13 +257,14 @@ class Stats(Cog):
         elif not flag._global:
             FILTER["_id"] = {"$in": [m.id for m in ctx.guild.members]}
 
-        LIMIT = flag.limit or float("inf")
-        col = self.bot.game_collections
-        async for data in col.find(FILTER).sort(
-            sort_by,
-            pymongo.ASCENDING if flag.order_by == "asc" else pymongo.DESCENDING,
+        order_by = pymongo.ASCENDING if flag.order_by == "asc" else pymongo.DESCENDING
+        for data, user in await self.__resolve_entries(
+            FILTER=FILTER,
+            sort_by=sort_by,
+            order_by=order_by,
+            limit=flag.limit,
+            guild=None if flag._global else ctx.guild,
         ):
-            user = await self.bot.get_or_fetch_member(ctx.guild, data["_id"], in_guild=False)
             if user is None:
                 continue
 
@@ -260,9 +280,6 @@ class Stats(Cog):
 `{sort_by.replace('_', ' ').title()}`: {data[sort_by]}
 """,
                 )
-            if i >= LIMIT:
-                break
-            i += 1
 
         if not entries:
             await ctx.send(f"{ctx.author.mention} No records found")
@@ -2,16 +2,21 @@ from __future__ import annotations
 
 import inspect
 import io
+import logging
 from itertools import zip_longest
 from random import random
 from typing import Annotated, Any
 
 import discord
 from core import Cog, Context, Parrot
-from discord.ext import commands
+from discord.ext import commands, tasks
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
 from utilities.checks import is_mod
 from utilities.formats import TabularData
 
+log = logging.getLogger("cogs.suggestion")
+
 REACTION_EMOJI = ["\N{UPWARDS BLACK ARROW}", "\N{DOWNWARDS BLACK ARROW}"]
 
 # fmt: off
@@ -54,6 +59,67 @@ class Suggestions(Cog):
         self.bot = bot
         self.message: dict[int, dict[str, Any]] = {}
 
+        self.suggestion_channels: set[int] = set()
+        # message IDs of which the vote counters changed since the last write
+        self._dirty_votes: set[int] = set()
+
+    async def cog_load(self) -> None:
+        self.bot.defer_until_ready("suggestion.channels", self.__build_channels)
+        self.write_votes.start()
+
+    async def cog_unload(self) -> None:
+        self.write_votes.cancel()
+        await self.__write_votes()
+
+    async def __build_channels(self) -> None:
+        async for data in self.bot.guild_configurations.find(
+            {"suggestion_channel": {"$ne": None}},
+            {"suggestion_channel": 1},
+        ):
+            if data.get("suggestion_channel"):
+                self.suggestion_channels.add(data["suggestion_channel"])
+
+    async def __write_votes(self) -> None:
+        dirty, self._dirty_votes = self._dirty_votes, set()
+        operations = []
+        for message_id in dirty:
+            try:
+                payload = self.message[message_id]
+            except KeyError:
+                continue
+            msg: discord.Message = payload["message"]
+            operations.append(
+                UpdateOne(
+                    {"_id": message_id},
+                    {
+                        "$set": {
+                            "guild_id": msg.guild.id if msg.guild else None,
+                            "channel_id": msg.channel.id,
+                            "upvote": payload["message_upvote"],
+                            "downvote": payload["message_downvote"],
+                        },
+                    },
+                    upsert=True,
+                ),
+            )
+
+        if not operations:
+            return
+        log.debug("Writing votes of %s suggestions", len(operations))
+        try:
+            await self.bot.suggestions.bulk_write(operations, ordered=False)
+        except PyMongoError as e:
+            # the counters are set, not incremented, the next write carries their latest value
+            log.warning("Could not write votes of %s suggestions, retrying on the next write: %s", len(operations), e)
+            self._dirty_votes |= dirty
+
+    @tasks.loop(minutes=1)
+    async def write_votes(self) -> None:
+        try:
+            await self.__write_votes()
+        except Exception as e:
+            log.error("Could not write the suggestion votes", exc_info=e)
+
     @property
     def display_emoji(self) -> discord.PartialEmoji:
         return discord.PartialEmoji(name="\N{SPEECH BALLOON}")
@@ -103,24 +169,32 @@ class Suggestions(Cog):
             before=discord.Object(message + 1),
             after=discord.Object(message - 1),
         ):
-            payload = {
-                "message_author": msg.author,
-                "message": msg,
-                "message_downvote": self.__get_emoji_count_from__msg(msg, emoji="\N{DOWNWARDS BLACK ARROW}"),
-                "message_upvote": self.__get_emoji_count_from__msg(msg, emoji="\N{UPWARDS BLACK ARROW}"),
-            }
-            self.message[message] = payload
+            self.__cache_message(msg)
             return msg
 
+    def __cache_message(self, msg: discord.Message) -> dict[str, Any]:
+        # counters are rebuilt from the reactions, not incremented, when the message is not known yet
+        payload = {
+            "message_author": msg.author,
+            "message": msg,
+            "message_downvote": self.__get_emoji_count_from__msg(msg, emoji="\N{DOWNWARDS BLACK ARROW}"),
+            "message_upvote": self.__get_emoji_count_from__msg(msg, emoji="\N{UPWARDS BLACK ARROW}"),
+        }
+        self.message[msg.id] = payload
+        self._dirty_votes.add(msg.id)
+        return payload
+
     def __get_emoji_count_from__msg(
         self,
         msg: discord.Message,
         *,
         emoji: discord.Emoji | discord.PartialEmoji | str,
-    ):
+    ) -> int:
         for reaction in msg.reactions:
             if str(reaction.emoji) == str(emoji):
-                return reaction.count
+                # own reaction of the bot is not a vote
+                return reaction.count - int(reaction.me)
+        return 0
 
     async def __suggest(
         self,
@@ -452,21 +526,26 @@ class Suggestions(Cog):
     async def suggest_msg_delete(self, payload: discord.RawMessageDeleteEvent) -> None:
         if payload.message_id in self.message:
             del self.message[payload.message_id]
+            self._dirty_votes.discard(payload.message_id)
+            await self.bot.suggestions.delete_one({"_id": payload.message_id})
+
+    @Cog.listener()
+    async def on_guild_config_update(self, guild_id: int, data: dict[str, Any]) -> None:
+        guild = self.bot.get_guild(guild_id)
+        if guild is not None:
+            self.suggestion_channels.difference_update(c.id for c in guild.text_channels)
+        if channel_id := data.get("suggestion_channel"):
+            self.suggestion_channels.add(channel_id)
 
     @Cog.listener()
     async def on_message(self, message: discord.Message) -> None:
-        await self.bot.wait_until_ready()
         if message.author.bot or message.guild is None:
             return
 
-        ls = await self.bot.guild_configurations.find_one(
-            {"_id": message.guild.id, "suggestion_channel": message.channel.id},
-        )
-        if not ls:
+        if message.channel.id not in self.suggestion_channels:
             return
 
-        if message.channel.id != ls["suggestion_channel"]:
-            return
+        await self.bot.wait_until_ready()
 
         if await self.__parse_mod_action(message):
             return
@@ -484,29 +563,41 @@ class Suggestions(Cog):
 
     @Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
-        if payload.message_id not in self.message:
+        if str(payload.emoji) not in REACTION_EMOJI or payload.user_id == self.bot.user.id:
             return
 
-        if str(payload.emoji) not in REACTION_EMOJI:
+        if payload.message_id not in self.message:
+            if payload.channel_id in self.suggestion_channels and payload.guild_id is not None:
+                # not seen since the restart, the fetched reactions already have this vote
+                guild = self.bot.get_guild(payload.guild_id)
+                if guild is not None:
+                    await self.get_or_fetch_message(payload.message_id, guild=guild)
             return
 
         if str(payload.emoji) == "\N{UPWARDS BLACK ARROW}":
             self.message[payload.message_id]["message_upvote"] += 1
         if str(payload.emoji) == "\N{DOWNWARDS BLACK ARROW}":
             self.message[payload.message_id]["message_downvote"] += 1
+        self._dirty_votes.add(payload.message_id)
 
     @Cog.listener()
     async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
-        if payload.message_id not in self.message:
+        if str(payload.emoji) not in REACTION_EMOJI or payload.user_id == self.bot.user.id:
             return
 
-        if str(payload.emoji) not in REACTION_EMOJI:
+        if payload.message_id not in self.message:
+            if payload.channel_id in self.suggestion_channels and payload.guild_id is not None:
+                # not seen since the restart, the fetched reactions already have this vote
+                guild = self.bot.get_guild(payload.guild_id)
+                if guild is not None:
+                    await self.get_or_fetch_message(payload.message_id, guild=guild)
             return
 
         if str(payload.emoji) == "\N{UPWARDS BLACK ARROW}":
             self.message[payload.message_id]["message_upvote"] -= 1
         if str(payload.emoji) == "\N{DOWNWARDS BLACK ARROW}":
             self.message[payload.message_id]["message_downvote"] -= 1
+        self._dirty_votes.add(payload.message_id)
 
     async def __parse_mod_action(self, message: discord.Message) -> bool | None:
         assert isinstance(message.author, discord.Member)
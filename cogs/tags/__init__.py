@@ -3,20 +3,33 @@ from __future__ import annotations
 import cogs.tags.method as mt
 import discord
 from core import Cog, Context, Parrot
+from discord import app_commands
 from discord.ext import commands
 
+from .cache import TagCache
+
 
 class Tags(Cog):
     """For making the tags. Tags are like the snippets. You can create tags and use them later."""
 
     def __init__(self, bot: Parrot) -> None:
         self.bot = bot
+        self.cache = TagCache(bot)
+
+    async def cog_load(self) -> None:
+        await self.cache.ensure_indexes()
+        self.cache.flush_loop.start()
+
+    async def cog_unload(self) -> None:
+        self.cache.flush_loop.cancel()
+        await self.cache.flush()
 
     @property
     def display_emoji(self) -> discord.PartialEmoji:
         return discord.PartialEmoji(name="\N{TICKET}")
 
-    @commands.group(invoke_without_command=True)
+    @commands.hybrid_group(invoke_without_command=True, fallback="view")
+    @commands.guild_only()
     async def tag(self, ctx: Context, *, tag: str = None):
         """Tag management, or to show the tag.
 
@@ -145,6 +158,15 @@ class Tags(Cog):
         """
         await mt._show_tag_mine(self.bot, ctx)
 
+    @tag.command(name="search", aliases=["find"])
+    async def tag_search(self, ctx: Context, *, query: str):
+        """To search the tags by name. Names starting with the query are shown first, then the closest matches.
+
+        **Examples:**
+        - `[p]tag search tag_na`
+        """
+        await mt._search_tags(self.bot, ctx, query)
+
     @tag.command(name="raw", aliases=["source", "code"])
     async def tag_raw(self, ctx: Context, *, tag: str):
         """To show the tag in raw format.
@@ -154,6 +176,21 @@ class Tags(Cog):
         """
         await mt._show_raw_tag(self.bot, ctx, tag)
 
+    @tag.autocomplete("tag")
+    @tag_delete.autocomplete("tag")
+    @tag_edit_name.autocomplete("tag")
+    @tag_edit_text.autocomplete("tag")
+    @tag_owner.autocomplete("tag")
+    @tag_claim.autocomplete("tag")
+    @toggle_nsfw.autocomplete("tag")
+    @tag_tranfer.autocomplete("tag")
+    @tag_raw.autocomplete("tag")
+    async def tag_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        if interaction.guild_id is None:
+            return []
+        names = await self.cache.search(interaction.guild_id, current)
+        return [app_commands.Choice(name=name, value=name) for name in names]
+
 
 async def setup(bot: Parrot) -> None:
     await bot.add_cog(Tags(bot))
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import bisect
+import logging
+from collections import Counter
+from typing import TYPE_CHECKING, Any
+
+import pymongo
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+from rapidfuzz import fuzz, process
+
+from discord.ext import tasks
+from utilities.converters import Cache
+
+if TYPE_CHECKING:
+    from core import Parrot
+
+__all__ = ("TagCache",)
+
+log = logging.getLogger("cogs.tags.cache")
+
+FUZZY_CUTOFF = 60
+
+
+class TagCache:
+    """Tags of the guilds, cached by ``(guild_id, tag_id)``.
+
+    Usage counters are kept in memory and written back with one ``bulk_write``.
+    Names of the tags of each guild are kept sorted, for prefix and fuzzy search.
+    """
+
+    def __init__(self, bot: Parrot, *, cache_size: int = 2**12) -> None:
+        self.bot = bot
+        self.tags: Cache[tuple[int, str], dict[str, Any]] = Cache(bot, cache_size=cache_size)
+        self.names: Cache[int, list[str]] = Cache(bot, cache_size=2**10)
+        self.usage: Counter[tuple[int, str]] = Counter()
+
+    @property
+    def collection(self):
+        return self.bot.tags_collection
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index([("guild_id", pymongo.ASCENDING), ("tag_id", pymongo.ASCENDING)])
+
+    async def get(self, guild_id: int, tag_id: str) -> dict[str, Any] | None:
+        """|coro|.
+
+        The tag document, the database is queried only on a cache miss.
+        """
+        key = (guild_id, tag_id)
+        if (data := self.tags.get(key)) is not None:
+            return data
+
+        data = await self.collection.find_one({"guild_id": guild_id, "tag_id": tag_id})
+        if data is not None:
+            self.tags[key] = data
+        return data
+
+    def invalidate(self, guild_id: int, tag_id: str) -> None:
+        if (guild_id, tag_id) in self.tags:
+            self.tags.pop((guild_id, tag_id))
+
+    def used(self, guild_id: int, tag_id: str) -> None:
+        self.usage[(guild_id, tag_id)] += 1
+
+    def count(self, guild_id: int, tag_id: str, stored: int) -> int:
+        """Usage count including the uses which are not written yet."""
+        return stored + self.usage.get((guild_id, tag_id), 0)
+
+    async def _names(self, guild_id: int) -> list[str]:
+        if (names := self.names.get(guild_id)) is not None:
+            return names
+
+        names = sorted(
+            [data["tag_id"] async for data in self.collection.find({"guild_id": guild_id}, {"tag_id": 1})],
+        )
+        self.names[guild_id] = names
+        return names
+
+    def add_name(self, guild_id: int, tag_id: str) -> None:
+        if (names := self.names.get(guild_id)) is not None:
+            bisect.insort(names, tag_id)
+
+    def remove_name(self, guild_id: int, tag_id: str) -> None:
+        self.invalidate(guild_id, tag_id)
+        if (names := self.names.get(guild_id)) is not None:
+            i = bisect.bisect_left(names, tag_id)
+            if i < len(names) and names[i] == tag_id:
+                del names[i]
+
+    def rename(self, guild_id: int, tag_id: str, name: str) -> None:
+        self.remove_name(guild_id, tag_id)
+        self.add_name(guild_id, name)
+        if count := self.usage.pop((guild_id, tag_id), 0):
+            self.usage[(guild_id, name)] += count
+
+    async def search(self, guild_id: int, query: str, *, limit: int = 25) -> list[str]:
+        """|coro|.
+
+        Names starting with ``query`` first, then the closest fuzzy matches.
+        """
+        names = await self._names(guild_id)
+        if not query:
+            return names[:limit]
+
+        i = bisect.bisect_left(names, query)
+        result: list[str] = []
+        while i < len(names) and len(result) < limit and names[i].startswith(query):
+            result.append(names[i])
+            i += 1
+
+        if len(result) < limit:
+            seen = set(result)
+            for name, _, _ in process.extract(query, names, scorer=fuzz.WRatio, limit=limit, score_cutoff=FUZZY_CUTOFF):
+                if name not in seen:
+                    result.append(name)
+                    if len(result) >= limit:
+                        break
+        return result
+
+    async def flush(self) -> None:
+        usage, self.usage = self.usage, Counter()
+        keys = list(usage)
+        operations = [
+            UpdateOne({"guild_id": guild_id, "tag_id": tag_id}, {"$inc": {"count": usage[guild_id, tag_id]}})
+            for guild_id, tag_id in keys
+        ]
+        if not operations:
+            return
+
+        log.debug("Writing usage of %s tags", len(operations))
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # `$inc` is not idempotent, only the operations which failed are written again
+            failed = {error["index"] for error in e.details.get("writeErrors", [])}
+            log.warning("Could not write usage of %s tags, retrying on the next flush", len(failed))
+            self.usage.update({keys[i]: usage[keys[i]] for i in failed})
+            for i in failed:
+                del usage[keys[i]]
+        except PyMongoError as e:
+            log.warning("Could not write usage of %s tags, retrying on the next flush: %s", len(operations), e)
+            self.usage.update(usage)
+            return
+
+        # cached documents would be behind the database otherwise
+        for key, count in usage.items():
+            if (data := self.tags.get(key)) is not None:
+                data["count"] = data.get("count", 0) + count
+
+    @tasks.loop(minutes=1)
+    async def flush_loop(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            log.error("Could not flush the tag usage", exc_info=e)
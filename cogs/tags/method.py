@@ -3,6 +3,8 @@ from __future__ import annotations
 import discord
 from core import Context, Parrot
 
+from .cache import TagCache
+
 # fmt: off
 IGNORE = {
     "create", "add", "new", "make", "mk",
@@ -16,28 +18,39 @@ IGNORE = {
     "all", "list", "show", "ls",
     "mine", "my", "owned", "own",
     "raw", "source", "code",
+    "search", "find",
 }
 # fmt: on
 
 
+def _cache(ctx: Context) -> TagCache:
+    return ctx.cog.cache  # type: ignore
+
+
+async def _not_found(ctx: Context, tag: str) -> None:
+    content = f"{ctx.author.mention} No tag with named `{tag}`"
+    if matches := await _cache(ctx).search(ctx.guild.id, tag, limit=3):
+        content += f". Did you mean: {', '.join(f'`{m}`' for m in matches)}?"
+    await ctx.reply(content, allowed_mentions=discord.AllowedMentions(users=[ctx.author]))
+
+
 async def _show_tag(bot: Parrot, ctx: Context, tag: str, msg_ref: discord.Message | None = None):
-    collection = ctx.bot.tags_collection
     allowed_mentions = discord.AllowedMentions.none()
-    if data := await collection.find_one({"tag_id": tag}):
+    if data := await _cache(ctx).get(ctx.guild.id, tag):
         if not data["nsfw"] and msg_ref is not None or data["nsfw"] and ctx.channel.nsfw and msg_ref is not None:  # type: ignore
             await msg_ref.reply(data["text"], allowed_mentions=allowed_mentions)
         elif not data["nsfw"] or ctx.channel.nsfw:  # type: ignore
             await ctx.send(data["text"], allowed_mentions=allowed_mentions)
         else:
             await ctx.reply(f"{ctx.author.mention} this tag can only be called in NSFW marked channel")
+            return
+        _cache(ctx).used(ctx.guild.id, tag)
     else:
-        await ctx.reply(f"{ctx.author.mention} No tag with named `{tag}`")
-    await collection.update_one({"tag_id": tag, "guild_id": ctx.guild.id}, {"$inc": {"count": 1}})
+        await _not_found(ctx, tag)
 
 
 async def _show_raw_tag(bot: Parrot, ctx: Context, tag: str):
-    collection = ctx.bot.tags_collection
-    if data := await collection.find_one({"tag_id": tag, "guild_id": ctx.guild.id}):
+    if data := await _cache(ctx).get(ctx.guild.id, tag):
         first = discord.utils.escape_markdown(data["text"])
         main = discord.utils.escape_mentions(first)
         if data["nsfw"] and ctx.channel.nsfw or not data["nsfw"]:  # type: ignore
@@ -45,7 +58,7 @@ async def _show_raw_tag(bot: Parrot, ctx: Context, tag: str):
         else:
             await ctx.reply(f"{ctx.author.mention} this tag can only be called in NSFW marked channel")
     else:
-        await ctx.reply(f"{ctx.author.mention} No tag with named `{tag}`")
+        await _not_found(ctx, tag)
 
 
 async def _create_tag(bot: Parrot, ctx: Context, tag: str, text: str):
@@ -61,7 +74,7 @@ async def _create_tag(bot: Parrot, ctx: Context, tag: str, text: str):
     collection = ctx.bot.tags_collection
     if tag in IGNORE:
         return await ctx.error(f"{ctx.author.mention} the name `{tag}` is reserved word.")
-    if _ := await collection.find_one({"tag_id": tag, "guild_id": ctx.guild.id}):
+    if _ := await _cache(ctx).get(ctx.guild.id, tag):
         return await ctx.error(f"{ctx.author.mention} the name `{tag}` already exists")
 
     val = await ctx.prompt(f"{ctx.author.mention} do you want to make the tag as NSFW marked channels")
@@ -79,64 +92,69 @@ async def _create_tag(bot: Parrot, ctx: Context, tag: str, text: str):
             "created_at": int(discord.utils.utcnow().timestamp()),
         },
     )
+    _cache(ctx).add_name(ctx.guild.id, tag)
     await ctx.reply(f"{ctx.author.mention} tag created successfully")
 
 
 async def _delete_tag(bot: Parrot, ctx: Context, tag: str):
     collection = ctx.bot.tags_collection
-    if data := await collection.find_one({"tag_id": tag, "guild_id": ctx.guild.id}):
+    if data := await _cache(ctx).get(ctx.guild.id, tag):
         if data["owner"] == ctx.author.id:
-            await collection.delete_one({"tag_id": tag})
+            await collection.delete_one({"tag_id": tag, "guild_id": ctx.guild.id})
+            _cache(ctx).remove_name(ctx.guild.id, tag)
             await ctx.reply(f"{ctx.author.mention} tag deleted successfully")
         else:
             await ctx.error(f"{ctx.author.mention} you don't own this tag")
     else:
-        await ctx.error(f"{ctx.author.mention} No tag with named `{tag}`")
+        await _not_found(ctx, tag)
 
 
 async def _name_edit(bot: Parrot, ctx: Context, tag: str, name: str):
     collection = ctx.bot.tags_collection
-    if _ := await collection.find_one({"tag_id": name, "guild_id": ctx.guild.id}):
+    if _ := await _cache(ctx).get(ctx.guild.id, name):
         await ctx.error(f"{ctx.author.mention} that name already exists in the database")
-    elif data := await collection.find_one({"tag_id": tag}):
+    elif data := await _cache(ctx).get(ctx.guild.id, tag):
         if data["owner"] == ctx.author.id:
             await collection.update_one({"tag_id": tag, "guild_id": ctx.guild.id}, {"$set": {"tag_id": name}})
+            _cache(ctx).rename(ctx.guild.id, tag, name)
             await ctx.reply(f"{ctx.author.mention} tag name successfully changed")
         else:
             await ctx.error(f"{ctx.author.mention} you don't own this tag")
     else:
-        await ctx.error(f"{ctx.author.mention} No tag with named `{tag}`")
+        await _not_found(ctx, tag)
 
 
 async def _text_edit(bot: Parrot, ctx: Context, tag: str, text: str):
     collection = ctx.bot.tags_collection
-    if data := await collection.find_one({"tag_id": tag, "guild_id": ctx.guild.id}):
+    if data := await _cache(ctx).get(ctx.guild.id, tag):
         if data["owner"] == ctx.author.id:
             await collection.update_one({"tag_id": tag, "guild_id": ctx.guild.id}, {"$set": {"text": text}})
+            _cache(ctx).invalidate(ctx.guild.id, tag)
             await ctx.reply(f"{ctx.author.mention} tag content successfully changed")
         else:
             await ctx.error(f"{ctx.author.mention} you don't own this tag")
     else:
-        await ctx.error(f"{ctx.author.mention} No tag with named `{tag}`")
+        await _not_found(ctx, tag)
 
 
 async def _claim_owner(bot: Parrot, ctx: Context, tag: str):
     collection = ctx.bot.tags_collection
-    if data := await collection.find_one({"tag_id": tag, "guild_id": ctx.guild.id}):
+    if data := await _cache(ctx).get(ctx.guild.id, tag):
         member = await bot.get_or_fetch_member(ctx.guild, data["owner"])
         if member:
             return await ctx.error(
                 f"{ctx.author.mention} you can not claim the tag ownership as the member is still in the server",
             )
         await collection.update_one({"tag_id": tag, "guild_id": ctx.guild.id}, {"$set": {"owner": ctx.author.id}})
+        _cache(ctx).invalidate(ctx.guild.id, tag)
         await ctx.reply(f"{ctx.author.mention} ownership of tag `{tag}` claimed!")
     else:
-        await ctx.error(f"{ctx.author.mention} No tag with named `{tag}`")
+        await _not_found(ctx, tag)
 
 
 async def _transfer_owner(bot: Parrot, ctx: Context, tag: str, member: discord.Member):
     collection = ctx.bot.tags_collection
-    if data := await collection.find_one({"tag_id": tag, "guild_id": ctx.guild.id}):
+    if data := await _cache(ctx).get(ctx.guild.id, tag):
         if data["owner"] != ctx.author.id:
             return await ctx.error(f"{ctx.author.mention} you don't own this tag")
         val = await ctx.prompt(
@@ -146,23 +164,25 @@ async def _transfer_owner(bot: Parrot, ctx: Context, tag: str, member: discord.M
             await ctx.error(f"{ctx.author.mention} you did not responds on time")
         elif val:
             await collection.update_one({"tag_id": tag, "guild_id": ctx.guild.id}, {"$set": {"owner": member.id}})
+            _cache(ctx).invalidate(ctx.guild.id, tag)
             await ctx.reply(f"{ctx.author.mention} tag ownership successfully transfered to **{member}**")
         else:
             await ctx.error(f"{ctx.author.mention} ok! reverting the process!")
     else:
-        await ctx.error(f"{ctx.author.mention} No tag with named `{tag}`")
+        await _not_found(ctx, tag)
 
 
 async def _toggle_nsfw(bot: Parrot, ctx: Context, tag: str):
     collection = ctx.bot.tags_collection
-    if data := await collection.find_one({"tag_id": tag, "guild_id": ctx.guild.id}):
+    if data := await _cache(ctx).get(ctx.guild.id, tag):
         if data["owner"] != ctx.author.id:
             return await ctx.reply(f"{ctx.author.mention} you don't own this tag")
         nsfw = not data["nsfw"]
         await collection.update_one({"tag_id": tag, "guild_id": ctx.guild.id}, {"$set": {"nsfw": nsfw}})
+        _cache(ctx).invalidate(ctx.guild.id, tag)
         await ctx.reply(f"{ctx.author.mention} NSFW status of tag named `{tag}` is set to **{nsfw}**")
     else:
-        await ctx.reply(f"{ctx.author.mention} No tag with named `{tag}`")
+        await _not_found(ctx, tag)
 
 
 async def _show_tag_mine(bot: Parrot, ctx: Context):
@@ -189,12 +209,11 @@ async def _show_all_tags(bot: Parrot, ctx: Context):
 
 
 async def _view_tag(bot: Parrot, ctx: Context, tag: str):
-    collection = ctx.bot.tags_collection
-    if data := await collection.find_one({"tag_id": tag, "guild_id": ctx.guild.id}):
+    if data := await _cache(ctx).get(ctx.guild.id, tag):
         text_len = len(data["text"])
         owner = await bot.get_or_fetch_member(ctx.guild, data["owner"])
         nsfw = data["nsfw"]
-        count = data["count"]
+        count = _cache(ctx).count(ctx.guild.id, tag, data["count"])
         created_at = f"<t:{data['created_at']}>"
         claimable = owner is None
         em = (
@@ -211,3 +230,10 @@ async def _view_tag(bot: Parrot, ctx: Context, tag: str):
             .add_field(name="Can Claim?", value=claimable)
         )
         await ctx.reply(embed=em)
+
+
+async def _search_tags(bot: Parrot, ctx: Context, query: str):
+    entries = await _cache(ctx).search(ctx.guild.id, query)
+    if not entries:
+        return await ctx.reply(f"{ctx.author.mention} no tag found matching `{query}`")
+    await ctx.paginate(entries, module="SimplePages")
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-import io
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Literal
 
 import discord
 from core import Cog, Context, Parrot
 from discord.ext import commands
 
+from .transcript import export_transcript
+
 if TYPE_CHECKING:
     from discord.ext.commands._types import Check
 
@@ -118,22 +119,21 @@ class Tickets(Cog):
         guild: discord.Guild,
         author: discord.Member | discord.User,
         channel: discord.TextChannel,
+        *,
+        fmt: Literal["txt", "html", "json"] = "txt",
+        compress: bool = False,
     ) -> None:
         if not channel:
             return
 
-        messages_string = ""
-        async for message in channel.history(limit=1000, oldest_first=True):
-            if not message.author.bot:
-                messages_string += f"{message.author} ({message.author.id}): {message.content}\n"
-
-        file = discord.File(
-            io.BytesIO(messages_string.encode("utf-8")),
-            filename=f"{channel.name}.txt",
-        )
-
-        await self.log(guild=guild, author=author, args=f"Saved by {author} ({author.id})")
-        await channel.send(file=file)
+        transcript, files = await export_transcript(channel, fmt=fmt, compress=compress)
+        try:
+            await self.log(guild=guild, author=author, args=f"Saved by {author} ({author.id})")
+            # the upload limit is per request, one part per message
+            for file in files:
+                await channel.send(file=file)
+        finally:
+            transcript.close()
 
     @commands.group(invoke_without_command=True)
     @commands.has_permissions()
@@ -167,12 +167,20 @@ class Tickets(Cog):
     @commands.cooldown(1, 5, commands.BucketType.channel)
     @ticket_enabled()
     @require_ticket_channel()
-    async def save(self, ctx: Context):
+    async def save(self, ctx: Context, fmt: Literal["txt", "html", "json"] = "txt", compress: bool = False):
         """Use this to save the transcript of a ticket.
 
         This command only works in ticket channels.
+        Transcript can be saved as `txt`, `html` or `json`, optionally compressed with gzip.
+        Large transcripts are split into multiple files.
+
+        **Examples:**
+        - `[p]ticket save`
+        - `[p]ticket save html`
+        - `[p]ticket save json yes`
         """
-        await self.save_ticket(ctx.guild, ctx.author, ctx.channel)
+        async with ctx.typing():
+            await self.save_ticket(ctx.guild, ctx.author, ctx.channel, fmt=fmt, compress=compress)
 
     @ticket.command(name="enable")
     @commands.has_permissions(manage_guild=True)
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import html
+import json
+import logging
+import tempfile
+from abc import ABC, abstractmethod
+from typing import IO, TYPE_CHECKING, ClassVar, Literal
+
+import discord
+
+if TYPE_CHECKING:
+    from typing import TypeAlias
+
+    Format: TypeAlias = Literal["txt", "html", "json"]
+
+__all__ = ("Transcript", "TextTranscript", "HTMLTranscript", "JSONTranscript", "FORMATS", "export_transcript")
+
+log = logging.getLogger("cogs.ticket.transcript")
+
+# messages rendered per call off the event loop, one history page
+WRITE_BATCH = 100
+# compressed output lags behind the input by the zlib buffer, start the next part a bit early
+SPLIT_MARGIN = 2**20
+
+
+class Transcript(ABC):
+    """Writes messages one by one into temporary files, starting a new part when the upload limit is reached.
+
+    Every part is a complete document on its own, compressed with gzip if asked.
+    """
+
+    extension: ClassVar[str] = "txt"
+
+    def __init__(self, name: str, *, limit: int, compress: bool = False) -> None:
+        self.name = name
+        self.limit = max(limit - SPLIT_MARGIN, SPLIT_MARGIN) if compress else limit
+        self.compress = compress
+
+        self.parts: list[IO[bytes]] = []
+        self.written: int = 0
+
+        self._raw: IO[bytes] | None = None
+        self._stream: IO[bytes] | None = None
+        self._in_part: int = 0
+
+    def header(self) -> str:
+        return ""
+
+    def footer(self) -> str:
+        return ""
+
+    def separator(self) -> str:
+        return ""
+
+    @abstractmethod
+    def render(self, message: discord.Message) -> str:
+        ...
+
+    def _open_part(self) -> None:
+        # a real file object, discord.File takes anything else for a path
+        self._raw = tempfile.TemporaryFile()
+        self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb") if self.compress else self._raw
+        self._in_part = 0
+        self._stream.write(self.header().encode("utf-8"))
+
+    def _close_part(self) -> None:
+        assert self._raw is not None and self._stream is not None
+
+        self._stream.write(self.footer().encode("utf-8"))
+        if self._stream is not self._raw:
+            self._stream.close()  # flushes the gzip trailer, does not close the temporary file
+        self._raw.seek(0)
+        self.parts.append(self._raw)
+        self._raw = self._stream = None
+
+    def write(self, message: discord.Message) -> None:
+        data = self.render(message).encode("utf-8")
+
+        if self._raw is None:
+            self._open_part()
+        elif self._in_part and self._raw.tell() + len(data) + len(self.footer()) > self.limit:
+            self._close_part()
+            self._open_part()
+
+        assert self._stream is not None
+        if self._in_part:
+            self._stream.write(self.separator().encode("utf-8"))
+        self._stream.write(data)
+        self._in_part += 1
+        self.written += 1
+
+    def write_many(self, messages: list[discord.Message]) -> None:
+        for message in messages:
+            self.write(message)
+
+    def filename(self, index: int) -> str:
+        suffix = f"-{index + 1}" if len(self.parts) > 1 else ""
+        name = f"{self.name}{suffix}.{self.extension}"
+        return f"{name}.gz" if self.compress else name
+
+    def finish(self) -> list[discord.File]:
+        if self._raw is None:
+            self._open_part()
+        self._close_part()
+        return [discord.File(part, filename=self.filename(i)) for i, part in enumerate(self.parts)]
+
+    def close(self) -> None:
+        for part in self.parts:
+            part.close()
+        if self._raw is not None:
+            self._raw.close()
+
+
+class TextTranscript(Transcript):
+    extension = "txt"
+
+    def render(self, message: discord.Message) -> str:
+        attachments = "".join(f" {attachment.url}" for attachment in message.attachments)
+        return f"{message.author} ({message.author.id}): {message.content}{attachments}\n"
+
+
+class HTMLTranscript(Transcript):
+    extension = "html"
+
+    def header(self) -> str:
+        return (
+            f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(self.name)}</title>"
+            "<style>body{font-family:sans-serif;background:#36393f;color:#dcddde}"
+            ".m{margin:4px 0}.a{font-weight:bold;color:#fff}.t{color:#72767d;font-size:small}</style>"
+            "</head><body>\n"
+        )
+
+    def footer(self) -> str:
+        return "</body></html>\n"
+
+    def render(self, message: discord.Message) -> str:
+        attachments = "".join(
+            f"<br><a href='{html.escape(a.url)}'>{html.escape(a.filename)}</a>" for a in message.attachments
+        )
+        return (
+            f"<div class='m'><span class='a'>{html.escape(str(message.author))}</span> "
+            f"<span class='t'>{message.created_at.isoformat()}</span><br>"
+            f"{html.escape(message.content).replace(chr(10), '<br>')}{attachments}</div>\n"
+        )
+
+
+class JSONTranscript(Transcript):
+    extension = "json"
+
+    def header(self) -> str:
+        return "["
+
+    def footer(self) -> str:
+        return "]\n"
+
+    def separator(self) -> str:
+        return ",\n"
+
+    def render(self, message: discord.Message) -> str:
+        return json.dumps(
+            {
+                "id": message.id,
+                "author": {"id": message.author.id, "name": str(message.author)},
+                "content": message.content,
+                "created_at": message.created_at.isoformat(),
+                "attachments": [attachment.url for attachment in message.attachments],
+            },
+        )
+
+
+FORMATS: dict[str, type[Transcript]] = {
+    "txt": TextTranscript,
+    "html": HTMLTranscript,
+    "json": JSONTranscript,
+}
+
+
+async def export_transcript(
+    channel: discord.TextChannel,
+    *,
+    fmt: Format = "txt",
+    compress: bool = False,
+    limit: int | None = None,
+) -> tuple[Transcript, list[discord.File]]:
+    """|coro|.
+
+    Streams the whole history of the channel into a transcript. The history is paginated by discord.py,
+    100 messages per request, and every page is written in a thread as soon as it arrives.
+    """
+    transcript = FORMATS[fmt](
+        channel.name,
+        limit=limit or channel.guild.filesize_limit,
+        compress=compress,
+    )
+    batch: list[discord.Message] = []
+    try:
+        async for message in channel.history(limit=None, oldest_first=True):
+            if not message.author.bot:
+                batch.append(message)
+            if len(batch) >= WRITE_BATCH:
+                await asyncio.to_thread(transcript.write_many, batch)
+                batch = []
+        if batch:
+            await asyncio.to_thread(transcript.write_many, batch)
+        files = await asyncio.to_thread(transcript.finish)
+    except BaseException:
+        transcript.close()
+        raise
+
+    log.debug("Transcript of %s: %s messages in %s parts", channel.id, transcript.written, len(files))
+    return transcript, files
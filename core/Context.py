@@ -226,7 +226,11 @@ class Context(commands.Context[commands.Bot], Generic[BotT]):
         if underline:
             content = f"__{content}__"
 
-        return await super().send(str(content)[:1990] if content else None, **kwargs)
+        message = await super().send(str(content)[:1990] if content else None, **kwargs)
+        if isinstance(view := kwargs.get("view"), discord.ui.View):
+            # lets the games follow the views their commands start
+            self.bot.dispatch("view_sent", self, view, message)
+        return message
 
     async def reply(self, content: str | None = None, **kwargs: Any) -> discord.Message:
         try:
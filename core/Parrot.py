@@ -20,8 +20,8 @@ import aiosqlite
 import jishaku  # noqa: F401  # pylint: disable=unused-import
 import pymongo
 from aiohttp import ClientSession
-from pymongo.errors import ConnectionFailure, DuplicateKeyError
-from pymongo.results import DeleteResult, InsertOneResult
+from pymongo.errors import DuplicateKeyError
+from pymongo.results import BulkWriteResult, DeleteResult, InsertOneResult
 
 import discord
 from discord import app_commands
@@ -63,8 +63,15 @@ from utilities.paste import Client
 from .__template import post as POST
 from .Context import Context
 from .help import PaginatedHelpCommand
+from .log_sink import LogSink, LogSinkHandler
+from .members import MemberResolver
+from .metrics import Metrics
+from .moderation import ModerationStore
+from .startup import ExtensionLoader, StartupTimeline, run_deferred
+from .timers import TimerManager
 from .tips import TIPS
 from .utils import CustomFormatter, handler
+from .webhooks import WebhookExecutor
 
 if TYPE_CHECKING:
     from discord.ext.commands.cooldowns import CooldownMapping
@@ -150,8 +157,6 @@ class Parrot(commands.AutoShardedBot):
         topgg: topgg.client.DBLClient
         topgg_webhook: topgg.webhook.WebhookManager
 
-    recieved_logs: list[list] = []
-
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(
             command_prefix=self.get_prefix,
@@ -188,9 +193,7 @@ class Parrot(commands.AutoShardedBot):
 
         self._was_ready: bool = False
         self.lock: asyncio.Lock = asyncio.Lock()
-        self.timer_task: asyncio.Task | None = None
-        self._current_timer: dict | None = {}
-        self._have_data: asyncio.Event = asyncio.Event()
+        self.timer_manager: TimerManager = TimerManager(self)
         self.reminder_event: asyncio.Event = asyncio.Event()
 
         # Top.gg
@@ -200,8 +203,15 @@ class Parrot(commands.AutoShardedBot):
         self.resumes: dict[int, list[datetime.datetime]] = defaultdict(list)
         self.identifies: dict[int, list[datetime.datetime]] = defaultdict(list)
         self._prev_events: deque[str] = deque(maxlen=10)
+        self.metrics: Metrics = Metrics(self)
 
         self.mystbin: Client = Client()
+        self.webhooks: WebhookExecutor = WebhookExecutor(self)
+        self.member_resolver: MemberResolver = MemberResolver(self)
+        self.moderation: ModerationStore = ModerationStore(self)
+
+        self.log_sink: LogSink = LogSink(self)
+        logger.addHandler(LogSinkHandler(self.log_sink))
 
         # caching variables
         self.guild_configurations_cache: dict[int, PostType] = Cache(self)  # type: ignore
@@ -229,6 +239,8 @@ class Parrot(commands.AutoShardedBot):
         # Extensions
         self._successfully_loaded: list[str] = []
         self._failed_to_load: dict[str, str] = {}
+        self.startup_timeline: StartupTimeline = StartupTimeline()
+        self._extension_loader: ExtensionLoader | None = None
 
         self.GLOBAL_HEADERS: dict[str, str] = {
             "Accept": "application/json",
@@ -257,6 +269,7 @@ class Parrot(commands.AutoShardedBot):
         self.command_collections: MongoCollection = self.main_db["commandCollections"]
         self.timers: MongoCollection = self.main_db["timers"]
         self.starboards: MongoCollection = self.main_db["starboards"]
+        self.suggestions: MongoCollection = self.main_db["suggestions"]
         self.giveaways: MongoCollection = self.main_db["giveawaysCollection"]
         self.user_collections_ind: MongoCollection = self.main_db["userCollections"]
         self.guild_collections_ind: MongoCollection = self.main_db["guildCollections"]
@@ -363,19 +376,12 @@ class Parrot(commands.AutoShardedBot):
             await self.load_extension("jishaku")
             return
 
-        for ext in EXTENSIONS:
-            try:
-                await self.load_extension(ext)
-                self._successfully_loaded.append(ext)
-                log.info("Loaded extension %s", ext)
-            except (commands.ExtensionFailed, commands.ExtensionNotFound) as e:
-                self._failed_to_load[ext] = str(e)
-                traceback.print_exc()
-                log.error("Failed to load extension %s", ext)
-            else:
-                if ext in UNLOAD_EXTENSIONS:
-                    await self.unload_extension(ext)
-                    log.warning("Unloaded extension %s", ext)
+        # cogs check the sticky bans and mutes as soon as they are loaded
+        await self.moderation.load()
+
+        self._extension_loader = ExtensionLoader(self, EXTENSIONS, unload=UNLOAD_EXTENSIONS)
+        await self._extension_loader.load_all()
+        self._extension_loader = None
 
         if self.HAS_TOP_GG:
             self.topgg = topgg.DBLClient(  # type: ignore
@@ -415,12 +421,28 @@ class Parrot(commands.AutoShardedBot):
                     self.ON_DOCKER = True
                     traceback.print_exc()
 
-        self.timer_task = self.loop.create_task(self.dispatch_timers())
+        await self.timer_manager.start()
 
         self.global_write_data.start()
         self.update_banned_members.start()
         self.update_scam_link_db.start()
         self.update_user_cache.start()
+        self.log_sink.start()
+        self.metrics.start()
+        self.moderation.start()
+
+    async def add_cog(self, cog: commands.Cog, /, **kwargs: Any) -> None:
+        ini = perf_counter()
+        await super().add_cog(cog, **kwargs)
+        if self._extension_loader is not None:
+            self._extension_loader.record_cog_load(cog, perf_counter() - ini)
+
+    def defer_until_ready(self, name: str, func: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """To run the non-critical data loading after the bot is READY.
+
+        The time taken is recorded in the startup timeline.
+        """
+        return self.loop.create_task(run_deferred(self, name, func), name=f"deferred:{name}")
 
     async def db_latency(self) -> float:
         ini = perf_counter()
@@ -442,6 +464,16 @@ class Parrot(commands.AutoShardedBot):
     async def on_socket_raw_receive(self, msg: str) -> None:
         self._prev_events.append(msg)
 
+    def dispatch(self, event_name: str, /, *args: Any, **kwargs: Any) -> None:
+        if event_name == "socket_event_type":
+            # dispatched for every gateway payload, counted here to avoid a task per payload
+            self.metrics.gateway_event(args[0])
+        super().dispatch(event_name, *args, **kwargs)
+
+    async def _run_event(self, coro: Callable[..., Awaitable[Any]], event_name: str, *args: Any, **kwargs: Any) -> None:
+        # every listener (bot and cog) of every event is run through here
+        await self.metrics.timed(event_name, coro, super()._run_event(coro, event_name, *args, **kwargs))
+
     async def _execute_webhook_from_scratch(
         self,
         webhook: discord.Webhook | str | None,
@@ -483,8 +515,8 @@ class Parrot(commands.AutoShardedBot):
             return
 
         if self.http_session.closed:
-            log.warning("HTTP session is closed. Creating new session")
-            self.http_session = aiohttp.ClientSession(loop=self.loop)
+            log.warning("HTTP session is closed. Can not execute webhook (%s)", URL)
+            return
         log.debug("Executing webhook from scratch (%s). Payload: %s", URL, payload)
         async with self.http_session.post(URL, json=payload, headers=self.GLOBAL_HEADERS) as resp:
             return await resp.json(content_type=None)
@@ -508,24 +540,15 @@ class Parrot(commands.AutoShardedBot):
             msg = "must provide atleast webhook_url or webhook_id and webhook_token"
             raise ValueError(msg)
 
+        if self.http_session.closed:
+            log.warning("HTTP session is closed. Can not execute webhook")
+            return None
+
         if webhook_id and webhook_token:
             log.debug("Executing webhook with webhook_id and webhook_token")
-            BASE_URL = "https://discordapp.com/api/webhooks"
-            URL = f"{BASE_URL}/{webhook_id}/{webhook_token}"
-
-        elif isinstance(webhook, str) and self.http_session:
-            URL = webhook
-
-            webhook: discord.Webhook = discord.Webhook.from_url(URL, session=self.http_session)
-        elif self.http_session.closed:
-            await self._execute_webhook_from_scratch(
-                webhook,
-                content=content,
-                username=kwargs.pop("username", self.user.name),
-                avatar_url=kwargs.pop("avatar_url", self.user.display_avatar.url),
-                **kwargs,
-            )
-            return
+            webhook = self.webhooks.get(f"https://discord.com/api/webhooks/{webhook_id}/{webhook_token}")
+        elif isinstance(webhook, str):
+            webhook = self.webhooks.get(webhook)
 
         _CONTENT = content
         _FILE = kwargs.pop("file", discord.utils.MISSING)
@@ -544,7 +567,8 @@ class Parrot(commands.AutoShardedBot):
                     webhook.url,
                     content,
                 )
-                return await webhook.send(
+                return await self.webhooks.send(
+                    webhook,
                     content=_CONTENT,  # type: ignore
                     file=_FILE,
                     avatar_url=kwargs.pop("avatar_url", self.user.display_avatar.url),
@@ -557,7 +581,7 @@ class Parrot(commands.AutoShardedBot):
 
     async def on_error(self, event: str, *args: Any, **kwargs: Any) -> None:
         log.error("Ignoring exception in %s, %s, %s", event, args, kwargs, exc_info=True)
-        await self._execute_webhook(
+        self.webhooks.queue_log(
             WEBHOOK_ERROR_LOGS,
             content=f"```py\nIgnoring exception on {event}\n{traceback.format_exc()}```",
         )
@@ -575,10 +599,10 @@ class Parrot(commands.AutoShardedBot):
     async def close(self) -> None:
         """To close the bot."""
         if hasattr(self, "http_session"):
+            await self.webhooks.close()
             await self.http_session.close()
 
-        if self.timer_task is not None and not self.timer_task.cancelled():
-            self.timer_task.cancel()
+        self.timer_manager.close()
 
         if self.global_write_data.is_running():
             self.global_write_data.stop()
@@ -586,6 +610,10 @@ class Parrot(commands.AutoShardedBot):
         if self.update_scam_link_db.is_running():
             self.update_scam_link_db.stop()
 
+        self.metrics.stop()
+
+        await self.moderation.close()
+        await self.log_sink.close()
         await self.sql.close()
 
         return await super().close()
@@ -597,6 +625,7 @@ class Parrot(commands.AutoShardedBot):
         if self._was_ready:
             return
         self._was_ready = True
+        self.startup_timeline.mark_ready()
 
         if MINIMAL_BOOT:
             return
@@ -634,12 +663,13 @@ class Parrot(commands.AutoShardedBot):
         else:
             content += "\n- All cogs loaded successfully"
         content += "```"
+        content += f"\n```\n{self.startup_timeline.format(5)}```"
 
         await self._execute_webhook(self._startup_log_token, content=f"{content}")
 
         for name, error in self._failed_to_load.items():
             st = f"```css\n[{self.user.name.title()}] Failed to load {name} cog due to``````py\n{error}```"
-            await self._execute_webhook(self._error_log_token, content=f"{st}")
+            self.webhooks.queue_log(self._error_log_token, content=st)
 
         VOICE_CHANNEL_ID = 1116780108074713098
         channel: discord.VoiceChannel | None = await self.getch(self.get_channel, self.fetch_channel, VOICE_CHANNEL_ID)  # type: ignore
@@ -797,10 +827,11 @@ class Parrot(commands.AutoShardedBot):
         """|coro|.
 
         Bulk resolves member IDs to member instances, if possible.
+        See :class:`core.members.MemberResolver`.
 
         Members that can't be resolved are discarded from the list.
 
-        This is done lazily using an asynchronous iterator.
+        The members are yielded using an asynchronous iterator.
 
         Note that the order of the resolved members is not the same as the input.
 
@@ -816,41 +847,9 @@ class Parrot(commands.AutoShardedBot):
         Member
             The resolved members.
         """
-        needs_resolution = []
-        for member_id in member_ids:
-            member = guild.get_member(member_id)
-            if member is not None:
-                yield member
-            else:
-                needs_resolution.append(member_id)
-
-        total_need_resolution = len(needs_resolution)
-        if total_need_resolution == 1:
-            shard = self.get_shard(guild.shard_id)
-
-            if shard and shard.is_ws_ratelimited():
-                try:
-                    member = await guild.fetch_member(needs_resolution[0])
-                except discord.HTTPException:
-                    pass
-                else:
-                    yield member
-            else:
-                members: list[discord.Member] = await guild.query_members(limit=1, user_ids=needs_resolution, cache=True)
-                if members:
-                    yield members[0]
-        elif total_need_resolution <= 100 and total_need_resolution > 1:
-            # Only a single resolution call needed here
-            resolved = await guild.query_members(limit=100, user_ids=needs_resolution, cache=True)
-            for member in resolved:
-                yield member
-        else:
-            # We need to chunk these in bits of 100...
-            for index in range(0, total_need_resolution, 100):
-                to_resolve = needs_resolution[index : index + 100]
-                members = await guild.query_members(limit=100, user_ids=to_resolve, cache=True)
-                for member in members:
-                    yield member
+        resolved = await self.member_resolver.resolve(guild, member_ids)
+        for member in resolved.values():
+            yield member
 
     @overload
     async def get_or_fetch_member(
@@ -903,19 +902,7 @@ class Parrot(commands.AutoShardedBot):
 
         if not in_guild:
             return await self.getch(self.get_user, self.fetch_user, int(member_id))
-        member = guild.get_member(member_id)
-        if member is not None:
-            return member
-
-        shard = self.get_shard(guild.shard_id)
-        if shard and shard.is_ws_ratelimited():
-            try:
-                return await guild.fetch_member(member_id)
-            except discord.HTTPException:
-                return None
-
-        members = await guild.query_members(limit=1, user_ids=[member_id], cache=True)
-        return members[0] if members else None
+        return await self.member_resolver.get(guild, member_id)
 
     async def get_prefix(self, message: discord.Message) -> list[str]:
         """Dynamic prefixing."""
@@ -991,14 +978,16 @@ class Parrot(commands.AutoShardedBot):
             self.guild_configurations_cache[guild_id] = data
         else:
             log.debug("Guild %s not found in database, creating new one", guild_id)
-            FAKE_POST = POST.copy()
-            FAKE_POST["_id"] = guild_id
+            data = POST.copy()
+            data["_id"] = guild_id
             try:
-                await self.guild_configurations.insert_one(FAKE_POST)
+                await self.guild_configurations.insert_one(data)
             except DuplicateKeyError:
                 pass
             finally:
-                self.guild_configurations_cache[guild_id] = FAKE_POST
+                self.guild_configurations_cache[guild_id] = data
+
+        self.dispatch("guild_config_update", guild_id, data)
 
     @tasks.loop(count=1)
     async def update_banned_members(self):
@@ -1016,82 +1005,6 @@ class Parrot(commands.AutoShardedBot):
             log.info("Chunking guild %s", ctx.guild.id)
             self.loop.create_task(ctx.guild.chunk())
 
-    async def get_active_timer(self, **filters: Any) -> dict | None:
-        data = await self.timers.find_one({**filters}, sort=[("expires_at", pymongo.ASCENDING)])
-        log.debug("Received data: %s", data)
-        return data
-
-    async def wait_for_active_timers(self, **filters: Any) -> dict | None:
-        timers = await self.get_active_timer(**filters)
-        if timers:
-            self._have_data.set()
-            log.debug("Event set")
-            return timers
-
-        self._have_data.clear()
-        log.debug("Event cleared")
-        self._current_timer = None
-        log.debug(
-            "Current timers set to None",
-        )
-        await self._have_data.wait()
-        log.debug("Event waited")
-        return await self.get_active_timer()
-
-    async def dispatch_timers(self):
-        log.debug("Starting timer task")
-        try:
-            while not self.is_closed():
-                timers = self._current_timer = await self.wait_for_active_timers()
-                log.debug(
-                    "Received timers: %s",
-                    timers,
-                )
-                if timers is None:
-                    continue
-
-                now = discord.utils.utcnow().timestamp()
-
-                if timers["expires_at"] > now:
-                    log.debug(
-                        "Sleeping for %s seconds",
-                        timers["expires_at"] - now,
-                    )
-                    await asyncio.sleep(timers["expires_at"] - now)
-
-                await self.call_timer(self.timers, **timers)
-
-                await asyncio.sleep(0)
-        except (OSError, discord.ConnectionClosed, ConnectionFailure):
-            if self.timer_task:
-                self.timer_task.cancel()
-                self.timer_task = self.loop.create_task(self.dispatch_timers())
-
-        except asyncio.CancelledError:
-            raise
-
-    async def call_timer(self, collection: MongoCollection, **data: Any):
-        log.debug("Calling timer: %s", data)
-        deleted: DeleteResult = await collection.delete_one({"_id": data["_id"]})
-
-        log.debug("Deleted timer: %s", deleted)
-        if deleted.deleted_count == 0:
-            return
-
-        if data.get("_event_name"):
-            self.dispatch(f"{data['_event_name']}_timer_complete", **data)
-        else:
-            self.dispatch("timer_complete", **data)
-
-    async def short_time_dispatcher(self, collection: MongoCollection, **data: Any):
-        log.debug(
-            "Sleeping for %s seconds",
-            data["expires_at"] - discord.utils.utcnow().timestamp(),
-        )
-        await asyncio.sleep(discord.utils.utcnow().timestamp() - data["expires_at"])
-
-        await self.call_timer(collection, **data)
-
     async def create_timer(
         self,
         *,
@@ -1124,14 +1037,48 @@ class Parrot(commands.AutoShardedBot):
         is_todo: :class:`bool`
             To provide whether the timer related to `TODO`
         """
-        collection: MongoCollection = self.timers
+        post = self._timer_post(
+            expires_at=expires_at,
+            _event_name=_event_name,
+            created_at=created_at,
+            content=content,
+            message=message,
+            dm_notify=dm_notify,
+            is_todo=is_todo,
+            extra=extra,
+            **kw,
+        )
+        insert_data = await self.timer_manager.create(post)
+        log.debug("Inserted data: %s", insert_data)
+        return insert_data
 
+    async def create_timers(self, *timers: dict[str, Any]) -> BulkWriteResult | None:
+        """|coro|.
+
+        To register many timers with one database request. Each item takes the same keywords as :meth:`create_timer`.
+        Timers without ``message`` must have an unique ``_id``.
+        """
+        return await self.timer_manager.create_many(self._timer_post(**timer) for timer in timers)
+
+    def _timer_post(
+        self,
+        *,
+        expires_at: float,
+        _event_name: str | None = None,
+        created_at: float | None = None,
+        content: str | None = None,
+        message: discord.Message | int | None = None,
+        dm_notify: bool = False,
+        is_todo: bool = False,
+        extra: dict[str, Any] | None = None,
+        **kw,
+    ) -> dict[str, Any]:
         embed: dict[str, Any] | None = kw.get("embed_like") or kw.get("embed")
         mod_action: dict[str, Any] | None = kw.get("mod_action")
         cmd_exec_str: str | None = kw.get("cmd_exec_str")
 
         # fmt: off
-        post = {
+        return {
             "_id": (message.id if isinstance(message, discord.Message) else message) or int(discord.utils.utcnow().timestamp() * 1000),
             "_event_name": _event_name,
             "expires_at": expires_at,
@@ -1155,44 +1102,26 @@ class Parrot(commands.AutoShardedBot):
             **kw,
         }
         # fmt: on
-        insert_data = await collection.insert_one(post)
-        log.debug("Inserted data: %s", insert_data)
-        self._have_data.set()
-
-        if self._current_timer and self._current_timer["expires_at"] > expires_at:
-            self._current_timer = post
-
-            if self.timer_task:
-                log.debug("Cancelling current timer %s", self._current_timer)
-                self.timer_task.cancel()
-
-                self.timer_task = self.loop.create_task(self.dispatch_timers())
-
-        return insert_data
 
     async def get_timer(self, **kw: Any) -> dict[str, Any] | None:
         collection: MongoCollection = self.timers
         return await collection.find_one({"_id": kw["_id"]})
 
     async def delete_timer(self, **kw: Any) -> DeleteResult:
-        data: DeleteResult = await self.timers.delete_one({"_id": kw["_id"]})
-        delete_count = data.deleted_count
-        if delete_count == 0:
-            log.debug("Deleted data: %s", data)
-            return data
-
-        if delete_count and self._current_timer and self._current_timer["_id"] == kw["_id"] and self.timer_task:
-            log.debug("Rerunning timer task")
-            self.timer_task.cancel()
-            self.timer_task = self.loop.create_task(self.dispatch_timers())
+        data: DeleteResult = await self.timer_manager.delete(kw["_id"])
+        log.debug("Deleted data: %s", data)
         return data
 
+    async def delete_timers(self, *ids: Any) -> DeleteResult | None:
+        """|coro|.
+
+        To delete many timers, by their ``_id``, with one database request.
+        """
+        return await self.timer_manager.delete_many(ids)
+
     async def restart_timer(self) -> bool:
-        if self.timer_task:
-            self.timer_task.cancel()
-            self.timer_task = self.loop.create_task(self.dispatch_timers())
-            return True
-        return False
+        self.timer_manager.restart()
+        return True
 
     @overload
     async def get_app_command(
@@ -1590,17 +1519,9 @@ class Parrot(commands.AutoShardedBot):
                 },
             )
 
-    # CREATE TABLE IF NOT EXISTS logs (
-    #       id      INTEGER PRIMARY KEY AUTOINCREMENT,
-    #       level   INT NOT NULL,
-    #       message TEXT NOT NULL,
-    #       created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    #       extra   TEXT,
-    #       UNIQUE(message, created_at)
-    # );
-
     @overload
     def log(
+        self,
         level: int | str,
         message: str,
         extra: dict[str, Any] | None = None,
@@ -1609,6 +1530,7 @@ class Parrot(commands.AutoShardedBot):
 
     @overload
     def log(
+        self,
         *,
         level: int | str,
         message: str,
@@ -1618,6 +1540,7 @@ class Parrot(commands.AutoShardedBot):
 
     @overload
     def log(
+        self,
         level: int | str,
         *,
         message: str,
@@ -1625,36 +1548,11 @@ class Parrot(commands.AutoShardedBot):
     ) -> None:
         ...
 
-    @staticmethod
     def log(
-        *args: Any,
-        **kwargs: Any,
+        self,
+        level: int | str,
+        message: str,
+        extra: dict[str, Any] | None = None,
     ) -> None:
-        mapping = {
-            "debug": "DEBUG",
-            "info": "INFO",
-            "warning": "WARNING",
-            "error": "ERROR",
-            "critical": "CRITICAL",
-            "0": "DEBUG",
-            "1": "INFO",
-            "2": "WARNING",
-            "3": "ERROR",
-            "4": "CRITICAL",
-        }
-        level = kwargs.get("level") or args[0]
-        message = kwargs.get("message") or args[1]
-        extra = kwargs.get("extra") or args[2]
-        level = mapping.get(str(level).lower(), "INFO")
-        Parrot.recieved_logs.append([level, message or "None", extra])
-
-    async def _log(self) -> None:
-        if self.recieved_logs:
-            query = """
-                INSERT INTO logs (level, message, extra) VALUES (?, ?, ?) ON CONFLICT(message, created_at) DO NOTHING;
-            """
-            await self.sql.executemany(query, self.recieved_logs)
-
-    @tasks.loop(minutes=1)
-    async def log_loop(self):
-        await self._log()
+        """To log the message in the SQLite `logs` table. Written in batches, see :class:`core.log_sink.LogSink`."""
+        self.log_sink.put(level, message, extra)
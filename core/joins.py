@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import Counter, deque
+from collections.abc import Awaitable, Callable, Iterable
+from typing import TYPE_CHECKING, TypeVar
+
+import discord
+
+if TYPE_CHECKING:
+    from typing import TypeAlias
+
+    BurstHandler: TypeAlias = Callable[[discord.Guild, list[discord.Member]], Awaitable[object]]
+
+__all__ = ("JoinBuffer", "run_bounded")
+
+log = logging.getLogger("core.joins")
+
+T = TypeVar("T")
+
+# seconds a guild's joins are collected before they are handled together
+WINDOW = 1.0
+# a raid is handled in slices of this size, without waiting for the window
+MAX_BATCH = 500
+# the kick, ban and role routes share a per guild bucket, more only queue up in the HTTP client
+CONCURRENCY = 5
+
+
+async def run_bounded(
+    targets: Iterable[T],
+    func: Callable[[T], Awaitable[object]],
+    *,
+    concurrency: int = CONCURRENCY,
+) -> tuple[list[T], Counter[str]]:
+    """|coro|.
+
+    Calls ``func`` for every target, with at most ``concurrency`` calls in flight.
+    Returns the targets it succeeded for, and the HTTP errors counted by message.
+    """
+    pending: deque[T] = deque(targets)
+    done: list[T] = []
+    failures: Counter[str] = Counter()
+
+    async def worker() -> None:
+        while pending:
+            target = pending.popleft()
+            try:
+                await func(target)
+            except discord.HTTPException as e:
+                failures[str(e)] += 1
+            else:
+                done.append(target)
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, len(pending)))))
+    return done, failures
+
+
+class JoinBuffer:
+    """Collects the member joins of every guild over a short window.
+
+    The handler gets the joins of one guild at once, a raid wave is evaluated
+    as a few batches instead of thousands of separate events.
+    """
+
+    def __init__(self, handler: BurstHandler, *, window: float = WINDOW, max_batch: int = MAX_BATCH) -> None:
+        self.handler = handler
+        self.window = window
+        self.max_batch = max_batch
+
+        self.pending: dict[int, list[discord.Member]] = {}
+        self._timers: dict[int, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def __repr__(self) -> str:
+        return f"<JoinBuffer guilds={len(self.pending)} running={len(self._tasks)}>"
+
+    def add(self, member: discord.Member) -> None:
+        guild_id = member.guild.id
+        batch = self.pending.setdefault(guild_id, [])
+        batch.append(member)
+
+        if len(batch) >= self.max_batch:
+            self.flush(guild_id)
+        elif guild_id not in self._timers:
+            self._timers[guild_id] = asyncio.get_running_loop().call_later(self.window, self.flush, guild_id)
+
+    def flush(self, guild_id: int) -> None:
+        if (timer := self._timers.pop(guild_id, None)) is not None:
+            timer.cancel()
+
+        members = self.pending.pop(guild_id, None)
+        if not members:
+            return
+
+        task = asyncio.create_task(self._handle(members[0].guild, members), name=f"join-burst:{guild_id}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _handle(self, guild: discord.Guild, members: list[discord.Member]) -> None:
+        if len(members) > 1:
+            log.debug("Handling %s joins in %s", len(members), guild.id)
+        try:
+            await self.handler(guild, members)
+        except Exception as e:
+            log.error("Failed to handle %s joins in %s", len(members), guild.id, exc_info=e)
+
+    def close(self) -> None:
+        """Hands the joins still waiting in the window to the handler."""
+        for guild_id in list(self.pending):
+            self.flush(guild_id)
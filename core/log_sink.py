@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import deque
+from contextlib import suppress
+from typing import TYPE_CHECKING, Any
+
+import aiosqlite
+
+from discord.ext import tasks
+
+if TYPE_CHECKING:
+    from .Parrot import Parrot
+
+__all__ = ("LogSink", "LogSinkHandler")
+
+log = logging.getLogger("core.log_sink")
+
+LEVELS: dict[str, int] = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "critical": logging.CRITICAL,
+    "0": logging.DEBUG,
+    "1": logging.INFO,
+    "2": logging.WARNING,
+    "3": logging.ERROR,
+    "4": logging.CRITICAL,
+}
+
+# CREATE TABLE IF NOT EXISTS logs (
+#       id      INTEGER PRIMARY KEY AUTOINCREMENT,
+#       level   INT NOT NULL,
+#       message TEXT NOT NULL,
+#       created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+#       extra   TEXT,
+#       UNIQUE(message, created_at)
+# );
+# CREATE INDEX IF NOT EXISTS logs_level_created_at ON logs (level, created_at);
+
+INSERT_QUERY = """
+    INSERT INTO logs (level, message, extra) VALUES (?, ?, ?) ON CONFLICT(message, created_at) DO NOTHING;
+"""
+
+
+def parse_level(level: int | str) -> int:
+    if isinstance(level, int):
+        return level
+    return LEVELS.get(str(level).lower(), logging.INFO)
+
+
+class LogSink:
+    """Bounded buffer of log records, written to the SQLite ``logs`` table in batches.
+
+    When the buffer is full the oldest record is dropped and counted in :attr:`dropped`.
+    Rows older than ``max_age_days`` or beyond ``max_rows`` are rotated out every hour.
+    """
+
+    def __init__(
+        self,
+        bot: Parrot,
+        *,
+        maxlen: int = 2**12,
+        batch_size: int = 2**8,
+        max_age_days: int = 7,
+        max_rows: int = 2**16,
+    ) -> None:
+        self.bot = bot
+        self.buffer: deque[tuple[int, str, str | None]] = deque(maxlen=maxlen)
+        self.batch_size = batch_size
+        self.max_age_days = max_age_days
+        self.max_rows = max_rows
+
+        self.dropped: int = 0
+        self.written: int = 0
+        self.lock: asyncio.Lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def put(self, level: int | str, message: str, extra: dict[str, Any] | None = None) -> None:
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+
+        self.buffer.append(
+            (
+                parse_level(level),
+                message or "None",
+                json.dumps(extra, default=str) if extra is not None else None,
+            ),
+        )
+
+    def _requeue(self, batch: list[tuple[int, str, str | None]]) -> None:
+        # back in front of the records put since, as many as the buffer has room for
+        room = (self.buffer.maxlen or len(batch)) - len(self.buffer)
+        kept = batch[:room] if room > 0 else []
+        self.dropped += len(batch) - len(kept)
+        self.buffer.extendleft(reversed(kept))
+
+    async def drain(self) -> int:
+        """|coro|.
+
+        Writes the buffered records in batches. Returns the number of records written.
+        A batch that fails to be written is put back in the buffer, and the drain stops.
+        """
+        total = 0
+        while self.buffer:
+            batch = [self.buffer.popleft() for _ in range(min(self.batch_size, len(self.buffer)))]
+            async with self.lock:
+                try:
+                    await self.bot.sql.executemany(INSERT_QUERY, batch)
+                    await self.bot.sql.commit()
+                except Exception as e:
+                    with suppress(Exception):
+                        await self.bot.sql.rollback()
+                    self._requeue(batch)
+                    log.warning("Could not write %s log records, retrying on the next drain: %s", len(batch), e)
+                    break
+            total += len(batch)
+
+        self.written += total
+        if total:
+            log.debug("Wrote %s log records, %s dropped so far", total, self.dropped)
+        return total
+
+    async def rotate(self) -> None:
+        async with self.lock:
+            await self.bot.sql.execute(
+                "DELETE FROM logs WHERE created_at < datetime('now', ?)",
+                (f"-{self.max_age_days} days",),
+            )
+            await self.bot.sql.execute(
+                "DELETE FROM logs WHERE id <= (SELECT id FROM logs ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (self.max_rows,),
+            )
+            await self.bot.sql.commit()
+
+    async def fetch(
+        self,
+        *,
+        level: int | str | None = None,
+        min_level: int | str | None = None,
+        limit: int = 100,
+    ) -> list[aiosqlite.Row]:
+        """|coro|.
+
+        Latest records, filtered by exact ``level`` or by ``min_level``. Uses the ``(level, created_at)`` index.
+        """
+        if level is not None:
+            query = "SELECT id, level, message, created_at, extra FROM logs WHERE level = ? ORDER BY created_at DESC LIMIT ?"
+            args: tuple = (parse_level(level), limit)
+        elif min_level is not None:
+            query = "SELECT id, level, message, created_at, extra FROM logs WHERE level >= ? ORDER BY created_at DESC LIMIT ?"
+            args = (parse_level(min_level), limit)
+        else:
+            query = "SELECT id, level, message, created_at, extra FROM logs ORDER BY id DESC LIMIT ?"
+            args = (limit,)
+
+        cursor = await self.bot.sql.execute(query, args)
+        return list(await cursor.fetchall())
+
+    @tasks.loop(seconds=30)
+    async def drain_loop(self) -> None:
+        await self.drain()
+
+    @tasks.loop(hours=1)
+    async def rotate_loop(self) -> None:
+        await self.rotate()
+
+    def start(self) -> None:
+        self.drain_loop.start()
+        self.rotate_loop.start()
+
+    async def close(self) -> None:
+        self.drain_loop.cancel()
+        self.rotate_loop.cancel()
+        await self.drain()
+
+
+class LogSinkHandler(logging.Handler):
+    """Forwards the :mod:`logging` records to :class:`LogSink`."""
+
+    def __init__(self, sink: LogSink, level: int = logging.WARNING) -> None:
+        super().__init__(level)
+        self.sink = sink
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.sink.put(
+                record.levelno,
+                record.getMessage(),
+                {"name": record.name, "lineno": record.lineno, "funcName": record.funcName},
+            )
+        except Exception:
+            self.handleError(record)
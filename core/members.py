@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import defaultdict
+from collections.abc import Iterable
+from time import monotonic
+from typing import TYPE_CHECKING
+
+import discord
+
+from .utils import FixedWindowBucket
+
+if TYPE_CHECKING:
+    from .Parrot import Parrot
+
+__all__ = ("MemberResolver",)
+
+log = logging.getLogger("core.members")
+
+QUERY_CHUNK = 100
+
+# Gateway allows 120 commands per 60 seconds per shard, heartbeats and presence need some too
+GATEWAY_RATE = 60
+GATEWAY_PER = 60.0
+
+NEGATIVE_TTL = 60.0
+FETCH_CONCURRENCY = 5
+
+
+class MemberResolver:
+    """Resolves many member (or user) IDs at once.
+
+    Cache hits are served directly, misses are resolved with ``query_members``
+    in chunks of 100, rate limited per shard. IDs which could not be resolved
+    are remembered for a short time so that they are not requested again.
+    """
+
+    def __init__(self, bot: Parrot, *, negative_ttl: float = NEGATIVE_TTL) -> None:
+        self.bot = bot
+        self.negative_ttl = negative_ttl
+
+        self._negative: dict[tuple[int, int], float] = {}
+        self._buckets: defaultdict[int, FixedWindowBucket] = defaultdict(lambda: FixedWindowBucket(GATEWAY_RATE, GATEWAY_PER))
+        self._fetch_semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+    def _is_negative(self, scope: int, _id: int, now: float) -> bool:
+        expires_at = self._negative.get((scope, _id))
+        if expires_at is None:
+            return False
+        if expires_at < now:
+            del self._negative[(scope, _id)]
+            return False
+        return True
+
+    def _mark_negative(self, scope: int, ids: Iterable[int]) -> None:
+        expires_at = monotonic() + self.negative_ttl
+        for _id in ids:
+            self._negative[(scope, _id)] = expires_at
+
+        if len(self._negative) > 2**14:
+            now = monotonic()
+            self._negative = {k: v for k, v in self._negative.items() if v > now}
+
+    async def _fetch_member(self, guild: discord.Guild, member_id: int) -> discord.Member | None:
+        async with self._fetch_semaphore:
+            try:
+                return await guild.fetch_member(member_id)
+            except discord.HTTPException:
+                return None
+
+    async def _query(self, guild: discord.Guild, member_ids: list[int]) -> list[discord.Member]:
+        shard = self.bot.get_shard(guild.shard_id)
+        if shard and shard.is_ws_ratelimited() and len(member_ids) <= FETCH_CONCURRENCY:
+            # few members, HTTP is cheaper than waiting for the gateway
+            members = await asyncio.gather(*(self._fetch_member(guild, member_id) for member_id in member_ids))
+            return [member for member in members if member is not None]
+
+        async with self._buckets[guild.shard_id]:
+            return await guild.query_members(limit=QUERY_CHUNK, user_ids=member_ids, cache=True)
+
+    async def resolve(self, guild: discord.Guild, member_ids: Iterable[int]) -> dict[int, discord.Member]:
+        """|coro|.
+
+        Resolves member IDs to members. IDs which are not in the guild are not in the returned mapping.
+        """
+        now = monotonic()
+        resolved: dict[int, discord.Member] = {}
+        misses: list[int] = []
+
+        for member_id in dict.fromkeys(member_ids):
+            member = guild.get_member(member_id)
+            if member is not None:
+                resolved[member_id] = member
+            elif not self._is_negative(guild.id, member_id, now):
+                misses.append(member_id)
+
+        if not misses:
+            return resolved
+
+        log.debug("Resolving %s members of guild %s, %s cache hits", len(misses), guild.id, len(resolved))
+        for index in range(0, len(misses), QUERY_CHUNK):
+            chunk = misses[index : index + QUERY_CHUNK]
+            try:
+                members = await self._query(guild, chunk)
+            except asyncio.TimeoutError:
+                log.warning("Timed out resolving %s members of guild %s", len(chunk), guild.id)
+                continue
+            for member in members:
+                resolved[member.id] = member
+
+        self._mark_negative(guild.id, (member_id for member_id in misses if member_id not in resolved))
+        return resolved
+
+    async def _fetch_user(self, user_id: int) -> discord.User | None:
+        async with self._fetch_semaphore:
+            try:
+                return await self.bot.fetch_user(user_id)
+            except discord.HTTPException:
+                return None
+
+    async def resolve_users(
+        self,
+        user_ids: Iterable[int],
+        *,
+        guild: discord.Guild | None = None,
+    ) -> dict[int, discord.Member | discord.User]:
+        """|coro|.
+
+        Resolves user IDs. If guild is given, members of that guild are preferred.
+        Users which are neither cached nor members are fetched over HTTP, with bounded concurrency.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        resolved: dict[int, discord.Member | discord.User] = {}
+        if guild is not None:
+            resolved.update(await self.resolve(guild, user_ids))
+
+        now = monotonic()
+        misses: list[int] = []
+        for user_id in user_ids:
+            if user_id in resolved:
+                continue
+            if (user := self.bot.get_user(user_id)) is not None:
+                resolved[user_id] = user
+            elif not self._is_negative(0, user_id, now):
+                misses.append(user_id)
+
+        if misses:
+            users = await asyncio.gather(*(self._fetch_user(user_id) for user_id in misses))
+            for user in users:
+                if user is not None:
+                    resolved[user.id] = user
+            self._mark_negative(0, (user_id for user_id in misses if user_id not in resolved))
+
+        return resolved
+
+    async def get(self, guild: discord.Guild, member_id: int) -> discord.Member | None:
+        resolved = await self.resolve(guild, (member_id,))
+        return resolved.get(member_id)
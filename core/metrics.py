@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import bisect
+import logging
+from collections import Counter, defaultdict, deque
+from time import monotonic, perf_counter
+from typing import TYPE_CHECKING, Any
+
+from discord.ext import tasks
+
+if TYPE_CHECKING:
+    from .Parrot import Parrot
+
+__all__ = ("Histogram", "Metrics")
+
+log = logging.getLogger("core.metrics")
+
+# upper bounds, in milliseconds
+BUCKETS: tuple[float, ...] = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+
+LAG_INTERVAL = 0.5
+
+
+class Histogram:
+    """Fixed buckets latency histogram. Constant memory per instance."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts: list[int] = [0] * len(BUCKETS)
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def add(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket in which the ``p`` percentile lies."""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total, 3),
+            "mean_ms": round(self.mean, 3),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max, 3),
+        }
+
+
+class Metrics:
+    """Per event and per listener timings, event loop lag and gateway payload rates."""
+
+    def __init__(self, bot: Parrot) -> None:
+        self.bot = bot
+        self.started_at: float = monotonic()
+
+        self.events: defaultdict[str, Histogram] = defaultdict(Histogram)
+        self.listeners: defaultdict[tuple[str, str], Histogram] = defaultdict(Histogram)
+        self.loop_lag: Histogram = Histogram()
+        self._recent_lag: deque[float] = deque(maxlen=120)
+        self._last_sample: float | None = None
+
+        self.gateway_events: Counter[str] = Counter()
+        self.gateway_total: int = 0
+        # (timestamp, total payloads) samples, to calculate the rate
+        self._gateway_samples: deque[tuple[float, int]] = deque(maxlen=60)
+
+    @staticmethod
+    def listener_name(coro: Any) -> str:
+        owner = getattr(coro, "__self__", None)
+        name = getattr(coro, "__qualname__", None) or getattr(coro, "__name__", repr(coro))
+        if owner is not None and not name.startswith(type(owner).__name__):
+            return f"{type(owner).__name__}.{name}"
+        return name
+
+    async def timed(self, event_name: str, coro: Any, awaitable: Any) -> Any:
+        ini = perf_counter()
+        try:
+            return await awaitable
+        finally:
+            ms = (perf_counter() - ini) * 1000
+            self.events[event_name].add(ms)
+            self.listeners[(event_name, self.listener_name(coro))].add(ms)
+
+    def gateway_event(self, event_type: str) -> None:
+        self.gateway_events[event_type] += 1
+        self.gateway_total += 1
+
+    def gateway_rate(self) -> float:
+        """Payloads per second, over the last minute."""
+        if len(self._gateway_samples) < 2:
+            return 0.0
+        (t0, c0), (t1, c1) = self._gateway_samples[0], self._gateway_samples[-1]
+        return (c1 - c0) / (t1 - t0) if t1 > t0 else 0.0
+
+    @tasks.loop(seconds=LAG_INTERVAL)
+    async def sample_loop(self) -> None:
+        now = monotonic()
+        if self._last_sample is not None:
+            # the time taken by the loop to wake us up, beyond the interval asked
+            lag = max(now - self._last_sample - LAG_INTERVAL, 0.0) * 1000
+            self.loop_lag.add(lag)
+            self._recent_lag.append(lag)
+        self._last_sample = now
+
+        self._gateway_samples.append((now, self.gateway_total))
+
+    def start(self) -> None:
+        self.sample_loop.start()
+
+    def stop(self) -> None:
+        self.sample_loop.cancel()
+
+    def slowest_listeners(self, n: int = 10, *, event: str | None = None) -> list[tuple[tuple[str, str], Histogram]]:
+        items = [(k, v) for k, v in self.listeners.items() if event is None or k[0] == event]
+        return sorted(items, key=lambda kv: kv[1].total, reverse=True)[:n]
+
+    def to_dict(self, n: int = 10) -> dict[str, Any]:
+        return {
+            "uptime": round(monotonic() - self.started_at, 3),
+            "loop_lag": {
+                **self.loop_lag.to_dict(),
+                "recent_max_ms": round(max(self._recent_lag, default=0.0), 3),
+            },
+            "gateway": {
+                "total": self.gateway_total,
+                "rate_per_second": round(self.gateway_rate(), 3),
+                "top": dict(self.gateway_events.most_common(n)),
+            },
+            "events": {
+                name: hist.to_dict() for name, hist in sorted(self.events.items(), key=lambda kv: kv[1].total, reverse=True)[:n]
+            },
+            "listeners": {f"{event}:{name}": hist.to_dict() for (event, name), hist in self.slowest_listeners(n)},
+        }
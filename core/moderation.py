@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from typing import TYPE_CHECKING, Literal
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from discord.ext import tasks
+
+if TYPE_CHECKING:
+    from typing import TypeAlias
+
+    from .Parrot import Parrot
+
+    Kind: TypeAlias = Literal["sticky_bans", "muted"]
+
+__all__ = ("ModerationStore",)
+
+log = logging.getLogger("core.moderation")
+
+
+class ModerationStore:
+    """Sticky bans and mutes of every guild, as sets of user IDs.
+
+    Loaded once at startup, checked in O(1) on join and unban events.
+    Only the changes are written back, in one ``bulk_write`` per collection.
+    Changes of a failed write are kept, and written with the next flush.
+    """
+
+    # kind -> name of the collection attribute of the bot
+    COLLECTIONS: dict[Kind, str] = {
+        "sticky_bans": "guild_collections_ind",
+        "muted": "guild_configurations",
+    }
+
+    def __init__(self, bot: Parrot) -> None:
+        self.bot = bot
+        self.sticky_bans: defaultdict[int, set[int]] = defaultdict(set)
+        self.muted: defaultdict[int, set[int]] = defaultdict(set)
+
+        # (kind, guild ID) -> IDs added / removed since the last flush
+        self._added: defaultdict[tuple[Kind, int], set[int]] = defaultdict(set)
+        self._removed: defaultdict[tuple[Kind, int], set[int]] = defaultdict(set)
+
+    def _store(self, kind: Kind) -> defaultdict[int, set[int]]:
+        return self.sticky_bans if kind == "sticky_bans" else self.muted
+
+    def _add(self, kind: Kind, guild_id: int, user_id: int) -> None:
+        self._store(kind)[guild_id].add(user_id)
+        self._removed[(kind, guild_id)].discard(user_id)
+        self._added[(kind, guild_id)].add(user_id)
+
+    def _remove(self, kind: Kind, guild_id: int, user_id: int) -> bool:
+        members = self._store(kind).get(guild_id)
+        if not members or user_id not in members:
+            return False
+        members.discard(user_id)
+        self._added[(kind, guild_id)].discard(user_id)
+        self._removed[(kind, guild_id)].add(user_id)
+        return True
+
+    def is_sticky_banned(self, guild_id: int, user_id: int) -> bool:
+        return user_id in self.sticky_bans.get(guild_id, ())
+
+    def add_sticky_ban(self, guild_id: int, user_id: int) -> None:
+        self._add("sticky_bans", guild_id, user_id)
+
+    def remove_sticky_ban(self, guild_id: int, user_id: int) -> bool:
+        return self._remove("sticky_bans", guild_id, user_id)
+
+    def is_muted(self, guild_id: int, user_id: int) -> bool:
+        return user_id in self.muted.get(guild_id, ())
+
+    def add_mute(self, guild_id: int, user_id: int) -> None:
+        self._add("muted", guild_id, user_id)
+
+    def remove_mute(self, guild_id: int, user_id: int) -> bool:
+        return self._remove("muted", guild_id, user_id)
+
+    async def load(self) -> None:
+        for kind, attr in self.COLLECTIONS.items():
+            collection = getattr(self.bot, attr)
+            store = self._store(kind)
+            async for data in collection.find({kind: {"$exists": True, "$ne": []}}, {kind: 1}):
+                store[data["_id"]] = set(data[kind])
+
+        log.debug(
+            "Loaded sticky bans of %s guilds and mutes of %s guilds",
+            len(self.sticky_bans),
+            len(self.muted),
+        )
+
+    async def flush(self) -> None:
+        added, self._added = self._added, defaultdict(set)
+        removed, self._removed = self._removed, defaultdict(set)
+
+        operations: defaultdict[Kind, list[UpdateOne]] = defaultdict(list)
+        # an ID is never in both, so the order of the operations does not matter
+        for (kind, guild_id), ids in added.items():
+            if ids:
+                operations[kind].append(
+                    UpdateOne({"_id": guild_id}, {"$addToSet": {kind: {"$each": list(ids)}}}, upsert=True),
+                )
+        for (kind, guild_id), ids in removed.items():
+            if ids:
+                operations[kind].append(UpdateOne({"_id": guild_id}, {"$pull": {kind: {"$in": list(ids)}}}))
+
+        for kind, ops in operations.items():
+            log.debug("Writing %s %s changes", len(ops), kind)
+            try:
+                await getattr(self.bot, self.COLLECTIONS[kind]).bulk_write(ops, ordered=False)
+            except PyMongoError as e:
+                # the operations are idempotent, write them again with the next flush
+                log.warning("Could not write %s %s changes, retrying on the next flush: %s", len(ops), kind, e)
+                self._restore(kind, added, removed)
+
+    def _restore(
+        self,
+        kind: Kind,
+        added: dict[tuple[Kind, int], set[int]],
+        removed: dict[tuple[Kind, int], set[int]],
+    ) -> None:
+        # changes made since the flush started are newer, and win
+        for (k, guild_id), ids in added.items():
+            if k == kind:
+                self._added[(k, guild_id)] |= ids - self._removed.get((k, guild_id), set())
+        for (k, guild_id), ids in removed.items():
+            if k == kind:
+                self._removed[(k, guild_id)] |= ids - self._added.get((k, guild_id), set())
+
+    @tasks.loop(seconds=30)
+    async def flush_loop(self) -> None:
+        await self.flush()
+
+    def start(self) -> None:
+        self.flush_loop.start()
+
+    async def close(self) -> None:
+        self.flush_loop.cancel()
+        await self.flush()
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Iterable
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from discord.ext import commands
+
+if TYPE_CHECKING:
+    from .Parrot import Parrot
+
+__all__ = ("StartupTimeline", "ExtensionLoader")
+
+log = logging.getLogger("core.startup")
+
+
+class TimelineEntry:
+    __slots__ = ("name", "kind", "started_at", "total", "cog_load", "error")
+
+    def __init__(self, name: str, kind: str, started_at: float) -> None:
+        self.name = name
+        self.kind = kind
+        self.started_at = started_at
+        self.total: float = 0.0
+        self.cog_load: float = 0.0
+        self.error: str | None = None
+
+    @property
+    def import_time(self) -> float:
+        # everything `load_extension` did, that was not `cog_load`, was import + setup()
+        return max(self.total - self.cog_load, 0.0)
+
+    def __repr__(self) -> str:
+        return f"<TimelineEntry name={self.name!r} kind={self.kind!r} total={self.total:.3f}s>"
+
+
+class StartupTimeline:
+    """Keeps the record of how long every startup step took."""
+
+    def __init__(self) -> None:
+        self.origin: float = perf_counter()
+        self.entries: dict[str, TimelineEntry] = {}
+        self.ready_at: float | None = None
+
+    def start(self, name: str, kind: str = "extension") -> TimelineEntry:
+        entry = TimelineEntry(name, kind, perf_counter() - self.origin)
+        self.entries[name] = entry
+        return entry
+
+    def mark_ready(self) -> None:
+        if self.ready_at is None:
+            self.ready_at = perf_counter() - self.origin
+
+    def slowest(self, n: int = 10, *, kind: str | None = None) -> list[TimelineEntry]:
+        entries = [e for e in self.entries.values() if kind is None or e.kind == kind]
+        return sorted(entries, key=lambda e: e.total, reverse=True)[:n]
+
+    def format(self, n: int = 10) -> str:  # noqa: A003
+        lines = [f"{'Name':<32} {'Start':>8} {'Import':>8} {'CogLoad':>8} {'Total':>8}"]
+        for entry in self.slowest(n):
+            lines.append(
+                f"{entry.name[:32]:<32} {entry.started_at:>7.2f}s {entry.import_time:>7.2f}s "
+                f"{entry.cog_load:>7.2f}s {entry.total:>7.2f}s" + (" [FAILED]" if entry.error else ""),
+            )
+
+        extensions = [e for e in self.entries.values() if e.kind == "extension"]
+        if extensions:
+            finished = max(e.started_at + e.total for e in extensions)
+            sequential = sum(e.total for e in extensions)
+            lines.append(f"\nExtensions: {len(extensions)} loaded in {finished:.2f}s (sequential sum {sequential:.2f}s)")
+        if self.ready_at is not None:
+            lines.append(f"READY after {self.ready_at:.2f}s")
+        return "\n".join(lines)
+
+
+class ExtensionLoader:
+    """Loads the extensions in dependency order, concurrently within a level.
+
+    An extension depends on every other listed extension which is its dotted parent,
+    i.e. ``cogs.holidays.easter`` is loaded only after ``cogs.holidays``.
+    Extensions with no dependency between them have their ``cog_load`` awaited concurrently.
+    """
+
+    def __init__(self, bot: Parrot, extensions: Iterable[str], *, unload: Iterable[str] = ()) -> None:
+        self.bot = bot
+        self.extensions: list[str] = list(dict.fromkeys(extensions))
+        self.unload: set[str] = set(unload)
+
+        self._current: dict[str, TimelineEntry] = {}
+
+    def levels(self) -> list[list[str]]:
+        listed = set(self.extensions)
+        depth: dict[str, int] = {}
+
+        def _depth(ext: str) -> int:
+            if ext in depth:
+                return depth[ext]
+            parent, _, _ = ext.rpartition(".")
+            while parent and parent not in listed:
+                parent, _, _ = parent.rpartition(".")
+            depth[ext] = _depth(parent) + 1 if parent else 0
+            return depth[ext]
+
+        levels: list[list[str]] = []
+        for ext in self.extensions:
+            level = _depth(ext)
+            while len(levels) <= level:
+                levels.append([])
+            levels[level].append(ext)
+        return levels
+
+    def record_cog_load(self, cog: commands.Cog, elapsed: float) -> None:
+        entry = self._current.get(cog.__module__.rpartition(".")[0]) or self._current.get(cog.__module__)
+        if entry is None:
+            # cog defined in a submodule, find the extension which owns it
+            for name, _entry in self._current.items():
+                if cog.__module__.startswith(f"{name}."):
+                    entry = _entry
+                    break
+        if entry is not None:
+            entry.cog_load += elapsed
+
+    async def _load(self, ext: str) -> None:
+        entry = self.bot.startup_timeline.start(ext)
+        self._current[ext] = entry
+
+        ini = perf_counter()
+        try:
+            await self.bot.load_extension(ext)
+        except (commands.ExtensionFailed, commands.ExtensionNotFound, commands.NoEntryPointError) as e:
+            entry.error = str(e)
+            self.bot._failed_to_load[ext] = str(e)
+            log.error("Failed to load extension %s", ext, exc_info=e)
+        else:
+            self.bot._successfully_loaded.append(ext)
+            log.info("Loaded extension %s", ext)
+            if ext in self.unload:
+                await self.bot.unload_extension(ext)
+                log.warning("Unloaded extension %s", ext)
+        finally:
+            entry.total = perf_counter() - ini
+            self._current.pop(ext, None)
+
+    async def load_all(self) -> None:
+        for level in self.levels():
+            await asyncio.gather(*(self._load(ext) for ext in level))
+
+        log.info("Startup timeline:\n%s", self.bot.startup_timeline.format())
+
+
+async def run_deferred(bot: Parrot, name: str, func: Callable[[], Awaitable[Any]]) -> None:
+    await bot.wait_until_ready()
+
+    entry = bot.startup_timeline.start(name, kind="deferred")
+    ini = perf_counter()
+    try:
+        await func()
+    except Exception as e:
+        entry.error = str(e)
+        log.error("Deferred startup task %s failed", name, exc_info=e)
+    finally:
+        entry.total = entry.cog_load = perf_counter() - ini
+        log.debug("Deferred startup task %s took %.3fs", name, entry.total)
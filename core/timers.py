@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any
+
+import pymongo
+from pymongo import InsertOne
+from pymongo.errors import ConnectionFailure
+from pymongo.results import BulkWriteResult, DeleteResult, InsertOneResult
+
+import discord
+
+if TYPE_CHECKING:
+    from .Parrot import Parrot
+
+__all__ = ("TimerLane", "TimerManager")
+
+log = logging.getLogger("core.timers")
+
+RETRY_AFTER = 5
+
+
+def _now() -> float:
+    return discord.utils.utcnow().timestamp()
+
+
+class TimerLane:
+    """Dispatches the timers of one kind (``_event_name``), in order of expiry.
+
+    Every kind has its own lane, a backlog of one kind does not delay the others.
+    """
+
+    def __init__(self, manager: TimerManager, kind: str | None) -> None:
+        self.manager = manager
+        self.kind = kind
+        self.next_id: Any = None
+        self.next_at: float | None = None
+
+        self._wakeup = asyncio.Event()
+        self.task: asyncio.Task | None = None
+
+    def __repr__(self) -> str:
+        return f"<TimerLane kind={self.kind!r} next_at={self.next_at}>"
+
+    def wake(self, expires_at: float | None = None) -> None:
+        if expires_at is None or self.next_at is None or expires_at < self.next_at:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run(), name=f"timer-lane:{self.kind}")
+
+    def cancel(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+
+    async def _drain(self) -> int:
+        collection = self.manager.collection
+        count = 0
+        # atomic, a timer deleted meanwhile (cancelled reminder) is never dispatched
+        while data := await collection.find_one_and_delete(
+            {"_event_name": self.kind, "expires_at": {"$lte": _now()}},
+            sort=[("expires_at", pymongo.ASCENDING)],
+        ):
+            self.manager.dispatch(data)
+            count += 1
+            await asyncio.sleep(0)
+        return count
+
+    async def run(self) -> None:
+        bot = self.manager.bot
+        while not bot.is_closed():
+            self._wakeup.clear()
+            try:
+                if count := await self._drain():
+                    log.debug("Dispatched %s timers of %r", count, self.kind)
+
+                data = await self.manager.collection.find_one(
+                    {"_event_name": self.kind},
+                    {"expires_at": 1},
+                    sort=[("expires_at", pymongo.ASCENDING)],
+                )
+            except (OSError, ConnectionFailure) as e:
+                log.warning("Timer lane %r failed, retrying in %ss", self.kind, RETRY_AFTER, exc_info=e)
+                await asyncio.sleep(RETRY_AFTER)
+                continue
+
+            if data is None:
+                self.next_id = self.next_at = None
+                timeout = None
+            else:
+                self.next_id, self.next_at = data["_id"], data["expires_at"]
+                timeout = max(data["expires_at"] - _now(), 0)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+class TimerManager:
+    """Timers in ``mainDB.timers``, dispatched by one :class:`TimerLane` per kind.
+
+    All lane queries are served by the ``(_event_name, expires_at)`` index.
+    """
+
+    def __init__(self, bot: Parrot) -> None:
+        self.bot = bot
+        self.lanes: dict[str | None, TimerLane] = {}
+
+    @property
+    def collection(self):
+        return self.bot.timers
+
+    def dispatch(self, data: dict[str, Any]) -> None:
+        if data.get("_event_name"):
+            self.bot.dispatch(f"{data['_event_name']}_timer_complete", **data)
+        else:
+            self.bot.dispatch("timer_complete", **data)
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index([("_event_name", pymongo.ASCENDING), ("expires_at", pymongo.ASCENDING)])
+        await self.collection.create_index([("expires_at", pymongo.ASCENDING)])
+        await self.collection.create_index([("messageAuthor", pymongo.ASCENDING)])
+
+    def lane(self, kind: str | None) -> TimerLane:
+        try:
+            return self.lanes[kind]
+        except KeyError:
+            lane = self.lanes[kind] = TimerLane(self, kind)
+            lane.start()
+            return lane
+
+    async def start(self) -> None:
+        await self.ensure_indexes()
+        kinds: list[str | None] = await self.collection.distinct("_event_name")
+        for kind in {None, *kinds}:
+            self.lane(kind)
+        log.debug("Started timer lanes: %s", list(self.lanes))
+
+    def close(self) -> None:
+        for lane in self.lanes.values():
+            lane.cancel()
+
+    def restart(self) -> None:
+        for lane in self.lanes.values():
+            lane.wake()
+            lane.start()
+
+    async def create(self, post: dict[str, Any]) -> InsertOneResult:
+        result = await self.collection.insert_one(post)
+        self.lane(post.get("_event_name")).wake(post["expires_at"])
+        return result
+
+    async def create_many(self, posts: Iterable[dict[str, Any]]) -> BulkWriteResult | None:
+        """|coro|.
+
+        Inserts many timers with one ``bulk_write``. Each lane is woken once.
+        """
+        posts = list(posts)
+        if not posts:
+            return None
+
+        result = await self.collection.bulk_write([InsertOne(post) for post in posts], ordered=False)
+        earliest: dict[str | None, float] = {}
+        for post in posts:
+            kind = post.get("_event_name")
+            earliest[kind] = min(post["expires_at"], earliest.get(kind, post["expires_at"]))
+        for kind, expires_at in earliest.items():
+            self.lane(kind).wake(expires_at)
+        return result
+
+    def _wake_if_next(self, ids: Iterable[Any]) -> None:
+        ids = set(ids)
+        for lane in self.lanes.values():
+            if lane.next_id in ids:
+                lane.wake()
+
+    async def delete(self, _id: Any) -> DeleteResult:
+        result: DeleteResult = await self.collection.delete_one({"_id": _id})
+        if result.deleted_count:
+            self._wake_if_next((_id,))
+        return result
+
+    async def delete_many(self, ids: Iterable[Any]) -> DeleteResult | None:
+        ids = list(ids)
+        if not ids:
+            return None
+
+        result: DeleteResult = await self.collection.delete_many({"_id": {"$in": ids}})
+        if result.deleted_count:
+            self._wake_if_next(ids)
+        return result
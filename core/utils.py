@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import logging.handlers
+from time import monotonic
+from typing import Any
 
 from colorama import Fore
 
@@ -47,3 +50,36 @@ class CustomFormatter(logging.Formatter):
         log_fmt = self.formats.get(record.levelno)
         formatter = logging.Formatter(log_fmt, DT_FMT)
         return formatter.format(record)
+
+
+class FixedWindowBucket:
+    """A simple fixed window rate limit bucket. ``async with`` waits until a slot is free, and takes it."""
+
+    __slots__ = ("rate", "per", "remaining", "window", "lock")
+
+    def __init__(self, rate: int, per: float) -> None:
+        self.rate = rate
+        self.per = per
+        self.remaining = rate
+        self.window = 0.0
+        self.lock = asyncio.Lock()
+
+    def retry_after(self) -> float:
+        now = monotonic()
+        if now > self.window + self.per:
+            self.window = now
+            self.remaining = self.rate
+        if self.remaining > 0:
+            return 0.0
+        return self.window + self.per - now
+
+    async def __aenter__(self) -> FixedWindowBucket:
+        # the lock only guards taking a slot, the work done with it runs concurrently
+        async with self.lock:
+            while (retry_after := self.retry_after()) > 0:
+                await asyncio.sleep(retry_after)
+            self.remaining -= 1
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any
+
+import discord
+from utilities.converters import Cache
+
+from .utils import FixedWindowBucket
+
+if TYPE_CHECKING:
+    from .Parrot import Parrot
+
+__all__ = ("WebhookExecutor",)
+
+log = logging.getLogger("core.webhooks")
+
+WEBHOOK_URL_RE = re.compile(
+    r"discord(?:app)?\.com/api/(?:v\d+/)?webhooks/(?P<id>[0-9]{17,20})/(?P<token>[A-Za-z0-9\.\-\_]{60,})",
+)
+
+# Discord allows 5 requests per 2 seconds on a single webhook
+BUCKET_RATE = 5
+BUCKET_PER = 2.0
+
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_CONTENT_LENGTH = 2000
+
+
+class WebhookExecutor:
+    """Sends the messages to webhooks, with parsed webhooks cached by ID.
+
+    Every webhook has its own rate limit bucket. Log messages are queued and
+    sent in batches, multiple embeds (and contents) packed in one request.
+    Webhooks which returns 404 are pruned and never tried again.
+    """
+
+    def __init__(self, bot: Parrot, *, queue_size: int = 2**10) -> None:
+        self.bot = bot
+        self.webhooks: Cache[int, discord.Webhook] = Cache(bot, cache_size=2**10)
+        self.buckets: defaultdict[int, FixedWindowBucket] = defaultdict(lambda: FixedWindowBucket(BUCKET_RATE, BUCKET_PER))
+        self.dead: set[int] = set()
+
+        self.queue: asyncio.Queue[tuple[str, str | None, discord.Embed | None]] = asyncio.Queue(maxsize=queue_size)
+        self.dropped: int = 0
+        self._worker: asyncio.Task | None = None
+
+    def get(self, url: str) -> discord.Webhook | None:
+        """Returns the cached :class:`discord.Webhook` of the url, parses and caches it otherwise."""
+        match = WEBHOOK_URL_RE.search(url)
+        if match is None:
+            return None
+
+        webhook_id = int(match["id"])
+        if webhook_id in self.dead:
+            return None
+
+        try:
+            webhook = self.webhooks[webhook_id]
+        except KeyError:
+            webhook = discord.Webhook.partial(webhook_id, match["token"], session=self.bot.http_session)
+            self.webhooks[webhook_id] = webhook
+            return webhook
+
+        if webhook.token != match["token"]:
+            # token was regenerated
+            webhook = discord.Webhook.partial(webhook_id, match["token"], session=self.bot.http_session)
+            self.webhooks[webhook_id] = webhook
+        return webhook
+
+    def prune(self, webhook: discord.Webhook) -> None:
+        log.info("Pruning webhook %s, webhook not found", webhook.id)
+        self.dead.add(webhook.id)
+        self.buckets.pop(webhook.id, None)
+        try:
+            del self.webhooks[webhook.id]
+        except KeyError:
+            pass
+        self.bot.dispatch("webhook_not_found", webhook)
+
+    async def send(self, webhook: discord.Webhook | str, **kwargs: Any) -> discord.WebhookMessage | None:
+        """|coro|.
+
+        Sends the message to the webhook, respecting its rate limit bucket.
+
+        Raises
+        ------
+        discord.NotFound
+            The webhook was deleted. The webhook is pruned.
+        """
+        if isinstance(webhook, str):
+            _webhook = self.get(webhook)
+            if _webhook is None:
+                return None
+            webhook = _webhook
+        elif webhook.id in self.dead:
+            return None
+
+        async with self.buckets[webhook.id]:
+            try:
+                return await webhook.send(**kwargs)
+            except discord.NotFound:
+                self.prune(webhook)
+                raise
+
+    def queue_log(self, url: str, *, content: str | None = None, embed: discord.Embed | None = None) -> bool:
+        """Queues the log message to be sent to the webhook in batch.
+
+        Returns ``False`` if the queue was full and the message was dropped.
+        """
+        if self._worker is None or self._worker.done():
+            self._worker = self.bot.loop.create_task(self.__worker())
+
+        try:
+            self.queue.put_nowait((url, content, embed))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            log.warning("Webhook log queue is full, dropped %s messages so far", self.dropped)
+            return False
+        return True
+
+    def _drain(self, *items: tuple[str, str | None, discord.Embed | None]) -> dict[str, tuple[list[str], list[discord.Embed]]]:
+        batches: dict[str, tuple[list[str], list[discord.Embed]]] = {}
+        pending = list(items)
+        while not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+
+        for url, content, embed in pending:
+            contents, embeds = batches.setdefault(url, ([], []))
+            if content:
+                contents.append(content)
+            if embed is not None:
+                embeds.append(embed)
+        return batches
+
+    async def _flush(self, url: str, contents: list[str], embeds: list[discord.Embed]) -> None:
+        kwargs: dict[str, Any] = {
+            "username": self.bot.user.name,
+            "avatar_url": self.bot.user.display_avatar.url,
+        }
+
+        # pack as many contents as possible in 2000 characters, one message each otherwise
+        packed: list[str] = []
+        for content in contents:
+            if packed and len(packed[-1]) + len(content) + 1 <= MAX_CONTENT_LENGTH:
+                packed[-1] = f"{packed[-1]}\n{content}"
+            else:
+                packed.append(content)
+
+        for content in packed:
+            if len(content) > MAX_CONTENT_LENGTH:
+                await self.bot._execute_webhook(url, content=content, **kwargs)
+            else:
+                await self.send(url, content=content, **kwargs)
+
+        for index in range(0, len(embeds), MAX_EMBEDS_PER_MESSAGE):
+            await self.send(url, embeds=embeds[index : index + MAX_EMBEDS_PER_MESSAGE], **kwargs)
+
+    async def flush(self, *items: tuple[str, str | None, discord.Embed | None]) -> None:
+        for url, (contents, embeds) in self._drain(*items).items():
+            try:
+                await self._flush(url, contents, embeds)
+            except discord.HTTPException as e:
+                log.warning("Failed to send webhook logs to %s", url, exc_info=e)
+
+    async def __worker(self) -> None:
+        while not self.bot.is_closed():
+            item = await self.queue.get()
+            # wait a bit, so that the burst of logs is sent together
+            await asyncio.sleep(1)
+            await self.flush(item)
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+        await self.flush()
@@ -1,16 +1,19 @@
 import re
+from functools import cache
 
 from . import db
 
-ALIAS_TO_EMOJI = db.get_emoji_aliases()
-EMOJI_TO_ALIAS = {v: k for k, v in ALIAS_TO_EMOJI.items()}
-EMOJI_TO_ALIAS_SORTED = sorted(ALIAS_TO_EMOJI.values(), key=len, reverse=True)
 
-RE_TEXT_TO_EMOJI_GROUP = "({})".format("|".join([re.escape(emoji) for emoji in ALIAS_TO_EMOJI]))
-RE_TEXT_TO_EMOJI = re.compile(RE_TEXT_TO_EMOJI_GROUP)
+@cache
+def _tables() -> tuple[dict[str, str], dict[str, str], re.Pattern[str], re.Pattern[str]]:
+    # building these regexes is expensive, so it is done on first use instead of import
+    alias_to_emoji = db.get_emoji_aliases()
+    emoji_to_alias = {v: k for k, v in alias_to_emoji.items()}
+    emoji_to_alias_sorted = sorted(alias_to_emoji.values(), key=len, reverse=True)
 
-RE_EMOJI_TO_TEXT_GROUP = "({})".format("|".join([re.escape(emoji) for emoji in EMOJI_TO_ALIAS_SORTED]))
-RE_EMOJI_TO_TEXT = re.compile(RE_EMOJI_TO_TEXT_GROUP)
+    re_text_to_emoji = re.compile("({})".format("|".join([re.escape(emoji) for emoji in alias_to_emoji])))
+    re_emoji_to_text = re.compile("({})".format("|".join([re.escape(emoji) for emoji in emoji_to_alias_sorted])))
+    return alias_to_emoji, emoji_to_alias, re_text_to_emoji, re_emoji_to_text
 
 
 def encode(msg) -> str:
@@ -22,7 +25,8 @@ def encode(msg) -> str:
         >>> emojis.encode('This is a message with emojis :smile: :snake:')
         'This is a message with emojis 😄 🐍'.
     """
-    msg = RE_TEXT_TO_EMOJI.sub(lambda match: ALIAS_TO_EMOJI[match.group(0)], msg)
+    alias_to_emoji, _, re_text_to_emoji, _ = _tables()
+    msg = re_text_to_emoji.sub(lambda match: alias_to_emoji[match.group(0)], msg)
     return msg
 
 
@@ -35,7 +39,8 @@ def decode(msg) -> str:
         >>> emojis.decode('This is a message with emojis 😄 🐍')
         'This is a message with emojis :smile: :snake:'.
     """
-    msg = RE_EMOJI_TO_TEXT.sub(lambda match: EMOJI_TO_ALIAS[match.group(0)], msg)
+    _, emoji_to_alias, _, re_emoji_to_text = _tables()
+    msg = re_emoji_to_text.sub(lambda match: emoji_to_alias[match.group(0)], msg)
     return msg
 
 
@@ -44,7 +49,7 @@ def get(msg) -> set:
     :param msg: String to search for Emojis.
     :rtype: set.
     """
-    return {match.group() for match in RE_EMOJI_TO_TEXT.finditer(msg)}
+    return {match.group() for match in _tables()[3].finditer(msg)}
 
 
 def iter(msg):
@@ -52,7 +57,7 @@ def iter(msg):
     :param msg: String to search for Emojis.
     :rtype: iterator.
     """
-    return (match.group() for match in RE_EMOJI_TO_TEXT.finditer(msg))
+    return (match.group() for match in _tables()[3].finditer(msg))
 
 
 def count(msg, unique=False):
@@ -62,5 +67,5 @@ def count(msg, unique=False):
     :rtype: int.
     """
     if unique:
-        return len({match.group() for match in RE_EMOJI_TO_TEXT.finditer(msg)})
-    return len([match.group() for match in RE_EMOJI_TO_TEXT.finditer(msg)])
+        return len({match.group() for match in _tables()[3].finditer(msg)})
+    return len([match.group() for match in _tables()[3].finditer(msg)])
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+import discord
+from discord.ext import tasks
+
+if TYPE_CHECKING:
+    from core import Parrot
+
+log = logging.getLogger("events.guild.hub_state")
+
+
+class HubRegistry:
+    """Temporary hub channels of every guild, held in memory.
+
+    Changes are written back to ``hub_temp_channels`` in batches, a voice state update never waits on the database.
+    """
+
+    def __init__(self, bot: Parrot) -> None:
+        self.bot = bot
+        # {GUILD_ID: {CHANNEL_ID: OWNER_ID}}
+        self.channels: dict[int, dict[int, int]] = {}
+        self._dirty: set[int] = set()
+
+    def owner(self, guild_id: int, channel_id: int) -> int | None:
+        return self.channels.get(guild_id, {}).get(channel_id)
+
+    def next_index(self, guild_id: int) -> int:
+        return len(self.channels.get(guild_id, {})) + 1
+
+    def add(self, guild_id: int, channel_id: int, owner_id: int) -> None:
+        self.channels.setdefault(guild_id, {})[channel_id] = owner_id
+        self._dirty.add(guild_id)
+
+    def remove(self, guild_id: int, channel_id: int) -> int | None:
+        owner_id = self.channels.get(guild_id, {}).pop(channel_id, None)
+        if owner_id is not None:
+            self._dirty.add(guild_id)
+        return owner_id
+
+    async def load(self) -> None:
+        async for data in self.bot.guild_configurations.find(
+            {"hub_temp_channels": {"$exists": True, "$ne": []}},
+            {"hub_temp_channels": 1},
+        ):
+            self.channels[data["_id"]] = {ch["channel_id"]: ch["author"] for ch in data["hub_temp_channels"]}
+
+    async def reconcile(self) -> None:
+        """|coro|.
+
+        Forgets the hubs which were deleted, and deletes the hubs which were left empty, while the bot was offline.
+        """
+        for guild_id, channels in list(self.channels.items()):
+            guild = self.bot.get_guild(guild_id)
+            if guild is None:
+                continue
+
+            for channel_id in list(channels):
+                channel = guild.get_channel(channel_id)
+                if isinstance(channel, discord.VoiceChannel) and channel.members:
+                    continue
+
+                self.remove(guild_id, channel_id)
+                if channel is not None and guild.me.guild_permissions.manage_channels:
+                    try:
+                        await channel.delete(reason="Hub was left empty")
+                    except discord.HTTPException:
+                        pass
+
+        log.debug("Hub registry reconciled, %s guilds changed", len(self._dirty))
+        await self.flush()
+
+    async def flush(self) -> None:
+        dirty, self._dirty = self._dirty, set()
+        operations = [
+            UpdateOne(
+                {"_id": guild_id},
+                {
+                    "$set": {
+                        "hub_temp_channels": [
+                            {"channel_id": channel_id, "author": owner_id}
+                            for channel_id, owner_id in self.channels.get(guild_id, {}).items()
+                        ],
+                    },
+                },
+            )
+            for guild_id in dirty
+        ]
+        if not operations:
+            return
+        try:
+            await self.bot.guild_configurations.bulk_write(operations, ordered=False)
+        except PyMongoError as e:
+            # the channels are written whole from memory, the next flush writes their latest state
+            log.warning("Could not write the hubs of %s guilds, retrying on the next flush: %s", len(dirty), e)
+            self._dirty |= dirty
+
+    @tasks.loop(seconds=30)
+    async def flush_loop(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            log.error("Could not flush the hub registry", exc_info=e)
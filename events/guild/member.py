@@ -2,21 +2,27 @@ from __future__ import annotations
 
 from contextlib import suppress
 
-from pymongo import UpdateOne
-
 import discord
 from core import Cog, Parrot
 
 from ._member import _MemberJoin as MemberJoin
+from .hub_state import HubRegistry
 
 
 class Member(Cog, command_attrs={"hidden": True}):
     def __init__(self, bot: Parrot) -> None:
         self.bot = bot
-        self.muted: dict[int, set[int]] = {}  # {GUILD_ID: {*MEMBER_IDS}}
+        self.hubs = HubRegistry(bot)
 
     @Cog.listener()
     async def on_member_join(self, member: discord.Member):
+        if self.bot.moderation.is_sticky_banned(member.guild.id, member.id):
+            # unbanned while the bot was offline
+            if member.guild.me.guild_permissions.ban_members:
+                with suppress(discord.HTTPException):
+                    await member.ban(reason="Sticky ban")
+                return
+
         try:
             role = int(self.bot.guild_configurations_cache[member.guild.id]["mute_role"] or 0)
             role: discord.Role | None = member.guild.get_role(role)
@@ -26,8 +32,7 @@ class Member(Cog, command_attrs={"hidden": True}):
         if role is None:
             role = discord.utils.get(member.guild.roles, name="Muted")
 
-        if member.id in self.muted.get(member.guild.id, []) and role is not None:
-            self.muted[member.guild.id].remove(member.id)
+        if role is not None and self.bot.moderation.remove_mute(member.guild.id, member.id):
             with suppress(discord.Forbidden):
                 await member.add_roles(
                     role,
@@ -52,10 +57,7 @@ class Member(Cog, command_attrs={"hidden": True}):
             role = discord.utils.find(lambda m: "muted" in m.name.lower(), member.roles)
 
         if role in member.roles:
-            if guild_set := self.muted.get(member.guild.id):
-                guild_set.add(member.id)
-            else:
-                self.muted[member.guild.id] = {member.id}
+            self.bot.moderation.add_mute(member.guild.id, member.id)
 
     @Cog.listener()
     async def on_member_update(self, before: discord.Member, after: discord.Member):
@@ -74,76 +76,54 @@ class Member(Cog, command_attrs={"hidden": True}):
         with suppress(discord.Forbidden):
             await member.send(error)
 
-    async def _get_index(self, guild: discord.Guild) -> int:
-        if data := await self.bot.guild_configurations.find_one({"_id": guild.id, "hub_temp_channels": {"$exists": True}}):
-            return len(data["hub_temp_channels"]) + 1
-
-        return 1
-
     async def __on_voice_channel_join(
         self,
         channel: discord.VoiceChannel | discord.StageChannel,
         member: discord.Member,
     ):
         try:
-            self.bot.guild_configurations_cache[member.guild.id]["hub"]
+            hub = self.bot.guild_configurations_cache[member.guild.id]["hub"]
         except KeyError:
             return
+
+        if channel.id != hub:
+            return
+
+        perms = member.guild.me.guild_permissions
+        if not all([perms.manage_permissions, perms.manage_channels, perms.move_members]):
+            return
+
+        if channel.category:
+            hub_channel = await member.guild.create_voice_channel(
+                f"[#{self.hubs.next_index(member.guild.id)}] {member.name}",
+                category=channel.category,
+            )
+            self.hubs.add(member.guild.id, hub_channel.id, member.id)
+            await member.edit(
+                voice_channel=hub_channel,
+                reason=f"{member} ({member.id}) created their Hub",
+            )
         else:
-            perms = member.guild.me.guild_permissions
-            if not all([perms.manage_permissions, perms.manage_channels, perms.move_members]):
-                return
-            if channel.id == self.bot.guild_configurations_cache[member.guild.id]["hub"]:
-                if channel.category:
-                    hub_channel = await member.guild.create_voice_channel(
-                        f"[#{await self._get_index(member.guild)}] {member.name}",
-                        category=channel.category,
-                    )
-                    await self.bot.guild_configurations.update_one(
-                        {"_id": member.guild.id},
-                        {
-                            "$addToSet": {
-                                "hub_temp_channels": {
-                                    "channel_id": hub_channel.id,
-                                    "author": member.id,
-                                },
-                            },
-                        },
-                    )
-                    await member.edit(
-                        voice_channel=hub_channel,
-                        reason=f"{member} ({member.id}) created their Hub",
-                    )
-                else:
-                    await self.__notify_member(
-                        f"{member.mention} falied to create Hub for you. As the base Category is unreachable by the bot",
-                        member=member,
-                    )
+            await self.__notify_member(
+                f"{member.mention} falied to create Hub for you. As the base Category is unreachable by the bot",
+                member=member,
+            )
 
     async def __on_voice_channel_remove(
         self,
         channel: discord.VoiceChannel | discord.StageChannel,
         member: discord.Member,
     ):
-        if data := await self.bot.guild_configurations.find_one(
-            {
-                "_id": member.guild.id,
-                "hub_temp_channels.channel_id": channel.id,
-                "hub_temp_channels.author": member.id,
-            },
-        ):
-            perms = member.guild.me.guild_permissions
-            if not all([perms.manage_permissions, perms.manage_channels, perms.move_members]):
-                return
-            for ch in data["hub_temp_channels"]:
-                if ch["channel_id"] == channel.id and ch["author"] == member.id:
-                    hub_channel = await self.bot.getch(self.bot.get_channel, self.bot.fetch_channel, channel.id)
-                    await self.bot.guild_configurations.update_one(
-                        {"_id": member.guild.id},
-                        {"$pull": {"hub_temp_channels": {"channel_id": hub_channel.id}}},
-                    )
-                    await hub_channel.delete(reason=f"{member} ({member.id}) left their Hub")
-                    return
+        if self.hubs.owner(member.guild.id, channel.id) != member.id:
+            return
+
+        perms = member.guild.me.guild_permissions
+        if not all([perms.manage_permissions, perms.manage_channels, perms.move_members]):
+            return
+
+        self.hubs.remove(member.guild.id, channel.id)
+        with suppress(discord.NotFound):
+            await channel.delete(reason=f"{member} ({member.id}) left their Hub")
 
     @Cog.listener(name="on_voice_state_update")
     async def hub_on_voice_state_update(
@@ -159,6 +139,10 @@ class Member(Cog, command_attrs={"hidden": True}):
         if member.guild is None:
             return
 
+        if before.channel == after.channel:
+            # mute, deafen, stream... not a move
+            return
+
         __channel = before.channel or after.channel
         if isinstance(__channel, discord.StageChannel) or __channel is None:
             return
@@ -174,25 +158,22 @@ class Member(Cog, command_attrs={"hidden": True}):
         if after.channel is None and before.channel is not None:
             return await self.__on_voice_channel_remove(before.channel, member)
 
+    @Cog.listener(name="on_guild_channel_delete")
+    async def hub_on_channel_delete(self, channel: discord.abc.GuildChannel):
+        self.hubs.remove(channel.guild.id, channel.id)
+
     @Cog.listener()
     async def on_presence_update(self, before: discord.Member, after: discord.Member):
         pass  # nothing can be done, as discord dont gave use presence intent UwU
 
     async def cog_load(self):
-        async for data in self.bot.guild_configurations.find({"muted": {"$exists": True}}):
-            self.muted[data["_id"]] = set(data["muted"])
+        await self.hubs.load()
+        self.bot.defer_until_ready("member.hubs", self.hubs.reconcile)
+        self.hubs.flush_loop.start()
 
     async def cog_unload(self):
-        operations = [
-            UpdateOne(
-                {"_id": guild_id},
-                {"$set": {"muted": list(set_member_muted)}},
-                upsert=True,
-            )
-            for guild_id, set_member_muted in self.muted.items()
-        ]
-
-        await self.bot.guild_configurations.write_bulk(operations)
+        self.hubs.flush_loop.cancel()
+        await self.hubs.flush()
 
 
 async def setup(bot: Parrot) -> None:
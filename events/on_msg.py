@@ -8,6 +8,7 @@ import textwrap
 import urllib.parse
 from collections.abc import Callable, Coroutine
 from contextlib import suppress
+from functools import cache
 from re import Pattern
 from typing import TYPE_CHECKING, Any, Literal, overload
 from urllib.parse import quote_plus
@@ -26,8 +27,13 @@ if TYPE_CHECKING:
 
 from .on_msg_caching import OnMsgCaching
 
-with open("extra/profanity.json", encoding="utf-8", errors="ignore") as f:
-    bad_dict: dict[str, bool] = json.load(f)
+
+@cache
+def bad_words() -> frozenset[str]:
+    with open("extra/profanity.json", encoding="utf-8", errors="ignore") as f:
+        bad_dict: dict[str, bool] = json.load(f)
+    return frozenset(word.lower() for word in bad_dict)
+
 
 TRIGGER: tuple = (
     "ok google,",
@@ -338,9 +344,10 @@ class OnMsg(Cog, command_attrs={"hidden": True}):
                 return await message.channel.send(res)
 
     def refrain_message(self, msg: str):
-        if "chod" in msg.replace(",", "").split(" "):
+        words = msg.replace(",", "").split(" ")
+        if "chod" in words:
             return False
-        return all(bad_word.lower() not in msg.replace(",", "").split(" ") for bad_word in bad_dict)
+        return bad_words().isdisjoint(words)
 
     def is_banned(self, member: discord.User | discord.Member) -> bool | None:
         # return True if member is banned else False
@@ -552,6 +559,14 @@ class OnMsg(Cog, command_attrs={"hidden": True}):
         if __functions:
             await asyncio.gather(*__functions, return_exceptions=False)
 
+    @Cog.listener()
+    async def on_webhook_not_found(self, webhook: discord.Webhook):
+        # global chat webhook was deleted, stop relaying to that guild
+        await self.bot.guild_configurations.update_many(
+            {"global_chat.enable": True, "global_chat.webhook": {"$regex": f"/{webhook.id}/"}},
+            {"$set": {"global_chat.enable": False, "global_chat.webhook": None}},
+        )
+
     @Cog.listener()
     async def on_message_edit(self, before: discord.Message, after: discord.Message):
         await self.bot.wait_until_ready()
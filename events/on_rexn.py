@@ -4,11 +4,11 @@ import datetime
 from time import time
 from typing import TYPE_CHECKING, Any, Literal
 
-import pymongo
-
 import discord
 from core import Cog
 
+from .on_rexn_state import STAR, StarboardState, StarEntry
+
 if TYPE_CHECKING:
     from core import Parrot
 
@@ -22,29 +22,46 @@ TWO_WEEK = 1209600
 class OnReaction(Cog, command_attrs={"hidden": True}):
     def __init__(self, bot: Parrot) -> None:
         self.bot = bot
+        self.state = StarboardState(bot)
+
+    async def cog_load(self) -> None:
+        await self.state.ensure_indexes()
+        self.state.flush_loop.start()
+
+    async def cog_unload(self) -> None:
+        self.state.flush_loop.cancel()
+        await self.state.flush()
+
+    def _starboard_config(self, guild_id: int) -> dict[str, Any] | None:
+        try:
+            return self.bot.guild_configurations_cache[guild_id]["starboard_config"]
+        except KeyError:
+            return None
 
     async def _factory_reactor(self, payload: discord.RawReactionActionEvent, *, tp: Literal["add", "remove"]) -> None:
         log.debug("Reaction %sing sequence started, %s", tp, payload)
         if not payload.guild_id:
             return
 
+        config = self._starboard_config(payload.guild_id)
+        if config is None:
+            return
+
         CURRENT_TIME = time()
         DATETIME: datetime.datetime = discord.utils.snowflake_time(payload.message_id)
-        if payload.channel_id in self.bot.guild_configurations_cache[payload.guild_id]["starboard_config"]["ignore_channel"]:
+        if payload.channel_id in config["ignore_channel"]:
             log.debug("Channel ignored %s", payload.channel_id)
             return
 
-        max_duration = self.bot.guild_configurations_cache[payload.guild_id]["starboard_config"]["max_duration"] or TWO_WEEK
+        max_duration = config["max_duration"] or TWO_WEEK
 
         if (CURRENT_TIME - DATETIME.timestamp()) > max_duration:
             log.debug("Message too old %s", DATETIME)
             return
 
-        self_star = self.bot.guild_configurations_cache[payload.guild_id]["starboard_config"].get("can_self_star", False)
-
-        try:
-            locked: bool = self.bot.guild_configurations_cache[payload.guild_id]["starboard_config"]["is_locked"]
-        except KeyError:
+        self_star: bool = config.get("can_self_star", False)
+        locked: bool | None = config.get("is_locked")
+        if locked is None:
             return
 
         log.debug(
@@ -59,86 +76,48 @@ class OnReaction(Cog, command_attrs={"hidden": True}):
             log.debug("Starboard locked")
             return
 
-        msg: discord.Message | None = await self.bot.get_or_fetch_message(payload.channel_id, payload.message_id)
-        if not msg:
-            log.debug("Message not found %s-%s", payload.channel_id, payload.message_id)
-            return  # rare case
+        entry = await self.state.get(payload.message_id)
+        if entry is None:
+            if tp == "remove":
+                # not on the starboard, nothing to update
+                return
 
-        if payload.user_id == msg.author.id and not self_star:
-            log.debug("Self star not allowed %s", payload.user_id)
-            return
+            msg: discord.Message | None = await self.bot.get_or_fetch_message(payload.channel_id, payload.message_id)
+            if not msg:
+                log.debug("Message not found %s-%s", payload.channel_id, payload.message_id)
+                return  # rare case
 
-        func = getattr(self, f"_on_star_reaction_{tp}")
-        await func(payload, author_message=msg)
-        return
+            if payload.user_id == msg.author.id and not self_star:
+                log.debug("Self star not allowed %s", payload.user_id)
+                return
 
-    async def __make_starboard_post(
-        self,
-        *,
-        bot_message: discord.Message,
-        message: discord.Message,
-    ) -> dict:
-        post = {
-            "message_id": {"bot": bot_message.id, "author": message.id},
-            "channel_id": message.channel.id,
-            "author_id": message.author.id,
-            "guild_id": message.guild.id,
-            "created_at": message.created_at.timestamp(),
-            "content": message.content,
-            "number_of_stars": await self.get_star_count(message, from_db=False),
-            "starrer": [message.author.id],
-        }
+            entry = await self.state.create(msg, self_star=self_star)
+            entry.starrers.add(payload.user_id)
+            await self._on_star_reaction_add(payload, entry=entry, message=msg)
+            return
 
-        if message.attachments:
-            if message.attachments[0].url.lower().endswith(("png", "jpeg", "jpg", "gif", "webp")):
-                post["picture"] = message.attachments[0].url
-            else:
-                post["attachment"] = message.attachments[0].url
+        if payload.user_id == entry.author_id and not self_star:
+            log.debug("Self star not allowed %s", payload.user_id)
+            return
+
+        if tp == "add":
+            entry.starrers.add(payload.user_id)
+        else:
+            entry.starrers.discard(payload.user_id)
+        entry.dirty = True
 
-        return post
+        func = getattr(self, f"_on_star_reaction_{tp}")
+        await func(payload, entry=entry)
 
     async def get_star_count(self, message: discord.Message | None = None, *, from_db: bool = True) -> int:
-        stars = 0
         if message is None:
-            return stars
+            return 0
 
-        if data := await self.bot.starboards.find_one(
-            {
-                "$or": [
-                    {"message_id.bot": message.id},
-                    {"message_id.author": message.id},
-                ],
-            },
-        ):
-            stars = len(data["starrer"])
-
-        count = 0
-        _reactors = []
-        for reaction in message.reactions:
-            if str(reaction.emoji) == "\N{WHITE MEDIUM STAR}":
-                count = reaction.count
-                _reactors = [i.id async for i in reaction.users()]
-                break
-
-        if count >= stars and _reactors:
-            # missing reactors
-            await self.bot.starboards.update_one(
-                {
-                    "$or": [
-                        {"message_id.bot": message.id},
-                        {"message_id.author": message.id},
-                    ],
-                },
-                {
-                    "$addToSet": {
-                        "starrer": {
-                            "$each": _reactors,
-                        },
-                    },
-                },
-            )
-
-        return max(stars, count)
+        entry = await self.state.get(message.id) if from_db else None
+        if entry is not None:
+            return entry.count
+
+        return next((reaction.count for reaction in message.reactions if str(reaction.emoji) == STAR), 0)
 
     def star_gradient_colour(self, stars: int) -> int:
         p = stars / 13
@@ -155,11 +134,21 @@ class OnReaction(Cog, command_attrs={"hidden": True}):
             return "\N{GLOWING STAR}"
         return "\N{DIZZY SYMBOL}" if 25 > stars >= 10 else "\N{SPARKLES}"
 
-    async def star_post(self, *, starboard_channel: discord.TextChannel | None, message: discord.Message):
+    def star_content(self, entry: StarEntry) -> str:
+        count = entry.count
+        return f"{self.star_emoji(count)} {count} | In: <#{entry.channel_id}> | Message ID: {entry.message_id}\n> {entry.jump_url}"
+
+    async def _starboard_channel(self, guild_id: int) -> discord.TextChannel | None:
+        config = self._starboard_config(guild_id)
+        if config is None or not config.get("channel"):
+            return None
+        return await self.bot.getch(self.bot.get_channel, self.bot.fetch_channel, config["channel"])  # type: ignore
+
+    async def star_post(self, *, starboard_channel: discord.TextChannel | None, message: discord.Message, entry: StarEntry):
         if not starboard_channel:
             return
 
-        count = await self.get_star_count(message)
+        count = entry.count
 
         embed: discord.Embed = discord.Embed(timestamp=message.created_at, color=self.star_gradient_colour(count))
         embed.set_footer(text=f"ID: {message.author.id}")
@@ -179,129 +168,84 @@ class OnReaction(Cog, command_attrs={"hidden": True}):
                     name="Attachment",
                     value=f"[{message.attachments[0].filename}]({message.attachments[0].url})",
                 )
-        msg: discord.Message = await starboard_channel.send(
-            f"{self.star_emoji(count)} {count} | In: {message.channel.mention} | Message ID: {message.id}\n> {message.jump_url}",
-            embed=embed,
-        )
+        msg: discord.Message = await starboard_channel.send(self.star_content(entry), embed=embed)
 
         self.bot.message_cache[msg.id] = msg
         self.bot.message_cache[message.id] = message
 
-        post = await self.__make_starboard_post(bot_message=msg, message=message)
-        await self.bot.starboards.insert_one(post)
-
-    async def edit_starbord_post(self, payload: discord.RawReactionActionEvent, **data: Any):
-        ch: discord.TextChannel | None = await self.bot.getch(
-            self.bot.get_channel,
-            self.bot.fetch_channel,
-            data["channel_id"],
-        )
-        if ch is None:
-            log.debug("Channel not found %s", data["channel_id"])
-            return
+        entry.bot_message_id = msg.id
+        self.state._remember(entry)
 
-        try:
-            starboard_channel: int = (
-                self.bot.guild_configurations_cache[payload.guild_id]["starboard_config"]["channel"] or 0
-            )
-        except KeyError:
-            return
-        else:
-            starchannel: discord.TextChannel | None = await self.bot.getch(
-                self.bot.get_channel,
-                self.bot.fetch_channel,
-                starboard_channel,
-            )
-
-        msg: discord.Message = await self.bot.get_or_fetch_message(starchannel, data["message_id"]["bot"])
-        main_message: discord.Message = await self.bot.get_or_fetch_message(ch, data["message_id"]["author"])
-        if msg and not msg.embeds:
-            log.debug("Message has no embeds")
-            return
+        post = {
+            "message_id": {"bot": msg.id, "author": message.id},
+            "channel_id": message.channel.id,
+            "author_id": message.author.id,
+            "guild_id": message.guild.id,  # type: ignore
+            "created_at": message.created_at.timestamp(),
+            "content": message.content,
+            "number_of_stars": count,
+            "starrer": list(entry.starrers),
+        }
 
-        embed: discord.Embed = msg.embeds[0]
+        if message.attachments:
+            if message.attachments[0].url.lower().endswith(("png", "jpeg", "jpg", "gif", "webp")):
+                post["picture"] = message.attachments[0].url
+            else:
+                post["attachment"] = message.attachments[0].url
 
-        count = await self.get_star_count(msg, from_db=True)
+        await self.bot.starboards.insert_one(post)
+        entry.dirty = False
 
-        if not count:
+    async def edit_starbord_post(self, entry: StarEntry) -> bool:
+        if entry.bot_message_id is None:
             return False
 
-        embed.color = self.star_gradient_colour(count)
+        config = self._starboard_config(entry.guild_id) or {}
+        if self.state.needs_reconcile(entry):
+            await self.state.reconcile(entry, self_star=config.get("can_self_star", False))
 
-        await msg.edit(
-            embed=embed,
-            content=(
-                f"{self.star_emoji(count)} {count} | In: {main_message.channel.mention} | Message ID: {main_message.id}\n"
-                f"> {main_message.jump_url}"
-            ),
-        )
-        return True
+        starchannel = await self._starboard_channel(entry.guild_id)
+        if starchannel is None:
+            log.debug("Starboard channel not found %s", entry.guild_id)
+            return False
 
-    async def _on_star_reaction_remove(
-        self,
-        payload: discord.RawReactionActionEvent,
-        *,
-        author_message: discord.Message,
-    ):
-        if not payload.guild_id:
+        msg: discord.Message | None = await self.bot.get_or_fetch_message(starchannel, entry.bot_message_id)
+        if msg is None or not msg.embeds:
+            log.debug("Message has no embeds")
             return False
 
-        msg = author_message
-        try:
-            limit = self.bot.guild_configurations_cache[payload.guild_id]["starboard_config"]["limit"] or 0
-        except KeyError:
+        if not entry.count:
             return False
 
-        count = await self.get_star_count(msg, from_db=True)
+        embed: discord.Embed = msg.embeds[0]
+        embed.color = self.star_gradient_colour(entry.count)
+
+        await msg.edit(embed=embed, content=self.star_content(entry))
+        return True
+
+    async def _on_star_reaction_remove(self, payload: discord.RawReactionActionEvent, *, entry: StarEntry):
+        config = self._starboard_config(entry.guild_id)
+        if config is None:
+            return False
 
-        collection = self.bot.starboards
-        if limit > count:
-            await self._delete_starboard_post(payload)
+        limit = config["limit"] or 0
+        if limit > entry.count or not entry.count:
+            await self._delete_starboard_post(entry)
         else:
-            data = await collection.find_one_and_update(
-                {
-                    "$or": [
-                        {"message_id.bot": msg.id},
-                        {"message_id.author": msg.id},
-                    ],
-                },
-                {
-                    "$pull": {"starrer": payload.user_id},
-                    "$inc": {"number_of_stars": -1},
-                },
-                return_document=pymongo.ReturnDocument.AFTER,
-            )
-            if not data:
-                return False
-            if not data["starrer"]:
-                await self._delete_starboard_post(payload)
-
-            await self.edit_starbord_post(payload, **data)
+            self.state.schedule_edit(entry, self.edit_starbord_post)
         return False
 
-    async def _delete_starboard_post(self, payload: discord.RawReactionActionEvent) -> bool:
-        collection = self.bot.starboards
-        ch = await self.bot.getch(self.bot.get_channel, self.bot.fetch_channel, payload.channel_id)
-        msg: discord.Message | None = await self.bot.get_or_fetch_message(ch, payload.message_id)
-        data = await collection.find_one_and_delete(
-            {"$or": [{"message_id.bot": msg.id}, {"message_id.author": msg.id}]},
-        )
+    async def _delete_starboard_post(self, entry: StarEntry) -> bool:
+        self.state.forget(entry.message_id)
+        data = await self.bot.starboards.find_one_and_delete({"message_id.author": entry.message_id})
         if not data:
             return False
-        try:
-            channel: int = self.bot.guild_configurations_cache[payload.guild_id]["starboard_config"]["channel"] or 0
-        except KeyError:
-            return False
-
-        starboard_channel: discord.TextChannel | None = await self.bot.getch(
-            self.bot.get_channel,
-            self.bot.fetch_channel,
-            channel,
-        )
 
+        starboard_channel = await self._starboard_channel(entry.guild_id)
         bot_msg: discord.Message | None = await self.bot.get_or_fetch_message(
-            starboard_channel,
+            starboard_channel,  # type: ignore
             data["message_id"]["bot"],
+            partial=True,
         )
 
         if bot_msg:
@@ -312,46 +256,27 @@ class OnReaction(Cog, command_attrs={"hidden": True}):
         self,
         payload: discord.RawReactionActionEvent,
         *,
-        author_message: discord.Message,
+        entry: StarEntry,
+        message: discord.Message | None = None,
     ):
-        if not payload.guild_id:
+        if entry.bot_message_id is not None:
+            self.state.schedule_edit(entry, self.edit_starbord_post)
             return
 
-        msg = author_message
-
-        if data := await self.bot.starboards.find_one_and_update(
-            {"$or": [{"message_id.bot": msg.id}, {"message_id.author": msg.id}]},
-            {
-                "$addToSet": {"starrer": payload.user_id},
-                "$inc": {"number_of_stars": 1},
-            },
-        ):
-            await self.edit_starbord_post(payload, **data)
-            return
-
-        count = await self.get_star_count(msg)
-
-        try:
-            limit = self.bot.guild_configurations_cache[payload.guild_id]["starboard_config"]["limit"] or 0
-        except KeyError:
+        config = self._starboard_config(entry.guild_id)
+        if config is None:
             return
 
-        try:
-            channel: int = self.bot.guild_configurations_cache[payload.guild_id]["starboard_config"]["channel"] or 0
-        except KeyError:
+        limit = config["limit"] or 0
+        if not limit or entry.count < limit:
             return
 
-        starboard_channel: discord.TextChannel | None = await self.bot.getch(
-            self.bot.get_channel,
-            self.bot.fetch_channel,
-            channel,
-        )
-        if not limit:
+        message = message or await self.bot.get_or_fetch_message(entry.channel_id, entry.message_id)
+        if message is None:
             return
 
-        if count >= limit and msg:
-            await self.star_post(starboard_channel=starboard_channel, message=msg)
-            return
+        starboard_channel = await self._starboard_channel(entry.guild_id)
+        await self.star_post(starboard_channel=starboard_channel, message=message, entry=entry)
 
     @Cog.listener()
     async def on_reaction_add(self, reaction: discord.Reaction, user: discord.User | discord.Member):
@@ -369,15 +294,13 @@ class OnReaction(Cog, command_attrs={"hidden": True}):
 
     @Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
-        if not payload.guild_id:
+        if not payload.guild_id or str(payload.emoji) != STAR:
             return
 
-        if guild := self.bot.get_guild(payload.guild_id):
-            member = await self.bot.get_or_fetch_member(guild, payload.user_id)
-        else:
-            member = None
+        # counted before the reaction is filtered, so that it matches the count on Discord
+        self.state.count_reaction(payload.message_id, 1)
 
-        if member is not None and member.bot:
+        if payload.member is not None and payload.member.bot:
             return
 
         try:
@@ -388,8 +311,7 @@ class OnReaction(Cog, command_attrs={"hidden": True}):
             if self.bot.banned_users[payload.user_id].get("global"):
                 return
 
-        if str(payload.emoji) == "\N{WHITE MEDIUM STAR}":
-            await self._factory_reactor(payload, tp="add")
+        await self._factory_reactor(payload, tp="add")
 
     @Cog.listener()
     async def on_reaction_remove(self, reaction: discord.Reaction, user: discord.User | discord.Member):
@@ -407,9 +329,11 @@ class OnReaction(Cog, command_attrs={"hidden": True}):
 
     @Cog.listener()
     async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
-        if not payload.guild_id:
+        if not payload.guild_id or str(payload.emoji) != STAR:
             return
 
+        self.state.count_reaction(payload.message_id, -1)
+
         if guild := self.bot.get_guild(payload.guild_id):
             member = await self.bot.get_or_fetch_member(guild, payload.user_id)
         else:
@@ -428,8 +352,7 @@ class OnReaction(Cog, command_attrs={"hidden": True}):
             if self.bot.banned_users[payload.user_id].get("global"):
                 return
 
-        if str(payload.emoji) == "\N{WHITE MEDIUM STAR}":
-            await self._factory_reactor(payload, tp="remove")
+        await self._factory_reactor(payload, tp="remove")
 
     @Cog.listener()
     async def on_reaction_clear(self, message: discord.Message, reactions: list[discord.Reaction]):
@@ -440,6 +363,7 @@ class OnReaction(Cog, command_attrs={"hidden": True}):
         if not payload.guild_id:
             return
 
+        self.state.forget(payload.message_id)
         await self.bot.starboards.delete_one(
             {
                 "$or": [
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from time import monotonic
+from typing import TYPE_CHECKING
+
+import pymongo
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+import discord
+from discord.ext import tasks
+from utilities.converters import Cache
+
+if TYPE_CHECKING:
+    from core import Parrot
+
+log = logging.getLogger("events.on_rexn_state")
+
+STAR = "\N{WHITE MEDIUM STAR}"
+
+EDIT_DEBOUNCE = 3
+RECONCILE_AFTER = 60 * 10
+
+
+class StarEntry:
+    """In memory state of a starred message."""
+
+    __slots__ = (
+        "message_id",
+        "channel_id",
+        "guild_id",
+        "author_id",
+        "bot_message_id",
+        "starrers",
+        "raw_count",
+        "dirty",
+        "reconciled_at",
+    )
+
+    def __init__(
+        self,
+        *,
+        message_id: int,
+        channel_id: int,
+        guild_id: int,
+        author_id: int,
+        bot_message_id: int | None = None,
+        starrers: set[int] | None = None,
+    ) -> None:
+        self.message_id = message_id
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.author_id = author_id
+        self.bot_message_id = bot_message_id
+        self.starrers: set[int] = starrers or set()
+        # stars on Discord, bots and the author included. Unknown until the reactors are fetched
+        self.raw_count: int | None = None
+
+        self.dirty: bool = False
+        self.reconciled_at: float = monotonic()
+
+    @property
+    def count(self) -> int:
+        return len(self.starrers)
+
+    @property
+    def jump_url(self) -> str:
+        return f"https://discord.com/channels/{self.guild_id}/{self.channel_id}/{self.message_id}"
+
+    @classmethod
+    def from_document(cls, data: dict) -> StarEntry:
+        return cls(
+            message_id=data["message_id"]["author"],
+            channel_id=data["channel_id"],
+            guild_id=data["guild_id"],
+            author_id=data["author_id"],
+            bot_message_id=data["message_id"]["bot"],
+            starrers=set(data.get("starrer", [])),
+        )
+
+    def __repr__(self) -> str:
+        return f"<StarEntry message_id={self.message_id} bot_message_id={self.bot_message_id} count={self.count}>"
+
+
+class StarboardState:
+    """Keeps the star count of messages in memory, updated from raw reaction payloads.
+
+    Starboard documents are written back in bulk, edits of the starboard posts are debounced,
+    and the reactors are enumerated again only if the reaction count on Discord disagrees.
+    """
+
+    def __init__(self, bot: Parrot) -> None:
+        self.bot = bot
+        self.entries: Cache[int, StarEntry] = Cache(bot, cache_size=2**12, callback=self._on_evict)
+        # starboard (bot) message ID -> starred (author) message ID
+        self.aliases: Cache[int, int] = Cache(bot, cache_size=2**12)
+
+        self._pending_edits: dict[int, asyncio.TimerHandle] = {}
+        self._evicted: list[StarEntry] = []
+
+    def _on_evict(self, _: int, entry: StarEntry) -> None:
+        if entry.dirty:
+            self._evicted.append(entry)
+
+    @property
+    def collection(self):
+        return self.bot.starboards
+
+    async def ensure_indexes(self) -> None:
+        # `$or` is planned per clause, so each clause needs its own index
+        await self.collection.create_index([("message_id.author", pymongo.ASCENDING)])
+        await self.collection.create_index([("message_id.bot", pymongo.ASCENDING)])
+
+    def _remember(self, entry: StarEntry) -> StarEntry:
+        self.entries[entry.message_id] = entry
+        if entry.bot_message_id is not None:
+            self.aliases[entry.bot_message_id] = entry.message_id
+        return entry
+
+    def forget(self, message_id: int) -> StarEntry | None:
+        message_id = self.aliases.get(message_id) or message_id
+        entry = self.entries.pop(message_id) if message_id in self.entries else None
+        if entry is not None and entry.bot_message_id is not None:
+            if entry.bot_message_id in self.aliases:
+                self.aliases.pop(entry.bot_message_id)
+            if handle := self._pending_edits.pop(entry.bot_message_id, None):
+                handle.cancel()
+        return entry
+
+    def count_reaction(self, message_id: int, delta: int) -> None:
+        """Follows the star count on Discord, for every reaction, even the ones which are not counted as stars."""
+        # the starboard post's own reactions are not counted on the starred message
+        entry = self.entries.get(message_id)
+        if entry is not None and entry.raw_count is not None:
+            entry.raw_count += delta
+
+    async def get(self, message_id: int) -> StarEntry | None:
+        """|coro|.
+
+        Entry of the starred message (or its starboard post). Only the first call for a message hits the database.
+        """
+        message_id = self.aliases.get(message_id) or message_id
+        if entry := self.entries.get(message_id):
+            return entry
+
+        data = await self.collection.find_one(
+            {"$or": [{"message_id.bot": message_id}, {"message_id.author": message_id}]},
+        )
+        if data is None:
+            return None
+        return self._remember(StarEntry.from_document(data))
+
+    async def create(self, message: discord.Message, *, self_star: bool) -> StarEntry:
+        """Entry of a message which is not on the starboard yet. Reactors are enumerated only once here."""
+        assert message.guild is not None
+
+        entry = StarEntry(
+            message_id=message.id,
+            channel_id=message.channel.id,
+            guild_id=message.guild.id,
+            author_id=message.author.id,
+        )
+        await self._fetch_reactors(entry, message, self_star=self_star)
+        return self._remember(entry)
+
+    async def _fetch_reactors(self, entry: StarEntry, message: discord.Message, *, self_star: bool) -> None:
+        for reaction in message.reactions:
+            if str(reaction.emoji) == STAR:
+                entry.starrers = {user.id async for user in reaction.users(limit=None) if not user.bot}
+                entry.raw_count = reaction.count
+                break
+        else:
+            entry.starrers = set()
+            entry.raw_count = 0
+
+        if not self_star:
+            entry.starrers.discard(entry.author_id)
+        entry.reconciled_at = monotonic()
+
+    async def reconcile(self, entry: StarEntry, *, self_star: bool) -> bool:
+        """|coro|.
+
+        Compares the raw star count with the one on Discord, enumerates the reactors only if they disagree
+        (or if the raw count is not known yet, for entries loaded from the database).
+        """
+        entry.reconciled_at = monotonic()
+        message = await self.bot.get_or_fetch_message(entry.channel_id, entry.message_id)
+        if message is None:
+            return False
+
+        count = next((reaction.count for reaction in message.reactions if str(reaction.emoji) == STAR), 0)
+        if count == entry.raw_count:
+            return False
+
+        log.debug("Reconciling %s, count on discord %s", entry, count)
+        await self._fetch_reactors(entry, message, self_star=self_star)
+        entry.dirty = True
+        return True
+
+    def schedule_edit(self, entry: StarEntry, callback) -> None:
+        """Edits the starboard post after :data:`EDIT_DEBOUNCE` seconds, burst of reactions cause one edit."""
+        if entry.bot_message_id is None or entry.bot_message_id in self._pending_edits:
+            return
+
+        def _run() -> None:
+            self._pending_edits.pop(entry.bot_message_id, None)  # type: ignore
+            self.bot.loop.create_task(callback(entry))
+
+        self._pending_edits[entry.bot_message_id] = self.bot.loop.call_later(EDIT_DEBOUNCE, _run)
+
+    def needs_reconcile(self, entry: StarEntry) -> bool:
+        return monotonic() - entry.reconciled_at > RECONCILE_AFTER
+
+    async def flush(self) -> None:
+        operations = []
+        written: list[StarEntry] = []
+        evicted, self._evicted = self._evicted, []
+        for entry in [*evicted, *self.entries.values()]:
+            if not entry.dirty or entry.bot_message_id is None:
+                continue
+            # cleared before the write, so that a reaction during the write marks the entry again
+            entry.dirty = False
+            written.append(entry)
+            operations.append(
+                UpdateOne(
+                    {"message_id.author": entry.message_id},
+                    {"$set": {"starrer": list(entry.starrers), "number_of_stars": entry.count}},
+                ),
+            )
+
+        if not operations:
+            return
+        log.debug("Writing %s starboard entries", len(operations))
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except PyMongoError as e:
+            log.warning("Could not write %s starboard entries, retrying on the next flush: %s", len(operations), e)
+            for entry in written:
+                entry.dirty = True
+            # evicted entries are not in the cache anymore, only this list keeps them
+            self._evicted.extend(entry for entry in evicted if entry.dirty)
+
+    @tasks.loop(seconds=10)
+    async def flush_loop(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            log.error("Could not flush the starboard entries", exc_info=e)
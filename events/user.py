@@ -19,8 +19,7 @@ class User(Cog, command_attrs={"hidden": True}):
 
     @Cog.listener()
     async def on_member_unban(self, guild: discord.Guild, user: discord.User):
-        data = await self.bot.guild_collections_ind.find_one({"_id": guild.id, "sticky_bans": {"$exists": True}})
-        if data and user.id in data["sticky_bans"] and guild.me.guild_permissions.ban_members:
+        if self.bot.moderation.is_sticky_banned(guild.id, user.id) and guild.me.guild_permissions.ban_members:
             await guild.ban(user, reason="Sticky ban")
 
     @Cog.listener()
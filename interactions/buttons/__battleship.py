@@ -10,12 +10,15 @@ from collections.abc import Coroutine
 from io import BytesIO
 from typing import TYPE_CHECKING, Any, ClassVar, Final
 
-from PIL import Image, ImageDraw
+from PIL import ImageDraw
 
 import discord
 from core import Context, Parrot
 
+from utilities.assets import ASSETS
+
 from .__wordle import WordInputButton
+from .sessions import run_in_pool
 from .utils import BaseView
 
 if TYPE_CHECKING:
@@ -26,6 +29,9 @@ if TYPE_CHECKING:
 
 DEFAULT_COLOR: Final[discord.Color] = discord.Color(0x2F3136)
 
+BOARD_PATH = "extra/battleship.png"
+ASSETS.declare_images([BOARD_PATH])
+
 SHIPS: dict[str, tuple[int, tuple[int, int, int]]] = {
     "carrier": (5, (52, 152, 219)),
     "battleship": (4, (246, 246, 112)),
@@ -165,26 +171,27 @@ class Board:
         RED = (255, 0, 0)
         GRAY = (128, 128, 128)
 
-        with Image.open("extra/battleship.png") as img:
-            _img = img.convert("RGBA")
-            cur = ImageDraw.Draw(_img, "RGBA")
-
-            for i, y in zip(range(1, 11), range(75, 530, 50), strict=False):
-                for j, x in zip(range(1, 11), range(75, 530, 50), strict=False):
-                    coord = (i, j)
-                    if coord in self.op_misses:
-                        self.draw_dot(cur, x, y, fill=GRAY)
-
-                    elif coord in self.op_hits:
-                        if not hide:
-                            ship = self.get_ship(coord)
-                            self.draw_sq(cur, x, y, coord=coord, ship=ship)
-                        self.draw_dot(cur, x, y, fill=RED)
-                    elif ship := self.get_ship(coord):
-                        if not hide:
-                            self.draw_sq(cur, x, y, coord=coord, ship=ship)
-            buffer = BytesIO()
-            _img.save(buffer, "PNG")
+        # the shared board must not be drawn on
+        _img = ASSETS.image(BOARD_PATH).copy()
+        cur = ImageDraw.Draw(_img, "RGBA")
+
+        for i, y in zip(range(1, 11), range(75, 530, 50), strict=False):
+            for j, x in zip(range(1, 11), range(75, 530, 50), strict=False):
+                coord = (i, j)
+                if coord in self.op_misses:
+                    self.draw_dot(cur, x, y, fill=GRAY)
+
+                elif coord in self.op_hits:
+                    if not hide:
+                        ship = self.get_ship(coord)
+                        self.draw_sq(cur, x, y, coord=coord, ship=ship)
+                    self.draw_dot(cur, x, y, fill=RED)
+                elif ship := self.get_ship(coord):
+                    if not hide:
+                        self.draw_sq(cur, x, y, coord=coord, ship=ship)
+
+        buffer = BytesIO()
+        _img.save(buffer, "PNG")
 
         buffer.seek(0)
         del _img
@@ -248,10 +255,10 @@ class BattleShip:
         hide: bool = True,
     ) -> tuple[discord.Embed, discord.File, discord.Embed, discord.File]:
         board = self.get_board(player)
-        image1 = await asyncio.to_thread(board.to_image)
+        image1 = await run_in_pool(board.to_image)
 
         board2 = self.get_board(player, other=True)
-        image2 = await asyncio.to_thread(board2.to_image, hide=hide)
+        image2 = await run_in_pool(board2.to_image, hide=hide)
 
         file1 = discord.File(image1, "board1.png")
         file2 = discord.File(image2, "board2.png")
@@ -1,15 +1,187 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any
+import io
+import logging
+import threading
+from typing import TYPE_CHECKING, Any
 
 import chess
+import chess.svg
+from PIL import Image, ImageDraw
 from pymongo import UpdateOne
 
 import discord
 from core import Context, Parrot
+from utilities.assets import ASSETS
+from utilities.converters import Cache
 from utilities.paginator import ParrotPaginator
 
+from .sessions import run_in_pool
+
+if TYPE_CHECKING:
+    from typing import TypeAlias
+
+    # board FEN, last move, orientation, square of the king in check
+    RenderKey: TypeAlias = tuple[str, str | None, bool, int | None]
+
+log = logging.getLogger("interactions.buttons.chess")
+
+SQUARE = 64
+# room for the coordinates, around the board
+MARGIN = 24
+LIGHT = (240, 217, 181)
+DARK = (181, 136, 99)
+LAST_MOVE_LIGHT = (205, 210, 106)
+LAST_MOVE_DARK = (170, 162, 58)
+CHECK = (231, 76, 60)
+BACKGROUND = (49, 46, 43)
+COORDINATES = (220, 220, 220)
+
+FONT_PATH = "extra/roboto-bold.ttf"
+FONT_SIZE = 14
+ASSETS.declare_font(FONT_PATH, FONT_SIZE)
+
+# rendered boards kept, as PNG bytes
+RENDER_CACHE_SIZE = 256
+
+
+class ChessRenderer:
+    """Draws chess positions locally, with PIL.
+
+    The pieces are python-chess's SVG set, rasterized once per piece. The empty
+    board is drawn once per orientation, a position only pastes the pieces on
+    it. The PNGs are cached by position, last move, orientation and check.
+
+    Blocking, meant to be run in a thread.
+    """
+
+    def __init__(self, *, square: int = SQUARE, cache_size: int = RENDER_CACHE_SIZE) -> None:
+        self.square = square
+        self.size = 8 * square + 2 * MARGIN
+        self.cache: Cache[RenderKey, bytes] = Cache(cache_size=cache_size)
+
+        self._pieces: dict[str, Image.Image] = {}
+        self._boards: dict[bool, Image.Image] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<ChessRenderer square={self.square} cached={len(self.cache)}>"
+
+    def _rasterize(self, piece: chess.Piece) -> Image.Image:
+        try:
+            # wand loads the MagickWand library on import
+            from utilities.imaging.image import svg_to_png
+
+            svg = chess.svg.piece(piece, size=self.square)
+            png = svg_to_png(svg.encode(), width=self.square, height=self.square)
+            return Image.open(io.BytesIO(png)).convert("RGBA")
+        except (ImportError, OSError) as e:
+            # no ImageMagick at all, the piece is drawn as its letter instead
+            log.warning("Could not load ImageMagick, drawing %s as a letter", piece.symbol(), exc_info=e)
+            return self._letter(piece)
+        except Exception as e:
+            # no SVG support in ImageMagick
+            log.warning("Could not rasterize %s, drawing it as a letter", piece.symbol(), exc_info=e)
+            return self._letter(piece)
+
+    def _letter(self, piece: chess.Piece) -> Image.Image:
+        img = Image.new("RGBA", (self.square, self.square))
+        draw = ImageDraw.Draw(img)
+        fill, outline = ((255, 255, 255), (0, 0, 0)) if piece.color == chess.WHITE else ((0, 0, 0), (255, 255, 255))
+        pad = self.square // 8
+        draw.ellipse((pad, pad, self.square - pad, self.square - pad), fill=fill, outline=outline, width=2)
+        font = ASSETS.font(FONT_PATH, self.square // 2)
+        draw.text((self.square // 2, self.square // 2), piece.symbol().upper(), fill=outline, font=font, anchor="mm")
+        return img
+
+    def piece(self, symbol: str) -> Image.Image:
+        try:
+            return self._pieces[symbol]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if (img := self._pieces.get(symbol)) is None:
+                img = self._pieces[symbol] = self._rasterize(chess.Piece.from_symbol(symbol))
+            return img
+
+    def _origin(self, square: int, orientation: bool) -> tuple[int, int]:
+        file, rank = chess.square_file(square), chess.square_rank(square)
+        if orientation == chess.WHITE:
+            col, row = file, 7 - rank
+        else:
+            col, row = 7 - file, rank
+        return MARGIN + col * self.square, MARGIN + row * self.square
+
+    def _fill(self, draw: ImageDraw.ImageDraw, square: int, orientation: bool, colour: tuple[int, int, int]) -> None:
+        x, y = self._origin(square, orientation)
+        draw.rectangle((x, y, x + self.square - 1, y + self.square - 1), fill=colour)
+
+    def board(self, orientation: bool) -> Image.Image:
+        """The empty board, with its coordinates. Shared, must not be drawn on."""
+        if (img := self._boards.get(orientation)) is not None:
+            return img
+
+        img = Image.new("RGB", (self.size, self.size), BACKGROUND)
+        draw = ImageDraw.Draw(img)
+        font = ASSETS.font(FONT_PATH, FONT_SIZE)
+        for square in chess.SQUARES:
+            light = (chess.square_file(square) + chess.square_rank(square)) % 2
+            self._fill(draw, square, orientation, LIGHT if light else DARK)
+
+        for i in range(8):
+            x, _ = self._origin(chess.square(i, 0), orientation)
+            _, y = self._origin(chess.square(0, i), orientation)
+            half, end = self.square // 2, self.size - MARGIN // 2
+            draw.text((x + half, MARGIN // 2), chess.FILE_NAMES[i], fill=COORDINATES, font=font, anchor="mm")
+            draw.text((x + half, end), chess.FILE_NAMES[i], fill=COORDINATES, font=font, anchor="mm")
+            draw.text((MARGIN // 2, y + half), chess.RANK_NAMES[i], fill=COORDINATES, font=font, anchor="mm")
+            draw.text((end, y + half), chess.RANK_NAMES[i], fill=COORDINATES, font=font, anchor="mm")
+
+        self._boards[orientation] = img
+        return img
+
+    def draw(self, key: RenderKey) -> Image.Image:
+        board_fen, last_move, orientation, check = key
+        img = self.board(orientation).copy()
+        draw = ImageDraw.Draw(img)
+
+        if last_move is not None:
+            move = chess.Move.from_uci(last_move)
+            for square in (move.from_square, move.to_square):
+                light = (chess.square_file(square) + chess.square_rank(square)) % 2
+                self._fill(draw, square, orientation, LAST_MOVE_LIGHT if light else LAST_MOVE_DARK)
+        if check is not None:
+            self._fill(draw, check, orientation, CHECK)
+
+        for square, piece in chess.BaseBoard(board_fen).piece_map().items():
+            sprite = self.piece(piece.symbol())
+            img.paste(sprite, self._origin(square, orientation), sprite)
+        return img
+
+    @staticmethod
+    def key(board: chess.Board, *, orientation: bool = chess.WHITE) -> RenderKey:
+        last_move = board.peek().uci() if board.move_stack else None
+        check = board.king(board.turn) if board.is_check() else None
+        return board.board_fen(), last_move, orientation, check
+
+    def render(self, board: chess.Board, *, orientation: bool = chess.WHITE) -> bytes:
+        """The position as a PNG."""
+        key = self.key(board, orientation=orientation)
+        try:
+            return self.cache[key]
+        except KeyError:
+            pass
+
+        buffer = io.BytesIO()
+        self.draw(key).save(buffer, "png")
+        png = self.cache[key] = buffer.getvalue()
+        return png
+
+
+RENDERER = ChessRenderer()
+
 
 class ChessView(discord.ui.View):
     def __init__(self, *, game: Chess, ctx: Context = None, timeout: float = 300.0, **kwargs: Any) -> None:
@@ -112,16 +284,21 @@ class Chess:
             self.alternate_turn = self.black
             return
 
+    async def board_file(self, *, orientation: bool = chess.WHITE) -> discord.File:
+        # only the last move is needed, for its highlight
+        board = self.board.copy(stack=1)
+        png = await run_in_pool(RENDERER.render, board, orientation=orientation)
+        return discord.File(io.BytesIO(png), filename="board.png")
+
     async def place_move(self, user_move: str) -> None:
-        st = "white" if self.alternate_turn == self.white else "black"
-        move = self.board.push_san(user_move)
+        self.board.push_san(user_move)
+        # facing the player to move
+        file = await self.board_file(orientation=self.board.turn)
         content = f"{self.white.mention} VS {self.black.mention}"
         embed = discord.Embed(
             timestamp=discord.utils.utcnow(),
         )
-        embed.set_image(
-            url=f"https://backscattering.de/web-boardimage/board.png?fen={self.board.board_fen()}&lastMove={move.uci()}&coordinates=true&orientation={st}",
-        )
+        embed.set_image(url="attachment://board.png")
         embed.description = f"""```
 On Check?      : {self.board.is_check()}
 Can Claim Draw?: {self.board.can_claim_threefold_repetition()}
@@ -129,7 +306,12 @@ Can Claim Draw?: {self.board.can_claim_threefold_repetition()}
 """
         embed.set_footer(text=f"Turn: {self.alternate_turn} | Having 5m to make move")
         await self.game_message.delete()
-        self.game_message = await self.ctx.send(content=content, embed=embed, view=ChessView(game=self, ctx=self.ctx))
+        self.game_message = await self.ctx.send(
+            content=content,
+            embed=embed,
+            file=file,
+            view=ChessView(game=self, ctx=self.ctx),
+        )
         await self.game_over()
 
     async def game_over(
@@ -166,20 +348,24 @@ Can Claim Draw?: {self.board.can_claim_threefold_repetition()}
         return self.game_stop
 
     async def start(self):
+        file = await self.board_file()
         content = f"{self.white.mention} VS {self.black.mention}"
         embed = discord.Embed(
             timestamp=discord.utils.utcnow(),
         )
-        embed.set_image(
-            url=f"https://backscattering.de/web-boardimage/board.png?fen={self.board.board_fen()}&coordinates=true",
-        )
+        embed.set_image(url="attachment://board.png")
         embed.description = f"""```
 On Check?      : {self.board.is_check()}
 Can Claim Draw?: {self.board.can_claim_threefold_repetition()}
 ```
 """
         embed.set_footer(text=f"Turn: {self.turn} | Having 5m to make move")
-        self.game_message = await self.ctx.send(content=content, embed=embed, view=ChessView(game=self, ctx=self.ctx))
+        self.game_message = await self.ctx.send(
+            content=content,
+            embed=embed,
+            file=file,
+            view=ChessView(game=self, ctx=self.ctx),
+        )
         while not self.game_stop:
             msg = await self.wait_for_move()
             if msg is None:
@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import logging
+import random
+from time import perf_counter
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from typing import TypeAlias
+
+    # depth, flag, score, move
+    Entry: TypeAlias = tuple[int, int, int, int]
+
+log = logging.getLogger("interactions.buttons.connect_four")
+
+# difficulty -> search depth, in plies
+DIFFICULTIES: dict[str, int] = {
+    "easy": 1,
+    "medium": 3,
+    "hard": 6,
+    "expert": 12,
+}
+DEFAULT_DIFFICULTY = "hard"
+# seconds, a search returns the best move of the last finished depth
+TIME_BUDGET = 2.0
+
+WIN = 1_000_000
+# transposition table entries, cleared once full
+TABLE_SIZE = 1 << 20
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class _Timeout(Exception):
+    pass
+
+
+class C4Board:
+    """A Connect Four position as two bitboards.
+
+    Each column takes ``height + 1`` bits, bottom to top, the extra bit being
+    a sentinel which keeps the shifts of one column from leaking into the next.
+    ``current`` holds the stones of the player to move, ``mask`` every stone.
+    """
+
+    __slots__ = ("width", "height", "current", "mask", "moves", "bottom", "board")
+
+    def __init__(self, width: int = 7, height: int = 6) -> None:
+        self.width = width
+        self.height = height
+        self.current = 0
+        self.mask = 0
+        self.moves = 0
+
+        stride = height + 1
+        self.bottom = sum(1 << (col * stride) for col in range(width))
+        self.board = self.bottom * ((1 << height) - 1)
+
+    def __repr__(self) -> str:
+        return f"<C4Board width={self.width} height={self.height} moves={self.moves}>"
+
+    def copy(self) -> C4Board:
+        new = C4Board.__new__(C4Board)
+        for attr in self.__slots__:
+            setattr(new, attr, getattr(self, attr))
+        return new
+
+    @property
+    def size(self) -> int:
+        return self.width * self.height
+
+    def is_full(self) -> bool:
+        return self.moves == self.size
+
+    def column_mask(self, col: int) -> int:
+        return ((1 << self.height) - 1) << (col * (self.height + 1))
+
+    def can_play(self, col: int) -> bool:
+        return 0 <= col < self.width and not self.mask & (1 << (self.height - 1 + col * (self.height + 1)))
+
+    def legal_columns(self) -> list[int]:
+        return [col for col in range(self.width) if self.can_play(col)]
+
+    def play(self, col: int) -> int:
+        """Drops a stone of the player to move in ``col``, returns the row it lands in, counted from the bottom."""
+        if not self.can_play(col):
+            msg = f"column {col} is full"
+            raise ValueError(msg)
+
+        move = (self.mask + (1 << (col * (self.height + 1)))) & self.column_mask(col)
+        self.current ^= self.mask
+        self.mask |= move
+        self.moves += 1
+        return move.bit_length() - 1 - col * (self.height + 1)
+
+    def is_winning_move(self, col: int) -> bool:
+        move = (self.mask + (1 << (col * (self.height + 1)))) & self.column_mask(col)
+        return self.aligned(self.current | move)
+
+    def stones(self, player: int) -> int:
+        """The stones of ``player``, 1 being the one who moved first."""
+        first_to_move = self.moves % 2 == 0
+        return self.current if first_to_move == (player == 1) else self.current ^ self.mask
+
+    def aligned(self, pos: int) -> bool:
+        """Whether ``pos`` has four in a row, in any direction."""
+        # horizontal, vertical, and both diagonals
+        for shift in (self.height + 1, 1, self.height, self.height + 2):
+            m = pos & (pos >> shift)
+            if m & (m >> (2 * shift)):
+                return True
+        return False
+
+    def winning_cells(self, pos: int, mask: int) -> int:
+        """The empty cells of ``mask`` which would complete four in a row for ``pos``."""
+        # vertical, only the cell on top can complete it
+        r = (pos << 1) & (pos << 2) & (pos << 3)
+        for shift in (self.height + 1, self.height, self.height + 2):
+            p = (pos << shift) & (pos << (2 * shift))
+            r |= p & (pos << (3 * shift))
+            r |= p & (pos >> shift)
+            p = (pos >> shift) & (pos >> (2 * shift))
+            r |= p & (pos << shift)
+            r |= p & (pos >> (3 * shift))
+        return r & (self.board ^ mask)
+
+
+class SearchResult(NamedTuple):
+    column: int
+    score: int
+    depth: int
+    nodes: int
+    elapsed: float
+
+
+class C4Engine:
+    """Negamax with alpha-beta pruning over a :class:`C4Board`.
+
+    The search deepens one ply at a time until ``depth`` or the time budget is
+    reached. Moves are tried best first: the move stored in the transposition
+    table, then the moves creating the most threats, center columns first.
+    The table is kept between searches, the positions of the next turn are
+    mostly in it already.
+
+    Blocking, meant to be run in a thread.
+    """
+
+    def __init__(self, width: int = 7, height: int = 6) -> None:
+        self.width = width
+        self.height = height
+        # center columns first, they take part in the most alignments
+        self.order = sorted(range(width), key=lambda col: abs(width // 2 - col))
+        self.table: dict[int, Entry] = {}
+
+        self.nodes = 0
+        self._deadline = 0.0
+
+    def _check_time(self) -> None:
+        if perf_counter() > self._deadline:
+            raise _Timeout
+
+    def evaluate(self, board: C4Board, current: int, mask: int) -> int:
+        # threats, open cells completing four, weigh more than the center
+        opponent = current ^ mask
+        own = board.winning_cells(current, mask).bit_count()
+        theirs = board.winning_cells(opponent, mask).bit_count()
+        center = board.column_mask(self.width // 2)
+        return 4 * (own - theirs) + (current & center).bit_count() - (opponent & center).bit_count()
+
+    def negamax(self, board: C4Board, current: int, mask: int, moves: int, depth: int, alpha: int, beta: int) -> int:
+        self.nodes += 1
+        if not self.nodes & 0x3FF:
+            self._check_time()
+
+        size = board.size
+        if moves == size:
+            return 0
+
+        possible = (mask + board.bottom) & board.board
+        own_wins = board.winning_cells(current, mask)
+        if own_wins & possible:
+            return WIN - moves - 1
+
+        opponent = current ^ mask
+        opp_wins = board.winning_cells(opponent, mask)
+        forced = possible & opp_wins
+        if forced:
+            if forced & (forced - 1):
+                # two threats, only one can be blocked
+                return -(WIN - moves - 2)
+            possible = forced
+        # never play below a cell the opponent would win on
+        possible &= ~(opp_wins >> 1)
+        if not possible:
+            return -(WIN - moves - 2)
+
+        if depth <= 0:
+            return self.evaluate(board, current, mask)
+
+        key = current + mask
+        alpha_orig = alpha
+        hint = 0
+        if (entry := self.table.get(key)) is not None:
+            e_depth, e_flag, e_score, hint = entry
+            if e_depth >= depth:
+                if e_flag == EXACT:
+                    return e_score
+                if e_flag == LOWER:
+                    alpha = max(alpha, e_score)
+                else:
+                    beta = min(beta, e_score)
+                if alpha >= beta:
+                    return e_score
+
+        candidates: list[tuple[int, int]] = []
+        for col in self.order:
+            move = possible & board.column_mask(col)
+            if not move:
+                continue
+            if move == hint:
+                weight = 1 << 16
+            else:
+                weight = board.winning_cells(current | move, mask | move).bit_count()
+            candidates.append((weight, move))
+        # stable, ties keep the center first order
+        candidates.sort(key=lambda t: t[0], reverse=True)
+
+        best = -WIN - 1
+        best_move = candidates[0][1]
+        for _, move in candidates:
+            score = -self.negamax(board, opponent, mask | move, moves + 1, depth - 1, -beta, -alpha)
+            if score > best:
+                best, best_move = score, move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if len(self.table) >= TABLE_SIZE:
+            self.table.clear()
+        flag = UPPER if best <= alpha_orig else LOWER if best >= beta else EXACT
+        self.table[key] = (depth, flag, best, best_move)
+        return best
+
+    def _root(self, board: C4Board, depth: int, columns: list[int]) -> tuple[list[int], int]:
+        best = -WIN - 1
+        best_columns: list[int] = []
+        alpha = -WIN - 1
+        opponent = board.current ^ board.mask
+        for col in columns:
+            move = (board.mask + (1 << (col * (board.height + 1)))) & board.column_mask(col)
+            if board.aligned(board.current | move):
+                return [col], WIN - board.moves - 1
+            # the window is widened by one, the moves scoring the same as the best are exact and picked from randomly
+            score = -self.negamax(board, opponent, board.mask | move, board.moves + 1, depth - 1, -WIN - 1, -alpha + 1)
+            if score > best:
+                best, best_columns = score, [col]
+            elif score == best:
+                best_columns.append(col)
+            alpha = max(alpha, best)
+        return best_columns, best
+
+    def search(self, board: C4Board, *, depth: int, time_budget: float = TIME_BUDGET) -> SearchResult:
+        """The best column for the player to move, by iterative deepening up to ``depth`` plies."""
+        columns = [col for col in self.order if board.can_play(col)]
+        if not columns:
+            msg = "no legal move, the board is full"
+            raise ValueError(msg)
+
+        start = perf_counter()
+        self.nodes = 0
+        self._deadline = start + time_budget
+
+        best_columns, score, reached = [columns[0]], 0, 0
+        for current_depth in range(1, min(depth, board.size - board.moves) + 1):
+            try:
+                found, found_score = self._root(board, current_depth, columns)
+            except _Timeout:
+                break
+
+            best_columns, score, reached = found, found_score, current_depth
+            # the best move of this depth is searched first at the next one
+            columns.sort(key=lambda col: col not in found)
+            if abs(score) >= WIN - board.size:
+                # a forced win or loss is known, deeper searches would not change it
+                break
+
+        elapsed = perf_counter() - start
+        result = SearchResult(random.choice(best_columns), score, reached, self.nodes, elapsed)
+        log.debug("Connect four search: %s", result)
+        return result
+
+
+def benchmark(*, positions: int = 20, depth: int = 6, size: int = 7, seed: int = 0) -> dict[str, float]:
+    """Searches random mid-game positions, for the nodes searched per second."""
+    rng = random.Random(seed)
+    nodes = 0
+    elapsed = 0.0
+    searched = 0
+    for _ in range(positions):
+        board = C4Board(size, size)
+        for _ in range(rng.randrange(4, 12)):
+            columns = [col for col in board.legal_columns() if not board.is_winning_move(col)]
+            if not columns:
+                break
+            board.play(rng.choice(columns))
+
+        if board.is_full():
+            continue
+        engine = C4Engine(size, size)
+        result = engine.search(board, depth=depth, time_budget=float("inf"))
+        nodes += result.nodes
+        elapsed += result.elapsed
+        searched += 1
+
+    return {
+        "positions": searched,
+        "nodes": nodes,
+        "seconds": elapsed,
+        "nodes_per_second": nodes / elapsed if elapsed else 0.0,
+    }
@@ -12,6 +12,8 @@ from PIL import Image, ImageFilter, ImageOps
 import discord
 from core import Context, Parrot
 
+from .sessions import run_in_pool
+
 if TYPE_CHECKING:
     from typing import TypeAlias
 
@@ -80,10 +82,10 @@ class CountryGuesser:
         file = os.path.join(self._countries_path, country_file)
 
         if self.hard_mode:
-            file = await asyncio.to_thread(self.blur_image, file)
+            file = await run_in_pool(self.blur_image, file)
 
         if self.light_mode:
-            file = await asyncio.to_thread(self.invert_image, file)
+            file = await run_in_pool(self.invert_image, file)
 
         return discord.File(file, "country.png")
 
@@ -7,9 +7,10 @@ from collections import defaultdict
 from itertools import product
 from pathlib import Path
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 
 import discord
+from utilities.assets import ASSETS
 
 DECK = list(product(*[(0, 1, 2)] * 4))
 
@@ -32,8 +33,9 @@ IMAGE_PATH = Path("extra", "duckgame", "all_cards.png")
 FONT_PATH = Path("extra", "duckgame", "LuckiestGuy-Regular.ttf")
 HELP_IMAGE_PATH = Path("extra", "duckgame", "ducks_help_ex.png")
 
-ALL_CARDS = Image.open(IMAGE_PATH)
-LABEL_FONT = ImageFont.truetype(str(FONT_PATH), size=16)
+LABEL_FONT_SIZE = 16
+ASSETS.declare_images([IMAGE_PATH], mode=None)
+ASSETS.declare_font(FONT_PATH, LABEL_FONT_SIZE)
 CARD_WIDTH = 155
 CARD_HEIGHT = 97
 
@@ -70,7 +72,7 @@ def assemble_board_image(board: list[tuple[int]], rows: int, columns: int) -> Im
             xy=(left + 5, top + 5),  # magic numbers are buffers for the card labels
             text=str(idx),
             fill=(0, 0, 0),
-            font=LABEL_FONT,
+            font=ASSETS.font(FONT_PATH, LABEL_FONT_SIZE),
         )
     return new_im
 
@@ -84,7 +86,7 @@ def get_card_image(card: tuple[int]) -> Image.Image:
     x2 = x1 + CARD_WIDTH
     y1 = row * CARD_HEIGHT
     y2 = y1 + CARD_HEIGHT
-    return ALL_CARDS.crop((x1, y1, x2, y2))
+    return ASSETS.image(IMAGE_PATH, mode=None).crop((x1, y1, x2, y2))
 
 
 def as_trinary(card: tuple[int]) -> int:
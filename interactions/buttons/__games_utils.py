@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 import asyncio
+import bisect
 import itertools
 import random
 import re
 from collections import defaultdict
 from collections.abc import Iterable, Iterator, Sequence
-from functools import cached_property, wraps
-from typing import TYPE_CHECKING, Literal, NamedTuple, TypedDict, overload
+from functools import cache, cached_property, wraps
+from typing import TYPE_CHECKING, NamedTuple, TypedDict
 
 from discord.utils import MISSING
 
@@ -16,6 +17,7 @@ import emojis
 from core import Context, Parrot
 from discord.ext import boardgames, commands, old_menus as menus  # type: ignore
 
+from .__connect_four import DEFAULT_DIFFICULTY, DIFFICULTIES, C4Board, C4Engine
 from .__constants import (
     BIG,
     CROSS_EMOJI,
@@ -31,10 +33,16 @@ from .__constants import (
     BoardState,
     Coordinate,
 )
+from .sessions import solve_in_pool
 
 with open("extra/boggle.txt", encoding="utf-8", errors="ignore") as f:
     DICTIONARY = set(f.read().splitlines())
 
+# sorted, the words sharing a prefix are next to each other
+WORDS: tuple[str, ...] = tuple(sorted(DICTIONARY))
+
+MISSED_WORDS_SHOWN = 20
+
 
 class Position(NamedTuple):
     col: int
@@ -53,7 +61,28 @@ class MadlibsTemplate(TypedDict):
     value: list[str]
 
 
+@cache
+def _neighbours(size: int) -> tuple[tuple[int, ...], ...]:
+    """Adjacent cells of every cell of a ``size`` by ``size`` board, cells indexed by ``col * size + row``."""
+    return tuple(
+        tuple(
+            (col + x) * size + row + y
+            for x, y in itertools.product(range(-1, 2), range(-1, 2))
+            if (x or y) and 0 <= col + x < size and 0 <= row + y < size
+        )
+        for col in range(size)
+        for row in range(size)
+    )
+
+
 class BoardBoogle:
+    """A Boggle board, solved once for every word of the dictionary it contains.
+
+    The dictionary is walked as an implicit prefix trie: the words sharing a prefix
+    are a contiguous range of the sorted :data:`WORDS`, and every letter added to the
+    prefix narrows that range with a bisect. A path whose range is empty is pruned.
+    """
+
     def __init__(self, *, size=ORIGINAL, board=None):
         self.size = size
 
@@ -66,51 +95,49 @@ class BoardBoogle:
 
         self.columns = board
 
-    def board_contains(self, word: str, pos: Position = None, passed: list[Position] = None) -> bool:
-        if passed is None:
-            passed = []
-        # Empty words
-        if not word:
-            return True
+    def _letters(self) -> list[str]:
+        letters = []
+        for col in range(self.size):
+            for row in range(self.size):
+                letter = self.columns[col][row]
+                letters.append(DIAGRAPHS[letter] if letter.isdigit() else letter)
+        return letters
 
-        # When starting out
-        if pos is None:
-            # Check all positions
-            for col in range(self.size):
-                for row in range(self.size):
-                    if self.board_contains(word, Position(col, row)):
-                        return True
-
-        elif pos not in passed:
-            # Check if letter matches current start of word
-            letter = self.columns[pos.col][pos.row]
-            if letter.isdigit():
-                letter = DIAGRAPHS[letter]
-
-            if word[: len(letter)] == letter:
-                # Check adjacent for next letter
-                for x, y in itertools.product(range(-1, 2), range(-1, 2)):
-                    # don't check yourself
-                    if x == 0 and y == 0:
-                        continue
-
-                    new_pos = Position(pos.col + x, pos.row + y)
-
-                    # don't check out of bounds
-                    if new_pos.col < 0 or new_pos.col >= self.size or new_pos.row < 0 or new_pos.row >= self.size:
-                        continue
-
-                    if self.board_contains(word[len(letter) :], new_pos, [*passed, pos]):
-                        return True
-
-        # Otherwise cannot find word
-        return False
+    @cached_property
+    def legal_words(self) -> frozenset[str]:
+        """Every word of the dictionary on the board. Solved with one DFS from each cell."""
+        letters = self._letters()
+        neighbours = _neighbours(self.size)
+        found: set[str] = set()
+
+        def search(cell: int, prefix: str, lo: int, hi: int, visited: int) -> None:
+            prefix += letters[cell]
+            lo = bisect.bisect_left(WORDS, prefix, lo, hi)
+            hi = bisect.bisect_right(WORDS, prefix + "\uffff", lo, hi)
+            if lo == hi:
+                return
+
+            if len(prefix) >= 3 and WORDS[lo] == prefix:
+                found.add(prefix)
+
+            visited |= 1 << cell
+            for nxt in neighbours[cell]:
+                if not visited & (1 << nxt):
+                    search(nxt, prefix, lo, hi, visited)
+
+        for cell in range(self.size**2):
+            search(cell, "", 0, len(WORDS), 0)
+        return frozenset(found)
+
+    @cached_property
+    def max_points(self) -> int:
+        return sum(POINTS[len(word)] for word in self.legal_words)
+
+    def board_contains(self, word: str) -> bool:
+        return word.upper() in self.legal_words
 
     def is_legal(self, word: str) -> bool:
-        if len(word) < 3:
-            return False
-        word = word.upper()
-        return False if word not in DICTIONARY else self.board_contains(word)
+        return len(word) >= 3 and word.upper() in self.legal_words
 
     def points(self, word: str) -> int:
         return POINTS[len(word)] if self.is_legal(word) else 0
@@ -146,8 +173,9 @@ class GameBoogle(menus.Menu):
         return await channel.send(content="Boggle game started, you have 3 minutes!", embed=self.state)
 
     async def start(self, *args, **kwargs):
+        # solved before the first guess, every guess is a set lookup
+        await solve_in_pool(lambda: self.board.legal_words)
         await super().start(*args, **kwargs)
-        # await self.bot.loop.run_in_executor(None, lambda: self.board.legal_words)
 
     async def finalize(self, timed_out):
         self.bot.dispatch("boggle_game_complete", self.message.channel)
@@ -158,6 +186,24 @@ class GameBoogle(menus.Menu):
     def check_word(self, word: str) -> bool:
         return self.board.is_legal(word)
 
+    @property
+    def legal_words(self) -> frozenset[str]:
+        return self.board.legal_words
+
+    @property
+    def max_points(self) -> int:
+        return self.board.max_points
+
+    def add_missed_words(self, embed: discord.Embed, found: Iterable[str]) -> discord.Embed:
+        missed = sorted(self.legal_words.difference(found), key=lambda w: (-len(w), w))
+        # an embed holds at most 25 fields
+        if missed and len(embed.fields) < 25:
+            shown = ", ".join(missed[:MISSED_WORDS_SHOWN])
+            more = f" and {len(missed) - MISSED_WORDS_SHOWN} more" if len(missed) > MISSED_WORDS_SHOWN else ""
+            embed.add_field(name="Words you missed", value=f"{shown}{more}"[:1024], inline=False)
+        embed.set_footer(text=f"{len(self.legal_words)} words on the board, worth {self.max_points} points")
+        return embed
+
     async def check_message(self, message: discord.Message):
         raise NotImplementedError
 
@@ -183,6 +229,7 @@ class ShuffflingGame(GameBoogle):
 
             # Shuffle board
             self.shuffle()
+            await solve_in_pool(lambda: self.board.legal_words)
             self.boards.append(self.board)
 
             # Note Board Updated
@@ -212,6 +259,15 @@ class ShuffflingGame(GameBoogle):
 
         return points
 
+    @property
+    def legal_words(self) -> frozenset[str]:
+        return frozenset().union(*(board.legal_words for board in self.boards))
+
+    @property
+    def max_points(self) -> int:
+        # a word on several boards is worth its points once
+        return self.get_points(self.legal_words)
+
 
 class DiscordGame(GameBoogle):
     name = "Discord Boggle"
@@ -268,7 +324,7 @@ class DiscordGame(GameBoogle):
         await super().finalize(timed_out)
         if timed_out:
             await self.message.edit(content="Game Over!")
-            await self.message.reply(embed=self.scores)
+            await self.message.reply(embed=self.add_missed_words(self.scores, self.all_words))
 
 
 class ClassicGame(GameBoogle):
@@ -357,7 +413,7 @@ class ClassicGame(GameBoogle):
             self.over = True
             await asyncio.sleep(10)
             self.filter_lists()
-            await self.message.reply(embed=self.scores)
+            await self.message.reply(embed=self.add_missed_words(self.scores, self.used_words))
 
 
 class FlipGame(ShuffflingGame, DiscordGame):
@@ -492,15 +548,19 @@ class GameC4:
         player2: discord.Member | discord.User | None,
         tokens: list,
         size: int = 7,
+        *,
+        difficulty: str = DEFAULT_DIFFICULTY,
     ):
         self.bot = bot
         self.channel = channel
         self.player1 = player1
-        self.player2 = player2 or AI_C4(self.bot, game=self)
         self.tokens = tokens
 
+        # the grid is what is shown, the board what is played on
         self.grid = self.generate_board(size)
         self.grid_size = size
+        self.board = C4Board(size, size)
+        self.player2 = player2 or AI_C4(self.bot, game=self, difficulty=difficulty)
 
         self.unicode_numbers = [emojis.encode(i) for i in NUMBERS[: self.grid_size]]
 
@@ -555,7 +615,7 @@ class GameC4:
             await self.print_grid()
 
             if isinstance(self.player_active, AI_C4):
-                coords = self.player_active.play()
+                coords = await self.player_active.play()
                 if not coords:
                     await self.game_over(
                         "draw",
@@ -568,7 +628,7 @@ class GameC4:
             if not coords:
                 return
 
-            if self.check_win(coords, 1 if self.player_active == self.player1 else 2):
+            if self.check_win(1 if self.player_active == self.player1 else 2):
                 await self.game_over(
                     "win",
                     self.bot.user if isinstance(self.player_active, AI_C4) else self.player_active,
@@ -576,6 +636,14 @@ class GameC4:
                 )
                 return
 
+            if self.board.is_full():
+                await self.game_over(
+                    "draw",
+                    self.bot.user if isinstance(self.player_active, AI_C4) else self.player_active,
+                    self.bot.user if isinstance(self.player_inactive, AI_C4) else self.player_inactive,
+                )
+                return
+
             self.player_active, self.player_inactive = (
                 self.player_inactive,
                 self.player_active,
@@ -594,7 +662,6 @@ class GameC4:
         message = await self.channel.send(
             f"{self.player_active.mention}, it's your turn! React with the column you want to place your token in.",
         )
-        player_num = 1 if self.player_active == self.player1 else 2
         while True:
             try:
                 reaction, user = await self.bot.wait_for("reaction_add", check=self.predicate, timeout=30.0)
@@ -613,36 +680,20 @@ class GameC4:
                     pass
 
                 column_num = self.unicode_numbers.index(str(reaction.emoji))
-                column = [row[column_num] for row in self.grid]
-
-                for row_num, square in reversed(list(enumerate(column))):
-                    if not square:
-                        self.grid[row_num][column_num] = player_num
-                        return row_num, column_num
+                if self.board.can_play(column_num):
+                    return self.place(column_num)
                 message = await self.channel.send(f"Column {column_num + 1} is full. Try again")
 
-    def check_win(self, coords: Coordinate, player_num: int) -> bool:
-        """Check that placing a counter here would cause the player to win."""
-        vertical = [(-1, 0), (1, 0)]
-        horizontal = [(0, 1), (0, -1)]
-        forward_diag = [(-1, 1), (1, -1)]
-        backward_diag = [(-1, -1), (1, 1)]
-        axes = [vertical, horizontal, forward_diag, backward_diag]
-
-        for axis in axes:
-            counters_in_a_row = 1  # The initial counter that is compared to
-            for row_incr, column_incr in axis:
-                row, column = coords
-                row += row_incr
-                column += column_incr
-
-                while 0 <= row < self.grid_size and 0 <= column < self.grid_size and self.grid[row][column] == player_num:
-                    counters_in_a_row += 1
-                    row += row_incr
-                    column += column_incr
-            if counters_in_a_row >= 4:
-                return True
-        return False
+    def place(self, column: int) -> Coordinate:
+        """Drops a counter of the player to move in ``column``, returns where it landed on the grid."""
+        player_num = 1 if self.board.moves % 2 == 0 else 2
+        row = self.grid_size - 1 - self.board.play(column)
+        self.grid[row][column] = player_num
+        return row, column
+
+    def check_win(self, player_num: int) -> bool:
+        """Check whether the player has four counters in a row."""
+        return self.board.aligned(self.board.stones(player_num))
 
 
 class AI_C4:
@@ -651,150 +702,141 @@ class AI_C4:
     if TYPE_CHECKING:
         from .__constants import Coordinate
 
-    def __init__(self, bot: Parrot, game: GameC4):
+    def __init__(self, bot: Parrot, game: GameC4, *, difficulty: str = DEFAULT_DIFFICULTY):
         self.game = game
         self.mention = bot.user.mention
+        self.depth = DIFFICULTIES[difficulty]
+        # kept for the whole game, its transposition table carries over between turns
+        self.engine = C4Engine(game.grid_size, game.grid_size)
 
-    def get_possible_places(self) -> list[Coordinate]:
-        """Gets all the coordinates where the AI_C4 could possibly place a counter."""
-        possible_coords = []
-        for column_num in range(self.game.grid_size):
-            column = [row[column_num] for row in self.game.grid]
-            for row_num, square in reversed(list(enumerate(column))):
-                if not square:
-                    possible_coords.append((row_num, column_num))
-                    break
-        return possible_coords
-
-    def check_ai_win(self, coord_list: list[Coordinate]) -> Coordinate | None:
-        """
-        Check AI_C4 win.
-        Check if placing a counter in any possible coordinate would cause the AI_C4 to win
-        with 10% chance of not winning and returning None
-        """
-        if random.randint(1, 10) == 1:
-            return None
-        return next(
-            (coords for coords in coord_list if self.game.check_win(coords, 2)),
-            None,
-        )
+    async def play(self) -> Coordinate | bool:
+        """Plays for the AI_C4, searching the best column in a thread."""
+        if self.game.board.is_full():
+            return False
 
-    def check_player_win(self, coord_list: list[Coordinate]) -> Coordinate | None:
-        """
-        Check Player win.
-        Check if placing a counter in possible coordinates would stop the player
-        from winning with 25% of not blocking them  and returning None.
-        """
-        if random.randint(1, 4) == 1:
-            return None
-        return next(
-            (coords for coords in coord_list if self.game.check_win(coords, 1)),
-            None,
-        )
+        result = await solve_in_pool(self.engine.search, self.game.board.copy(), depth=self.depth)
+        return self.game.place(result.column)
 
-    @staticmethod
-    def random_coords(coord_list: list[Coordinate]) -> Coordinate:
-        """Picks a random coordinate from the possible ones."""
-        return random.choice(coord_list)
-
-    def play(self) -> Coordinate | bool:
-        """
-        Plays for the AI_C4.
-        Gets all possible coords, and determins the move:
-        1. coords where it can win.
-        2. coords where the player can win.
-        3. Random coord
-        The first possible value is choosen.
-        """
-        possible_coords = self.get_possible_places()
-
-        if not possible_coords:
-            return False
 
-        coords = (
-            self.check_ai_win(possible_coords)
-            or self.check_player_win(possible_coords)
-            or self.random_coords(possible_coords)
-        )
+# bitmasks of the cells, row by row
+TTT_LINES = (
+    0b000000111,
+    0b000111000,
+    0b111000000,
+    0b001001001,
+    0b010010010,
+    0b100100100,
+    0b100010001,
+    0b001010100,
+)
+TTT_FULL = 0b111111111
+
+# (own | other << 9) -> (score, best cells), for every position reachable in a game
+# where the player to move owns `own`. Built once, on the first lookup
+_TTT_TABLE: dict[int, tuple[int, tuple[int, ...]]] = {}
+
+
+def _ttt_line(mask: int) -> bool:
+    return any(mask & line == line for line in TTT_LINES)
+
+
+def _ttt_solve(own: int, other: int) -> int:
+    # negamax over the whole tree, every position is solved once. Wins score
+    # higher the sooner they happen, losses the later
+    key = own | other << 9
+    if (entry := _TTT_TABLE.get(key)) is not None:
+        return entry[0]
+
+    best = -10
+    cells: list[int] = []
+    taken = own | other
+    for cell in range(9):
+        bit = 1 << cell
+        if taken & bit:
+            continue
 
-        row, column = coords
-        self.game.grid[row][column] = 2
-        return coords
+        mine = own | bit
+        if _ttt_line(mine):
+            score = 10 - (mine | other).bit_count()
+        elif mine | other == TTT_FULL:
+            score = 0
+        else:
+            score = -_ttt_solve(other, mine)
+
+        if score > best:
+            best, cells = score, [cell]
+        elif score == best:
+            cells.append(cell)
+
+    _TTT_TABLE[key] = (best, tuple(cells))
+    return best
+
+
+def perfect_moves(own: int, other: int) -> tuple[int, ...]:
+    """The cells, as ``row * 3 + column``, the player owning ``own`` plays with perfect play."""
+    if not _TTT_TABLE:
+        _ttt_solve(0, 0)
+    return _TTT_TABLE[own | other << 9][1]
 
 
 class Board:
+    """A tic-tac-toe board, as one 9 bit mask per player."""
+
+    __slots__ = ("marks", "current_player", "winner")
+
     def __init__(
         self,
-        state: BoardState,
+        marks: tuple[int, int] = (0, 0),
         current_player: bool = False,
     ) -> None:
-        self.state = state
+        # indexed by the player
+        self.marks = marks
         self.current_player = current_player
         self.winner: bool | None = MISSING
 
+        if _ttt_line(marks[False]):
+            self.winner = False
+        elif _ttt_line(marks[True]):
+            self.winner = True
+        elif marks[False] | marks[True] == TTT_FULL:
+            self.winner = None
+
     @property
-    def legal_moves(self) -> Iterator[tuple[int, int]]:
-        for c, r in itertools.product(range(3), range(3)):
-            if self.state[r][c] is None:
-                yield (r, c)
+    def state(self) -> BoardState:
+        return [[self[r, c] for c in range(3)] for r in range(3)]
 
-    @cached_property
-    def over(self) -> bool:
-        # vertical
-        for c in range(3):
-            token = self.state[0][c]
-            if token is None:
-                continue
-            if self.state[1][c] == token and self.state[2][c] == token:
-                self.winner = token
-                return True
-
-        # horizontal
-        for r in range(3):
-            token = self.state[r][0]
-            if token is None:
-                continue
-            if self.state[r][1] == token and self.state[r][2] == token:
-                self.winner = token
-                return True
-
-        # descending diag
-        if self.state[0][0] is not None:
-            token = self.state[0][0]
-            if self.state[1][1] == token and self.state[2][2] == token:
-                self.winner = token
-                return True
-
-        # ascending diag
-        if self.state[0][2] is not None:
-            token = self.state[0][2]
-            if self.state[1][1] == token and self.state[2][0] == token:
-                self.winner = token
-                return True
-
-        # Check if board is empty
-        for _ in self.legal_moves:
-            break
-        else:
-            self.winner = None
+    def __getitem__(self, cell: tuple[int, int]) -> bool | None:
+        bit = 1 << (cell[0] * 3 + cell[1])
+        if self.marks[False] & bit:
+            return False
+        if self.marks[True] & bit:
             return True
+        return None
 
-        return False
+    @property
+    def legal_moves(self) -> Iterator[tuple[int, int]]:
+        taken = self.marks[False] | self.marks[True]
+        for cell in range(9):
+            if not taken & (1 << cell):
+                yield divmod(cell, 3)
+
+    @property
+    def over(self) -> bool:
+        return self.winner is not MISSING
 
     def move(self, r: int, c: int) -> Board:
-        if (r, c) not in self.legal_moves:
+        bit = 1 << (r * 3 + c)
+        if self.over or (self.marks[False] | self.marks[True]) & bit:
             msg = "Illegal Move"
             raise ValueError(msg)
 
-        new_state = [[self.state[r][c] for c in range(3)] for r in range(3)]
-        new_state[r][c] = self.current_player
-
-        return Board(new_state, not self.current_player)
+        marks = list(self.marks)
+        marks[self.current_player] |= bit
+        return Board((marks[0], marks[1]), not self.current_player)
 
     @classmethod
     def new_game(cls) -> Board:
-        state: BoardState = [[None for _ in range(3)] for _ in range(3)]
-        return cls(state)
+        return cls()
 
 
 class AI:
@@ -807,68 +849,14 @@ class AI:
 
 
 class NegamaxAI(AI):
-    def __init__(self, player: bool) -> None:
-        super().__init__(player)
-
-    def heuristic(self, game: Board, sign: int) -> float:
-        player = not self.player if sign == -1 else self.player
-        if game.over:
-            if game.winner is None:
-                return 0
-            return 1_000_000 if game.winner == player else -1_000_000
-        return random.randint(-10, 10)
-
-    @overload
-    def negamax(
-        self,
-        game: Board,
-        depth: Literal[0] = ...,
-        alpha: float = ...,
-        beta: float = ...,
-        sign: int = ...,
-    ) -> tuple[int, int]:
-        ...
-
-    @overload
-    def negamax(
-        self,
-        game: Board,
-        depth: int = ...,
-        alpha: float = ...,
-        beta: float = ...,
-        sign: int = ...,
-    ) -> float:
-        ...
-
-    def negamax(
-        self,
-        game: Board,
-        depth: int = 0,
-        alpha: float = float("-inf"),
-        beta: float = float("inf"),
-        sign: int = 1,
-    ) -> float | tuple[int, int]:
-        if game.over:
-            return sign * self.heuristic(game, sign)
-
-        move = MISSING
-
-        score = float("-inf")
-        for c in game.legal_moves:
-            move_score = -self.negamax(game.move(*c), depth + 1, -beta, -alpha, -sign)
-
-            if move_score > score:
-                score = move_score
-                move = c
-
-            alpha = max(alpha, score)
-            if alpha >= beta:
-                break
+    """Perfect play, looked up from the solved game tree. Equally good moves are picked randomly."""
 
-        return move if depth == 0 else score
+    def best_move(self, game: Board) -> tuple[int, int]:
+        cells = perfect_moves(game.marks[self.player], game.marks[not self.player])
+        return divmod(random.choice(cells), 3)
 
     def move(self, game: Board) -> Board:
-        return game.move(*self.negamax(game))
+        return game.move(*self.best_move(game))
 
 
 class ButtonTicTacToe(discord.ui.Button["GameTicTacToe"]):
@@ -878,7 +866,7 @@ class ButtonTicTacToe(discord.ui.Button["GameTicTacToe"]):
         self.c = c
 
     def update(self):
-        cell = self.view.board.state[self.r][self.c]
+        cell = self.view.board[self.r, self.c]
 
         if cell is not None or self.view.board.over:
             self.disabled = True
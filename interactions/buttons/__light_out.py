@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-import random
 from typing import TYPE_CHECKING, Final, Literal, TypeVar
 
 import discord
 from core import Context, Parrot
 
-from .__number_slider import DEFAULT_COLOR, DiscordColor, SlideView
+from .__number_slider import DEFAULT_COLOR, DiscordColor, HintButton, SlideView
+from .puzzles import LightsSolver, generate_lights
+from .sessions import solve_in_pool
 from .utils import chunk, double_wait, wait_for_delete
 
 if TYPE_CHECKING:
@@ -84,15 +85,21 @@ class LightsOutView(SlideView):
                 )
                 self.add_item(button)
 
+        # a 5x5 board takes every row
+        if self.game.count < 5:
+            self.add_item(HintButton(row=self.game.count))
+
 
 class LightsOut:
     """Lights Out Game."""
 
-    def __init__(self, count: Literal[1, 2, 3, 4, 5] = 4) -> None:
+    def __init__(self, count: Literal[1, 2, 3, 4, 5] = 4, *, difficulty: str = "medium") -> None:
         if count not in range(1, 6):
             msg = "Count must be an integer between 1 and 5"
             raise ValueError(msg)
 
+        self.difficulty = difficulty
+        self.solver = LightsSolver(count)
         self.moves: int = 0
         self.count = count
 
@@ -102,6 +109,15 @@ class LightsOut:
         self.player: discord.User | None = None
         self.button_style: discord.ButtonStyle = discord.ButtonStyle.green
 
+    def hint(self) -> str:
+        """The next tile to press, on the shortest way to turn every light off."""
+        board = sum(1 << i for i, tile in enumerate(t for row in self.tiles for t in row) if tile is not None)
+        cell = self.solver.hint(board)
+        if cell is None:
+            return "Every light is already off!"
+        row, col = divmod(cell, self.count)
+        return f"Press the tile in row **{row + 1}**, column **{col + 1}**"
+
     def toggle(self, row: int, col: int) -> None:
         self.tiles[row][col] = BULB if self.tiles[row][col] is None else None
 
@@ -144,8 +160,9 @@ class LightsOut:
         self.button_style = button_style
         self.player = ctx.author
 
-        self.tiles = random.choices((None, BULB), k=self.count**2)
-        self.tiles = chunk(self.tiles, count=self.count)
+        # made of random presses, always solvable
+        board = await solve_in_pool(generate_lights, self.count, self.difficulty)
+        self.tiles = chunk([BULB if board >> i & 1 else None for i in range(self.count**2)], count=self.count)
 
         self.view = LightsOutView(self, timeout=timeout)
         self.embed = discord.Embed(description="Turn off all the tiles!", color=embed_color)
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-import asyncio
-import re
+import threading
 from io import BytesIO
 
 import numpy as np
@@ -10,133 +9,216 @@ from PIL import Image
 import discord
 from core import Context
 
-from .__constants import code_dict, codes, selector_back, selector_front
-
-
-def isometric_func(shape, selector_pos=None):
-    """Creates static isometric drawing."""
-    t = 4
-    resx = resy = 1024 * 5
-    canvas = Image.new("RGBA", (resx, resy), (25, 25, 25, 0))
-
-    shape = list(shape)
-    mid = round(resx / 2)
-
-    i = j = lvl = count = 0
-    for row in shape:
-        for val in row:
-            fx = mid + j * t * 7 - i * t * 7
-            fy = mid + j * t * 4 + i * t * 4 - lvl * t * 7
-            # fx = mid + j*t*7 - i*t*7
-            # fy = mid + j*t*6 + i*t*6 - lvl*t*7
-
-            selected = False
-            if [lvl, i, j] == selector_pos:
-                canvas.paste(selector_back, (fx, fy), selector_back)
-                selected = True
-
-            if img := code_dict.get(val):
-                canvas.paste(img, (fx, fy), img)
-
-            if selected:
-                canvas.paste(selector_front, (fx, fy), selector_front)
-
-            j += 1
-            if val == "-":
-                i = -1
-                j = 0
-                lvl += 1
-
-            if val in codes or selected:
-                count += 1
-        j = 0
-        i += 1
-
-    if count == 0:
-        msg = "Did not detect any blocks. Do `j;iso blocks` or `j;help iso` to see available blocks"
-        raise Exception(msg)
-
-    canvasBox = canvas.getbbox()
-    crop = canvas.crop(canvasBox)
-    buf = BytesIO()
-    crop.save(buf, "PNG")
-    buf.seek(0)
-
-    return buf, count
-
-
-def liquid(blocks: str) -> str:
-    blocks = blocks.replace("\n", " ")
-    blocks = blocks.strip()
-    blocks = re.sub(" +", " ", blocks)
-
-    arr = [[[]]]
-    i, j = 0, 0
-    for c in blocks:
-        if c not in [" ", "-"]:
-            arr[i][j].append(c)
-
-        if c == " ":
-            arr[i].append([])
-            j += 1
-
-        if c == "-":
-            arr.append([[]])
-            i += 1
-            j = 0
-
-    arr = [list(filter(lambda x: x != [], lay)) for lay in arr]
-
-    waters = ["2", "░", "▓", "∙"]
-    lavas = ["v", "▒", "█", "·"]
-    for i, lay in enumerate(arr):
-        for j, row in enumerate(lay):
-            for k, el in enumerate(row):
-                if el == "2":
-                    try:
-                        if arr[i + 1][j][k] in waters:
-                            arr[i][j][k] = "░"
-                    except Exception:
-                        pass
-
-                elif el == "v":
-                    try:
-                        if arr[i + 1][j][k] in lavas:
-                            arr[i][j][k] = "▒"
-                    except Exception:
-                        pass
-
-    for i, lay in enumerate(arr):
-        for j, row in enumerate(lay):
-            for k, el in enumerate(row):
-                if el == "2":
-                    try:
-                        if arr[i - 1][j][k] in ["░", "▓"]:
-                            arr[i][j][k] = "∙"
-                    except Exception:
-                        pass
-                elif el == "v":
-                    try:
-                        if arr[i - 1][j][k] in ["▒", "█"]:
-                            arr[i][j][k] = "·"
-                    except Exception:
-                        pass
-                elif el == "░":
-                    try:
-                        if arr[i - 1][j][k] in ["░", "▓"]:
-                            arr[i][j][k] = "▓"
-                    except Exception:
-                        pass
-                elif el == "▒":
-                    try:
-                        if arr[i - 1][j][k] in ["▒", "█"]:
-                            arr[i][j][k] = "█"
-                    except Exception:
-                        pass
-
-    res = "- ".join([" ".join(["".join(row) for row in lay]) for lay in arr])
-    res = res.strip()
-    return re.sub(" +", " ", res)
+from utilities.assets import ASSETS
+
+from .__constants import SELECTOR_BACK, SELECTOR_FRONT, code_dict
+from .sessions import run_in_pool
+
+
+# screen offset of one step along the columns/rows (x, y) and the levels of the grid
+DX = 4 * 7
+DY = 4 * 4
+DZ = 4 * 7
+
+WATERS = ["2", "░", "▓", "∙"]
+LAVAS = ["v", "▒", "█", "·"]
+
+ASSETS.declare_images([SELECTOR_BACK, SELECTOR_FRONT])
+
+BACKGROUND = (25, 25, 25, 0)
+
+Rect = tuple[int, int, int, int]
+
+
+def _origin(lvl: int, i: int, j: int) -> tuple[int, int]:
+    return (j - i) * DX, (j + i) * DY - lvl * DZ
+
+
+def _sprite_size(code: str) -> tuple[int, int]:
+    return code_dict[code].size if code in code_dict else (0, 0)
+
+
+def _selector_size() -> tuple[int, int]:
+    back, front = ASSETS.image(SELECTOR_BACK), ASSETS.image(SELECTOR_FRONT)
+    return max(back.width, front.width), max(back.height, front.height)
+
+
+def _union(a: Rect | None, b: Rect | None) -> Rect | None:
+    if a is None or b is None:
+        return a or b
+    return min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
+
+
+def resolve_liquids(box: np.ndarray) -> np.ndarray:
+    """Water and lava blocks, turned into their full, deep and surface variants by the blocks above and below."""
+    grid = box.copy()
+    for still, full, deep, surface, family in (("2", "░", "▓", "∙", WATERS), ("v", "▒", "█", "·", LAVAS)):
+        if not np.any(box == still):
+            continue
+
+        covered = np.zeros(box.shape, bool)
+        covered[:-1] = np.isin(box[1:], family)
+        grid[(box == still) & covered] = full
+
+        on_liquid = np.zeros(box.shape, bool)
+        on_liquid[1:] = np.isin(grid[:-1], [full, deep])
+        still_mask = (grid == still) & on_liquid
+        full_mask = (grid == full) & on_liquid
+        grid[still_mask] = surface
+        grid[full_mask] = deep
+    return grid
+
+
+class _Cells:
+    """The drawable blocks of a grid, in painting order (level, row, column)."""
+
+    __slots__ = ("shape", "keys", "xs", "ys", "ws", "hs", "sprites")
+
+    def __init__(self, grid: np.ndarray) -> None:
+        self.shape = grid.shape
+        coords = np.argwhere(grid != "0")
+        values = grid[tuple(coords.T)]
+        keep = np.fromiter((v in code_dict for v in values), bool, len(values))
+        coords, values = coords[keep], values[keep]
+
+        lvl, i, j = coords.T
+        self.keys = np.ravel_multi_index((lvl, i, j), grid.shape)
+        self.xs = (j - i) * DX
+        self.ys = (j + i) * DY - lvl * DZ
+        self.sprites: list[Image.Image] = [code_dict[v] for v in values]
+        self.ws = np.fromiter((img.width for img in self.sprites), np.int64, len(self.sprites))
+        self.hs = np.fromiter((img.height for img in self.sprites), np.int64, len(self.sprites))
+
+    def __len__(self) -> int:
+        return len(self.sprites)
+
+    def bbox(self) -> Rect | None:
+        if not self.sprites:
+            return None
+        return (
+            int(self.xs.min()),
+            int(self.ys.min()),
+            int((self.xs + self.ws).max()),
+            int((self.ys + self.hs).max()),
+        )
+
+    def paint(self, rect: Rect, selector: tuple[int, int, int] | None = None) -> Image.Image:
+        """A tile of ``rect``, painted from scratch with every block covering it, and the selector at its turn."""
+        x0, y0, x1, y1 = rect
+        selector_back, selector_front = ASSETS.image(SELECTOR_BACK), ASSETS.image(SELECTOR_FRONT)
+        tile = Image.new("RGBA", (x1 - x0, y1 - y0), BACKGROUND)
+        idx = np.flatnonzero((self.xs < x1) & (self.xs + self.ws > x0) & (self.ys < y1) & (self.ys + self.hs > y0))
+
+        if selector is not None:
+            sel_key = int(np.ravel_multi_index(selector, self.shape))
+            sx, sy = _origin(*selector)
+            sel_at = (sx - x0, sy - y0)
+        pending = selector is not None
+
+        for n in idx:
+            sprite = self.sprites[n]
+            at = (int(self.xs[n]) - x0, int(self.ys[n]) - y0)
+            if pending and self.keys[n] >= sel_key:
+                pending = False
+                tile.paste(selector_back, sel_at, selector_back)
+                if self.keys[n] == sel_key:
+                    tile.paste(sprite, at, sprite)
+                    tile.paste(selector_front, sel_at, selector_front)
+                    continue
+                tile.paste(selector_front, sel_at, selector_front)
+            tile.paste(sprite, at, sprite)
+
+        if pending:
+            tile.paste(selector_back, sel_at, selector_back)
+            tile.paste(selector_front, sel_at, selector_front)
+        return tile
+
+
+class IsometricRenderer:
+    """Renders ``box[level, row, column]`` as an isometric drawing.
+
+    The canvas is only as large as the blocks (and the selector) cover. The blocks are kept
+    rendered as a scene: a move of the selector re-paints only the tile under it, and a placed
+    or destroyed block re-paints only the tiles of the blocks which changed.
+    """
+
+    def __init__(self, box: np.ndarray) -> None:
+        self.box = box
+
+        self._lock = threading.Lock()
+        self._grid: np.ndarray | None = None
+        self._cells: _Cells | None = None
+        self._scene: Image.Image | None = None
+        self._scene_rect: Rect | None = None
+
+    def _update_scene(self) -> _Cells:
+        grid = resolve_liquids(self.box)
+        if self._grid is not None and self._cells is not None:
+            changed = np.argwhere(grid != self._grid)
+            if not len(changed):
+                return self._cells
+        else:
+            changed = None
+
+        cells = _Cells(grid)
+        rect = cells.bbox()
+        if changed is None or rect is None or rect != self._scene_rect:
+            self._scene = cells.paint(rect) if rect is not None else None
+        else:
+            dirty: Rect | None = None
+            for lvl, i, j in changed:
+                x, y = _origin(int(lvl), int(i), int(j))
+                # the old sprite must be covered as well as the new one
+                old_w, old_h = _sprite_size(self._grid[lvl, i, j])
+                new_w, new_h = _sprite_size(grid[lvl, i, j])
+                dirty = _union(dirty, (x, y, x + max(old_w, new_w), y + max(old_h, new_h)))
+            assert dirty is not None and self._scene is not None
+
+            # the blocks did not outgrow the scene, nothing outside of it needs a re-paint
+            dirty = (max(dirty[0], rect[0]), max(dirty[1], rect[1]), min(dirty[2], rect[2]), min(dirty[3], rect[3]))
+            if dirty[0] < dirty[2] and dirty[1] < dirty[3]:
+                self._scene.paste(cells.paint(dirty), (dirty[0] - rect[0], dirty[1] - rect[1]))
+
+        self._grid, self._cells, self._scene_rect = grid, cells, rect
+        return cells
+
+    def render(self, selector_pos: list[int] | None = None) -> tuple[BytesIO, int]:
+        """The drawing as PNG, and the count of blocks (and the selector) drawn."""
+        with self._lock:
+            cells = self._update_scene()
+            count = len(cells)
+            rect = self._scene_rect
+
+            if selector_pos is not None:
+                selector = (selector_pos[0], selector_pos[1], selector_pos[2])
+                code = self._grid[selector]  # type: ignore
+                if code not in code_dict:
+                    count += 1
+
+                sx, sy = _origin(*selector)
+                w, h = (max(a, b) for a, b in zip(_selector_size(), _sprite_size(code), strict=True))
+                sel_rect = (sx, sy, sx + w, sy + h)
+                rect = _union(rect, sel_rect)
+
+            if count == 0 or rect is None:
+                msg = "Did not detect any blocks. Do `j;iso blocks` or `j;help iso` to see available blocks"
+                raise Exception(msg)
+
+            if rect == self._scene_rect:
+                canvas = self._scene.copy()  # type: ignore
+            else:
+                canvas = Image.new("RGBA", (rect[2] - rect[0], rect[3] - rect[1]), BACKGROUND)
+                if self._scene is not None and self._scene_rect is not None:
+                    canvas.paste(self._scene, (self._scene_rect[0] - rect[0], self._scene_rect[1] - rect[1]))
+
+            if selector_pos is not None:
+                canvas.paste(cells.paint(sel_rect, selector), (sel_rect[0] - rect[0], sel_rect[1] - rect[1]))
+
+        crop = canvas.crop(canvas.getbbox())
+        buf = BytesIO()
+        crop.save(buf, "PNG")
+        buf.seek(0)
+        return buf, count
 
 
 class BlockSelector(discord.ui.Select["Minecraft"]):
@@ -205,6 +287,7 @@ class Minecraft(discord.ui.View):
         super().__init__(timeout=None)
         self.ctx = ctx
         self.box = np.zeros(shape, np.uint8).astype(str)
+        self.renderer = IsometricRenderer(self.box)
         self.block = "1"
         self.selector_pos = selector_pos or [i // 2 for i in shape]
         self.prev_pos = None
@@ -293,11 +376,7 @@ class Minecraft(discord.ui.View):
         self.destroy_btn.disabled = self.box[tuple(self.selector_pos)] == "0"
         self.finish_btn.disabled = np.all(self.box == "0")  # type: ignore
 
-        code = "- ".join([" ".join(["".join(row) for row in lay]) for lay in self.box])
-        if "2" in code or "v" in code:
-            code = liquid(code)
-
-        buf, c = await asyncio.to_thread(isometric_func, code.split(), self.selector_pos)
+        buf, c = await run_in_pool(self.renderer.render, self.selector_pos)
         c -= 1
         buf_file = discord.File(buf, "interactive_iso.png")
 
@@ -345,12 +424,7 @@ class Minecraft(discord.ui.View):
         await self.update(interaction)
 
     async def finish(self, interaction: discord.Interaction):
-        code = "- ".join([" ".join(["".join(row) for row in lay]) for lay in self.box])
-
-        if "2" in code or "v" in code:
-            code = liquid(code)
-
-        buf, _ = await asyncio.to_thread(isometric_func, code.split())
+        buf, _ = await run_in_pool(self.renderer.render)
         await self.ctx.reply(file=discord.File(buf, "interactive_iso.png"), mention_author=False)
 
         for child in self.children[:]:
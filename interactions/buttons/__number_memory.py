@@ -6,10 +6,11 @@ import string
 from io import BytesIO
 
 import arrow
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 
 import discord
 from discord.ext import commands
+from utilities.assets import ASSETS
 
 from .utils import *
 
@@ -105,7 +106,7 @@ class NumberMemory:
         self.number = self.generate_number()
 
         self._text_size = font_size
-        self._font = ImageFont.truetype("extra/ClearSans-Bold.ttf", self._text_size)
+        self._font = ASSETS.font("extra/ClearSans-Bold.ttf", self._text_size)
 
     @executor()
     def generate_image(self) -> BytesIO:
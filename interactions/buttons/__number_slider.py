@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import random
 from typing import TYPE_CHECKING, Literal, TypeVar
 
 import discord
@@ -17,6 +16,8 @@ if TYPE_CHECKING:
     Board: TypeAlias = list[list[int | None]]
 
 
+from .puzzles import SliderSolver, generate_slider
+from .sessions import SESSIONS, solve_in_pool
 from .utils import DEFAULT_COLOR, BaseView, DiscordColor, chunk, double_wait, wait_for_delete
 
 
@@ -63,14 +64,34 @@ class SlideButton(discord.ui.Button["SlideView"]):
         return await interaction.response.edit_message(embed=game.embed, view=self.view)
 
 
+class HintButton(discord.ui.Button["SlideView"]):
+    def __init__(self, *, row: int) -> None:
+        super().__init__(label="Hint", style=discord.ButtonStyle.blurple, row=row)
+
+    async def callback(self, interaction: discord.Interaction) -> None:
+        assert self.view is not None
+
+        game = self.view.game
+        if interaction.user != game.player:
+            return await interaction.response.send_message("This is not your game!", ephemeral=True)
+        if retry := SESSIONS.hint_cooldown(interaction.user.id):
+            return await interaction.response.send_message(f"You can have another hint in {retry:.1f}s.", ephemeral=True)
+
+        text = await solve_in_pool(game.hint)
+        return await interaction.response.send_message(text, ephemeral=True)
+
+
 class NumberSlider:
     """Number Slider Game."""
 
-    def __init__(self, count: Literal[1, 2, 3, 4, 5] = 4) -> None:
+    def __init__(self, count: Literal[1, 2, 3, 4, 5] = 4, *, difficulty: str = "medium") -> None:
         if count not in range(1, 6):
             msg = "Count must be an integer between 1 and 5"
             raise ValueError(msg)
 
+        self.difficulty = difficulty
+        self.solver = SliderSolver(count)
+
         self.all_numbers: list[int | None] = list(range(1, count**2))
 
         self.player: discord.Member | discord.User | None = None
@@ -83,6 +104,13 @@ class NumberSlider:
         self.wrong_style: discord.ButtonStyle = discord.ButtonStyle.gray
         self.correct_style: discord.ButtonStyle = discord.ButtonStyle.green
 
+    def hint(self) -> str:
+        """The next slide towards the solution. Blocking, meant to be run in a thread."""
+        tile = self.solver.hint(tuple(n or 0 for row in self.numbers for n in row))
+        if tile is None:
+            return "The board is already solved!"
+        return f"Slide the tile **{tile}**"
+
     def get_item(self, obj: int | None = None) -> tuple[int, int]:
         return next((x, y) for x, row in enumerate(self.numbers) for y, item in enumerate(row) if item == obj)
 
@@ -111,12 +139,9 @@ class NumberSlider:
         self.wrong_style = wrong_style
         self.correct_style = correct_style
 
-        numbers = self.all_numbers[:]
-        random.shuffle(numbers)
-        random.shuffle(numbers)
-
-        numbers.append(None)
-        self.numbers = chunk(numbers, count=self.count)
+        # scrambled by random slides, always solvable
+        tiles = await solve_in_pool(generate_slider, self.count, self.difficulty)
+        self.numbers = chunk([n or None for n in tiles], count=self.count)
 
         self.completed = chunk(self.all_numbers + [None], count=self.count)
 
@@ -158,3 +183,7 @@ class SlideView(BaseView):
                     row=i,
                 )
                 self.add_item(button)
+
+        # a 5x5 board takes every row
+        if self.game.count < 5:
+            self.add_item(HintButton(row=self.game.count))
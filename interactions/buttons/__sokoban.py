@@ -2,9 +2,37 @@ from __future__ import annotations
 
 import time
 
+from aiofile import async_open
+
 import discord
 from core import Context
 
+from .puzzles import SokobanLevel, SokobanSolver, SokobanState
+from .sessions import SESSIONS, solve_in_pool
+
+# levels shipped in extra/sokoban
+LEVEL_COUNT = 10
+
+# level number -> parsed level, each file is read and preprocessed once
+_LEVELS: dict[int, SokobanLevel] = {}
+
+
+async def load_level(number: int) -> SokobanLevel:
+    if number not in _LEVELS:
+        async with async_open(f"extra/sokoban/level{number}.txt", "r") as fp:
+            _LEVELS[number] = SokobanLevel.parse(await fp.read())
+    return _LEVELS[number]
+
+
+def verify_level(level: SokobanLevel) -> str:
+    """Whether the level was solved within the solver's budget. Blocking, meant to be run in a thread."""
+    start = time.perf_counter()
+    solution = SokobanSolver(level).solve(level.player, level.boxes)
+    elapsed = time.perf_counter() - start
+    if solution is None:
+        return f"no solution found ({elapsed:.2f}s)"
+    return f"{len(solution.moves)} moves, {solution.pushes} pushes ({solution.nodes:,} states, {elapsed:.2f}s)"
+
 
 class SokobanGame:
     """The real sokoban game."""
@@ -18,122 +46,51 @@ class SokobanGame:
         "x": ":x:",  # TODO: change the "x"
     }
 
-    # Do not DM me or mail me how this works
-    # Thing is, I myself forget
-    def __init__(self, level: list[list[str]]) -> None:
+    def __init__(self, level: SokobanLevel) -> None:
         self.level = level
-        self.player = []
-        self.blocks = []
-        self.target = []
+        self.state = SokobanState(level)
+        self.solver = SokobanSolver(level)
 
     def __repr__(self) -> str:
         return self.show()
 
     def display_board(self) -> str:
-        main = ""
-        for i in self.level:
-            for j in i:
-                main += self.legend[j]
-            main += "\n"
-        return main
-
-    def _get_cords(self):
-        self.player, self.blocks = [], []
-        for index, i in enumerate(self.level):
-            for _index, j in enumerate(i):
-                if j == "@":
-                    self.player = [index, _index]
-                if j in ("$", "x"):
-                    self.blocks.append([index, _index])
-                if j in (".", "x"):
-                    self.target.append([index, _index])
+        blank = self.legend[" "]
+        return "".join("".join(self.legend.get(char, blank) for char in row) + "\n" for row in self.state.rows())
 
     def show(self) -> str:
-        main = ""
-        for i in self.level:
-            for j in i:
-                main += str(j)
-            main += "\n"
-        return main
-
-    def move_up(self) -> None:
-        if self.level[self.player[0] - 1][self.player[1]] in (" ", "."):
-            self.level[self.player[0] - 1][self.player[1]] = "@"
-            return self._move_up_h()
-        if (self.level[self.player[0] - 1][self.player[1]] in ("$", "x")) and (
-            self.level[self.player[0] - 2][self.player[1]] in (" ", ".")
-        ):
-            self.level[self.player[0] - 1][self.player[1]] = "@"
-            self.level[self.player[0] - 2][self.player[1]] = (
-                "$" if self.level[self.player[0] - 2][self.player[1]] == " " else "x"
-            )
-            return self._move_up_h()
-
-    def _move_up_h(self):
-        self.level[self.player[0]][self.player[1]] = " " if self.player not in self.target else "."
-        self.player = [self.player[0] - 1, self.player[1]]
-
-    def move_down(self) -> None:
-        if self.level[self.player[0] + 1][self.player[1]] in (" ", "."):
-            self.level[self.player[0] + 1][self.player[1]] = "@"
-            return self._move_down_h()
-        if (self.level[self.player[0] + 1][self.player[1]] in ("$", "x")) and (
-            self.level[self.player[0] + 2][self.player[1]] in (" ", ".")
-        ):
-            self.level[self.player[0] + 1][self.player[1]] = "@"
-            self.level[self.player[0] + 2][self.player[1]] = (
-                "$" if self.level[self.player[0] + 2][self.player[1]] == " " else "x"
-            )
-            return self._move_down_h()
-
-    def _move_down_h(self):
-        self.level[self.player[0]][self.player[1]] = " " if self.player not in self.target else "."
-        self.player = [self.player[0] + 1, self.player[1]]
-
-    def move_left(self) -> None:
-        if self.level[self.player[0]][self.player[1] - 1] in (" ", "."):
-            self.level[self.player[0]][self.player[1] - 1] = "@"
-            return self._move_left_h()
-        if (self.level[self.player[0]][self.player[1] - 1] in ("$", "x")) and (
-            self.level[self.player[0]][self.player[1] - 2] in (" ", ".")
-        ):
-            self.level[self.player[0]][self.player[1] - 1] = "@"
-            self.level[self.player[0]][self.player[1] - 2] = (
-                "$" if self.level[self.player[0]][self.player[1] - 2] == " " else "x"
-            )
-            return self._move_left_h()
-
-    def _move_left_h(self):
-        self.level[self.player[0]][self.player[1]] = " " if self.player not in self.target else "."
-        self.player = [self.player[0], self.player[1] - 1]
-
-    def move_right(self) -> None:
-        if self.level[self.player[0]][self.player[1] + 1] in (" ", "."):
-            self.level[self.player[0]][self.player[1] + 1] = "@"
-            return self._move_right_h()
-        if (self.level[self.player[0]][self.player[1] + 1] in ("$", "x")) and (
-            self.level[self.player[0]][self.player[1] + 2] in (" ", ".")
-        ):
-            self.level[self.player[0]][self.player[1] + 1] = "@"
-            self.level[self.player[0]][self.player[1] + 2] = (
-                "$" if self.level[self.player[0]][self.player[1] + 2] == " " else "x"
-            )
-            return self._move_right_h()
-
-    def _move_right_h(self):
-        self.level[self.player[0]][self.player[1]] = " " if self.player not in self.target else "."
-        self.player = [self.player[0], self.player[1] + 1]
+        return "".join(f"{row}\n" for row in self.state.rows())
+
+    def move_up(self) -> bool:
+        return self.state.move("up")
+
+    def move_down(self) -> bool:
+        return self.state.move("down")
+
+    def move_left(self) -> bool:
+        return self.state.move("left")
+
+    def move_right(self) -> bool:
+        return self.state.move("right")
+
+    def undo(self) -> bool:
+        return self.state.undo()
+
+    def reset(self) -> None:
+        self.state.reset()
 
     def is_game_over(self) -> bool:
-        self.player = []
-        self.blocks = []
-        for index, i in enumerate(self.level):
-            for _index, j in enumerate(i):
-                if j == "@":
-                    self.player = [index, _index]
-                if j in ("$", "x"):
-                    self.blocks.append([index, _index])
-        return self.target == self.blocks
+        return self.state.is_solved()
+
+    def hint(self) -> str:
+        """Blocking, meant to be run in a thread."""
+        if self.state.is_stuck():
+            return "A box is stuck where it can not reach any target, undo or reset."
+
+        direction = self.solver.hint(self.state)
+        if direction is None:
+            return "Could not find a way to finish from here in time, try undoing a few moves."
+        return f"Try moving **{direction}**."
 
 
 class SokobanGameView(discord.ui.View):
@@ -149,12 +106,14 @@ class SokobanGameView(discord.ui.View):
         super().__init__(timeout=timeout)
         self.user = user
         self.game = game
-        self._original_game = game
         self.level = level or 1
         self.ctx = ctx
 
         self.ini = time.perf_counter()
-        self.moves = 0
+
+    @property
+    def moves(self) -> int:
+        return self.game.state.moves
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         if self.user == interaction.user:
@@ -165,10 +124,21 @@ class SokobanGameView(discord.ui.View):
         )
         return False
 
+    def make_embed(self) -> discord.Embed:
+        state = self.game.state
+        footer = f"User: {self.user} | Moves: {state.moves} | Pushes: {state.pushes}"
+        if state.is_stuck():
+            footer += " | A box is stuck, undo or reset"
+        return discord.Embed(
+            title="Sokoban Game",
+            description=f"{self.game.display_board()}",
+            timestamp=discord.utils.utcnow(),
+        ).set_footer(text=footer)
+
     def make_win_embed(self) -> discord.Embed:
         embed = (
             discord.Embed(title="You win! :tada:", timestamp=discord.utils.utcnow())
-            .set_footer(text=f"User: {self.user}")
+            .set_footer(text=f"User: {self.user} | Moves: {self.moves} | Pushes: {self.game.state.pushes}")
         )
         embed.description = f"{self.game.display_board()}"
         embed.add_field(
@@ -177,6 +147,14 @@ class SokobanGameView(discord.ui.View):
         )
         return embed
 
+    async def _update(self, interaction: discord.Interaction) -> None:
+        if self.game.is_game_over():
+            self.stop()
+            await interaction.response.edit_message(embed=self.make_win_embed(), view=None)
+            return
+
+        await interaction.response.edit_message(embed=self.make_embed(), view=self)
+
     @discord.ui.button(
         emoji="\N{REGIONAL INDICATOR SYMBOL LETTER R}",
         label="\u200b",
@@ -184,34 +162,13 @@ class SokobanGameView(discord.ui.View):
         disabled=False,
     )
     async def null_button(self, interaction: discord.Interaction, _: discord.ui.Button):
-        self.game = self._original_game
-        embed = (
-            discord.Embed(
-                title="Sokoban Game",
-                description=f"{self.game.display_board()}",
-                timestamp=discord.utils.utcnow(),
-            )
-            .set_footer(text=f"User: {self.user}")
-        )
-        await interaction.response.edit_message(embed=embed, view=self)
+        self.game.reset()
+        await interaction.response.edit_message(embed=self.make_embed(), view=self)
 
     @discord.ui.button(emoji="\N{UPWARDS BLACK ARROW}", style=discord.ButtonStyle.red, disabled=False)
     async def upward(self, interaction: discord.Interaction, _: discord.ui.Button):
-        self.moves += 1
         self.game.move_up()
-        embed = (
-            discord.Embed(
-                title="Sokoban Game",
-                description=f"{self.game.display_board()}",
-                timestamp=discord.utils.utcnow(),
-            )
-            .set_footer(text=f"User: {self.user}")
-        )
-
-        if self.game.is_game_over():
-            await interaction.response.edit_message(embed=self.make_win_embed(), view=None)
-
-        await interaction.response.edit_message(embed=embed, view=self)
+        await self._update(interaction)
 
     @discord.ui.button(
         emoji="\N{REGIONAL INDICATOR SYMBOL LETTER Q}",
@@ -232,21 +189,8 @@ class SokobanGameView(discord.ui.View):
         row=1,
     )
     async def left(self, interaction: discord.Interaction, _: discord.ui.Button):
-        self.moves += 1
         self.game.move_left()
-        embed = (
-            discord.Embed(
-                title="Sokoban Game",
-                description=f"{self.game.display_board()}",
-                timestamp=discord.utils.utcnow(),
-            )
-            .set_footer(text=f"User: {self.user}")
-        )
-
-        if self.game.is_game_over():
-            await interaction.response.edit_message(embed=self.make_win_embed(), view=None)
-
-        await interaction.response.edit_message(embed=embed, view=self)
+        await self._update(interaction)
 
     @discord.ui.button(
         emoji="\N{DOWNWARDS BLACK ARROW}",
@@ -256,21 +200,8 @@ class SokobanGameView(discord.ui.View):
         row=1,
     )
     async def downward(self, interaction: discord.Interaction, _: discord.ui.Button):
-        self.moves += 1
         self.game.move_down()
-        embed = (
-            discord.Embed(
-                title="Sokoban Game",
-                description=f"{self.game.display_board()}",
-                timestamp=discord.utils.utcnow(),
-            )
-            .set_footer(text=f"User: {self.user}")
-        )
-
-        if self.game.is_game_over():
-            await interaction.response.edit_message(embed=self.make_win_embed(), view=None)
-
-        await interaction.response.edit_message(embed=embed, view=self)
+        await self._update(interaction)
 
     @discord.ui.button(
         emoji="\N{BLACK RIGHTWARDS ARROW}",
@@ -280,29 +211,29 @@ class SokobanGameView(discord.ui.View):
         row=1,
     )
     async def right(self, interaction: discord.Interaction, _: discord.ui.Button):
-        self.moves += 1
         self.game.move_right()
-        embed = (
-            discord.Embed(
-                title="Sokoban Game",
-                description=f"{self.game.display_board()}",
-                timestamp=discord.utils.utcnow(),
-            )
-            .set_footer(text=f"User: {self.user}")
-        )
+        await self._update(interaction)
 
-        if self.game.is_game_over():
-            await interaction.response.edit_message(embed=self.make_win_embed(), view=None)
+    @discord.ui.button(
+        emoji="\N{LEFTWARDS ARROW WITH HOOK}",
+        label="\u200b",
+        style=discord.ButtonStyle.secondary,
+        disabled=False,
+        row=2,
+    )
+    async def undo(self, interaction: discord.Interaction, _: discord.ui.Button):
+        self.game.undo()
+        await interaction.response.edit_message(embed=self.make_embed(), view=self)
+
+    @discord.ui.button(label="Hint", style=discord.ButtonStyle.blurple, disabled=False, row=2)
+    async def hint(self, interaction: discord.Interaction, _: discord.ui.Button):
+        if retry := SESSIONS.hint_cooldown(interaction.user.id):
+            return await interaction.response.send_message(f"You can have another hint in {retry:.1f}s.", ephemeral=True)
 
-        await interaction.response.edit_message(embed=embed, view=self)
+        # the solver may take a few seconds, longer than an interaction can wait for its response
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        text = await solve_in_pool(self.game.hint)
+        await interaction.followup.send(text, ephemeral=True)
 
     async def start(self, ctx: Context):
-        await ctx.send(
-            embed=discord.Embed(
-                title="Sokoban Game",
-                description=f"{self.game.display_board()}",
-                timestamp=discord.utils.utcnow(),
-            )
-            .set_footer(text=f"User: {self.user}"),
-            view=self,
-        )
+        await ctx.send(embed=self.make_embed(), view=self)
@@ -1,40 +1,29 @@
 from __future__ import annotations
 
-import itertools
-import random
-from typing import TYPE_CHECKING, TypeVar
+from typing import TYPE_CHECKING
 
 import discord
 
+from .puzzles import generate_sudoku, is_solved, sudoku_hint
+from .sessions import solve_in_pool
+
 if TYPE_CHECKING:
     from core import Context
 
-T = TypeVar("T")
-
 
 class Sudoku:
     def __init__(self, base: int = 3) -> None:
         self.base: int = base
         self.side = base**2
 
-        self.rows = [g * base + r for g in self.suffle(list(range(base))) for r in self.suffle(list(range(base)))]
-        self.cols = [g * base + c for g in self.suffle(list(range(base))) for c in self.suffle(list(range(base)))]
-
-        self.nums = self.suffle(list(range(1, base**2 + 1)))
-
-        self.board = [[self.nums[self.pattern(r, c)] for c in self.cols] for r in self.rows]
-        self.original_board = self.board.copy()
+        self.board: list[list[int]] = [[0] * self.side for _ in range(self.side)]
+        self.original_board = [row.copy() for row in self.board]
+        self.solution: list[int] = []
 
         self._current_row = 0
         self._current_col = 0
 
-        self._changeable_positions = []
-
-    def pattern(self, r: int, c: int) -> int:
-        return (self.base * (r % self.base) + r // self.base + c) % self.side
-
-    def suffle(self, s: list[T]) -> list[T]:
-        return random.sample(s, len(s))
+        self._changeable_positions: set[tuple[int, int]] = set()
 
     def expand_line(self, line: str) -> str:
         return line[0] + line[5:9].join([line[1:5] * (self.base - 1)] * self.base) + line[9:]
@@ -84,12 +73,24 @@ class Sudoku:
 
         return str(board)
 
-    def generate_board(self) -> None:
-        squares = self.side * self.side
-        empties = squares * 3 // 4
-        for p in random.sample(range(squares), empties):
-            self.board[p // self.side][p % self.side] = 0
-            self._changeable_positions.append((p // self.side, p % self.side))
+    def generate_board(self, difficulty: str = "medium") -> None:
+        """Generates a puzzle with a unique solution. Blocking, meant to be run in a thread."""
+        puzzle, self.solution = generate_sudoku(difficulty, base=self.base)
+        self.board = [puzzle[r * self.side : (r + 1) * self.side] for r in range(self.side)]
+        self.original_board = [row.copy() for row in self.board]
+        self._changeable_positions = {(r, c) for r, row in enumerate(self.board) for c, n in enumerate(row) if not n}
+
+    def hint(self) -> tuple[int, int, int] | None:
+        """Fills the next cell, a wrong one first, and moves the cursor there."""
+        flat = [n for row in self.board for n in row]
+        if (found := sudoku_hint(flat, self.solution, base=self.base)) is None:
+            return None
+
+        index, number = found
+        row, col = divmod(index, self.side)
+        self.board[row][col] = number
+        self.cursor_position = row, col
+        return row, col, number
 
     def place_number_at(self, row: int, col: int, number: int) -> None:
         self.board[row][col] = number
@@ -100,24 +101,7 @@ class Sudoku:
         self.board[self._current_row][self._current_col] = number
 
     def checker(self) -> bool:
-        def line_ok(e):
-            if len(set(e)) != 9:
-                return False
-            for i in range(len(e)):
-                if e[i] not in range(1, 10):
-                    return False
-            return True
-
-        bad_rows = [False for row in self.board if not line_ok(row)]
-        grid = list(zip(*self.board))
-        bad_cols = [False for col in grid if not line_ok(col)]
-        squares = []
-        for i in range(0, 9, 3):
-            for j in range(0, 9, 3):
-                square = list(itertools.chain.from_iterable(row[j : j + 3] for row in grid[i : i + 3]))
-                squares.append(square)
-        bad_squares = [False for sq in squares if not line_ok(sq)]
-        return not any([bad_rows, bad_cols, bad_squares])
+        return is_solved([n for row in self.board for n in row], base=self.base)
 
     def move_cursor_at(self, row: int, col: int) -> None:
         if row < 0 or row > self.side - 1:
@@ -181,7 +165,7 @@ class Sudoku:
         self.board[self._current_row][self._current_col] = 0
 
     def reset(self) -> None:
-        self.board = self.original_board.copy()
+        self.board = [row.copy() for row in self.original_board]
         self._current_row = 0
         self._current_col = 0
 
@@ -213,11 +197,11 @@ class SudokuView(discord.ui.View):
     message: discord.Message
     ctx: Context
 
-    def __init__(self, timeout: float | None = 300) -> None:
+    def __init__(self, timeout: float | None = 300, *, difficulty: str = "medium") -> None:
         super().__init__(timeout=timeout)
 
         self.game = Sudoku()
-        self.game.generate_board()
+        self.difficulty = difficulty
 
     def init(self):
         for i in range(1, 5 + 1):
@@ -348,6 +332,15 @@ class SudokuView(discord.ui.View):
     async def __null_5(self, interaction: discord.Interaction, _: discord.ui.Button):
         return
 
+    @discord.ui.button(
+        label="Hint",
+        style=discord.ButtonStyle.primary,
+        row=4,
+    )
+    async def hint(self, interaction: discord.Interaction, _: discord.ui.Button):
+        self.game.hint()
+        await interaction.response.edit_message(content=self.game.display_board("discord"), view=self)
+
     @discord.ui.button(
         label="Submit",
         style=discord.ButtonStyle.success,
@@ -367,6 +360,7 @@ class SudokuView(discord.ui.View):
         self,
         ctx: Context,
     ) -> None:
+        await solve_in_pool(self.game.generate_board, self.difficulty)
         self.init()
         self.ctx = ctx
         self.message = await ctx.send(self.game.display_board("discord"), view=self)
@@ -3,19 +3,30 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
+import math
+from collections import Counter
+from collections.abc import Callable, Sequence
+from functools import cache
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
     from typing import TypeAlias
 
+    # one mark per letter
+    Marks: TypeAlias = tuple[int, ...]
+
 import random
 from io import BytesIO
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 
 import discord
 from core import Context, Parrot
 
+from utilities.assets import ASSETS
+
+from .sessions import SESSIONS, run_in_pool, solve_in_pool
 from .utils import DEFAULT_COLOR, BaseView
 
 DiscordColor: TypeAlias = discord.Color | int
@@ -33,8 +44,126 @@ ORANGE = (200, 179, 87)
 GREEN = (105, 169, 99)
 LGRAY = (198, 201, 205)
 
+FONT_PATH = "extra/HelveticaNeuBold.ttf"
+ASSETS.declare_font(FONT_PATH, 55)
+
 with open(r"extra/5_words.txt", encoding="utf-8", errors="ignore") as f:
-    VALID_WORDS = tuple(f.read().splitlines())
+    WORD_LIST: tuple[str, ...] = tuple(sorted({w.strip().lower() for w in f.read().splitlines() if len(w.strip()) == 5}))
+VALID_WORDS: frozenset[str] = frozenset(WORD_LIST)
+
+ABSENT, PRESENT, CORRECT = 0, 1, 2
+MARK_COLORS = {ABSENT: GRAY, PRESENT: ORANGE, CORRECT: GREEN}
+
+# above this many candidates, the hint ranks them by letter frequency instead of
+# building their full pattern table
+ENTROPY_LIMIT = 400
+# words outside of the candidates, tried as guesses in the pattern table
+PROBES = 100
+
+
+def score_guess(guess: str, answer: str) -> Marks:
+    """The marks of ``guess`` against ``answer``.
+
+    A letter is marked present only as many times as it is left in the answer
+    once the correct letters are taken out, so a repeated letter is not marked
+    twice for a single occurrence.
+    """
+    marks = [ABSENT] * len(guess)
+    left: dict[str, int] = {}
+    for i, (g, a) in enumerate(zip(guess, answer, strict=True)):
+        if g == a:
+            marks[i] = CORRECT
+        else:
+            left[a] = left.get(a, 0) + 1
+
+    for i, g in enumerate(guess):
+        if marks[i] == ABSENT and left.get(g):
+            marks[i] = PRESENT
+            left[g] -= 1
+    return tuple(marks)
+
+
+class WordleSolver:
+    """The words still possible after some guesses, and the best guess to narrow them down.
+
+    With few candidates left, the pattern table of every candidate against the
+    others is built and the guess splitting them the most (highest entropy) is
+    suggested. With many, the candidate with the most common letters is.
+    """
+
+    def __init__(self, words: Sequence[str] = WORD_LIST) -> None:
+        self.words = words
+        self.candidates: list[str] = list(words)
+        self.seen = 0
+
+    def __repr__(self) -> str:
+        return f"<WordleSolver candidates={len(self.candidates)}>"
+
+    def update(self, history: list[tuple[str, Marks]]) -> None:
+        """Applies the guesses of ``history`` not applied yet."""
+        for guess, marks in history[self.seen :]:
+            self.candidates = [word for word in self.candidates if score_guess(guess, word) == marks]
+        self.seen = len(history)
+
+    def _weights(self) -> Callable[[str], int]:
+        letters: Counter[str] = Counter()
+        positional: list[Counter[str]] = [Counter() for _ in range(5)]
+        for word in self.candidates:
+            letters.update(set(word))
+            for i, letter in enumerate(word):
+                positional[i][letter] += 1
+
+        def weight(word: str) -> int:
+            return sum(letters[letter] for letter in set(word)) + sum(positional[i][letter] for i, letter in enumerate(word))
+
+        return weight
+
+    def _by_entropy(self) -> str:
+        # the candidates, and the words sharing the most letters with them; those can
+        # split a family of candidates differing by one letter faster than any of its words
+        weight = self._weights()
+        probes = heapq.nlargest(PROBES, self.words, key=weight)
+        guesses = dict.fromkeys([*self.candidates, *probes])
+
+        total = len(self.candidates)
+        possible = set(self.candidates)
+        best, best_entropy = self.candidates[0], -1.0
+        for guess in guesses:
+            table = Counter(score_guess(guess, answer) for answer in self.candidates)
+            entropy = -sum(n / total * math.log2(n / total) for n in table.values())
+            # a candidate may be the answer itself, it wins the ties
+            if guess in possible:
+                entropy += 1 / total
+            if entropy > best_entropy:
+                best, best_entropy = guess, entropy
+        return best
+
+    def suggest(self) -> str | None:
+        if not self.candidates:
+            return None
+        if len(self.candidates) <= 2:
+            return self.candidates[0]
+        if len(self.candidates) > ENTROPY_LIMIT:
+            return max(self.candidates, key=self._weights())
+        return self._by_entropy()
+
+
+@cache
+def _empty_board() -> Image.Image:
+    # the empty tiles, every game draws its rows on a copy
+    img = Image.new("RGB", (WIDTH, HEIGHT), (255, 255, 255))
+    cursor = ImageDraw.Draw(img)
+    for i in range(6):
+        for j in range(5):
+            x, y = BORDER + j * (SQ + SPACE), BORDER + i * (SQ + SPACE)
+            cursor.rectangle((x, y, x + SQ, y + SQ), outline=LGRAY, width=4)
+    return img
+
+
+def _hint_message(suggestion: str | None, left: int) -> str:
+    if suggestion is None:
+        return "No word in the list fits your guesses, no hint this time."
+    return f"**{left}** possible words left, try: **{suggestion}**"
 
 
 class Wordle:
@@ -43,51 +172,56 @@ class Wordle:
 
         self._valid_words = VALID_WORDS
         self._text_size = text_size
-        self._font = ImageFont.truetype(r"extra/HelveticaNeuBold.ttf", self._text_size)
+        self._font = ASSETS.font(FONT_PATH, self._text_size)
 
         self.guesses: list[list[dict[str, str]]] = []
-        self.word: str = random.choice(self._valid_words)
+        self.history: list[tuple[str, Marks]] = []
+        self.word: str = random.choice(WORD_LIST)
+
+        self._canvas: Image.Image | None = None
+        # rows of `guesses` already drawn on the canvas
+        self._drawn = 0
+        self._solver: WordleSolver | None = None
+
+    def is_valid(self, guess: str) -> bool:
+        return guess in self._valid_words
 
     def parse_guess(self, guess: str) -> bool:
-        self.guesses.append([])
-        for ind, letter in enumerate(guess):
-            if letter in self.word:
-                color = GREEN if self.word[ind] == letter else ORANGE
-            else:
-                color = GRAY
-            self.guesses[-1].append({"letter": letter, "color": color})
+        marks = score_guess(guess, self.word)
+        self.history.append((guess, marks))
+        self.guesses.append([{"letter": letter, "color": MARK_COLORS[mark]} for letter, mark in zip(guess, marks, strict=True)])
 
         return guess == self.word
 
+    def hint(self) -> tuple[str | None, int]:
+        """The suggested guess, and how many words are still possible. Blocking, run it in a thread."""
+        if self._solver is None:
+            self._solver = WordleSolver()
+        self._solver.update(self.history)
+        return self._solver.suggest(), len(self._solver.candidates)
+
     def render_image(self) -> BytesIO:
-        with Image.new("RGB", (WIDTH, HEIGHT), (255, 255, 255)) as img:
-            cursor = ImageDraw.Draw(img)
-
-            x = y = BORDER
-            for i in range(6):
-                for j in range(5):
-                    try:
-                        letter = self.guesses[i][j]
-                        color = letter["color"]
-                        act_letter = letter["letter"]
-                    except (IndexError, KeyError):
-                        cursor.rectangle((x, y, x + SQ, y + SQ), outline=LGRAY, width=4)
-                    else:
-                        cursor.rectangle((x, y, x + SQ, y + SQ), width=0, fill=color)
-                        cursor.text(
-                            (x + SQ / 2, y + SQ / 2),
-                            act_letter.upper(),
-                            font=self._font,
-                            anchor="mm",
-                            fill=(255, 255, 255),
-                        )
-
-                    x += SQ + SPACE
-                x = BORDER
-                y += SQ + SPACE
-
-            buf = BytesIO()
-            img.save(buf, "PNG")
+        if self._canvas is None:
+            self._canvas = _empty_board().copy()
+
+        # only the rows guessed since the last render are drawn
+        cursor = ImageDraw.Draw(self._canvas)
+        for i in range(self._drawn, len(self.guesses)):
+            y = BORDER + i * (SQ + SPACE)
+            for j, letter in enumerate(self.guesses[i]):
+                x = BORDER + j * (SQ + SPACE)
+                cursor.rectangle((x, y, x + SQ, y + SQ), width=0, fill=letter["color"])
+                cursor.text(
+                    (x + SQ / 2, y + SQ / 2),
+                    letter["letter"].upper(),
+                    font=self._font,
+                    anchor="mm",
+                    fill=(255, 255, 255),
+                )
+        self._drawn = len(self.guesses)
+
+        buf = BytesIO()
+        self._canvas.save(buf, "PNG")
         buf.seek(0)
         return buf
 
@@ -100,10 +234,10 @@ class Wordle:
     ) -> discord.Message | None:
         self.embed_color = embed_color
 
-        buf = await asyncio.to_thread(self.render_image)
+        buf = await run_in_pool(self.render_image)
 
         embed = discord.Embed(title="Wordle!", color=self.embed_color)
-        embed.description = "`QUIT` to end the game"
+        embed.description = "`QUIT` to end the game, `HINT` for a suggestion"
         embed.set_image(url="attachment://wordle.png")
 
         message: discord.Message = await ctx.send(embed=embed, file=discord.File(buf, "wordle.png"))
@@ -111,8 +245,10 @@ class Wordle:
         while True:
 
             def check(m: discord.Message) -> bool:
-                return (len(m.content) == 5 and m.author == ctx.author and m.channel == ctx.channel) or (
-                    m.content.lower() == "quit"
+                return (
+                    m.author == ctx.author
+                    and m.channel == ctx.channel
+                    and (len(m.content) == 5 or m.content.lower() in ("quit", "hint"))
                 )
 
             try:
@@ -124,20 +260,28 @@ class Wordle:
             if content.upper() == "QUIT":
                 return await ctx.send(f"Game over! You quit! Word was: {self.word}")
 
-            if content not in self._valid_words:
+            if content.upper() == "HINT":
+                if retry := SESSIONS.hint_cooldown(ctx.author.id):
+                    await ctx.send(f"You can have another hint in {retry:.1f}s.")
+                    continue
+                suggestion, left = await solve_in_pool(self.hint)
+                await ctx.send(_hint_message(suggestion, left))
+                continue
+
+            if not self.is_valid(content):
                 await ctx.send(
                     "That is not a valid word!",
                 )
             else:
                 won = self.parse_guess(content)
-                buf = await asyncio.to_thread(self.render_image)
+                buf = await run_in_pool(self.render_image)
 
                 await message.delete()
 
                 embed = discord.Embed(
                     title="Wordle!",
                     color=self.embed_color,
-                    description="`QUIT` to end the game",
+                    description="`QUIT` to end the game, `HINT` for a suggestion",
                     timestamp=ctx.message.created_at,
                 )
                 embed.set_footer(text=f"{ctx.author}")
@@ -169,13 +313,13 @@ class WordInput(discord.ui.Modal, title="Word Input"):
     async def on_submit(self, interaction: discord.Interaction) -> None:
         assert interaction.message is not None
 
-        content = str(self.word.value).lower()
+        content = str(self.word.value).strip().lower()
         game = self.view.game
 
-        if content not in game._valid_words:
+        if not game.is_valid(content):
             return await interaction.response.send_message("That is not a valid word!", ephemeral=True)
         won = game.parse_guess(content)
-        buf = await asyncio.to_thread(game.render_image)
+        buf = await run_in_pool(game.render_image)
 
         embed = discord.Embed(title="Wordle!", color=self.view.game.embed_color)
         embed.set_image(url="attachment://wordle.png")
@@ -218,12 +362,30 @@ class WordInputButton(discord.ui.Button["WordleView"]):
         return
 
 
+class HintButton(discord.ui.Button["WordleView"]):
+    def __init__(self) -> None:
+        super().__init__(label="Hint", style=discord.ButtonStyle.gray)
+
+    async def callback(self, interaction: discord.Interaction) -> None:
+        assert isinstance(self.view, WordleView)
+
+        game = self.view.game
+        if interaction.user != game.player:
+            return await interaction.response.send_message("This isn't your game!", ephemeral=True)
+        if retry := SESSIONS.hint_cooldown(interaction.user.id):
+            return await interaction.response.send_message(f"You can have another hint in {retry:.1f}s.", ephemeral=True)
+
+        suggestion, left = await solve_in_pool(game.hint)
+        await interaction.response.send_message(_hint_message(suggestion, left), ephemeral=True)
+
+
 class WordleView(BaseView):
     def __init__(self, game: BetaWordle, *, timeout: float | None) -> None:
         super().__init__(timeout=timeout)
 
         self.game = game
         self.add_item(WordInputButton())
+        self.add_item(HintButton())
         self.add_item(WordInputButton(cancel_button=True))
 
 
@@ -259,7 +421,7 @@ class BetaWordle(Wordle):
         self.embed_color = embed_color
         self.player = ctx.author
 
-        buf = await asyncio.to_thread(self.render_image)
+        buf = await run_in_pool(self.render_image)
         embed = discord.Embed(title="Wordle!", color=self.embed_color)
         embed.set_image(url="attachment://wordle.png")
 
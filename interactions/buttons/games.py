@@ -15,13 +15,14 @@ from pathlib import Path
 from random import choice
 from typing import Any, Literal
 
-from aiofile import async_open
 from discord.utils import MISSING
+from tabulate import tabulate
 
 import discord
 import emojis
 from core import Cog, Context, Parrot
 from discord.ext import boardgames, commands  # type: ignore
+from utilities.assets import ASSETS
 from utilities.constants import Colours
 from utilities.converters import convert_bool
 from utilities.uno.game import UNO
@@ -32,6 +33,7 @@ from .__battleship import BetaBattleShip
 from .__black_jack import BlackJackView
 from .__chess import Chess
 from .__chimp import ChimpTest
+from .__connect_four import DEFAULT_DIFFICULTY, benchmark as c4_benchmark
 from .__constants import _2048_GAME, CHOICES, CROSS_EMOJI, EMOJI_CHECK, HAND_RAISED_EMOJI, SHORT_CHOICES, WINNER_DICT, Emojis
 from .__country_guess import BetaCountryGuesser
 from .__duckgame import (
@@ -66,12 +68,17 @@ from .__games_utils import (
 )
 from .__light_out import LightsOut
 from .__memory_game import MemoryGame
-from .__minecraft import Minecraft, isometric_func
+from .__minecraft import Minecraft
 from .__number_memory import NumberMemory
 from .__number_slider import NumberSlider
-from .__sokoban import SokobanGame, SokobanGameView
+from .__sokoban import LEVEL_COUNT as SOKOBAN_LEVELS
+from .__sokoban import SokobanGame, SokobanGameView, load_level, verify_level
+from .__sudoku import SudokuView
 from .__verbal_memory import VerbalMemory
 from .__wordle import BetaWordle
+from .puzzles import SokobanLevel
+from .puzzles import benchmark as puzzle_benchmark
+from .sessions import SESSIONS, run_in_pool
 from .secret_hitler.ui.join import JoinUI
 
 emoji = emojis  # Idk
@@ -101,6 +108,33 @@ class Games(Cog):
         self.current_games: dict[int, DuckGame] = {}
         self.uno_games: dict[int, UNO] = {}
 
+    async def cog_load(self) -> None:
+        # decoded off the event loop, so that the first game does not wait on the disk
+        self.bot.defer_until_ready("games.assets", lambda: asyncio.to_thread(ASSETS.warm))
+        SESSIONS.start()
+
+    async def cog_unload(self) -> None:
+        SESSIONS.stop()
+
+    async def cog_check(self, ctx: Context) -> bool:
+        if ctx.command and ctx.command.hidden:
+            return True
+        return SESSIONS.check(ctx)
+
+    async def cog_before_invoke(self, ctx: Context) -> None:
+        SESSIONS.open(ctx)
+
+    async def cog_after_invoke(self, ctx: Context) -> None:
+        SESSIONS.release(ctx)
+
+    @Cog.listener()
+    async def on_view_sent(self, ctx: Context, view: discord.ui.View, message: discord.Message) -> None:
+        SESSIONS.attach(ctx, view, message)
+
+    @Cog.listener()
+    async def on_interaction(self, interaction: discord.Interaction) -> None:
+        SESSIONS.touch(interaction)
+
     @staticmethod
     def _load_templates() -> list[MadlibsTemplate]:
         madlibs_stories = Path("extra/madlibs_templates.json")
@@ -265,13 +299,15 @@ class Games(Cog):
         board_size: int,
         emoji1: Any,
         emoji2: Any,
+        *,
+        difficulty: str = DEFAULT_DIFFICULTY,
     ) -> None:
         """Helper for playing a game of connect four."""
         self.tokens = [":white_circle:", emoji1, emoji2]
         game = None  # if game fails to intialize in try...except
 
         try:
-            game = GameC4(self.bot, ctx.channel, ctx.author, user, self.tokens, size=board_size)
+            game = GameC4(self.bot, ctx.channel, ctx.author, user, self.tokens, size=board_size, difficulty=difficulty)
             self.games_c4.append(game)
             await game.start_game()
             self.games_c4.remove(game)
@@ -358,8 +394,11 @@ class Games(Cog):
         board_size: int = 7,
         emoji1: EMOJI_CHECK = "\N{LARGE BLUE CIRCLE}",
         emoji2: EMOJI_CHECK = "\N{LARGE RED CIRCLE}",
+        difficulty: Literal["easy", "medium", "hard", "expert"] = DEFAULT_DIFFICULTY,
     ) -> None:
-        """Play Connect Four against a computer player."""
+        """Play Connect Four against a computer player.
+        `difficulty`: How far ahead the computer looks. One of `easy`, `medium`, `hard` and `expert`.
+        """
         check, emoji = self.check_emojis(emoji1, emoji2)
         if not check:
             raise commands.EmojiNotFound(emoji)
@@ -368,7 +407,18 @@ class Games(Cog):
         if not check_author_result:
             return
 
-        await self._play_game(ctx, None, board_size, emoji1, emoji2)
+        await self._play_game(ctx, None, board_size, emoji1, emoji2, difficulty=difficulty)
+
+    @connect_four.command(name="bench", hidden=True)
+    @commands.is_owner()
+    async def connect_four_bench(self, ctx: Context, depth: int = 6, positions: int = 20, board_size: int = 7) -> None:
+        """Searches random positions with the Connect Four engine, for its speed."""
+        stats = await asyncio.to_thread(c4_benchmark, positions=positions, depth=depth, size=board_size)
+        await ctx.send(
+            f"Searched **{stats['positions']}** positions to depth **{depth}** on a {board_size}x{board_size} board: "
+            f"**{stats['nodes']}** nodes in **{stats['seconds']:.2f}s** "
+            f"(**{stats['nodes_per_second']:,.0f}** nodes/s)",
+        )
 
     @commands.command(aliases=["akinator"])
     @commands.bot_has_permissions(embed_links=True, add_reactions=True)
@@ -521,13 +571,9 @@ class Games(Cog):
         if ctx.invoked_subcommand:
             return
         level = level or 1
-        if not 10 >= level >= 1:
-            return await ctx.send(f"{ctx.author.mention} for now existing levels are from range 1-10")
-        async with async_open(f"extra/sokoban/level{level or 1}.txt", "r") as fp:
-            lvl_str = await fp.read()
-        ls = [list(i) for i in lvl_str.split("\n")]
-        game = SokobanGame(ls)
-        game._get_cords()
+        if not SOKOBAN_LEVELS >= level >= 1:
+            return await ctx.send(f"{ctx.author.mention} for now existing levels are from range 1-{SOKOBAN_LEVELS}")
+        game = SokobanGame(await load_level(level))
         main_game = SokobanGameView(game, ctx.author, level=level, ctx=ctx)
         await main_game.start(ctx)
 
@@ -539,13 +585,25 @@ class Games(Cog):
         - Your level must have only and only 1 character (`@`)
         - There should be equal number of `.` (target) and `$` (box)
         """
-        level = text.strip("```")
-        ls = [list(i) for i in level.split("\n")]
-        game = SokobanGame(ls)
-        game._get_cords()
+        try:
+            level = SokobanLevel.parse(text.strip("`"))
+        except ValueError as e:
+            return await ctx.send(f"{ctx.author.mention} {e}")
+        game = SokobanGame(level)
         main_game = SokobanGameView(game, ctx.author, level=None, ctx=ctx)
         await main_game.start(ctx)
 
+    @sokoban.command(name="verify", hidden=True)
+    @commands.is_owner()
+    async def verify_sokoban(self, ctx: Context):
+        """Solves every shipped level, to check each one can be finished"""
+        async with ctx.typing():
+            lines = []
+            for number in range(1, SOKOBAN_LEVELS + 1):
+                result = await asyncio.to_thread(verify_level, await load_level(number))
+                lines.append(f"**Level {number}**: {result}")
+        await ctx.send("\n".join(lines))
+
     @commands.command(name="2048")
     async def _2048(self, ctx: Context, *, boardsize: int = None):
         """Classis 2048 Game"""
@@ -648,9 +706,52 @@ class Games(Cog):
 
     @commands.command()
     @commands.max_concurrency(1, commands.BucketType.user)
-    async def slidingpuzzle(self, ctx: Context, boardsize: Literal[1, 2, 3, 4, 5] = 4):
+    async def slidingpuzzle(
+        self,
+        ctx: Context,
+        boardsize: Literal[1, 2, 3, 4, 5] = 4,
+        difficulty: Literal["easy", "medium", "hard"] = "medium",
+    ):
         """A Classic Sliding game"""
-        await NumberSlider(boardsize).start(ctx)
+        await NumberSlider(boardsize, difficulty=difficulty).start(ctx)
+
+    @commands.command()
+    @commands.max_concurrency(1, commands.BucketType.user)
+    async def sudoku(self, ctx: Context, difficulty: Literal["easy", "medium", "hard"] = "medium"):
+        """Sudoku, with exactly one solution"""
+        await SudokuView(difficulty=difficulty).start(ctx)
+
+    @commands.command(hidden=True)
+    @commands.is_owner()
+    async def puzzlebench(self, ctx: Context, difficulty: Literal["easy", "medium", "hard"] = "medium"):
+        """Puzzles generated per second, for each puzzle game"""
+        rates = await asyncio.to_thread(puzzle_benchmark, difficulty=difficulty)
+        await ctx.send("\n".join(f"**{name}**: {rate:,.1f}/s" for name, rate in rates.items()))
+
+    @commands.command(hidden=True)
+    @commands.is_owner()
+    async def gamesessions(self, ctx: Context, limit: int = 10):
+        """Running games, the memory they hold and the time spent rendering"""
+        stats = SESSIONS.to_dict()
+        games = sorted(stats["games"].items(), key=lambda kv: kv[1]["bytes"], reverse=True)[:limit]
+        render = list(stats["render"].items())[:limit]
+
+        builder = [
+            f"Active: {stats['active']} | Held: {stats['bytes'] / 1024 ** 2:.2f} MiB | Refused: {stats['refused']}",
+            f"Evicted: {', '.join(f'{k} {v}' for k, v in stats['evicted'].items()) or 'none'}",
+            "",
+            tabulate(
+                [(name[:30], g["active"], g["started"], f"{g['bytes'] / 1024:.1f}") for name, g in games],
+                headers=["Game", "Active", "Started", "KiB"],
+                tablefmt="psql",
+            ),
+            tabulate(
+                [(name[-40:], h["count"], h["mean_ms"], h["p95_ms"]) for name, h in render],
+                headers=["Rendering", "Calls", "Mean ms", "P95 ms"],
+                tablefmt="psql",
+            ),
+        ]
+        await ctx.send("```sql\n" + "\n".join(builder)[:1900] + "```")
 
     @commands.group(invoke_without_command=True)
     @boggle_game(DiscordGame)
@@ -811,9 +912,14 @@ class Games(Cog):
 
     @commands.command(aliases=["lightsout"])
     @commands.max_concurrency(1, per=commands.BucketType.user)
-    async def lightout(self, ctx: Context, count: Literal[1, 2, 3, 4, 5] = 4):
+    async def lightout(
+        self,
+        ctx: Context,
+        count: Literal[1, 2, 3, 4, 5] = 4,
+        difficulty: Literal["easy", "medium", "hard"] = "medium",
+    ):
         """Light Out Game"""
-        lg = LightsOut(count)
+        lg = LightsOut(count, difficulty=difficulty)
         await lg.start(ctx, timeout=120)
 
     @commands.command()
@@ -950,7 +1056,7 @@ class Games(Cog):
         """Create and send an embed to display the board."""
         image = assemble_board_image(game.board, game.rows, game.columns)
         with io.BytesIO() as image_stream:
-            await asyncio.to_thread(image.save, image_stream, format="png")
+            await run_in_pool(image.save, image_stream, format="png")
             image_stream.seek(0)
             file = discord.File(fp=image_stream, filename="board.png")
         embed = discord.Embed(
@@ -1066,9 +1172,8 @@ class Games(Cog):
     async def minecraft(self, ctx: Context):
         """Minecraft game."""
         interactive_view = Minecraft(ctx, [50, 50, 50])
-        code = "- ".join([" ".join(["".join(row) for row in lay]) for lay in interactive_view.box])
 
-        buf, c = await asyncio.to_thread(isometric_func, code.split(), interactive_view.selector_pos)
+        buf, c = await run_in_pool(interactive_view.renderer.render, interactive_view.selector_pos)
         c -= 1
         buf_file = discord.File(buf, "interactive_iso.png")
         # link = await ctx.upload_bytes(buf.getvalue(), 'image/png', 'interactive_iso')
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import random
+from collections.abc import Callable
+from time import perf_counter
+
+from .lights import LightsSolver, generate_lights
+from .slider import SliderSolver, generate_slider, is_solvable
+from .sokoban import SokobanLevel, SokobanSolver, SokobanState
+from .sudoku import SudokuSolver, generate_sudoku, is_solved, sudoku_hint
+
+__all__ = (
+    "LightsSolver",
+    "SliderSolver",
+    "SokobanLevel",
+    "SokobanSolver",
+    "SokobanState",
+    "SudokuSolver",
+    "generate_lights",
+    "generate_slider",
+    "generate_sudoku",
+    "is_solvable",
+    "is_solved",
+    "sudoku_hint",
+    "benchmark",
+    "DIFFICULTY_LEVELS",
+)
+
+DIFFICULTY_LEVELS = ("easy", "medium", "hard")
+
+
+def benchmark(*, seconds: float = 1.0, difficulty: str = "medium", seed: int = 0) -> dict[str, float]:
+    """Puzzles generated per second, for each kind. Blocking, meant to be run in a thread."""
+    rng = random.Random(seed)
+    kinds: dict[str, Callable[[], object]] = {
+        "sudoku": lambda: generate_sudoku(difficulty, rng=rng),
+        # generated and solved, the solution is what the hints are made of
+        "slider 4x4": lambda: SliderSolver(4).solve(generate_slider(4, difficulty, rng=rng)),
+        "lights out 5x5": lambda: generate_lights(5, difficulty, rng=rng),
+    }
+
+    rates: dict[str, float] = {}
+    for name, func in kinds.items():
+        count = 0
+        start = perf_counter()
+        while (elapsed := perf_counter() - start) < seconds:
+            func()
+            count += 1
+        rates[name] = count / elapsed
+    return rates
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import random
+from functools import cache
+
+__all__ = ("LightsSolver", "generate_lights", "DIFFICULTIES")
+
+# difficulty -> share of the cells pressed by the shortest solution
+DIFFICULTIES: dict[str, float] = {
+    "easy": 0.2,
+    "medium": 0.4,
+    "hard": 0.6,
+}
+# boards drawn, looking for one whose shortest solution has the wanted length
+ATTEMPTS = 50
+
+
+@cache
+def _effects(size: int) -> tuple[int, ...]:
+    # cell -> mask of the cells a press on it toggles
+    out = []
+    for i in range(size * size):
+        r, c = divmod(i, size)
+        mask = 1 << i
+        for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+            if 0 <= nr < size and 0 <= nc < size:
+                mask |= 1 << (nr * size + nc)
+        out.append(mask)
+    return tuple(out)
+
+
+class LightsSolver:
+    """Solves lights out as a linear system over GF(2), one bitmask per equation.
+
+    A cell is lit if it is toggled an odd number of times, so the presses solving a
+    board are the solutions of ``A x = b``, ``A`` being the press effects. Some board
+    sizes have more than one solution, the one with the fewest presses is kept.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.cells = size * size
+        self.effects = _effects(size)
+
+    def __repr__(self) -> str:
+        return f"<LightsSolver size={self.size}>"
+
+    def press(self, board: int, cell: int) -> int:
+        return board ^ self.effects[cell]
+
+    def solve(self, board: int) -> int | None:
+        """The mask of the cells to press, fewest first, ``None`` if the board has no solution."""
+        n = self.cells
+        # row i: the presses toggling cell i, and whether cell i is lit on bit n. The
+        # effects are symmetric, the presses toggling cell i are the cells i toggles
+        rows = [self.effects[i] | ((board >> i & 1) << n) for i in range(n)]
+
+        pivots: list[int] = []
+        r = 0
+        for col in range(n):
+            bit = 1 << col
+            pivot = next((i for i in range(r, n) if rows[i] & bit), None)
+            if pivot is None:
+                continue
+            rows[r], rows[pivot] = rows[pivot], rows[r]
+            for i in range(n):
+                if i != r and rows[i] & bit:
+                    rows[i] ^= rows[r]
+            pivots.append(col)
+            r += 1
+
+        if any(rows[i] >> n & 1 for i in range(r, n)):
+            return None
+
+        # the free presses are 0 in the particular solution
+        solution = 0
+        for i, col in enumerate(pivots):
+            if rows[i] >> n & 1:
+                solution |= 1 << col
+
+        # every free press gives one solution of A x = 0
+        free = [col for col in range(n) if col not in pivots]
+        kernel = []
+        for f in free:
+            vector = 1 << f
+            for i, col in enumerate(pivots):
+                if rows[i] >> f & 1:
+                    vector |= 1 << col
+            kernel.append(vector)
+
+        best = solution
+        for combo in range(1, 1 << len(kernel)):
+            candidate = solution
+            for j, vector in enumerate(kernel):
+                if combo >> j & 1:
+                    candidate ^= vector
+            if candidate.bit_count() < best.bit_count():
+                best = candidate
+        return best
+
+    def hint(self, board: int) -> int | None:
+        """The cell to press next, on the shortest way to turn every light off."""
+        presses = self.solve(board)
+        if not presses:
+            return None
+        return (presses & -presses).bit_length() - 1
+
+
+def generate_lights(size: int, difficulty: str = "medium", *, rng: random.Random | None = None) -> int:
+    """A board made of random presses, so it always has a solution.
+
+    Boards are drawn until the shortest solution is as long as ``difficulty`` asks,
+    the closest one is kept otherwise.
+    """
+    rng = rng or random.Random()
+    solver = LightsSolver(size)
+    wanted = max(1, round(DIFFICULTIES[difficulty] * solver.cells))
+
+    best_board, best_gap = 0, solver.cells + 1
+    for _ in range(ATTEMPTS):
+        board = 0
+        for cell in rng.sample(range(solver.cells), wanted):
+            board = solver.press(board, cell)
+        if not board:
+            continue
+
+        presses = solver.solve(board)
+        assert presses is not None
+        gap = abs(presses.bit_count() - wanted)
+        if gap < best_gap:
+            best_board, best_gap = board, gap
+            if not gap:
+                break
+    return best_board
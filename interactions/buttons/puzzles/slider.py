@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import heapq
+import random
+from functools import cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import TypeAlias
+
+    # tiles row by row, 0 for the blank
+    Tiles: TypeAlias = tuple[int, ...]
+
+__all__ = ("SliderSolver", "generate_slider", "is_solvable", "DIFFICULTIES")
+
+# difficulty -> random moves scrambling the solved board
+DIFFICULTIES: dict[str, int] = {
+    "easy": 10,
+    "medium": 30,
+    "hard": 150,
+}
+# nodes searched for an optimal solution, before settling for a short one
+OPTIMAL_NODES = 200_000
+# weights of the heuristic when settling, tried in order while each stays under the node limit.
+# The last one is close to a greedy search, and is always run to the end
+WEIGHTS = (3, 6, 12)
+WEIGHTED_NODES = 50_000
+
+
+@cache
+def _neighbours(size: int) -> tuple[tuple[int, ...], ...]:
+    out = []
+    for i in range(size * size):
+        r, c = divmod(i, size)
+        around = ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1))
+        out.append(tuple(nr * size + nc for nr, nc in around if 0 <= nr < size and 0 <= nc < size))
+    return tuple(out)
+
+
+def goal(size: int) -> Tiles:
+    return (*range(1, size * size), 0)
+
+
+def is_solvable(tiles: Tiles, size: int) -> bool:
+    """Whether ``tiles`` can be slid back in order, by the parity of its inversions."""
+    numbers = [t for t in tiles if t]
+    inversions = sum(1 for i, a in enumerate(numbers) for b in numbers[i + 1 :] if a > b)
+    if size % 2:
+        return inversions % 2 == 0
+    blank_row_from_bottom = size - tiles.index(0) // size
+    return (inversions + blank_row_from_bottom) % 2 == 1
+
+
+class SliderSolver:
+    """Solves the sliding puzzle with IDA*, over the Manhattan distance of the tiles.
+
+    The search is optimal, up to :data:`OPTIMAL_NODES` nodes. Past those, a weighted
+    A* finds a short solution instead. The last solution is kept, the hints of a
+    player following it are lookups.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.neighbours = _neighbours(size)
+        # distance[tile][cell], tile 0 costs nothing
+        cells = size * size
+        self.distance = [[0] * cells for _ in range(cells)]
+        for tile in range(1, cells):
+            gr, gc = divmod(tile - 1, size)
+            for cell in range(cells):
+                r, c = divmod(cell, size)
+                self.distance[tile][cell] = abs(r - gr) + abs(c - gc)
+
+        # state -> the tile to slide next, along the last solution
+        self._plan: dict[Tiles, int] = {}
+
+    def __repr__(self) -> str:
+        return f"<SliderSolver size={self.size}>"
+
+    def heuristic(self, tiles: Tiles) -> int:
+        distance = self.distance
+        return sum(distance[tile][cell] for cell, tile in enumerate(tiles))
+
+    def _ida(self, tiles: Tiles, max_nodes: int) -> list[int] | None:
+        state = list(tiles)
+        blank = state.index(0)
+        distance = self.distance
+        neighbours = self.neighbours
+        path: list[int] = []
+        nodes = 0
+
+        def search(blank: int, g: int, h: int, bound: int, previous: int) -> int:
+            # returns -1 once solved, the smallest bound exceeded otherwise
+            nonlocal nodes
+            nodes += 1
+            f = g + h
+            if f > bound:
+                return f
+            if h == 0:
+                return -1
+            if nodes > max_nodes:
+                raise OverflowError
+
+            smallest = 1 << 30
+            for cell in neighbours[blank]:
+                if cell == previous:
+                    continue
+                tile = state[cell]
+                new_h = h - distance[tile][cell] + distance[tile][blank]
+                state[blank], state[cell] = tile, 0
+                path.append(tile)
+                t = search(cell, g + 1, new_h, bound, blank)
+                if t == -1:
+                    return -1
+                path.pop()
+                state[blank], state[cell] = 0, tile
+                smallest = min(smallest, t)
+            return smallest
+
+        h = bound = self.heuristic(tiles)
+        try:
+            while True:
+                t = search(blank, 0, h, bound, -1)
+                if t == -1:
+                    return path
+                bound = t
+        except OverflowError:
+            return None
+
+    def _weighted(self, tiles: Tiles, weight: int, max_nodes: int | None) -> list[int] | None:
+        start = tuple(tiles)
+        target = goal(self.size)
+        parents: dict[Tiles, tuple[Tiles, int] | None] = {start: None}
+        costs = {start: 0}
+        heap = [(weight * self.heuristic(start), 0, start)]
+        nodes = 0
+        while heap:
+            _, g, state = heapq.heappop(heap)
+            if state == target:
+                break
+            if g > costs[state]:
+                continue
+            nodes += 1
+            if max_nodes is not None and nodes > max_nodes:
+                return None
+            blank = state.index(0)
+            for cell in self.neighbours[blank]:
+                new = list(state)
+                new[blank], new[cell] = new[cell], 0
+                key = tuple(new)
+                if key not in costs or g + 1 < costs[key]:
+                    costs[key] = g + 1
+                    parents[key] = (state, state[cell])
+                    heapq.heappush(heap, (g + 1 + weight * self.heuristic(key), g + 1, key))
+
+        moves: list[int] = []
+        node = parents.get(target)
+        while node is not None:
+            state, tile = node
+            moves.append(tile)
+            node = parents[state]
+        moves.reverse()
+        return moves
+
+    def solve(self, tiles: Tiles, *, max_nodes: int = OPTIMAL_NODES) -> list[int]:
+        """The tiles to slide into the blank, in order. Blocking, meant to be run in a thread."""
+        if not is_solvable(tiles, self.size):
+            msg = "this board can not be solved"
+            raise ValueError(msg)
+
+        moves = self._ida(tiles, max_nodes)
+        for i, weight in enumerate(WEIGHTS):
+            if moves is not None:
+                break
+            moves = self._weighted(tiles, weight, WEIGHTED_NODES if i < len(WEIGHTS) - 1 else None)
+        assert moves is not None
+
+        self._plan.clear()
+        state = list(tiles)
+        for tile in moves:
+            self._plan[tuple(state)] = tile
+            cell, blank = state.index(tile), state.index(0)
+            state[blank], state[cell] = tile, 0
+        return moves
+
+    def hint(self, tiles: Tiles) -> int | None:
+        """The tile to slide next."""
+        tiles = tuple(tiles)
+        if tiles in self._plan:
+            return self._plan[tiles]
+        moves = self.solve(tiles)
+        return moves[0] if moves else None
+
+
+def generate_slider(size: int, difficulty: str = "medium", *, rng: random.Random | None = None) -> Tiles:
+    """A scrambled board, made of random slides from the solved one so it is always solvable."""
+    rng = rng or random.Random()
+    tiles = list(goal(size))
+    if size < 2:
+        return tuple(tiles)
+
+    neighbours = _neighbours(size)
+    blank, previous = len(tiles) - 1, -1
+    for _ in range(DIFFICULTIES[difficulty]):
+        # never undoing the previous slide
+        cell = rng.choice([cell for cell in neighbours[blank] if cell != previous])
+        tiles[blank], tiles[cell] = tiles[cell], 0
+        blank, previous = cell, blank
+
+    if tuple(tiles) == goal(size):
+        return generate_slider(size, difficulty, rng=rng)
+    return tuple(tiles)
@@ -0,0 +1,424 @@
+from __future__ import annotations
+
+import heapq
+import logging
+from collections import deque
+from time import perf_counter
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from typing import TypeAlias
+
+    Boxes: TypeAlias = frozenset[int]
+
+__all__ = ("SokobanLevel", "SokobanState", "SokobanSolver", "DIRECTIONS")
+
+log = logging.getLogger("interactions.buttons.puzzles.sokoban")
+
+WALL = "#"
+PLAYER = "@"
+PLAYER_ON_GOAL = "+"
+BOX = "$"
+BOX_ON_GOAL = "x"
+BOX_ON_GOAL_ALT = "*"
+GOAL = "."
+FLOOR = " "
+
+DIRECTIONS = ("up", "down", "left", "right")
+
+# pushes expanded by the solver, and seconds spent, before giving up
+SOLVER_NODES = 200_000
+SOLVER_TIME = 5.0
+# weight of the heuristic. Over 1 the solutions are not the shortest, but are found far sooner
+SOLVER_WEIGHT = 5
+UNREACHABLE = 1 << 20
+
+
+class SokobanLevel:
+    """A level parsed once, as flat arrays shared by every game of it.
+
+    The grid is padded with a wall all around, a move never goes out of it. The
+    cells the player can not reach, even with every box removed, are outside of
+    the level: what they hold is kept for display only. The dead squares are the
+    floor cells from which a box can not be pushed to any goal.
+    """
+
+    __slots__ = ("width", "height", "walls", "goals", "dead", "player", "boxes", "offsets", "decor")
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        walls: bytearray,
+        goals: frozenset[int],
+        player: int,
+        boxes: Boxes,
+        decor: dict[int, str],
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.walls = walls
+        self.goals = goals
+        self.player = player
+        self.boxes = boxes
+        self.decor = decor
+        # direction -> index offset
+        self.offsets = {"up": -width, "down": width, "left": -1, "right": 1}
+        self.dead = self._dead_squares()
+
+    def __repr__(self) -> str:
+        return f"<SokobanLevel {self.width - 2}x{self.height - 2} boxes={len(self.boxes)}>"
+
+    @classmethod
+    def parse(cls, text: str) -> SokobanLevel:
+        lines = [line.rstrip("\r") for line in text.strip("\n").split("\n")]
+        width = max(map(len, lines), default=0) + 2
+        height = len(lines) + 2
+
+        # short lines are padded with floor, the border is a wall the level never shows
+        chars = [FLOOR] * (width * height)
+        for i in range(width * height):
+            r, c = divmod(i, width)
+            if r in (0, height - 1) or c in (0, width - 1):
+                chars[i] = WALL
+        for r, line in enumerate(lines, start=1):
+            for c, char in enumerate(line, start=1):
+                chars[r * width + c] = char
+
+        players = [i for i, char in enumerate(chars) if char in (PLAYER, PLAYER_ON_GOAL)]
+        if len(players) != 1:
+            msg = "A level must have exactly one player (`@`)"
+            raise ValueError(msg)
+
+        walls = bytearray(char == WALL for char in chars)
+        # the cells the player can ever stand on, or push a box to
+        inside = _flood(players[0], walls, (-width, width, -1, 1))
+
+        goals = frozenset(i for i in inside if chars[i] in (GOAL, BOX_ON_GOAL, BOX_ON_GOAL_ALT, PLAYER_ON_GOAL))
+        boxes = frozenset(i for i in inside if chars[i] in (BOX, BOX_ON_GOAL, BOX_ON_GOAL_ALT))
+        if not boxes:
+            msg = "A level must have at least one box (`$`) the player can reach"
+            raise ValueError(msg)
+        if len(boxes) != len(goals):
+            msg = f"A level must have as many boxes as targets, found {len(boxes)} boxes and {len(goals)} targets"
+            raise ValueError(msg)
+
+        decor = {}
+        for i, char in enumerate(chars):
+            if i not in inside and char != WALL:
+                if char != FLOOR:
+                    log.debug("Cell %s (%r) is outside of the level, kept for display only", i, char)
+                decor[i] = char
+                # a box or goal outside is only drawn, the cell is blocked
+                walls[i] = 1
+
+        return cls(width, height, walls, goals, players[0], boxes, decor)
+
+    def _dead_squares(self) -> bytearray:
+        # a box on a cell can reach a goal if the goal can pull it back there: the box
+        # comes from `cell - d` while the player stands at `cell - 2d`
+        walls = self.walls
+        live = bytearray(len(walls))
+        queue = deque(self.goals)
+        for goal in self.goals:
+            live[goal] = 1
+        while queue:
+            cell = queue.popleft()
+            for d in self.offsets.values():
+                prev, player = cell - d, cell - 2 * d
+                if 0 <= player < len(walls) and not walls[prev] and not walls[player] and not live[prev]:
+                    live[prev] = 1
+                    queue.append(prev)
+        return bytearray(not walls[i] and not live[i] for i in range(len(walls)))
+
+    def cell(self, row: int, col: int) -> int:
+        return (row + 1) * self.width + col + 1
+
+
+class SokobanState:
+    """The position of a game. Moves are applied in place, and undone from a stack."""
+
+    __slots__ = ("level", "player", "boxes", "on_goal", "history", "pushes")
+
+    def __init__(self, level: SokobanLevel) -> None:
+        self.level = level
+        self.player = level.player
+        self.boxes: set[int] = set(level.boxes)
+        self.on_goal = len(self.boxes & level.goals)
+        # (direction, whether a box was pushed)
+        self.history: list[tuple[str, bool]] = []
+        self.pushes = 0
+
+    def __repr__(self) -> str:
+        return f"<SokobanState moves={len(self.history)} pushes={self.pushes} solved={self.is_solved()}>"
+
+    @property
+    def moves(self) -> int:
+        return len(self.history)
+
+    def key(self) -> tuple[int, Boxes]:
+        return self.player, frozenset(self.boxes)
+
+    def is_solved(self) -> bool:
+        return self.on_goal == len(self.boxes)
+
+    def is_stuck(self) -> bool:
+        """Whether a box is on a dead square, the level can not be finished anymore."""
+        dead = self.level.dead
+        return any(dead[box] for box in self.boxes)
+
+    def _move_box(self, src: int, dst: int) -> None:
+        goals = self.level.goals
+        self.boxes.remove(src)
+        self.boxes.add(dst)
+        self.on_goal += (dst in goals) - (src in goals)
+
+    def move(self, direction: str) -> bool:
+        """Moves the player, pushing the box in front of it. Returns whether anything moved."""
+        offset = self.level.offsets[direction]
+        target = self.player + offset
+        if self.level.walls[target]:
+            return False
+
+        pushed = target in self.boxes
+        if pushed:
+            beyond = target + offset
+            if self.level.walls[beyond] or beyond in self.boxes:
+                return False
+            self._move_box(target, beyond)
+            self.pushes += 1
+
+        self.player = target
+        self.history.append((direction, pushed))
+        return True
+
+    def undo(self) -> bool:
+        if not self.history:
+            return False
+
+        direction, pushed = self.history.pop()
+        offset = self.level.offsets[direction]
+        if pushed:
+            self._move_box(self.player + offset, self.player)
+            self.pushes -= 1
+        self.player -= offset
+        return True
+
+    def reset(self) -> None:
+        self.player = self.level.player
+        self.boxes = set(self.level.boxes)
+        self.on_goal = len(self.boxes & self.level.goals)
+        self.history.clear()
+        self.pushes = 0
+
+    def rows(self) -> list[str]:
+        """The board as level characters, without the padding."""
+        level = self.level
+        out = []
+        for r in range(1, level.height - 1):
+            row = []
+            for i in range(r * level.width + 1, (r + 1) * level.width - 1):
+                if i in level.decor:
+                    char = level.decor[i]
+                elif level.walls[i]:
+                    char = WALL
+                elif i == self.player:
+                    char = PLAYER
+                elif i in self.boxes:
+                    char = BOX_ON_GOAL if i in level.goals else BOX
+                else:
+                    char = GOAL if i in level.goals else FLOOR
+                row.append(char)
+            out.append("".join(row).rstrip())
+        return out
+
+
+class Solution(NamedTuple):
+    moves: list[str]
+    pushes: int
+    nodes: int
+
+
+def _flood(start: int, walls: bytearray, offsets: tuple[int, ...], blocked: Boxes | set[int] = frozenset()) -> set[int]:
+    seen = {start}
+    stack = [start]
+    while stack:
+        cell = stack.pop()
+        for d in offsets:
+            nxt = cell + d
+            if nxt not in seen and not walls[nxt] and nxt not in blocked:
+                seen.add(nxt)
+                stack.append(nxt)
+    return seen
+
+
+class SokobanSolver:
+    """A* over pushes, the player walking freely between them.
+
+    A state is the boxes and the top-left cell the player can reach, so every way
+    of walking to the same region is one state. Pushes onto dead squares, or making
+    a 2x2 block of boxes and walls off the goals, are never tried. The heuristic is
+    the sum of each box's distance to its nearest goal, weighted by
+    :data:`SOLVER_WEIGHT`.
+    """
+
+    def __init__(self, level: SokobanLevel) -> None:
+        self.level = level
+        self.offsets = tuple(level.offsets.values())
+        self.names = {d: name for name, d in level.offsets.items()}
+        self._goal_distance = self._distances()
+        # state key -> next direction, along the last solution
+        self._plan: dict[tuple[int, Boxes], str] = {}
+
+    def _distances(self) -> list[int]:
+        # pushing distance of each cell to the nearest goal, ignoring the other boxes
+        walls = self.level.walls
+        distance = [UNREACHABLE] * len(walls)
+        queue = deque(self.level.goals)
+        for goal in queue:
+            distance[goal] = 0
+        while queue:
+            cell = queue.popleft()
+            for d in self.offsets:
+                prev, player = cell - d, cell - 2 * d
+                if 0 <= player < len(walls) and not walls[prev] and not walls[player] and distance[prev] == UNREACHABLE:
+                    distance[prev] = distance[cell] + 1
+                    queue.append(prev)
+        return distance
+
+    def heuristic(self, boxes: Boxes) -> int:
+        distance = self._goal_distance
+        return sum(distance[box] for box in boxes)
+
+    def _frozen(self, box: int, boxes: Boxes) -> bool:
+        # whether the pushed box closes a 2x2 square of walls and boxes, not all on goals
+        walls, goals = self.level.walls, self.level.goals
+        width = self.level.width
+        for dr in (-width, width):
+            for dc in (-1, 1):
+                square = (box, box + dr, box + dc, box + dr + dc)
+                if all(walls[cell] or cell in boxes for cell in square) and any(
+                    cell in boxes and cell not in goals for cell in square
+                ):
+                    return True
+        return False
+
+    def _path(self, start: int, end: int, boxes: Boxes) -> list[str] | None:
+        # the player's walk between two cells, around the boxes
+        if start == end:
+            return []
+        walls = self.level.walls
+        parents: dict[int, tuple[int, int]] = {start: (start, 0)}
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            for d in self.offsets:
+                nxt = cell + d
+                if nxt in parents or walls[nxt] or nxt in boxes:
+                    continue
+                parents[nxt] = (cell, d)
+                if nxt == end:
+                    path = []
+                    while nxt != start:
+                        nxt, step = parents[nxt]
+                        path.append(self.names[step])
+                    path.reverse()
+                    return path
+                queue.append(nxt)
+        return None
+
+    def solve(
+        self,
+        player: int,
+        boxes: Boxes,
+        *,
+        max_nodes: int = SOLVER_NODES,
+        time_budget: float = SOLVER_TIME,
+    ) -> Solution | None:
+        """The moves finishing the level from this position.
+
+        ``None`` if no solution was found within ``max_nodes`` pushes or ``time_budget``
+        seconds. Blocking, meant to be run in a thread.
+        """
+        deadline = perf_counter() + time_budget
+        level = self.level
+        walls, dead, goals = level.walls, level.dead, level.goals
+        if any(dead[box] for box in boxes):
+            return None
+
+        # states are normalized once popped, a push leaves the player where the box was.
+        # Entries: (f, g, tie, h, player, boxes, parent state, box pushed, direction of the push)
+        heap: list[tuple[int, int, int, int, int, Boxes, tuple[int, Boxes] | None, int, int]]
+        heap = [(0, 0, 0, self.heuristic(boxes), player, boxes, None, 0, 0)]
+        distance = self._goal_distance
+        # state -> (previous state, box pushed, direction of the push)
+        parents: dict[tuple[int, Boxes], tuple[tuple[int, Boxes], int, int] | None] = {}
+        tie = 0
+        found = None
+
+        while heap:
+            _, g, _, h, state_player, state_boxes, parent, pushed, d = heapq.heappop(heap)
+            region = _flood(state_player, walls, self.offsets, state_boxes)
+            state = (min(region), state_boxes)
+            if state in parents:
+                continue
+            parents[state] = None if parent is None else (parent, pushed, d)
+            if goals >= state_boxes:
+                found = state
+                break
+            # the clock is cheap, but not free
+            if len(parents) > max_nodes or (not len(parents) % 256 and perf_counter() > deadline):
+                return None
+
+            for box in state_boxes:
+                for d in self.offsets:
+                    beyond = box + d
+                    if box - d not in region or walls[beyond] or beyond in state_boxes or dead[beyond]:
+                        continue
+                    new_boxes = (state_boxes - {box}) | {beyond}
+                    if self._frozen(beyond, new_boxes):
+                        continue
+                    tie += 1
+                    new_h = h - distance[box] + distance[beyond]
+                    heapq.heappush(
+                        heap,
+                        (g + 1 + SOLVER_WEIGHT * new_h, g + 1, tie, new_h, box, new_boxes, state, box, d),
+                    )
+
+        if found is None:
+            return None
+
+        pushes: list[tuple[int, int]] = []
+        node = found
+        while (entry := parents[node]) is not None:
+            node, box, d = entry
+            pushes.append((box, d))
+        pushes.reverse()
+
+        # the walks between the pushes
+        moves: list[str] = []
+        current, current_boxes = player, set(boxes)
+        self._plan.clear()
+        for box, d in pushes:
+            walk = self._path(current, box - d, frozenset(current_boxes))
+            assert walk is not None
+            for step in [*walk, self.names[d]]:
+                self._plan[(current, frozenset(current_boxes))] = step
+                offset = level.offsets[step]
+                current += offset
+                if current in current_boxes:
+                    current_boxes.remove(current)
+                    current_boxes.add(current + offset)
+            moves.extend(walk)
+            moves.append(self.names[d])
+        return Solution(moves, len(pushes), len(parents))
+
+    def hint(self, state: SokobanState) -> str | None:
+        """The next move, on the way to finishing the level. ``None`` if none was found."""
+        key = state.key()
+        if key in self._plan:
+            return self._plan[key]
+        solution = self.solve(state.player, key[1])
+        if solution is None or not solution.moves:
+            return None
+        return solution.moves[0]
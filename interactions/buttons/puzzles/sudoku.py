@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import random
+from functools import cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import TypeAlias
+
+    # cells row by row, 0 for empty
+    Grid: TypeAlias = list[int]
+
+__all__ = ("SudokuSolver", "generate_sudoku", "sudoku_hint", "is_solved", "DIFFICULTIES")
+
+# difficulty -> clues left on a 9x9 board, scaled for other sizes. Hard goes as low as uniqueness allows
+DIFFICULTIES: dict[str, int] = {
+    "easy": 38,
+    "medium": 31,
+    "hard": 0,
+}
+
+
+class SudokuSolver:
+    """Backtracking over bitmasks of the digits used by each row, column and box.
+
+    The empty cell with the fewest candidates is filled first.
+    """
+
+    def __init__(self, base: int = 3) -> None:
+        self.base = base
+        self.side = side = base * base
+        self.full = (1 << side) - 1
+        self.units = _units(base)
+
+    def __repr__(self) -> str:
+        return f"<SudokuSolver side={self.side}>"
+
+    def candidates(self, grid: Grid) -> list[int]:
+        """The mask of the digits each cell can take, 0 for filled cells."""
+        rows, cols, boxes = self._used(grid)
+        if rows is None:
+            return [0] * len(grid)
+        return [
+            0 if value else self.full & ~(rows[r] | cols[c] | boxes[b])
+            for value, (r, c, b) in zip(grid, self.units, strict=True)
+        ]
+
+    def _used(self, grid: Grid) -> tuple[list[int], list[int], list[int]] | tuple[None, None, None]:
+        rows, cols, boxes = [0] * self.side, [0] * self.side, [0] * self.side
+        for value, (r, c, b) in zip(grid, self.units, strict=True):
+            if not value:
+                continue
+            bit = 1 << (value - 1)
+            if (rows[r] | cols[c] | boxes[b]) & bit:
+                # a digit repeated, no solution
+                return None, None, None
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+        return rows, cols, boxes
+
+    def solve(self, grid: Grid, *, limit: int = 1, rng: random.Random | None = None) -> list[Grid]:
+        """Up to ``limit`` solutions of ``grid``. With ``rng``, digits are tried in a random order."""
+        rows, cols, boxes = self._used(grid)
+        if rows is None:
+            return []
+
+        grid = grid.copy()
+        units = self.units
+        full = self.full
+        empty = [i for i, value in enumerate(grid) if not value]
+        solutions: list[Grid] = []
+
+        def search() -> bool:
+            # returns True once enough solutions are found
+            best, best_mask, best_count = -1, 0, 10**9
+            for i in empty:
+                if grid[i]:
+                    continue
+                r, c, b = units[i]
+                mask = full & ~(rows[r] | cols[c] | boxes[b])
+                count = mask.bit_count()
+                if count < best_count:
+                    best, best_mask, best_count = i, mask, count
+                    if count <= 1:
+                        break
+
+            if best == -1:
+                solutions.append(grid.copy())
+                return len(solutions) >= limit
+            if not best_mask:
+                return False
+
+            bits = [1 << d for d in range(self.side) if best_mask >> d & 1]
+            if rng is not None:
+                rng.shuffle(bits)
+
+            r, c, b = units[best]
+            for bit in bits:
+                grid[best] = bit.bit_length()
+                rows[r] |= bit
+                cols[c] |= bit
+                boxes[b] |= bit
+                done = search()
+                rows[r] ^= bit
+                cols[c] ^= bit
+                boxes[b] ^= bit
+                if done:
+                    grid[best] = 0
+                    return True
+            grid[best] = 0
+            return False
+
+        search()
+        return solutions
+
+    def is_unique(self, grid: Grid) -> bool:
+        return len(self.solve(grid, limit=2)) == 1
+
+
+@cache
+def _units(base: int) -> tuple[tuple[int, int, int], ...]:
+    side = base * base
+    return tuple((i // side, i % side, (i // side) // base * base + (i % side) // base) for i in range(side * side))
+
+
+def is_solved(grid: Grid, *, base: int = 3) -> bool:
+    """Whether every row, column and box of a full ``grid`` holds each digit once."""
+    solver = SudokuSolver(base)
+    if not all(grid):
+        return False
+    rows, _, _ = solver._used(grid)
+    return rows is not None
+
+
+def generate_sudoku(difficulty: str = "medium", *, base: int = 3, rng: random.Random | None = None) -> tuple[Grid, Grid]:
+    """A puzzle with exactly one solution, and that solution.
+
+    A random full grid is solved from an empty one, then clues are removed in a
+    random order as long as the solution stays unique, down to the clue count of
+    ``difficulty``. Blocking, meant to be run in a thread.
+    """
+    rng = rng or random.Random()
+    solver = SudokuSolver(base)
+    cells = solver.side * solver.side
+
+    (solution,) = solver.solve([0] * cells, rng=rng)
+    puzzle = solution.copy()
+    # the clue counts are for 9x9 boards
+    target = DIFFICULTIES[difficulty] * cells // 81
+
+    clues = cells
+    order = list(range(cells))
+    rng.shuffle(order)
+    for i in order:
+        if clues <= target:
+            break
+        puzzle[i] = 0
+        if solver.is_unique(puzzle):
+            clues -= 1
+        else:
+            puzzle[i] = solution[i]
+    return puzzle, solution
+
+
+def sudoku_hint(grid: Grid, solution: Grid, *, base: int = 3) -> tuple[int, int] | None:
+    """The next cell to fill, as ``(index, digit)``.
+
+    A wrong digit is pointed out first. Otherwise the empty cell with the fewest
+    candidates, a cell having only one left is found by elimination alone.
+    """
+    for i, (value, answer) in enumerate(zip(grid, solution, strict=True)):
+        if value and value != answer:
+            return i, answer
+
+    candidates = SudokuSolver(base).candidates(grid)
+    empty = [i for i, value in enumerate(grid) if not value]
+    if not empty:
+        return None
+    best = min(empty, key=lambda i: candidates[i].bit_count())
+    return best, solution[best]
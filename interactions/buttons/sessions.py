@@ -0,0 +1,424 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import os
+import sys
+import types
+from collections import Counter, defaultdict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from time import monotonic, perf_counter
+from typing import TYPE_CHECKING, Any
+
+from discord.ext import commands, tasks
+from PIL import Image
+
+import discord
+from core.metrics import Histogram
+from utilities.exceptions import GameSessionLimit
+
+if TYPE_CHECKING:
+    from typing import TypeVar
+
+    from typing_extensions import ParamSpec
+
+    from core import Context
+
+    P = ParamSpec("P")
+    T = TypeVar("T")
+
+__all__ = ("GameSession", "GameSessions", "SESSIONS", "run_in_pool", "solve_in_pool", "approximate_size")
+
+log = logging.getLogger("interactions.buttons.sessions")
+
+# concurrent games, before new ones are refused
+MAX_PER_USER = 3
+MAX_PER_GUILD = 50
+MAX_SESSIONS = 500
+# seconds without an interaction, before a game is ended
+IDLE_TIMEOUT = 15 * 60
+# estimated bytes held by every game together. Past it, the least recently played are ended
+MEMORY_BUDGET = 256 * 1024**2
+SWEEP_INTERVAL = 30
+
+# threads shared by the games for rendering, and calls allowed in flight.
+# A burst of calls past the limit waits on the event loop, not in the executor queue
+POOL_WORKERS = min(4, os.cpu_count() or 1)
+POOL_LIMIT = 64
+# solvers and AI searches may take seconds, they get their own threads so that
+# they never hold the rendering of every other game
+SOLVER_WORKERS = min(2, os.cpu_count() or 1)
+SOLVER_LIMIT = 8
+# seconds between two hints of one user
+HINT_COOLDOWN = 10
+
+# objects walked when estimating the size of one game
+SIZE_NODES = 100_000
+# objects walked between two yields to the event loop
+SIZE_CHUNK = 1_000
+# owned by the bot, or shared by every game: never counted in a game's size
+_NOT_OWNED = (
+    discord.Client,
+    discord.Message,
+    discord.Interaction,
+    discord.Guild,
+    discord.Member,
+    discord.User,
+    discord.ClientUser,
+    discord.Role,
+    discord.Emoji,
+    discord.abc.GuildChannel,
+    discord.Thread,
+    discord.DMChannel,
+    commands.Context,
+    commands.Cog,
+    asyncio.Future,
+    asyncio.AbstractEventLoop,
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+)
+
+
+def _module_ids() -> set[int]:
+    # values held by the game modules themselves, word lists, renderers and such
+    ids: set[int] = set()
+    for name, module in list(sys.modules.items()):
+        if name.startswith("interactions.buttons") and module is not None:
+            ids.update(map(id, vars(module).values()))
+    return ids
+
+
+async def approximate_size(
+    root: object,
+    *,
+    max_nodes: int = SIZE_NODES,
+    skip: set[int] | None = None,
+    chunk: int = SIZE_CHUNK,
+) -> int:
+    """|coro|.
+
+    Bytes held by ``root`` and what it references, as told by :func:`sys.getsizeof`.
+    Images count their pixel buffer, ``width * height * bands``.
+
+    Discord models, the bot, and module level objects shared by every game are
+    not counted. The walk gives the loop back every ``chunk`` objects, and stops
+    after ``max_nodes`` of them, the size is a lower bound then.
+    """
+    seen = set(skip or ())
+    stack = [root]
+    size = 0
+    nodes = 0
+    while stack and nodes < max_nodes:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _NOT_OWNED):
+            continue
+        seen.add(id(obj))
+        nodes += 1
+        if not nodes % chunk:
+            await asyncio.sleep(0)
+
+        if isinstance(obj, Image.Image):
+            # the pixels live in the C core, getsizeof only sees the wrapper
+            size += obj.width * obj.height * len(obj.getbands())
+            continue
+
+        size += sys.getsizeof(obj, 0)
+
+        if isinstance(obj, str | bytes | bytearray | int | float | bool | None):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, list | tuple | set | frozenset):
+            stack.extend(obj)
+        if hasattr(obj, "__dict__"):
+            stack.append(vars(obj))
+        for cls in type(obj).__mro__:
+            for slot in getattr(cls, "__slots__", ()):
+                if not slot.startswith("__") and hasattr(obj, slot):
+                    stack.append(getattr(obj, slot))
+    return size
+
+
+class GameSession:
+    """A game started by a command, and the views it sent."""
+
+    __slots__ = ("id", "game", "user_id", "guild_id", "started_at", "last_active", "views", "messages", "size")
+
+    def __init__(self, ctx: Context) -> None:
+        self.id: int = ctx.message.id
+        self.game: str = ctx.command.qualified_name if ctx.command else "unknown"
+        self.user_id: int = ctx.author.id
+        self.guild_id: int | None = ctx.guild.id if ctx.guild else None
+        self.started_at: float = monotonic()
+        self.last_active: float = self.started_at
+        self.views: list[discord.ui.View] = []
+        self.messages: list[discord.Message] = []
+        # bytes, as of the last sweep
+        self.size: int = 0
+
+    def __repr__(self) -> str:
+        return f"<GameSession game={self.game!r} user={self.user_id} views={len(self.views)}>"
+
+    @property
+    def idle(self) -> float:
+        return monotonic() - self.last_active
+
+    def is_finished(self) -> bool:
+        return all(view.is_finished() for view in self.views)
+
+
+class GameSessions:
+    """Every running game, capped per user, per guild and globally.
+
+    A session opens when a game command is invoked, and follows the views the
+    command sends. It is closed once all of them are finished, or when idle for
+    :data:`IDLE_TIMEOUT` seconds. Sizes are estimated every sweep, the least
+    recently played games are ended while the total is over :data:`MEMORY_BUDGET`.
+
+    Blocking work of the games goes through :meth:`run`, on one bounded thread pool.
+    Solvers go through :meth:`solve`, on a smaller one of their own.
+    """
+
+    def __init__(self) -> None:
+        self.sessions: dict[int, GameSession] = {}
+        # message id -> session, for the interactions on the games' messages
+        self._by_message: dict[int, GameSession] = {}
+
+        # created on first use. Never shut down here: other extensions hold on to
+        # :func:`run_in_pool` across a reload of this one. The idle threads exit once
+        # nothing references the pool anymore
+        self._executor: ThreadPoolExecutor | None = None
+        self._solver: ThreadPoolExecutor | None = None
+        self._slots = asyncio.Semaphore(POOL_LIMIT)
+        self._solver_slots = asyncio.Semaphore(SOLVER_LIMIT)
+        # user id -> when they last asked for a hint
+        self._hints: dict[int, float] = {}
+        # callable name -> time spent in the pool, waiting included
+        self.render: defaultdict[str, Histogram] = defaultdict(Histogram)
+
+        self.started: Counter[str] = Counter()
+        self.evicted: Counter[str] = Counter()
+        self.refused: int = 0
+
+    def __repr__(self) -> str:
+        return f"<GameSessions active={len(self.sessions)}>"
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    # lifecycle
+
+    def check(self, ctx: Context) -> bool:
+        """Raises :exc:`GameSessionLimit` if ``ctx.author`` can not start one more game."""
+        if ctx.message.id in self.sessions:
+            # a subcommand of a game already started
+            return True
+
+        self._prune()
+        sessions = self.sessions.values()
+        if sum(s.user_id == ctx.author.id for s in sessions) >= MAX_PER_USER:
+            self.refused += 1
+            msg = f"You already have {MAX_PER_USER} games running, finish or quit one of them first."
+            raise GameSessionLimit(msg)
+        if ctx.guild and sum(s.guild_id == ctx.guild.id for s in sessions) >= MAX_PER_GUILD:
+            self.refused += 1
+            msg = f"This server already has {MAX_PER_GUILD} games running, try again later."
+            raise GameSessionLimit(msg)
+        if len(self.sessions) >= MAX_SESSIONS:
+            self.refused += 1
+            msg = "Too many games are running right now, try again later."
+            raise GameSessionLimit(msg)
+        return True
+
+    def open(self, ctx: Context) -> GameSession:
+        if session := self.sessions.get(ctx.message.id):
+            return session
+
+        session = self.sessions[ctx.message.id] = GameSession(ctx)
+        self.started[session.game] += 1
+        return session
+
+    def attach(self, ctx: Context, view: discord.ui.View, message: discord.Message | None) -> None:
+        session = self.sessions.get(ctx.message.id)
+        if session is None:
+            return
+
+        session.views.append(view)
+        session.last_active = monotonic()
+        if message is not None:
+            session.messages.append(message)
+            self._by_message[message.id] = session
+
+    def release(self, ctx: Context) -> None:
+        """Closes the session of ``ctx``, unless it sent views still running."""
+        session = self.sessions.get(ctx.message.id)
+        if session is not None and session.is_finished():
+            self._close(session)
+
+    def touch(self, interaction: discord.Interaction) -> None:
+        if interaction.message and (session := self._by_message.get(interaction.message.id)):
+            session.last_active = monotonic()
+
+    def _close(self, session: GameSession) -> None:
+        self.sessions.pop(session.id, None)
+        for message in session.messages:
+            self._by_message.pop(message.id, None)
+        session.views.clear()
+        session.messages.clear()
+
+    def _prune(self) -> None:
+        for session in [s for s in self.sessions.values() if s.views and s.is_finished()]:
+            self._close(session)
+
+    async def evict(self, session: GameSession, *, reason: str) -> None:
+        log.info("Ending %r: %s", session, reason)
+        self.evicted[reason] += 1
+        views, messages = list(session.views), list(session.messages)
+        self._close(session)
+
+        for view in views:
+            view.stop()
+        for message in messages:
+            with suppress(discord.HTTPException):
+                await message.edit(view=None)
+
+    @tasks.loop(seconds=SWEEP_INTERVAL)
+    async def sweep(self) -> None:
+        self._prune()
+
+        for session in [s for s in self.sessions.values() if s.idle > IDLE_TIMEOUT]:
+            await self.evict(session, reason="idle")
+
+        now = monotonic()
+        self._hints = {user_id: at for user_id, at in self._hints.items() if now - at < HINT_COOLDOWN}
+
+        sessions = list(self.sessions.values())
+        if not sessions:
+            return
+
+        skip = _module_ids()
+        for session in sessions:
+            try:
+                session.size = await approximate_size(session.views, skip=skip)
+            except Exception as e:
+                # the previous size is kept, one odd object must not stop the sweep
+                log.warning("Could not size %r", session, exc_info=e)
+
+        total = sum(s.size for s in sessions)
+        for session in sorted(sessions, key=lambda s: s.last_active):
+            if total <= MEMORY_BUDGET:
+                break
+            total -= session.size
+            await self.evict(session, reason="memory")
+
+    def start(self) -> None:
+        self.sweep.start()
+
+    def stop(self) -> None:
+        self.sweep.cancel()
+
+    # the shared pool
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=POOL_WORKERS, thread_name_prefix="games")
+        return self._executor
+
+    @property
+    def solver(self) -> ThreadPoolExecutor:
+        if self._solver is None:
+            self._solver = ThreadPoolExecutor(max_workers=SOLVER_WORKERS, thread_name_prefix="games-solver")
+        return self._solver
+
+    async def _run(
+        self,
+        executor: ThreadPoolExecutor,
+        slots: asyncio.Semaphore,
+        func: Callable[..., T],
+        /,
+        *args: Any,
+        **kwargs: Any,
+    ) -> T:
+        loop = asyncio.get_running_loop()
+        ini = perf_counter()
+        try:
+            async with slots:
+                return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+        finally:
+            name = getattr(func, "__qualname__", None) or repr(func)
+            self.render[name].add((perf_counter() - ini) * 1000)
+
+    async def run(self, func: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs) -> T:
+        """|coro|.
+
+        Runs ``func`` on the games' thread pool, and records the time it took.
+        """
+        return await self._run(self.executor, self._slots, func, *args, **kwargs)
+
+    async def solve(self, func: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs) -> T:
+        """|coro|.
+
+        Like :meth:`run`, on the few threads kept for the solvers and AI searches.
+        """
+        return await self._run(self.solver, self._solver_slots, func, *args, **kwargs)
+
+    def hint_cooldown(self, user_id: int) -> float:
+        """Seconds ``user_id`` has to wait before the next hint, 0 if they can have one now.
+
+        A hint given is recorded, the cooldown starts from it.
+        """
+        now = monotonic()
+        last = self._hints.get(user_id)
+        if last is not None and now - last < HINT_COOLDOWN:
+            return HINT_COOLDOWN - (now - last)
+        self._hints[user_id] = now
+        return 0
+
+    # reports
+
+    def by_game(self) -> dict[str, dict[str, Any]]:
+        out: dict[str, dict[str, Any]] = {}
+        for session in self.sessions.values():
+            entry = out.setdefault(session.game, {"active": 0, "bytes": 0, "views": 0})
+            entry["active"] += 1
+            entry["bytes"] += session.size
+            entry["views"] += len(session.views)
+        for game, stats in out.items():
+            stats["started"] = self.started[game]
+        return out
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "active": len(self.sessions),
+            "bytes": sum(s.size for s in self.sessions.values()),
+            "refused": self.refused,
+            "evicted": dict(self.evicted),
+            "games": self.by_game(),
+            "render": {name: hist.to_dict() for name, hist in sorted(self.render.items(), key=lambda kv: kv[1].total, reverse=True)},
+        }
+
+
+SESSIONS = GameSessions()
+
+
+async def run_in_pool(func: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs) -> T:
+    """|coro|.
+
+    Like :func:`asyncio.to_thread`, on the thread pool shared by the games.
+    """
+    return await SESSIONS.run(func, *args, **kwargs)
+
+
+async def solve_in_pool(func: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs) -> T:
+    """|coro|.
+
+    Like :func:`run_in_pool`, for solvers and searches that may take seconds.
+    """
+    return await SESSIONS.solve(func, *args, **kwargs)
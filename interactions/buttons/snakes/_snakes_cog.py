@@ -7,7 +7,6 @@ import random
 import re
 import string
 import textwrap
-from functools import partial
 from io import BytesIO
 from typing import Any
 
@@ -19,6 +18,7 @@ from core import Cog, Context, Parrot
 from discord import Colour, Embed, File, Member, Message, PartialEmoji, Reaction
 from discord.ext import commands
 
+from ..sessions import run_in_pool
 from ._converter import Snake
 from ._utils import (
     PerlinNoiseFactory,
@@ -875,8 +875,7 @@ class Snakes(Cog):
 
             stream.seek(0)
 
-            func = partial(self._generate_card, stream, content)
-            final_buffer = await self.bot.loop.run_in_executor(None, func)
+            final_buffer = await run_in_pool(self._generate_card, stream, content)
 
         # Send it!
         await ctx.send(
@@ -8,6 +8,8 @@ from typing import TYPE_CHECKING, Any, Final, TypeVar
 import discord
 from core import Context, Parrot, ParrotView
 
+from .sessions import SESSIONS
+
 if TYPE_CHECKING:
     from typing import TypeAlias
 
@@ -44,7 +46,7 @@ def executor() -> Callable[[Callable[P, T]], Callable[P, asyncio.Future[T]]]:
         def wrapper(*args: P.args, **kwargs: P.kwargs):
             partial = functools.partial(func, *args, **kwargs)
             loop = asyncio.get_event_loop()
-            return loop.run_in_executor(None, partial)
+            return loop.run_in_executor(SESSIONS.executor, partial)
 
         return wrapper
 
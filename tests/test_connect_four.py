@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from unittest import TestCase
+
+from interactions.buttons.__connect_four import DIFFICULTIES, C4Board, C4Engine
+
+
+def play(*columns: int, width: int = 7, height: int = 6) -> C4Board:
+    board = C4Board(width, height)
+    for col in columns:
+        board.play(col)
+    return board
+
+
+class TestC4Board(TestCase):
+    def setUp(self) -> None:
+        # columns played in turn, the first player ends with four in a row
+        self.wins: list[tuple[str, tuple[int, ...]]] = [
+            ("horizontal", (0, 0, 1, 1, 2, 2, 3)),
+            ("vertical", (0, 1, 0, 1, 0, 1, 0)),
+            ("diagonal", (0, 1, 1, 2, 2, 3, 2, 3, 3, 6, 3)),
+            ("anti diagonal", (6, 5, 5, 4, 4, 3, 4, 3, 3, 0, 3)),
+        ]
+
+    def test_win_detection(self):
+        # sourcery skip: no-loop-in-tests
+        for name, columns in self.wins:
+            with self.subTest(direction=name):
+                before = play(*columns[:-1])
+                self.assertFalse(before.aligned(before.stones(1)))
+                self.assertTrue(before.is_winning_move(columns[-1]))
+
+                after = play(*columns)
+                self.assertTrue(after.aligned(after.stones(1)))
+                self.assertFalse(after.aligned(after.stones(2)))
+
+    def test_no_wrap_between_columns(self):
+        # the second player has the top three cells of column 0 and the bottom one of column 1
+        board = play(0, 1, 0, 2, 0, 3, 1, 0, 6, 0, 6, 0, 1)
+        self.assertFalse(board.aligned(board.stones(1)))
+        self.assertFalse(board.aligned(board.stones(2)))
+
+    def test_full_column(self):
+        board = play(0, 0, 0, 0, 0, 0)
+        self.assertFalse(board.can_play(0))
+        self.assertNotIn(0, board.legal_columns())
+        with self.assertRaises(ValueError):
+            board.play(0)
+
+    def test_play_returns_row(self):
+        board = C4Board()
+        self.assertEqual([board.play(3) for _ in range(3)], [0, 1, 2])
+
+
+class TestC4Engine(TestCase):
+    def search(self, board: C4Board, difficulty: str) -> int:
+        engine = C4Engine(board.width, board.height)
+        return engine.search(board, depth=DIFFICULTIES[difficulty], time_budget=0.5).column
+
+    def test_takes_immediate_win(self):
+        # sourcery skip: no-loop-in-tests
+        # the first player has three in column 0, and is to move
+        board = play(0, 6, 0, 6, 0, 5)
+        for difficulty in DIFFICULTIES:
+            with self.subTest(difficulty=difficulty):
+                self.assertEqual(self.search(board.copy(), difficulty), 0)
+
+    def test_blocks_immediate_win(self):
+        # sourcery skip: no-loop-in-tests
+        # the first player threatens column 0, the second is to move
+        board = play(0, 6, 0, 6, 0)
+        for difficulty in DIFFICULTIES:
+            with self.subTest(difficulty=difficulty):
+                self.assertEqual(self.search(board.copy(), difficulty), 0)
+
+    def test_prefers_win_over_block(self):
+        # sourcery skip: no-loop-in-tests
+        # both players have three stacked, the one to move wins instead of blocking
+        board = play(0, 6, 0, 6, 0, 6)
+        for difficulty in DIFFICULTIES:
+            with self.subTest(difficulty=difficulty):
+                self.assertEqual(self.search(board.copy(), difficulty), 0)
+
+    def test_search_does_not_change_board(self):
+        board = play(3, 3, 2)
+        engine = C4Engine()
+        engine.search(board, depth=DIFFICULTIES["hard"], time_budget=0.5)
+        self.assertEqual((board.current, board.mask, board.moves), (play(3, 3, 2).current, play(3, 3, 2).mask, 3))
+
+    def test_full_board(self):
+        board = C4Board(2, 2)
+        for col in (0, 0, 1, 1):
+            board.play(col)
+        with self.assertRaises(ValueError):
+            C4Engine(2, 2).search(board, depth=1)
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import datetime
+from types import SimpleNamespace
+from unittest import TestCase
+
+import discord
+from cogs.mod.purge import BULK_DELETE_AGE, PurgeFilter, bulk_delete_cutoff
+
+
+def message(
+    content: str = "",
+    *,
+    author_id: int = 1,
+    bot: bool = False,
+    embeds: list | None = None,
+    attachments: list | None = None,
+    reactions: list | None = None,
+) -> SimpleNamespace:
+    # only the attributes the predicates read
+    return SimpleNamespace(
+        content=content,
+        author=SimpleNamespace(id=author_id, bot=bot),
+        embeds=embeds or [],
+        attachments=attachments or [],
+        reactions=reactions or [],
+    )
+
+
+class TestPurgeFilter(TestCase):
+    def setUp(self) -> None:
+        # filter, a message it matches, a message it does not
+        self.arguments: list[tuple[str, PurgeFilter, SimpleNamespace, SimpleNamespace]] = [
+            ("users", PurgeFilter(users=[discord.Object(id=7)]), message(author_id=7), message(author_id=8)),
+            ("bot", PurgeFilter(bot=True), message(bot=True), message()),
+            ("embeds", PurgeFilter(embeds=True), message(embeds=[object()]), message()),
+            ("files", PurgeFilter(files=True), message(attachments=[object()]), message()),
+            ("reactions", PurgeFilter(reactions=True), message(reactions=[object()]), message()),
+            ("contains", PurgeFilter(contains=["foo", "a.b"]), message("say a.b now"), message("say axb now")),
+            ("starts", PurgeFilter(starts=["!", "?"]), message("?help"), message("help?")),
+            ("ends", PurgeFilter(ends=["!", "?"]), message("help?"), message("?help")),
+            ("regex", PurgeFilter(regex=r"\d+ apples"), message("3 apples"), message("apples 3")),
+            ("emoji", PurgeFilter(emoji=True), message("hi <:parrot:123456>"), message("hi :parrot:")),
+            ("links", PurgeFilter(links=True), message("see https://example.com"), message("see you")),
+        ]
+
+    def test_predicates(self):
+        # sourcery skip: no-loop-in-tests
+        for name, purge_filter, matching, other in self.arguments:
+            with self.subTest(filter=name):
+                predicate = purge_filter.compile()
+                self.assertTrue(predicate(matching))
+                self.assertFalse(predicate(other))
+
+    def test_negate(self):
+        # sourcery skip: no-loop-in-tests
+        for name, purge_filter, matching, other in self.arguments:
+            with self.subTest(filter=name):
+                purge_filter.negate = True
+                predicate = purge_filter.compile()
+                self.assertFalse(predicate(matching))
+                self.assertTrue(predicate(other))
+
+    def test_no_option_matches_everything(self):
+        self.assertTrue(PurgeFilter().compile()(message()))
+        self.assertFalse(PurgeFilter(negate=True).compile()(message()))
+
+    def test_all_and_any(self):
+        both = message(embeds=[object()], attachments=[object()])
+        embed_only = message(embeds=[object()])
+
+        every = PurgeFilter(embeds=True, files=True).compile()
+        self.assertTrue(every(both))
+        self.assertFalse(every(embed_only))
+
+        either = PurgeFilter(embeds=True, files=True, any_=True).compile()
+        self.assertTrue(either(embed_only))
+        self.assertFalse(either(message()))
+
+        neither = PurgeFilter(embeds=True, files=True, any_=True, negate=True).compile()
+        self.assertTrue(neither(message()))
+        self.assertFalse(neither(embed_only))
+
+
+class TestBulkDeleteCutoff(TestCase):
+    def setUp(self) -> None:
+        self.now = datetime.datetime(2023, 6, 1, 12, tzinfo=datetime.timezone.utc)
+        self.cutoff = bulk_delete_cutoff(self.now)
+        self.oldest = self.now - BULK_DELETE_AGE
+
+    def snowflake(self, created_at: datetime.datetime) -> int:
+        # a message of some worker and increment, created at ``created_at``
+        return discord.utils.time_snowflake(created_at) | 0x3FFFFF
+
+    def test_message_at_cutoff_is_searched(self):
+        # history is fetched after the cutoff, exclusive
+        self.assertGreater(self.snowflake(self.oldest), self.cutoff)
+
+    def test_message_before_cutoff_is_not_searched(self):
+        self.assertLess(self.snowflake(self.oldest - datetime.timedelta(milliseconds=1)), self.cutoff)
+
+    def test_cutoff_within_two_weeks(self):
+        self.assertLess(BULK_DELETE_AGE, datetime.timedelta(weeks=2))
+        self.assertGreater(discord.utils.snowflake_time(self.cutoff), self.now - datetime.timedelta(weeks=2))
+
+    def test_later_after_wins(self):
+        later = discord.utils.time_snowflake(self.now - datetime.timedelta(days=1))
+        earlier = discord.utils.time_snowflake(self.now - datetime.timedelta(days=20))
+        self.assertEqual(bulk_delete_cutoff(self.now, later), later)
+        self.assertEqual(bulk_delete_cutoff(self.now, earlier), self.cutoff)
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import random
+from unittest import TestCase
+
+from interactions.buttons.puzzles import (
+    LightsSolver,
+    SliderSolver,
+    SudokuSolver,
+    generate_lights,
+    generate_slider,
+    generate_sudoku,
+    is_solvable,
+    is_solved,
+    sudoku_hint,
+)
+from interactions.buttons.puzzles.slider import goal
+
+
+class TestSudoku(TestCase):
+    def setUp(self) -> None:
+        self.solver = SudokuSolver()
+
+    def test_generated_puzzle_has_one_solution(self):
+        # sourcery skip: no-loop-in-tests
+        for difficulty in ("easy", "medium", "hard"):
+            with self.subTest(difficulty=difficulty):
+                puzzle, solution = generate_sudoku(difficulty, rng=random.Random(difficulty))
+
+                self.assertTrue(is_solved(solution))
+                self.assertEqual(self.solver.solve(puzzle, limit=2), [solution])
+                # the clues are the solution's digits
+                self.assertTrue(all(not value or value == answer for value, answer in zip(puzzle, solution, strict=True)))
+
+    def test_hint_corrects_wrong_digit_first(self):
+        puzzle, solution = generate_sudoku("easy", rng=random.Random(1))
+        index = puzzle.index(0)
+        grid = puzzle.copy()
+        grid[index] = solution[index] % 9 + 1
+
+        self.assertEqual(sudoku_hint(grid, solution), (index, solution[index]))
+
+    def test_hint_fills_forced_cell(self):
+        _, solution = generate_sudoku("easy", rng=random.Random(2))
+        grid = solution.copy()
+        grid[0] = grid[40] = 0
+        grid[1] = grid[2] = 0
+
+        index, digit = sudoku_hint(grid, solution)  # type: ignore
+        self.assertEqual(digit, solution[index])
+        # the cell chosen is the one with the fewest candidates
+        candidates = self.solver.candidates(grid)
+        self.assertEqual(candidates[index].bit_count(), min(candidates[i].bit_count() for i in (0, 1, 2, 40)))
+
+    def test_hint_on_solved_board(self):
+        _, solution = generate_sudoku("easy", rng=random.Random(3))
+        self.assertIsNone(sudoku_hint(solution, solution))
+
+
+class TestLightsOut(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        # 4x4 boards have many solutions each, every press combination is enumerated once
+        cls.solver = LightsSolver(4)
+        cls.fewest: dict[int, int] = {}
+        for presses in range(1 << cls.solver.cells):
+            board = 0
+            for cell in range(cls.solver.cells):
+                if presses >> cell & 1:
+                    board = cls.solver.press(board, cell)
+            count = presses.bit_count()
+            if count < cls.fewest.get(board, cls.solver.cells + 1):
+                cls.fewest[board] = count
+
+    def press_all(self, board: int, presses: int) -> int:
+        for cell in range(self.solver.cells):
+            if presses >> cell & 1:
+                board = self.solver.press(board, cell)
+        return board
+
+    def test_solution_is_minimal(self):
+        # sourcery skip: no-loop-in-tests
+        rng = random.Random(4)
+        for board in rng.sample(sorted(self.fewest), 200):
+            with self.subTest(board=board):
+                presses = self.solver.solve(board)
+                assert presses is not None
+                self.assertEqual(self.press_all(board, presses), 0)
+                self.assertEqual(presses.bit_count(), self.fewest[board])
+
+    def test_unsolvable_board(self):
+        # sourcery skip: no-loop-in-tests
+        board = next(b for b in range(1 << self.solver.cells) if b not in self.fewest)
+        self.assertIsNone(self.solver.solve(board))
+
+    def test_generated_board_is_solvable(self):
+        # sourcery skip: no-loop-in-tests
+        for size in (3, 4, 5):
+            with self.subTest(size=size):
+                board = generate_lights(size, "medium", rng=random.Random(size))
+                presses = LightsSolver(size).solve(board)
+                self.assertIsNotNone(presses)
+                self.assertNotEqual(board, 0)
+
+
+class TestNumberSlider(TestCase):
+    def replay(self, tiles: tuple[int, ...], moves: list[int]) -> tuple[int, ...]:
+        state = list(tiles)
+        for tile in moves:
+            cell, blank = state.index(tile), state.index(0)
+            self.assertIn(cell, SliderSolver(int(len(state) ** 0.5)).neighbours[blank])
+            state[blank], state[cell] = tile, 0
+        return tuple(state)
+
+    def test_solution_replays_to_goal(self):
+        # sourcery skip: no-loop-in-tests
+        for size, difficulty in ((2, "easy"), (3, "medium"), (3, "hard"), (4, "easy"), (4, "medium")):
+            with self.subTest(size=size, difficulty=difficulty):
+                tiles = generate_slider(size, difficulty, rng=random.Random(size))
+                self.assertTrue(is_solvable(tiles, size))
+
+                moves = SliderSolver(size).solve(tiles)
+                self.assertEqual(self.replay(tiles, moves), goal(size))
+
+    def test_solution_is_optimal_for_short_scrambles(self):
+        tiles = generate_slider(3, "easy", rng=random.Random(5))
+        moves = SliderSolver(3).solve(tiles)
+        # the scramble itself is a way back
+        self.assertLessEqual(len(moves), 10)
+
+    def test_hint_follows_solution(self):
+        tiles = generate_slider(3, "medium", rng=random.Random(6))
+        solver = SliderSolver(3)
+        moves = solver.solve(tiles)
+
+        state = tiles
+        for tile in moves:
+            self.assertEqual(solver.hint(state), tile)
+            state = self.replay(state, [tile])
+        self.assertEqual(state, goal(3))
+
+    def test_unsolvable_board(self):
+        tiles = (2, 1, 3, 4, 5, 6, 7, 8, 0)
+        self.assertFalse(is_solvable(tiles, 3))
+        with self.assertRaises(ValueError):
+            SliderSolver(3).solve(tiles)
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from unittest import TestCase
+
+from interactions.buttons.puzzles import SokobanLevel, SokobanSolver, SokobanState
+
+# two boxes, pushed left onto the targets from either side of the inner wall
+LEVEL = """
+#######
+#.  $ #
+# #@  #
+#.  $ #
+#######
+"""
+
+
+class TestSokobanLevel(TestCase):
+    def setUp(self) -> None:
+        self.level = SokobanLevel.parse(LEVEL)
+
+    def test_parse(self):
+        level = self.level
+        self.assertEqual(level.player, level.cell(2, 3))
+        self.assertEqual(level.boxes, frozenset({level.cell(1, 4), level.cell(3, 4)}))
+        self.assertEqual(level.goals, frozenset({level.cell(1, 1), level.cell(3, 1)}))
+        self.assertTrue(level.walls[level.cell(2, 2)])
+        self.assertFalse(level.walls[level.cell(2, 1)])
+
+    def test_dead_squares(self):
+        level = self.level
+        # a box in a corner off the goals can never move again
+        self.assertTrue(level.dead[level.cell(1, 5)])
+        self.assertFalse(level.dead[level.cell(1, 1)])
+        self.assertFalse(level.dead[level.cell(1, 4)])
+
+    def test_rows_round_trip(self):
+        self.assertEqual(SokobanState(self.level).rows(), [line.rstrip() for line in LEVEL.strip("\n").split("\n")])
+
+    def test_invalid_levels(self):
+        # sourcery skip: no-loop-in-tests
+        for text in ("#####\n# $.#\n#####", "######\n#@$$.#\n######", "#####\n#@ .#\n#####"):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                SokobanLevel.parse(text)
+
+
+class TestSokobanState(TestCase):
+    def setUp(self) -> None:
+        self.level = SokobanLevel.parse(LEVEL)
+        self.state = SokobanState(self.level)
+
+    def test_walls_block(self):
+        self.assertFalse(self.state.move("left"))
+        self.assertEqual(self.state.moves, 0)
+
+    def test_push_blocked_by_wall(self):
+        state = self.state
+        self.assertTrue(state.move("right"))
+        # the box above is against the wall
+        self.assertFalse(state.move("up"))
+        self.assertEqual((state.moves, state.pushes), (1, 0))
+
+    def test_push_and_undo(self):
+        state = self.state
+        before = state.key()
+        for direction in ("right", "right", "down"):
+            self.assertTrue(state.move(direction))
+
+        self.assertTrue(state.move("left"))
+        self.assertEqual(state.pushes, 1)
+        self.assertEqual(state.player, self.level.cell(3, 4))
+        self.assertIn(self.level.cell(3, 3), state.boxes)
+
+        self.assertTrue(state.undo())
+        self.assertEqual(state.pushes, 0)
+        self.assertEqual(state.player, self.level.cell(3, 5))
+        self.assertIn(self.level.cell(3, 4), state.boxes)
+        self.assertNotIn(self.level.cell(3, 3), state.boxes)
+
+        while state.undo():
+            pass
+        self.assertEqual(state.key(), before)
+        self.assertEqual(state.moves, 0)
+
+    def test_undo_restores_goal_count(self):
+        state = self.state
+        for direction in ("right", "right", "down", "left", "left", "left"):
+            self.assertTrue(state.move(direction))
+        self.assertEqual(state.on_goal, 1)
+
+        self.assertTrue(state.undo())
+        self.assertEqual(state.on_goal, 0)
+        self.assertIn(self.level.cell(3, 2), state.boxes)
+
+
+class TestSokobanSolver(TestCase):
+    def replay(self, level: SokobanLevel, moves: list[str]) -> SokobanState:
+        state = SokobanState(level)
+        for direction in moves:
+            self.assertTrue(state.move(direction), f"{direction} did not move, after {state.history}")
+        return state
+
+    def test_solution_replays_to_solved(self):
+        # sourcery skip: no-loop-in-tests
+        for text in (LEVEL, "##############\n#   .$@      #\n##############"):
+            with self.subTest(text=text):
+                level = SokobanLevel.parse(text)
+                solution = SokobanSolver(level).solve(level.player, level.boxes, time_budget=float("inf"))
+                assert solution is not None
+
+                state = self.replay(level, solution.moves)
+                self.assertTrue(state.is_solved())
+                self.assertEqual(state.pushes, solution.pushes)
+
+    def test_hints_follow_to_solved(self):
+        # sourcery skip: no-loop-in-tests
+        level = SokobanLevel.parse(LEVEL)
+        solver = SokobanSolver(level)
+        state = SokobanState(level)
+        for _ in range(100):
+            if state.is_solved():
+                break
+            direction = solver.hint(state)
+            assert direction is not None
+            self.assertTrue(state.move(direction))
+        self.assertTrue(state.is_solved())
+
+    def test_stuck_box_has_no_solution(self):
+        level = SokobanLevel.parse(LEVEL)
+        state = SokobanState(level)
+        # the top box, pushed into the corner
+        for direction in ("up", "right"):
+            self.assertTrue(state.move(direction))
+        self.assertTrue(state.is_stuck())
+        self.assertIsNone(SokobanSolver(level).solve(state.player, frozenset(state.boxes)))
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
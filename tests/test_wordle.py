@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from unittest import TestCase
+
+from interactions.buttons.__wordle import ABSENT, CORRECT, PRESENT, WordleSolver, score_guess
+
+A, P, C = ABSENT, PRESENT, CORRECT
+
+
+class TestScoreGuess(TestCase):
+    def setUp(self) -> None:
+        # guess, answer, marks
+        self.arguments: list[tuple[str, str, tuple[int, ...]]] = [
+            ("crane", "crane", (C, C, C, C, C)),
+            ("fight", "crane", (A, A, A, A, A)),
+            ("nacre", "crane", (P, P, P, P, C)),
+            # one "e" in the answer, only the first "e" of the guess is present
+            ("speed", "abide", (A, A, P, A, P)),
+            # the last "e" is correct, so only one more "e" is left to be present
+            ("eerie", "there", (P, A, P, A, C)),
+            ("there", "eerie", (A, A, P, P, C)),
+            # both "l"s of the answer are taken by the correct ones
+            ("lolly", "world", (A, C, A, C, A)),
+            ("abbey", "kebab", (P, P, C, P, A)),
+            ("geese", "eerie", (A, C, P, A, C)),
+        ]
+
+    def test_score_guess(self):
+        # sourcery skip: no-loop-in-tests
+        for guess, answer, expected in self.arguments:
+            with self.subTest(guess=guess, answer=answer):
+                self.assertEqual(score_guess(guess, answer), expected)
+
+
+class TestWordleSolver(TestCase):
+    def test_update_keeps_matching_words(self):
+        words = ["abide", "speed", "there", "eerie", "crane"]
+        solver = WordleSolver(words)
+        solver.update([("speed", score_guess("speed", "abide"))])
+        self.assertEqual(solver.candidates, ["abide"])
+        self.assertEqual(solver.suggest(), "abide")
+
+    def test_no_candidate_left(self):
+        solver = WordleSolver(["abide", "crane"])
+        solver.update([("speed", (C, C, C, C, C))])
+        self.assertEqual(solver.candidates, [])
+        self.assertIsNone(solver.suggest())
+
+
+if __name__ == "__main__":
+    from unittest import main
+
+    main()
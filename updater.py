@@ -23,6 +23,10 @@ ORIGINAL_REPO = _ORIGINAL_RAW_REPO
 async def init():
     db = await aiosqlite.connect("cached.sqlite", iter_chunk_size=2**8, cached_statements=2**10)
 
+    # logs are written in the background, WAL lets the readers go on meanwhile
+    await db.execute("PRAGMA journal_mode=WAL;")
+    await db.execute("PRAGMA synchronous=NORMAL;")
+
     query = """
         BEGIN;
         CREATE TABLE IF NOT EXISTS scam_links (id INTEGER PRIMARY KEY AUTOINCREMENT, link TEXT NOT NULL, UNIQUE(link));
@@ -31,7 +35,7 @@ async def init():
         CREATE TABLE IF NOT EXISTS nsfw_links_grouped (id INTEGER PRIMARY KEY AUTOINCREMENT, link TEXT NOT NULL UNIQUE, type TEXT);
 
         CREATE TABLE IF NOT EXISTS logs (id INTEGER PRIMARY KEY AUTOINCREMENT, level INT NOT NULL, message TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, extra TEXT, UNIQUE(message, created_at));
-        DELETE FROM logs;
+        CREATE INDEX IF NOT EXISTS logs_level_created_at ON logs (level, created_at);
 
         COMMIT;
     """
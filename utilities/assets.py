@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections.abc import Iterable, Iterator, Mapping
+from typing import TYPE_CHECKING
+
+from PIL import Image, ImageFont
+
+if TYPE_CHECKING:
+    from typing import TypeAlias
+
+    ImageKey: TypeAlias = tuple[str, str | None]
+    FontKey: TypeAlias = tuple[str, int]
+
+__all__ = ("AssetRegistry", "LazyImages", "ASSETS")
+
+log = logging.getLogger("utilities.assets")
+
+
+class AssetRegistry:
+    """Images and fonts, loaded from disk on first use and shared afterwards.
+
+    Images are keyed by ``(path, mode)``, fonts by ``(path, size)``. The shared
+    images must not be drawn on, take a ``.copy()`` for that.
+    """
+
+    def __init__(self) -> None:
+        self._images: dict[ImageKey, Image.Image] = {}
+        self._fonts: dict[FontKey, ImageFont.FreeTypeFont] = {}
+        # declared assets, loaded by `warm`
+        self._declared_images: set[ImageKey] = set()
+        self._declared_fonts: set[FontKey] = set()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<AssetRegistry images={len(self._images)} fonts={len(self._fonts)}>"
+
+    def image(self, path: str | os.PathLike[str], mode: str | None = "RGBA") -> Image.Image:
+        key = (os.fspath(path), mode)
+        try:
+            return self._images[key]
+        except KeyError:
+            pass
+
+        with self._lock:
+            # loaded by another thread, while this one waited
+            if (img := self._images.get(key)) is not None:
+                return img
+
+            with Image.open(key[0]) as fp:
+                img = fp.convert(mode) if mode is not None else fp.copy()
+            self._images[key] = img
+            log.debug("Loaded image %s (%s)", key[0], mode)
+            return img
+
+    def font(self, path: str | os.PathLike[str], size: int) -> ImageFont.FreeTypeFont:
+        key = (os.fspath(path), size)
+        try:
+            return self._fonts[key]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if (font := self._fonts.get(key)) is not None:
+                return font
+
+            font = self._fonts[key] = ImageFont.truetype(key[0], size)
+            log.debug("Loaded font %s (%s)", key[0], size)
+            return font
+
+    def declare_images(self, paths: Iterable[str | os.PathLike[str]], mode: str | None = "RGBA") -> None:
+        self._declared_images.update((os.fspath(path), mode) for path in paths)
+
+    def declare_font(self, path: str | os.PathLike[str], size: int) -> None:
+        self._declared_fonts.add((os.fspath(path), size))
+
+    def warm(self) -> None:
+        """Loads every declared asset. Blocking, meant to be run in a thread."""
+        for path, mode in list(self._declared_images):
+            try:
+                self.image(path, mode)
+            except OSError as e:
+                log.warning("Could not load image %s", path, exc_info=e)
+
+        for path, size in list(self._declared_fonts):
+            try:
+                self.font(path, size)
+            except OSError as e:
+                log.warning("Could not load font %s", path, exc_info=e)
+
+    def memory(self) -> dict[str, int]:
+        """Approximate bytes held per loaded asset. Images by their decoded pixels, fonts by their file."""
+        usage: dict[str, int] = {}
+        for (path, mode), img in self._images.items():
+            usage[f"{path} ({mode})"] = img.width * img.height * len(img.getbands())
+
+        for path, size in self._fonts:
+            try:
+                usage[f"{path} ({size}px)"] = os.path.getsize(path)
+            except OSError:
+                usage[f"{path} ({size}px)"] = 0
+        return usage
+
+
+ASSETS = AssetRegistry()
+
+
+class LazyImages(Mapping[str, Image.Image]):
+    """A mapping of keys to image paths, which gives the images themselves from :data:`ASSETS`.
+
+    Membership and iteration do not load anything.
+    """
+
+    def __init__(self, paths: Mapping[str, str], *, mode: str | None = "RGBA", registry: AssetRegistry = ASSETS) -> None:
+        self.paths = dict(paths)
+        self.mode = mode
+        self.registry = registry
+        registry.declare_images(self.paths.values(), mode)
+
+    def __getitem__(self, key: str) -> Image.Image:
+        return self.registry.image(self.paths[key], self.mode)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.paths
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
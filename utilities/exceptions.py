@@ -140,3 +140,7 @@ class ImageTooLarge(BaseImageException):
             f"The size of the provided image (`{size / MIL:.2f} MB`) " f"exceeds the limit of `{max_size / MIL} MB`"
         )
         super().__init__(self.message)
+
+
+class GameSessionLimit(ParrotCheckFailure):
+    pass